@@ -0,0 +1,174 @@
+"""
+Micro-benchmark of frame encoding/decoding per message type, for every JSON
+flavour and the Protobuf transport encoding.
+
+    python -m <package>.benchmark_codec [iterations]
+"""
+
+import json
+import sys
+import time
+
+from .codec import JsonCodec, orjson
+from .models import PAYLOAD_TYPES
+from .protobuf_codec import ProtobufCodec, upb_available
+
+SAMPLE_MESSAGES = {
+    "heartbeat": (PAYLOAD_TYPES.PROTO_HEARTBEAT_EVENT, {}),
+    "new_order_req": (
+        PAYLOAD_TYPES.PROTO_OA_NEW_ORDER_REQ,
+        {
+            "ctidTraderAccountId": 12345678,
+            "symbolId": 1,
+            "tradeSide": "BUY",
+            "volume": 100000,
+            "orderType": "MARKET",
+            "relativeStopLoss": 2000,
+            "relativeTakeProfit": 3500,
+        },
+    ),
+    "spot_event": (
+        PAYLOAD_TYPES.PROTO_OA_SPOT_EVENT,
+        {
+            "ctidTraderAccountId": 12345678,
+            "symbolId": 1,
+            "bid": 108512,
+            "ask": 108515,
+            "timestamp": 1760659200123,
+        },
+    ),
+    "execution_event": (
+        PAYLOAD_TYPES.PROTO_OA_EXECUTION_EVENT,
+        {
+            "ctidTraderAccountId": 12345678,
+            "executionType": 3,
+            "position": {
+                "positionId": 987654,
+                "tradeData": {
+                    "symbolId": 1,
+                    "volume": 100000,
+                    "tradeSide": 1,
+                    "openTimestamp": 1760659200123,
+                    "guaranteedStopLoss": False,
+                },
+                "positionStatus": 1,
+                "swap": 0,
+                "price": 1.08515,
+                "utcLastUpdateTimestamp": 1760659200123,
+                "commission": -6,
+                "marginRate": 1.08515,
+                "mirroringCommission": 0,
+                "guaranteedStopLoss": False,
+                "usedMargin": 3617,
+                "moneyDigits": 2,
+            },
+            "order": {
+                "orderId": 123456,
+                "tradeData": {
+                    "symbolId": 1,
+                    "volume": 100000,
+                    "tradeSide": 1,
+                    "openTimestamp": 1760659200100,
+                },
+                "orderType": 1,
+                "orderStatus": 2,
+                "executionPrice": 1.08515,
+                "executedVolume": 100000,
+                "utcLastUpdateTimestamp": 1760659200123,
+                "positionId": 987654,
+            },
+            "deal": {
+                "dealId": 555,
+                "orderId": 123456,
+                "positionId": 987654,
+                "volume": 100000,
+                "filledVolume": 100000,
+                "symbolId": 1,
+                "createTimestamp": 1760659200100,
+                "executionTimestamp": 1760659200123,
+                "executionPrice": 1.08515,
+                "tradeSide": 1,
+                "dealStatus": 2,
+                "marginRate": 1.08515,
+                "commission": -6,
+                "baseToUsdConversionRate": 1.08515,
+                "moneyDigits": 2,
+            },
+        },
+    ),
+    "symbols_list_res": (
+        PAYLOAD_TYPES.PROTO_OA_SYMBOLS_LIST_RES,
+        {
+            "ctidTraderAccountId": 12345678,
+            "symbol": [
+                {
+                    "symbolId": i,
+                    "symbolName": f"SYM{i:04d}",
+                    "enabled": True,
+                    "baseAssetId": i,
+                    "quoteAssetId": 1,
+                    "symbolCategoryId": 1,
+                    "description": f"Symbol number {i}",
+                }
+                for i in range(1, 1001)
+            ],
+        },
+    ),
+}
+
+
+def _legacy_encode(client_msg_id, payload_type, payload):
+    return json.dumps(
+        {"clientMsgId": client_msg_id, "payloadType": payload_type, "payload": payload},
+        indent=4,
+    )
+
+
+def _time_per_op(func, arg_sets, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for args in arg_sets:
+            func(*args)
+    return (time.perf_counter() - start) / (iterations * len(arg_sets))
+
+
+def _iterations_for(frame_size, iterations):
+    # Keep big messages from dominating the run time
+    return max(1, iterations * 200 // max(frame_size, 200))
+
+
+def run(iterations: int = 20_000):
+    codecs = [("json compact", JsonCodec(use_orjson=False))]
+    if orjson is not None:
+        codecs.append(("orjson", JsonCodec()))
+    codecs.append(("protobuf", ProtobufCodec(use_upb=False)))
+    if upb_available():
+        codecs.append(("protobuf upb", ProtobufCodec()))
+
+    print(
+        f"{'message':<18} {'codec':<14} {'bytes':>8} {'encode us':>10} {'decode us':>10}"
+    )
+    for name, (payload_type, payload) in SAMPLE_MESSAGES.items():
+        args = [("2106-1", payload_type, payload)]
+        legacy_frame = _legacy_encode(*args[0])
+        n = _iterations_for(len(legacy_frame), iterations)
+
+        encode = _time_per_op(_legacy_encode, args, n)
+        decode = _time_per_op(json.loads, [(legacy_frame,)], n)
+        print(
+            f"{name:<18} {'json indent=4':<14} {len(legacy_frame):>8} "
+            f"{encode * 1e6:>10.2f} {decode * 1e6:>10.2f}"
+        )
+
+        for codec_name, codec in codecs:
+            frame = codec.encode_message(*args[0])
+            encode = _time_per_op(codec.encode_message, args, n)
+            decode = _time_per_op(codec.decode, [(frame,)], n)
+            print(
+                f"{name:<18} {codec_name:<14} {len(frame):>8} "
+                f"{encode * 1e6:>10.2f} {decode * 1e6:>10.2f}"
+            )
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000)
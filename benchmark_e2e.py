@@ -0,0 +1,212 @@
+"""
+End-to-end benchmark of the client against the local mock server.
+
+    python -m <package>.benchmark_e2e [--transport json] [--spots 100000] [--orders 500]
+
+Reports spot events per second through `MessageReceiver.receive_messages`,
+order round-trip percentiles (request sent to ORDER_FILLED received) and
+resident memory over a period of steady spot traffic. The mock server runs
+in the same process and event loop, so absolute numbers include its cost.
+"""
+
+import argparse
+import asyncio
+import os
+import resource
+import time
+
+from .json_client import WebSocketsJsonClient
+from .mock_server import MockOpenApiServer
+from .models import TradeSide
+from .send_scheduler import CONNECTION
+
+# The benchmark measures the client, not the Open API rate limits
+UNLIMITED_RATE = {CONNECTION: (1e9, 1_000_000)}
+
+
+def rss_bytes() -> int:
+    """Current resident memory, or the peak where /proc isn't available."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if os.uname().sysname == "Darwin" else peak * 1024
+
+
+def percentile(sorted_values, fraction: float) -> float:
+    if not sorted_values:
+        return float("nan")
+    index = min(
+        len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1)
+    )
+    return sorted_values[index]
+
+
+def received_ticks(client: WebSocketsJsonClient) -> int:
+    return sum(buffer.count for buffer in client.spot_buffers.buffers.values())
+
+
+async def measure_throughput(client, server, symbol_ids, spots: int) -> dict:
+    frames = server.encode_spots(spots, symbol_ids)
+    before = received_ticks(client)
+
+    start = time.perf_counter()
+    server.broadcast(frames)
+    # Answered after every spot queued before it, so it marks the end of the burst
+    await (await client.message_emitter.reconcile())
+    elapsed = time.perf_counter() - start
+
+    received = received_ticks(client) - before
+    return {
+        "spots": received,
+        "seconds": elapsed,
+        "spots_per_second": received / elapsed,
+    }
+
+
+async def measure_orders(client, symbol_name: str, orders: int) -> dict:
+    emitter = client.message_emitter
+    latencies = []
+    position_ids = []
+    for _ in range(orders):
+        request = await emitter.open_trade(TradeSide.BUY, symbol_name, 100, 100)
+        msg = await request
+        latencies.append(request.latency)
+        position_ids.append(msg["payload"]["position"]["positionId"])
+
+    for request in emitter.close_positions(position_ids):
+        await request
+
+    latencies.sort()
+    return {
+        "orders": len(latencies),
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p90_ms": percentile(latencies, 0.90) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "max_ms": latencies[-1] * 1000 if latencies else float("nan"),
+    }
+
+
+async def measure_memory(client, server, seconds: float, spot_rate: float) -> list:
+    samples = []
+    server.spot_rate = spot_rate
+    for connection in server.connections:
+        connection.start_spot_stream()
+
+    start = time.monotonic()
+    ticks = received_ticks(client)
+    while time.monotonic() - start < seconds:
+        await asyncio.sleep(1)
+        now_ticks = received_ticks(client)
+        samples.append(
+            {
+                "second": round(time.monotonic() - start),
+                "rss_mb": rss_bytes() / 1e6,
+                "spots_per_second": now_ticks - ticks,
+            }
+        )
+        ticks = now_ticks
+
+    server.spot_rate = 0.0
+    return samples
+
+
+async def run(
+    transport: str = "json",
+    spots: int = 100_000,
+    orders: int = 500,
+    symbols: int = 50,
+    memory_seconds: float = 10,
+    spot_rate: float = 20_000,
+    latency: float = 0.0,
+) -> dict:
+    async with MockOpenApiServer(
+        transport=transport, symbols=symbols, latency=latency
+    ) as server:
+        client = WebSocketsJsonClient(
+            account_ids=server.account_ids[:1],
+            transport=transport,
+            host=server.host,
+            port=server.port,
+            ssl=False,
+            symbols_snapshot_path=None,
+            rate_limits=UNLIMITED_RATE,
+        )
+        client_task = asyncio.create_task(client.run_client_and_wait())
+        try:
+            await asyncio.wait_for(client.client_ready_event.wait(), 10)
+            symbol_ids = list(client.assignables.symbols.by_id)
+            await (await client.message_emitter.subscribe_spots(symbol_ids))
+
+            results = {
+                "transport": transport,
+                "throughput": await measure_throughput(
+                    client, server, symbol_ids, spots
+                ),
+                "orders": await measure_orders(
+                    client, client.assignables.symbols.name_for(symbol_ids[0]), orders
+                ),
+                "memory": await measure_memory(
+                    client, server, memory_seconds, spot_rate
+                ),
+            }
+        finally:
+            client_task.cancel()
+            try:
+                await client_task
+            except (asyncio.CancelledError, Exception):
+                pass
+    return results
+
+
+def print_report(results: dict):
+    throughput = results["throughput"]
+    orders = results["orders"]
+    print(f"transport: {results['transport']}")
+    print(
+        f"throughput: {throughput['spots']} spots in {throughput['seconds']:.3f}s "
+        f"= {throughput['spots_per_second']:,.0f} msgs/s"
+    )
+    print(
+        f"order round trip ({orders['orders']} orders): "
+        f"p50 {orders['p50_ms']:.3f} ms, p90 {orders['p90_ms']:.3f} ms, "
+        f"p99 {orders['p99_ms']:.3f} ms, max {orders['max_ms']:.3f} ms"
+    )
+    print(f"{'second':>6} {'rss MB':>8} {'spots/s':>9}")
+    for sample in results["memory"]:
+        print(
+            f"{sample['second']:>6} {sample['rss_mb']:>8.1f} "
+            f"{sample['spots_per_second']:>9}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--transport", choices=("json", "protobuf"), default="json")
+    parser.add_argument("--spots", type=int, default=100_000)
+    parser.add_argument("--orders", type=int, default=500)
+    parser.add_argument("--symbols", type=int, default=50)
+    parser.add_argument("--memory-seconds", type=float, default=10)
+    parser.add_argument("--spot-rate", type=float, default=20_000)
+    parser.add_argument("--latency", type=float, default=0.0)
+    args = parser.parse_args()
+
+    print_report(
+        asyncio.run(
+            run(
+                args.transport,
+                args.spots,
+                args.orders,
+                args.symbols,
+                args.memory_seconds,
+                args.spot_rate,
+                args.latency,
+            )
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
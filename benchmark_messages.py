@@ -0,0 +1,141 @@
+"""
+Micro-benchmark of the generated message classes against plain dict access:
+reading the fields a handler reads, building a request payload, and the
+memory a batch of decoded messages takes either way.
+
+    python -m <package>.benchmark_messages [iterations]
+"""
+
+import json
+import sys
+import time
+import tracemalloc
+
+from .benchmark_codec import SAMPLE_MESSAGES
+from .messages import (
+    ProtoOAExecutionEvent,
+    ProtoOANewOrderReq,
+    ProtoOAOrderType,
+    ProtoOASpotEvent,
+    ProtoOATradeSide,
+)
+
+MEMORY_SAMPLES = 10_000
+
+
+def _execution_from_dict(payload: dict):
+    position = payload.get("position", {})
+    order = payload.get("order", {})
+    return (
+        payload.get("executionType"),
+        position.get("positionId"),
+        position.get("positionStatus"),
+        position.get("tradeData", {}).get("symbolId"),
+        order.get("executionPrice"),
+    )
+
+
+def _execution_from_message(event: ProtoOAExecutionEvent):
+    position = event.position
+    return (
+        event.executionType,
+        position.positionId,
+        position.positionStatus,
+        position.tradeData.symbolId,
+        event.order.executionPrice,
+    )
+
+
+def _spot_from_dict(payload: dict):
+    return (
+        payload.get("symbolId"),
+        payload.get("bid"),
+        payload.get("ask"),
+        payload.get("timestamp"),
+    )
+
+
+def _spot_from_message(event: ProtoOASpotEvent):
+    return event.symbolId, event.bid, event.ask, event.timestamp
+
+
+def _order_dict():
+    return {
+        "ctidTraderAccountId": 12345678,
+        "symbolId": 1,
+        "orderType": "MARKET",
+        "tradeSide": "BUY",
+        "volume": 100000,
+        "relativeStopLoss": 2000,
+        "relativeTakeProfit": 3500,
+    }
+
+
+def _order_message():
+    return ProtoOANewOrderReq(
+        ctidTraderAccountId=12345678,
+        symbolId=1,
+        orderType=ProtoOAOrderType.MARKET,
+        tradeSide=ProtoOATradeSide.BUY,
+        volume=100000,
+        relativeStopLoss=2000,
+        relativeTakeProfit=3500,
+    ).to_dict()
+
+
+def _time_per_op(func, arg, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func(arg)
+    return (time.perf_counter() - start) / iterations
+
+
+def _retained_bytes(build, frame: str, count: int) -> float:
+    """Bytes per message kept alive by `count` messages decoded from `frame`."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = [build(json.loads(frame)) for _ in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return (after - before) / count
+
+
+def run(iterations: int = 200_000):
+    print(f"{'operation':<38} {'dict us':>9} {'class us':>9}")
+    for name, cls, from_dict, from_message in (
+        (
+            "execution_event",
+            ProtoOAExecutionEvent,
+            _execution_from_dict,
+            _execution_from_message,
+        ),
+        ("spot_event", ProtoOASpotEvent, _spot_from_dict, _spot_from_message),
+    ):
+        payload = SAMPLE_MESSAGES[name][1]
+        message = cls.from_dict(payload)
+        dict_access = _time_per_op(from_dict, payload, iterations)
+        print(
+            f"{name + ' field reads':<38} {dict_access * 1e6:>9.3f} "
+            f"{_time_per_op(from_message, message, iterations) * 1e6:>9.3f}"
+        )
+        print(
+            f"{name + ' from_dict + field reads':<38} {dict_access * 1e6:>9.3f} "
+            f"{_time_per_op(lambda p: from_message(cls.from_dict(p)), payload, iterations) * 1e6:>9.3f}"
+        )
+        frame = json.dumps(payload)
+        print(
+            f"{name + ' bytes retained':<38} "
+            f"{_retained_bytes(lambda p: p, frame, MEMORY_SAMPLES):>9.0f} "
+            f"{_retained_bytes(cls.from_dict, frame, MEMORY_SAMPLES):>9.0f}"
+        )
+
+    print(
+        f"{'new_order_req payload':<38} "
+        f"{_time_per_op(lambda _: _order_dict(), None, iterations) * 1e6:>9.3f} "
+        f"{_time_per_op(lambda _: _order_message(), None, iterations) * 1e6:>9.3f}"
+    )
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
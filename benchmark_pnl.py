@@ -0,0 +1,90 @@
+"""
+Micro-benchmark of the P&L engine: the time to revalue every open position
+on a tick with a Python loop over the position book, against one
+`PnlEngine.recompute`.
+
+    python -m <package>.benchmark_pnl [iterations]
+"""
+
+import random
+import sys
+import time
+
+from .pnl_engine import FIXED_POINT_SCALE, PRICE_SCALE, PnlEngine
+from .position_book import PositionBook
+from .symbol_index import Symbol, SymbolIndex
+
+SYMBOLS = 20
+POSITION_COUNTS = (10, 100, 1000, 10_000)
+
+
+def _book(positions: int, rng: random.Random) -> PositionBook:
+    book = PositionBook()
+    for position_id in range(1, positions + 1):
+        book.apply_execution(
+            {
+                "ctidTraderAccountId": 1,
+                "position": {
+                    "positionId": position_id,
+                    "tradeData": {
+                        "symbolId": rng.randrange(SYMBOLS),
+                        "volume": rng.randrange(1, 100) * 100_000,
+                        "tradeSide": rng.choice((1, 2)),
+                    },
+                    "positionStatus": 1,
+                    "price": rng.randrange(100_000, 120_000) / PRICE_SCALE,
+                    "usedMargin": rng.randrange(1, 10_000),
+                    "moneyDigits": 2,
+                },
+            }
+        )
+    return book
+
+
+def _python_revalue(book: PositionBook, bids: dict, asks: dict):
+    pnl = {}
+    by_quote = {}
+    for record in book.positions.values():
+        if record.side == 1:
+            fixed = (bids[record.symbol_id] - round(record.price * PRICE_SCALE)) * (
+                record.volume
+            )
+        else:
+            fixed = (round(record.price * PRICE_SCALE) - asks[record.symbol_id]) * (
+                record.volume
+            )
+        pnl[record.position_id] = fixed * 100 // FIXED_POINT_SCALE
+        by_quote[record.symbol_id] = by_quote.get(record.symbol_id, 0) + fixed
+    return pnl, by_quote
+
+
+def run(iterations: int = 1000):
+    rng = random.Random(1)
+    symbols = SymbolIndex()
+    for symbol_id in range(SYMBOLS):
+        symbols.add(Symbol(symbol_id, f"SYM{symbol_id}", True, symbol_id, 1000))
+    bids = {symbol_id: 110_000 for symbol_id in range(SYMBOLS)}
+    asks = {symbol_id: 110_002 for symbol_id in range(SYMBOLS)}
+
+    print(f"{'positions':>9} {'python us':>10} {'numpy us':>10}")
+    for positions in POSITION_COUNTS:
+        book = _book(positions, rng)
+        engine = PnlEngine(symbols)
+        engine.load(book)
+        for symbol_id in range(SYMBOLS):
+            engine.on_tick(symbol_id, bids[symbol_id], asks[symbol_id])
+
+        start = time.perf_counter()
+        for _ in range(iterations):
+            _python_revalue(book, bids, asks)
+        python = (time.perf_counter() - start) / iterations
+
+        start = time.perf_counter()
+        for i in range(iterations):
+            engine.on_tick(i % SYMBOLS, 110_000 + i % 7, 110_002 + i % 7)
+        vectorized = (time.perf_counter() - start) / iterations
+        print(f"{positions:>9} {python * 1e6:>10.1f} {vectorized * 1e6:>10.1f}")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
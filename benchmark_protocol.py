@@ -0,0 +1,76 @@
+"""
+Throughput of the protocol core without sockets: splitting a byte stream
+into frames, decoding them with OpenApiProtocol, and decoding plus handling
+them with a MessageReceiver, for spot and execution events on both codecs.
+
+    python -m <package>.benchmark_protocol [frames]
+"""
+
+import asyncio
+import logging
+import sys
+import time
+
+from .benchmark_codec import SAMPLE_MESSAGES
+from .codec import JsonCodec
+from .frame_replay import replay_receiver
+from .models import ClientAssignables
+from .protobuf_codec import ProtobufCodec
+from .protocol import LengthPrefixedFramer, OpenApiProtocol
+
+# Bytes per read when splitting the stream, as ProtobufStream reads them
+CHUNK_SIZE = 256 * 1024
+
+
+def _frames(codec, name: str, count: int) -> list:
+    payload_type, payload = SAMPLE_MESSAGES[name]
+    if name == "spot_event":
+        # One symbol per frame, so the receiver's spot buffers see every one
+        return [
+            codec.encode_message("", payload_type, dict(payload, symbolId=i % 50))
+            for i in range(count)
+        ]
+    return [codec.encode_message("", payload_type, payload)] * count
+
+
+def _rate(count: int, started: float) -> str:
+    return f"{count / (time.perf_counter() - started):>12,.0f}"
+
+
+async def _handle(codec_name: str, frames: list) -> str:
+    receiver = replay_receiver(codec_name)
+    process_frame = receiver.process_frame
+    started = time.perf_counter()
+    for frame in frames:
+        await process_frame(frame, inline=True)
+    return _rate(len(frames), started)
+
+
+def run(count: int = 100_000):
+    # The handlers log every execution event, which would be all that's measured
+    logging.disable(logging.INFO)
+    print(f"{'frames/s':<28} {'split':>12} {'decode':>12} {'decode+handle':>14}")
+    for codec_name, codec in (("json", JsonCodec()), ("protobuf", ProtobufCodec())):
+        for name in ("spot_event", "execution_event"):
+            frames = _frames(codec, name, count)
+
+            split = "-"
+            if codec_name == "protobuf":
+                stream = b"".join(LengthPrefixedFramer.frame(frame) for frame in frames)
+                framer = LengthPrefixedFramer()
+                started = time.perf_counter()
+                for pos in range(0, len(stream), CHUNK_SIZE):
+                    framer.feed(stream[pos : pos + CHUNK_SIZE])
+                split = _rate(count, started)
+
+            protocol = OpenApiProtocol(ClientAssignables(""), codec)
+            started = time.perf_counter()
+            protocol.receive_frames(frames)
+            decode = _rate(count, started)
+
+            handle = asyncio.run(_handle(codec_name, frames))
+            print(f"{codec_name + ' ' + name:<28} {split:>12} {decode} {handle:>14}")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
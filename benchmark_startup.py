@@ -0,0 +1,128 @@
+"""
+Cold start of a client against the local mock server: each run starts a
+fresh interpreter that imports the client, creates it and waits for
+`client_ready_event`.
+
+    python -m <package>.benchmark_startup [--transport json] [--runs 10] [--latency 0.005]
+
+Reports the median time to import the client, to create it, from
+`run_client_and_wait` to ready, from the first import to ready and for the
+whole process. `--latency` holds every frame of the server that long, as a
+network round trip would. The symbols snapshot is saved by a warm-up run,
+so the measured runs load it while connecting as a restarted worker would.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+# Runs in the fresh interpreter, timing starts before anything is imported
+CHILD = """
+import time
+started = time.perf_counter()
+import asyncio, json, sys
+from {package}.config import ClientConfig
+from {package}.json_client import WebSocketsJsonClient
+imported = time.perf_counter()
+
+async def main(options):
+    config = ClientConfig(
+        transport=options["transport"],
+        host=options["host"],
+        port=options["port"],
+        ssl=False,
+        log_directory=None,
+    )
+    client = WebSocketsJsonClient(
+        account_ids=options["account_ids"],
+        symbols_snapshot_path=options["symbols_snapshot_path"],
+        history_cache_path=None,
+        config=config,
+    )
+    created = time.perf_counter()
+    task = asyncio.create_task(client.run_client_and_wait())
+    await client.client_ready_event.wait()
+    ready = time.perf_counter()
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+    print(json.dumps({{
+        "import": imported - started,
+        "create": created - imported,
+        "connect": ready - created,
+        "ready": ready - started,
+    }}))
+
+asyncio.run(main(json.loads(sys.argv[1])))
+"""
+
+COLUMNS = ("import", "create", "connect", "ready", "process")
+
+
+async def start_client(options: dict) -> dict:
+    env = dict(
+        os.environ, PYTHONPATH=os.pathsep.join(path for path in sys.path if path)
+    )
+    started = time.perf_counter()
+    process = await asyncio.create_subprocess_exec(
+        sys.executable,
+        "-c",
+        CHILD.format(package=__package__),
+        json.dumps(options),
+        stdout=asyncio.subprocess.PIPE,
+        env=env,
+    )
+    stdout, _ = await process.communicate()
+    elapsed = time.perf_counter() - started
+    if process.returncode != 0:
+        raise RuntimeError(f"The client process exited with {process.returncode}.")
+    timings = json.loads(stdout.splitlines()[-1])
+    timings["process"] = elapsed
+    return timings
+
+
+async def run(transport: str, runs: int, symbols: int, latency: float) -> dict:
+    # Deferred so the parent's imports never warm anything up for the children
+    from .mock_server import MockOpenApiServer
+
+    async with MockOpenApiServer(
+        transport=transport, symbols=symbols, latency=latency
+    ) as server:
+        with tempfile.TemporaryDirectory() as directory:
+            options = {
+                "transport": transport,
+                "host": server.host,
+                "port": server.port,
+                "account_ids": server.account_ids,
+                "symbols_snapshot_path": os.path.join(directory, "symbols.json"),
+            }
+            await start_client(options)
+            results = [await start_client(options) for _ in range(runs)]
+    return {
+        column: statistics.median(result[column] for result in results)
+        for column in COLUMNS
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--transport", choices=("json", "protobuf"), default="json")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--symbols", type=int, default=1000)
+    parser.add_argument("--latency", type=float, default=0.005)
+    args = parser.parse_args()
+
+    medians = asyncio.run(run(args.transport, args.runs, args.symbols, args.latency))
+    print(" ".join(f"{column + ' ms':>11}" for column in COLUMNS))
+    print(" ".join(f"{medians[column] * 1000:>11.1f}" for column in COLUMNS))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+import asyncio
+
+from logging_config import logger
+
+from .config import ClientConfig
+from .json_client import WebSocketsJsonClient
+from .models import TradeSide
+from .pending_requests import PendingRequest
+from .position_book import PositionBook
+from .spot_buffers import SpotBuffers
+from .symbol_index import SymbolIndex
+from .trendbars import TrendbarAggregator
+
+
+class WebsocketsClientPool:
+    """
+    Several WebSocketsJsonClient connections sharing one event loop.
+
+    Accounts are spread round-robin over the connections and trading calls are
+    routed to the connection that authorized the account. Spot subscriptions
+    are sharded by symbol id. All connections share the symbols cache, the
+    spot buffers, the trendbars and the position book.
+    """
+
+    def __init__(
+        self, account_ids, connections: int = None, config: ClientConfig = None
+    ):
+        if not account_ids:
+            raise ValueError("The pool needs at least one account id.")
+
+        connections = min(connections or len(account_ids), len(account_ids))
+        self.symbols = SymbolIndex()
+        self.spot_buffers = SpotBuffers()
+        self.trendbars = TrendbarAggregator()
+        self.position_book = PositionBook()
+        self.clients: list[WebSocketsJsonClient] = []
+        self._clients_by_account: dict[int, WebSocketsJsonClient] = {}
+
+        for shard in range(connections):
+            shard_accounts = list(account_ids[shard::connections])
+            client = WebSocketsJsonClient(
+                account_ids=shard_accounts,
+                symbols=self.symbols,
+                spot_buffers=self.spot_buffers,
+                trendbars=self.trendbars,
+                position_book=self.position_book,
+                config=config,
+            )
+            self.clients.append(client)
+            for account_id in shard_accounts:
+                self._clients_by_account[account_id] = client
+
+    async def run(self, connection_loop):
+        """
+        Runs `connection_loop(client)` for every connection. The first one loads
+        the shared symbols cache before the rest start, so it's only downloaded once.
+        """
+        first, *rest = self.clients
+        first_task = asyncio.create_task(connection_loop(first))
+        first_ready = asyncio.create_task(first.client_ready_event.wait())
+        await asyncio.wait(
+            (first_task, first_ready), return_when=asyncio.FIRST_COMPLETED
+        )
+        first_ready.cancel()
+        logger.info("Starting %s more pooled connections.", len(rest))
+        await asyncio.gather(first_task, *(connection_loop(client) for client in rest))
+
+    async def wait_ready(self):
+        await asyncio.gather(
+            *(client.client_ready_event.wait() for client in self.clients)
+        )
+
+    def client_for(self, account_id: int) -> WebSocketsJsonClient:
+        try:
+            return self._clients_by_account[account_id]
+        except KeyError:
+            raise KeyError(f"Account {account_id} is not part of this pool.") from None
+
+    def client_for_symbol(self, symbol_id: int) -> WebSocketsJsonClient:
+        return self.clients[symbol_id % len(self.clients)]
+
+    async def open_trade(
+        self,
+        account_id: int,
+        trade_side: TradeSide,
+        symbol_name: str,
+        stop_loss: float,
+        take_profit: float,
+        timeout: float = None,
+    ) -> PendingRequest:
+        return await self.client_for(account_id).message_emitter.open_trade(
+            trade_side,
+            symbol_name,
+            stop_loss,
+            take_profit,
+            timeout=timeout,
+            account_id=account_id,
+        )
+
+    async def close_position(
+        self, account_id: int, position_id: int, timeout: float = None
+    ) -> PendingRequest:
+        return await self.client_for(account_id).message_emitter.close_position(
+            position_id, timeout=timeout, account_id=account_id
+        )
+
+    async def amend_position_sl(
+        self,
+        account_id: int,
+        new_stop_loss: float,
+        position_id: int,
+        same_take_profit: float,
+        timeout: float = None,
+    ) -> PendingRequest:
+        return await self.client_for(account_id).message_emitter.amend_position_sl(
+            new_stop_loss,
+            position_id,
+            same_take_profit,
+            timeout=timeout,
+            account_id=account_id,
+        )
+
+    def open_trades(self, account_id: int, orders, timeout: float = None):
+        return self.client_for(account_id).message_emitter.open_trades(
+            orders, timeout=timeout, account_id=account_id
+        )
+
+    def close_positions(self, account_id: int, position_ids, timeout: float = None):
+        return self.client_for(account_id).message_emitter.close_positions(
+            position_ids, timeout=timeout, account_id=account_id
+        )
+
+    def amend_positions_sl(self, account_id: int, amendments, timeout: float = None):
+        return self.client_for(account_id).message_emitter.amend_positions_sl(
+            amendments, timeout=timeout, account_id=account_id
+        )
+
+    def _shard_symbols(self, symbol_ids) -> dict:
+        shards = {}
+        for symbol_id in symbol_ids:
+            shards.setdefault(self.client_for_symbol(symbol_id), []).append(symbol_id)
+        return shards
+
+    async def subscribe_spots(self, symbol_ids):
+        return await asyncio.gather(
+            *(
+                client.message_emitter.subscribe_spots(shard)
+                for client, shard in self._shard_symbols(symbol_ids).items()
+            )
+        )
+
+    async def unsubscribe_spots(self, symbol_ids):
+        return await asyncio.gather(
+            *(
+                client.message_emitter.unsubscribe_spots(shard)
+                for client, shard in self._shard_symbols(symbol_ids).items()
+            )
+        )
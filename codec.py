@@ -0,0 +1,68 @@
+import json
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+
+class EncodedPayload(str):
+    """A payload that has already been serialized and is embedded verbatim."""
+
+
+class JsonCodec:
+    """
+    Compact JSON encoding of Open API frames.
+
+    Uses orjson when it is installed and the stdlib json module otherwise.
+    The envelope around the payload is cached per payloadType, and payloads
+    that never change during a session (heartbeat, auth, symbols list...) can
+    be encoded once with `encode_static` and reused.
+    """
+
+    name = "json"
+    DecodeError = json.JSONDecodeError
+
+    def __init__(self, use_orjson: bool = True):
+        self.backend = "orjson" if (use_orjson and orjson is not None) else "json"
+        if self.backend == "orjson":
+            self._dumps = _orjson_dumps
+            self.loads = orjson.loads
+        else:
+            self._dumps = json.JSONEncoder(
+                separators=(",", ":"), ensure_ascii=False
+            ).encode
+            self.loads = json.loads
+        self._envelopes: dict[int, str] = {}
+        self._static: dict[tuple, EncodedPayload] = {}
+
+    def dumps(self, obj) -> str:
+        return self._dumps(obj)
+
+    def encode_static(self, payload: dict) -> EncodedPayload:
+        key = tuple(payload.items())
+        encoded = self._static.get(key)
+        if encoded is None:
+            encoded = self._static[key] = EncodedPayload(self._dumps(payload))
+        return encoded
+
+    def encode_message(self, client_msg_id: str, payload_type: int, payload) -> str:
+        envelope = self._envelopes.get(payload_type)
+        if envelope is None:
+            envelope = self._envelopes[payload_type] = (
+                f'","payloadType":{payload_type},"payload":'
+            )
+        if not isinstance(payload, EncodedPayload):
+            payload = self._dumps(payload)
+        # Client message ids are generated by the emitter and never need escaping
+        return '{"clientMsgId":"' + client_msg_id + envelope + payload + "}"
+
+    def decode(self, frame) -> dict:
+        return self.loads(frame)
+
+
+def _orjson_dumps(obj) -> str:
+    return orjson.dumps(obj).decode()
+
+
+DEFAULT_CODEC = JsonCodec()
@@ -0,0 +1,103 @@
+import os
+
+from logging_config import LOG_DIRECTORY
+
+CLIENT_ID = ""
+CLIENT_SECRET = ""
+REFRESH_TOKEN = ""
+ACCESS_TOKEN = ""
+API_HOST_DEMO = "demo.ctraderapi.com"
+API_PORT_DEMO = 5036
+API_PROTOBUF_PORT_DEMO = 5035
+# "json" for JSON over websockets, "protobuf" for length-prefixed Protobuf over TLS
+API_TRANSPORT = "json"
+
+# Environment variables read by ClientConfig.from_env
+ENVIRONMENT_PREFIX = "OPEN_API_"
+
+
+class ClientConfig:
+    """
+    Credentials and endpoint of a WebSocketsJsonClient, defaulting to the
+    constants above.
+
+    `log_directory` is where the client sets up logging when it's created,
+    see logging_config.configure_logging; None leaves logging to the
+    application, e.g. short-lived workers that log through their parent.
+    """
+
+    __slots__ = (
+        "client_id",
+        "client_secret",
+        "access_token",
+        "refresh_token",
+        "transport",
+        "host",
+        "port",
+        "ssl",
+        "log_directory",
+    )
+
+    def __init__(
+        self,
+        client_id: str = CLIENT_ID,
+        client_secret: str = CLIENT_SECRET,
+        access_token: str = ACCESS_TOKEN,
+        refresh_token: str = REFRESH_TOKEN,
+        transport: str = API_TRANSPORT,
+        host: str = API_HOST_DEMO,
+        port: int = None,
+        ssl=True,
+        log_directory: str = LOG_DIRECTORY,
+    ):
+        if transport not in ("json", "protobuf"):
+            raise ValueError(f"Unknown transport: {transport}")
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.access_token = access_token
+        self.refresh_token = refresh_token
+        self.transport = transport
+        self.host = host
+        self.port = port or (
+            API_PROTOBUF_PORT_DEMO if transport == "protobuf" else API_PORT_DEMO
+        )
+        self.ssl = ssl
+        self.log_directory = log_directory
+
+    @classmethod
+    def from_env(cls, environ=None, **overrides) -> "ClientConfig":
+        """
+        Reads OPEN_API_CLIENT_ID, OPEN_API_CLIENT_SECRET, OPEN_API_ACCESS_TOKEN,
+        OPEN_API_REFRESH_TOKEN, OPEN_API_TRANSPORT, OPEN_API_HOST and
+        OPEN_API_PORT, falling back to the defaults for those not set.
+        """
+        environ = os.environ if environ is None else environ
+        values = {}
+        for name in (
+            "client_id",
+            "client_secret",
+            "access_token",
+            "refresh_token",
+            "transport",
+            "host",
+            "port",
+        ):
+            value = environ.get(ENVIRONMENT_PREFIX + name.upper())
+            if value:
+                values[name] = int(value) if name == "port" else value
+        values.update(overrides)
+        return cls(**values)
+
+    def replace(self, **changes) -> "ClientConfig":
+        values = {name: getattr(self, name) for name in self.__slots__}
+        if "transport" in changes and "port" not in changes:
+            # The port follows the transport unless given
+            values["port"] = None
+        values.update(changes)
+        return ClientConfig(**values)
+
+    def __repr__(self):
+        return (
+            f"ClientConfig(transport={self.transport!r}, host={self.host!r}, "
+            f"port={self.port})"
+        )
@@ -0,0 +1,229 @@
+import asyncio
+import time
+
+from logging_config import logger
+
+from .metrics import LatencyHistogram, Metrics
+from .models import PAYLOAD_TYPES
+
+# Never dropped: the reader waits for room instead (backpressure)
+LOSSLESS_PAYLOAD_TYPES = (
+    PAYLOAD_TYPES.PROTO_OA_EXECUTION_EVENT,
+    PAYLOAD_TYPES.PROTO_OA_ORDER_ERROR_EVENT,
+)
+
+
+def spot_symbol_key(msg: dict):
+    return msg["payload"]["symbolId"]
+
+
+# Only the latest message per key is kept until the handler catches up
+COALESCED_PAYLOAD_TYPES = {
+    PAYLOAD_TYPES.PROTO_OA_SPOT_EVENT: spot_symbol_key,
+}
+
+
+class LaneStats:
+    __slots__ = ("received", "handled", "dropped", "coalesced", "errors", "max_depth")
+
+    def __init__(self):
+        self.received = 0
+        self.handled = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.errors = 0
+        self.max_depth = 0
+
+
+class QueueLane:
+    """Bounded FIFO of messages of one payloadType with its own worker task."""
+
+    def __init__(
+        self,
+        payload_type: int,
+        handle,
+        maxsize: int,
+        lossless: bool,
+        timing: LatencyHistogram = None,
+    ):
+        self.payload_type = payload_type
+        self.handle = handle
+        self.lossless = lossless
+        self.timing = timing
+        self.queue = asyncio.Queue(maxsize)
+        self.stats = LaneStats()
+        self.task = asyncio.create_task(self._work())
+
+    @property
+    def depth(self):
+        return self.queue.qsize()
+
+    async def put(self, msg: dict):
+        stats = self.stats
+        stats.received += 1
+        if self.lossless:
+            await self.queue.put(msg)
+        else:
+            try:
+                self.queue.put_nowait(msg)
+            except asyncio.QueueFull:
+                stats.dropped += 1
+                return
+        depth = self.queue.qsize()
+        if depth > stats.max_depth:
+            stats.max_depth = depth
+
+    async def _work(self):
+        while True:
+            msg = await self.queue.get()
+            try:
+                await _run_handler(
+                    self.handle, self.payload_type, msg, self.stats, self.timing
+                )
+            finally:
+                self.queue.task_done()
+
+    async def drain(self):
+        await self.queue.join()
+
+
+class CoalescingLane:
+    """Latest-value-wins slot per key (e.g. symbolId) with its own worker task."""
+
+    lossless = False
+
+    def __init__(self, payload_type: int, handle, key, timing: LatencyHistogram = None):
+        self.payload_type = payload_type
+        self.handle = handle
+        self.key = key
+        self.timing = timing
+        self.latest: dict = {}
+        self.stats = LaneStats()
+        self._ready = asyncio.Event()
+        self.task = asyncio.create_task(self._work())
+
+    @property
+    def depth(self):
+        return len(self.latest)
+
+    async def put(self, msg: dict):
+        stats = self.stats
+        stats.received += 1
+        key = self.key(msg)
+        if key in self.latest:
+            stats.coalesced += 1
+        self.latest[key] = msg
+        depth = len(self.latest)
+        if depth > stats.max_depth:
+            stats.max_depth = depth
+        self._ready.set()
+
+    async def _work(self):
+        while True:
+            await self._ready.wait()
+            self._ready.clear()
+            batch, self.latest = self.latest, {}
+            for msg in batch.values():
+                await _run_handler(
+                    self.handle, self.payload_type, msg, self.stats, self.timing
+                )
+
+
+async def _run_handler(
+    handle,
+    payload_type: int,
+    msg: dict,
+    stats: LaneStats,
+    timing: LatencyHistogram = None,
+):
+    try:
+        if timing is None:
+            await handle(msg)
+        else:
+            started = time.perf_counter()
+            await handle(msg)
+            timing.record(time.perf_counter() - started)
+        stats.handled += 1
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        stats.errors += 1
+        logger.error("Handler for payloadType %s failed: %s", payload_type, e)
+
+
+class MessageDispatcher:
+    """
+    Routes every payloadType to its own lane and worker task, so a slow handler
+    only delays messages of its own type instead of the whole socket reader.
+    Each worker calls `handle(msg)` with the messages of its lane.
+    """
+
+    def __init__(
+        self,
+        handle,
+        maxsize: int = 1000,
+        lossless_maxsize: int = 10_000,
+        lossless_types=LOSSLESS_PAYLOAD_TYPES,
+        coalesced_types=None,
+        metrics: Metrics = None,
+    ):
+        self.handle = handle
+        self.metrics = metrics
+        self.maxsize = maxsize
+        self.lossless_maxsize = lossless_maxsize
+        self.lossless_types = frozenset(lossless_types)
+        self.coalesced_types = (
+            COALESCED_PAYLOAD_TYPES if coalesced_types is None else coalesced_types
+        )
+        self.lanes: dict = {}
+
+    async def dispatch(self, msg: dict):
+        payload_type = msg.get("payloadType")
+        lane = self.lanes.get(payload_type)
+        if lane is None:
+            lane = self.lanes[payload_type] = self._create_lane(payload_type)
+        await lane.put(msg)
+
+    def _create_lane(self, payload_type: int):
+        timing = (
+            self.metrics.handler_histogram(payload_type)
+            if self.metrics is not None
+            else None
+        )
+        key = self.coalesced_types.get(payload_type)
+        if key is not None:
+            return CoalescingLane(payload_type, self.handle, key, timing)
+        if payload_type in self.lossless_types:
+            return QueueLane(
+                payload_type, self.handle, self.lossless_maxsize, True, timing
+            )
+        return QueueLane(payload_type, self.handle, self.maxsize, False, timing)
+
+    def stats(self) -> dict:
+        return {
+            payload_type: {
+                "depth": lane.depth,
+                "max_depth": lane.stats.max_depth,
+                "received": lane.stats.received,
+                "handled": lane.stats.handled,
+                "dropped": lane.stats.dropped,
+                "coalesced": lane.stats.coalesced,
+                "errors": lane.stats.errors,
+            }
+            for payload_type, lane in self.lanes.items()
+        }
+
+    async def close(self, drain_timeout: float = 5.0):
+        """Lets lossless lanes finish what they hold, then stops every worker."""
+        lossless = [lane for lane in self.lanes.values() if lane.lossless]
+        if lossless:
+            try:
+                await asyncio.wait_for(
+                    asyncio.gather(*(lane.drain() for lane in lossless)), drain_timeout
+                )
+            except asyncio.TimeoutError:
+                logger.warning("Timed out draining lossless dispatch queues.")
+
+        for lane in self.lanes.values():
+            lane.task.cancel()
+        self.lanes.clear()
@@ -0,0 +1,267 @@
+import asyncio
+import inspect
+
+from logging_config import logger
+
+from .models import PAYLOAD_TYPES
+from .pending_requests import RequestError
+
+
+def _symbol_id(payload: dict):
+    symbol_id = payload.get("symbolId")
+    if symbol_id is None:
+        for key in ("position", "order"):
+            nested = payload.get(key)
+            if nested is not None:
+                symbol_id = nested.get("tradeData", {}).get("symbolId")
+                if symbol_id is not None:
+                    break
+    return symbol_id
+
+
+def _position_id(payload: dict):
+    position_id = payload.get("positionId")
+    if position_id is None:
+        for key in ("position", "order", "deal"):
+            nested = payload.get(key)
+            if nested is not None:
+                position_id = nested.get("positionId")
+                if position_id is not None:
+                    break
+    return position_id
+
+
+class Subscription:
+    __slots__ = ("bus", "payload_type", "callback", "keys", "symbol_ids", "confirmed")
+
+    def __init__(self, bus, payload_type: int, callback, keys, symbol_ids=()):
+        self.bus = bus
+        self.payload_type = payload_type
+        self.callback = callback
+        self.keys = keys
+        # Spot subscriptions held on behalf of this subscription
+        self.symbol_ids = symbol_ids
+        # Resolves to whether the server confirmed them, None if there are none
+        self.confirmed = None
+
+    @property
+    def active(self) -> bool:
+        return self.bus is not None
+
+    def cancel(self):
+        if self.bus is not None:
+            self.bus.unsubscribe(self)
+
+    def __repr__(self):
+        return f"Subscription({self.payload_type}, {self.callback!r}, keys={self.keys})"
+
+
+class EventBus:
+    """
+    Delivers received messages to any number of subscribers, each filtered by
+    payloadType and optionally by symbolId or positionId (found in the payload
+    or in its position, order or deal).
+
+    Every subscriber gets the same decoded dict, which must be treated as
+    read-only. Callbacks may be plain functions or coroutines; they run in the
+    dispatcher's worker for the payloadType, after the receiver's own handler,
+    so spot events are coalesced to the latest per symbol as for handlers.
+
+    With a SpotSubscriptions, subscribing to spot events of given symbols
+    also holds a reference on their server-side subscription until cancelled.
+    """
+
+    def __init__(self, spot_subscriptions: "SpotSubscriptions" = None):
+        self.spot_subscriptions = spot_subscriptions
+        # payloadType -> filter key -> subscriptions, None being the unfiltered key
+        self._routes: dict[int, dict] = {}
+        self.delivered = 0
+        self.errors = 0
+
+    def __contains__(self, payload_type: int):
+        return payload_type in self._routes
+
+    def subscribe(
+        self, payload_type: int, callback, symbol_ids=None, position_ids=None
+    ) -> Subscription:
+        """
+        Calls `callback(msg)` with every message of `payload_type`, or only
+        those about one of `symbol_ids` or `position_ids` when given.
+        """
+        keys = []
+        if symbol_ids is not None:
+            symbol_ids = tuple(symbol_ids)
+            keys += [("symbol", symbol_id) for symbol_id in symbol_ids]
+        if position_ids is not None:
+            keys += [("position", position_id) for position_id in position_ids]
+        if not keys:
+            keys.append(None)
+
+        spot_symbol_ids = ()
+        if (
+            payload_type == PAYLOAD_TYPES.PROTO_OA_SPOT_EVENT
+            and symbol_ids
+            and self.spot_subscriptions is not None
+        ):
+            spot_symbol_ids = symbol_ids
+
+        subscription = Subscription(
+            self, payload_type, callback, tuple(keys), spot_symbol_ids
+        )
+        routes = self._routes.setdefault(payload_type, {})
+        for key in subscription.keys:
+            routes.setdefault(key, []).append(subscription)
+        if spot_symbol_ids:
+            subscription.confirmed = self.spot_subscriptions.acquire(spot_symbol_ids)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        if subscription.bus is not self:
+            return
+        subscription.bus = None
+        routes = self._routes.get(subscription.payload_type, {})
+        for key in subscription.keys:
+            subscribers = routes.get(key)
+            if subscribers is not None and subscription in subscribers:
+                subscribers.remove(subscription)
+                if not subscribers:
+                    del routes[key]
+        if not routes:
+            self._routes.pop(subscription.payload_type, None)
+        if subscription.symbol_ids:
+            self.spot_subscriptions.release(subscription.symbol_ids)
+
+    def _subscribers(self, routes: dict, msg: dict):
+        subscribers = routes.get(None)
+        if subscribers is not None and len(routes) == 1:
+            return tuple(subscribers)
+
+        payload = msg.get("payload", {})
+        matched = list(subscribers) if subscribers is not None else []
+        for key in (
+            ("symbol", _symbol_id(payload)),
+            ("position", _position_id(payload)),
+        ):
+            filtered = routes.get(key)
+            if filtered is not None:
+                matched += filtered
+        # A message can match a subscription through both of its ids
+        return dict.fromkeys(matched) if len(matched) > 1 else matched
+
+    async def publish(self, msg: dict):
+        routes = self._routes.get(msg.get("payloadType"))
+        if routes is None:
+            return
+        for subscription in self._subscribers(routes, msg):
+            # Cancelled by a previous subscriber
+            if subscription.bus is not self:
+                continue
+            try:
+                result = subscription.callback(msg)
+                if inspect.isawaitable(result):
+                    await result
+                self.delivered += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.errors += 1
+                logger.error("Subscriber %s failed: %s", subscription, e)
+
+
+class SpotSubscriptions:
+    """
+    Reference counts of spot subscriptions shared by several consumers.
+
+    Changes made during one event loop iteration are diffed against what is
+    subscribed and sent as at most one ProtoOASubscribeSpotsReq and one
+    ProtoOAUnsubscribeSpotsReq, so a symbol acquired and released in the same
+    iteration costs nothing and a symbol several consumers want is subscribed
+    to once.
+    """
+
+    def __init__(self, client):
+        self.client = client
+        self.counts: dict[int, int] = {}
+        self.batches = 0
+        self._changed = set()
+        self._waiters = []
+        self._flush_handle = None
+        self._tasks = set()
+
+    def count(self, symbol_id: int) -> int:
+        return self.counts.get(symbol_id, 0)
+
+    def acquire(self, symbol_ids) -> asyncio.Future:
+        """Resolves to whether the server confirmed the batch the symbols went in."""
+        counts = self.counts
+        for symbol_id in symbol_ids:
+            counts[symbol_id] = counts.get(symbol_id, 0) + 1
+            self._changed.add(symbol_id)
+        return self._schedule()
+
+    def release(self, symbol_ids) -> asyncio.Future:
+        counts = self.counts
+        for symbol_id in symbol_ids:
+            count = counts.get(symbol_id, 0) - 1
+            if count > 0:
+                counts[symbol_id] = count
+            else:
+                counts.pop(symbol_id, None)
+            self._changed.add(symbol_id)
+        return self._schedule()
+
+    def _schedule(self) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+        self._waiters.append(waiter)
+        if self._flush_handle is None:
+            self._flush_handle = loop.call_soon(self._flush)
+        return waiter
+
+    def _flush(self):
+        self._flush_handle = None
+        changed, self._changed = self._changed, set()
+        waiters, self._waiters = self._waiters, []
+        subscribed = self.client.assignables.subscribed_spots
+        subscribe = [
+            symbol_id
+            for symbol_id in changed
+            if symbol_id in self.counts and symbol_id not in subscribed
+        ]
+        unsubscribe = [
+            symbol_id
+            for symbol_id in changed
+            if symbol_id not in self.counts and symbol_id in subscribed
+        ]
+        task = asyncio.create_task(self._send(subscribe, unsubscribe, waiters))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, subscribe: list, unsubscribe: list, waiters: list):
+        client = self.client
+        confirmed = True
+        if not subscribe and not unsubscribe:
+            pass
+        elif client.message_emitter is None or not client.events.account_auth.is_set():
+            # Not connected, the next session subscribes to what is left
+            subscribed = client.assignables.subscribed_spots
+            subscribed.update(subscribe)
+            subscribed.difference_update(unsubscribe)
+        else:
+            self.batches += 1
+            emitter = client.message_emitter
+            try:
+                requests = [
+                    await emitter.subscribe_spots(subscribe),
+                    await emitter.unsubscribe_spots(unsubscribe),
+                ]
+                for request in requests:
+                    if request is not None:
+                        await request
+            except (RequestError, ConnectionError, asyncio.TimeoutError) as e:
+                logger.info("Spot subscription change failed: %s", e)
+                confirmed = False
+
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(confirmed)
@@ -0,0 +1,500 @@
+"""
+Durable journal of execution events and trading requests.
+
+    python -m <package>.execution_journal <directory>
+
+rebuilds the position book from a journal and prints how long it took.
+"""
+
+import asyncio
+import atexit
+import glob
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+import zlib
+
+from logging_config import logger
+
+from .codec import orjson
+from .frame_recorder import INBOUND
+from .models import PAYLOAD_TYPES
+from .position_book import PositionBook
+
+# Direction of the records holding a PositionBook.snapshot()
+SNAPSHOT = 2
+
+JOURNAL_MAGIC = b"OAEJ"
+JOURNAL_VERSION = 1
+# magic, version, wall clock time at segment start (ns)
+JOURNAL_HEADER = struct.Struct("<4sBq")
+# payload length, crc32 of the payload, sequence, wall clock time (ns), payloadType, direction
+JOURNAL_RECORD_HEADER = struct.Struct("<IIQqIB")
+# sequence, offset in the segment, payloadType, direction
+INDEX_ENTRY = struct.Struct("<QQIB")
+
+JOURNAL_SUFFIX = ".journal"
+INDEX_SUFFIX = ".index"
+DEFAULT_SEGMENT_BYTES = 64 * 1024 * 1024
+
+# A group is written and synced once its first record waited this long, or
+# once it holds this many records, whichever comes first
+COMMIT_INTERVAL_SECONDS = 0.005
+COMMIT_RECORDS = 256
+# Records between two snapshots of the position book, which bound how much
+# of the journal a rebuild replays
+SNAPSHOT_INTERVAL = 10_000
+# Wait before writing a group again after a write failed
+WRITE_RETRY_SECONDS = 1.0
+
+JOURNALED_INBOUND_TYPES = frozenset(
+    (
+        PAYLOAD_TYPES.PROTO_OA_EXECUTION_EVENT,
+        PAYLOAD_TYPES.PROTO_OA_ORDER_ERROR_EVENT,
+        PAYLOAD_TYPES.PROTO_OA_RECONCILE_RES,
+    )
+)
+
+
+def _dumps(payload) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, separators=(",", ":")).encode()
+
+
+_loads = orjson.loads if orjson is not None else json.loads
+
+
+class ExecutionJournal:
+    """
+    Append-only binary journal of execution events, order errors,
+    reconciliations and the trading requests sent.
+
+    `append` only queues the record, so it costs the event loop one JSON
+    encoding. A writer thread commits records in groups: each group is
+    written, then synced to disk with one fdatasync, once its first record
+    waited `commit_interval` seconds or it holds `commit_records` records.
+    `await commit()` waits until everything appended so far is on disk.
+
+    When a write fails, the segment is cut back to its last committed record
+    and `commit()` raises the OSError. The group is written again, in a new
+    segment, every `WRITE_RETRY_SECONDS` until it succeeds; only `close()`
+    gives up on it.
+
+    With a `position_book`, a snapshot of it is journaled every
+    `snapshot_interval` records, so a rebuild only replays what followed
+    the last one. Each segment has an index of its records next to it. Read
+    the journal back with `JournalReader`.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        position_book: PositionBook = None,
+        commit_interval: float = COMMIT_INTERVAL_SECONDS,
+        commit_records: int = COMMIT_RECORDS,
+        snapshot_interval: int = SNAPSHOT_INTERVAL,
+        segment_bytes: int = DEFAULT_SEGMENT_BYTES,
+    ):
+        self.directory = directory
+        self.position_book = position_book
+        self.commit_interval = commit_interval
+        self.commit_records = commit_records
+        self.snapshot_interval = snapshot_interval
+        self.segment_bytes = segment_bytes
+        os.makedirs(directory, exist_ok=True)
+
+        reader = JournalReader(directory)
+        # Sequences go on from the journal already there
+        self.sequence = reader.last_sequence()
+        self.committed_sequence = self.sequence
+        self.commits = 0
+        self._segment = len(reader.segments)
+        self._since_snapshot = 0
+        self._pending = []
+        self._waiters = []
+        self._condition = threading.Condition()
+        self._closing = False
+        self._thread = None
+        self._path = None
+        self._file = None
+        self._index = None
+        self._size = 0
+        atexit.register(self.close)
+
+    def append(self, direction: int, payload_type: int, payload) -> int:
+        """Queues a record and returns its sequence number."""
+        data = _dumps(payload)
+        with self._condition:
+            if self._closing:
+                # The writer thread is gone, the record would never be written
+                raise RuntimeError("The execution journal is closed.")
+            sequence = self.sequence = self.sequence + 1
+            self._pending.append(
+                (sequence, time.time_ns(), direction, payload_type or 0, data)
+            )
+            if len(self._pending) >= self.commit_records:
+                self._condition.notify()
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="execution-journal", daemon=True
+                )
+                self._thread.start()
+
+        if direction != SNAPSHOT and self.position_book is not None:
+            self._since_snapshot += 1
+            if self._since_snapshot >= self.snapshot_interval:
+                self.snapshot()
+        return sequence
+
+    def record_inbound(self, payload_type: int, payload: dict):
+        if payload_type in JOURNALED_INBOUND_TYPES:
+            self.append(INBOUND, payload_type, payload)
+
+    def snapshot(self) -> int:
+        self._since_snapshot = 0
+        return self.append(SNAPSHOT, 0, self.position_book.snapshot())
+
+    async def commit(self):
+        """Waits until every record appended so far is on disk."""
+        with self._condition:
+            sequence = self.sequence
+            if self.committed_sequence >= sequence:
+                return
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._waiters.append((sequence, loop, future))
+            self._condition.notify()
+        await future
+
+    def _run(self):
+        condition = self._condition
+        while True:
+            with condition:
+                while not self._pending and not self._closing:
+                    condition.wait()
+                # Gives the group time to fill up, unless it's full already
+                if not self._closing and len(self._pending) < self.commit_records:
+                    condition.wait(self.commit_interval)
+                batch, self._pending = self._pending, []
+                closing = self._closing
+
+            if batch:
+                try:
+                    self._write(batch)
+                except OSError as e:
+                    self._write_failed(batch, e, closing)
+                    if closing:
+                        return
+                    with condition:
+                        if not self._closing:
+                            condition.wait(WRITE_RETRY_SECONDS)
+                    continue
+                self._committed(batch[-1][0])
+            if closing:
+                return
+
+    def _open_segment(self):
+        self._close_files()
+        self._size = 0
+        while True:
+            self._segment += 1
+            path = os.path.join(self.directory, f"{self._segment:06d}{JOURNAL_SUFFIX}")
+            if not os.path.exists(path):
+                break
+        self._path = path
+        self._file = open(path, "xb")
+        self._index = open(path[: -len(JOURNAL_SUFFIX)] + INDEX_SUFFIX, "wb")
+        self._size = self._file.write(
+            JOURNAL_HEADER.pack(JOURNAL_MAGIC, JOURNAL_VERSION, time.time_ns())
+        )
+
+    def _write(self, batch: list):
+        if self._file is None or self._size >= self.segment_bytes:
+            self._open_segment()
+        chunks = []
+        index = []
+        offset = self._size
+        pack = JOURNAL_RECORD_HEADER.pack
+        for sequence, timestamp, direction, payload_type, data in batch:
+            chunks.append(
+                pack(
+                    len(data),
+                    zlib.crc32(data),
+                    sequence,
+                    timestamp,
+                    payload_type,
+                    direction,
+                )
+            )
+            chunks.append(data)
+            index.append(INDEX_ENTRY.pack(sequence, offset, payload_type, direction))
+            offset += JOURNAL_RECORD_HEADER.size + len(data)
+
+        self._file.write(b"".join(chunks))
+        self._file.flush()
+        os.fdatasync(self._file.fileno())
+        # The index can be rebuilt from the segment, it isn't synced
+        self._index.write(b"".join(index))
+        self._index.flush()
+        self._size = offset
+        self.commits += 1
+
+    def _committed(self, sequence: int):
+        with self._condition:
+            self.committed_sequence = sequence
+            waiters = [waiter for waiter in self._waiters if waiter[0] <= sequence]
+            self._waiters = [waiter for waiter in self._waiters if waiter[0] > sequence]
+        for _, loop, future in waiters:
+            try:
+                loop.call_soon_threadsafe(_resolve, future)
+            except RuntimeError:
+                # The loop is closed
+                pass
+
+    def _write_failed(self, batch: list, error: OSError, closing: bool):
+        # Whatever part of the group reached the segment goes, so its
+        # records don't end up there twice, and the next write starts a
+        # new segment
+        path, size = self._path, self._size
+        for file in (self._file, self._index):
+            if file is not None:
+                try:
+                    file.close()
+                except OSError:
+                    pass
+        self._file = self._index = None
+        if path is not None:
+            try:
+                os.truncate(path, size)
+            except OSError as e:
+                logger.error("Execution journal can't truncate %s: %s", path, e)
+
+        if closing:
+            logger.error(
+                "Execution journal write failed, %s records are lost: %s",
+                len(batch),
+                error,
+            )
+        else:
+            logger.error(
+                "Execution journal write failed, retrying %s records: %s",
+                len(batch),
+                error,
+            )
+
+        sequence = batch[-1][0]
+        with self._condition:
+            if not closing:
+                self._pending[:0] = batch
+            waiters = [waiter for waiter in self._waiters if waiter[0] <= sequence]
+            self._waiters = [waiter for waiter in self._waiters if waiter[0] > sequence]
+        for _, loop, future in waiters:
+            try:
+                loop.call_soon_threadsafe(_reject, future, error)
+            except RuntimeError:
+                # The loop is closed
+                pass
+
+    def _close_files(self):
+        for file in (self._file, self._index):
+            if file is not None:
+                file.close()
+        self._file = self._index = None
+
+    def close(self):
+        """Commits what is left and stops the writer thread."""
+        with self._condition:
+            self._closing = True
+            self._condition.notify()
+            thread = self._thread
+        if thread is not None:
+            thread.join()
+        self._close_files()
+
+
+def _resolve(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+
+def _reject(future: asyncio.Future, error: Exception):
+    if not future.done():
+        future.set_exception(error)
+
+
+class JournalRecord:
+    __slots__ = ("sequence", "timestamp_ns", "direction", "payload_type", "data")
+
+    def __init__(self, sequence, timestamp_ns, direction, payload_type, data):
+        self.sequence = sequence
+        self.timestamp_ns = timestamp_ns
+        self.direction = direction
+        self.payload_type = payload_type
+        self.data = data
+
+    @property
+    def payload(self):
+        return _loads(self.data)
+
+    def __repr__(self):
+        return (
+            f"JournalRecord({self.sequence}, direction={self.direction}, "
+            f"payload_type={self.payload_type})"
+        )
+
+
+class JournalReader:
+    """
+    Reads an ExecutionJournal's segments, memory-mapped, checking each
+    record's CRC. A record cut short or corrupted by a crash ends its
+    segment.
+
+    The index files locate records without reading the segments, e.g. the
+    last snapshot, which `rebuild` starts from. Records after the last
+    indexed one are found by scanning, as the index isn't synced.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.segments = sorted(glob.glob(os.path.join(directory, f"*{JOURNAL_SUFFIX}")))
+
+    def _index_entries(self, path: str) -> list:
+        """(sequence, offset, payloadType, direction) of the indexed records of a segment."""
+        index_path = path[: -len(JOURNAL_SUFFIX)] + INDEX_SUFFIX
+        try:
+            with open(index_path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return []
+        usable = len(data) - len(data) % INDEX_ENTRY.size
+        size = os.path.getsize(path)
+        return [
+            entry
+            for entry in INDEX_ENTRY.iter_unpack(data[:usable])
+            if entry[1] + JOURNAL_RECORD_HEADER.size <= size
+        ]
+
+    def _read_segment(self, path: str, offset: int = None, from_sequence: int = 0):
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size <= JOURNAL_HEADER.size:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                magic = JOURNAL_HEADER.unpack_from(mm, 0)[0]
+                if magic != JOURNAL_MAGIC:
+                    raise ValueError(f"{path} is not an execution journal segment.")
+                end = len(mm)
+                pos = JOURNAL_HEADER.size if offset is None else offset
+                unpack = JOURNAL_RECORD_HEADER.unpack_from
+                header_size = JOURNAL_RECORD_HEADER.size
+                while pos + header_size <= end:
+                    length, crc, sequence, timestamp, payload_type, direction = unpack(
+                        mm, pos
+                    )
+                    start = pos + header_size
+                    pos = start + length
+                    if pos > end:
+                        break
+                    data = mm[start:pos]
+                    if zlib.crc32(data) != crc:
+                        logger.warning(
+                            "Execution journal %s is corrupted at record %s.",
+                            path,
+                            sequence,
+                        )
+                        break
+                    if sequence >= from_sequence:
+                        yield JournalRecord(
+                            sequence, timestamp, direction, payload_type, data
+                        )
+
+    def __iter__(self):
+        return self.records()
+
+    def records(self, from_sequence: int = 0):
+        """Every record from `from_sequence` on, oldest first."""
+        for path in self.segments:
+            offset = None
+            if from_sequence:
+                entries = self._index_entries(path)
+                if entries and entries[-1][0] < from_sequence:
+                    # Only what follows the indexed records may still match
+                    offset = entries[-1][1]
+                else:
+                    for sequence, entry_offset, _, _ in entries:
+                        if sequence >= from_sequence:
+                            offset = entry_offset
+                            break
+            yield from self._read_segment(path, offset, from_sequence)
+
+    def last_sequence(self) -> int:
+        for path in reversed(self.segments):
+            entries = self._index_entries(path)
+            offset = entries[-1][1] if entries else None
+            last = None
+            for last in self._read_segment(path, offset):
+                pass
+            if last is not None:
+                return last.sequence
+        return 0
+
+    def latest_snapshot(self) -> JournalRecord:
+        """The last snapshot of the position book, None if there isn't one."""
+        for path in reversed(self.segments):
+            entries = self._index_entries(path)
+            # Records past the index may hold a later one
+            tail_offset = entries[-1][1] if entries else None
+            snapshot = None
+            for record in self._read_segment(path, tail_offset):
+                if record.direction == SNAPSHOT:
+                    snapshot = record
+            if snapshot is not None:
+                return snapshot
+            for sequence, offset, _, direction in reversed(entries):
+                if direction == SNAPSHOT:
+                    return next(self._read_segment(path, offset), None)
+        return None
+
+    def rebuild(self, position_book: PositionBook = None) -> PositionBook:
+        """
+        The position book as of the end of the journal: the last snapshot,
+        then the execution events and reconciliations that followed it.
+        """
+        book = position_book if position_book is not None else PositionBook()
+        snapshot = self.latest_snapshot()
+        from_sequence = 0
+        if snapshot is not None:
+            for payload in snapshot.payload:
+                book.reconcile(payload)
+            from_sequence = snapshot.sequence + 1
+
+        for record in self.records(from_sequence):
+            if record.direction != INBOUND:
+                continue
+            if record.payload_type == PAYLOAD_TYPES.PROTO_OA_EXECUTION_EVENT:
+                book.apply_execution(record.payload)
+            elif record.payload_type == PAYLOAD_TYPES.PROTO_OA_RECONCILE_RES:
+                book.reconcile(record.payload)
+        return book
+
+
+def main():
+    if len(sys.argv) != 2:
+        print(__doc__)
+        sys.exit(2)
+    reader = JournalReader(sys.argv[1])
+    started = time.perf_counter()
+    book = reader.rebuild()
+    elapsed = time.perf_counter() - started
+    print(
+        f"Rebuilt {len(book)} positions and {len(book.orders)} orders "
+        f"in {elapsed * 1000:.1f} ms, up to record {reader.last_sequence()}."
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+import atexit
+import os
+import struct
+import time
+
+INBOUND = 0
+OUTBOUND = 1
+
+SEGMENT_MAGIC = b"OAFR"
+SEGMENT_VERSION = 1
+# magic, version, codec name, wall clock and monotonic time at segment start (ns)
+SEGMENT_HEADER = struct.Struct("<4sB8sqq")
+# frame length, monotonic time (ns), direction, payloadType
+RECORD_HEADER = struct.Struct("<IqBI")
+
+DEFAULT_SEGMENT_BYTES = 64 * 1024 * 1024
+SEGMENT_SUFFIX = ".frames"
+
+
+class FrameRecorder:
+    """
+    Appends every frame sent or received to segment files in `directory`.
+
+    Records are binary, a fixed header followed by the frame exactly as it
+    went over the wire, and writes are buffered, so recording costs two small
+    writes per frame. A new segment is started once the current one reaches
+    `segment_bytes`. Read them back with `frame_replay.FrameReader`.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        codec_name: str = "json",
+        segment_bytes: int = DEFAULT_SEGMENT_BYTES,
+        buffer_size: int = 1024 * 1024,
+    ):
+        self.directory = directory
+        self.codec_name = codec_name
+        self.segment_bytes = segment_bytes
+        self.buffer_size = buffer_size
+        self.records = 0
+        self._file = None
+        self._size = 0
+        self._segment = 0
+        os.makedirs(directory, exist_ok=True)
+        atexit.register(self.close)
+
+    def _next_segment_path(self) -> str:
+        # Continue after the segments already in the directory, never overwrite them
+        while True:
+            self._segment += 1
+            path = os.path.join(
+                self.directory,
+                f"{time.strftime('%Y%m%d')}-{self._segment:06d}{SEGMENT_SUFFIX}",
+            )
+            if not os.path.exists(path):
+                return path
+
+    def _open_segment(self):
+        self.close()
+        self._file = open(self._next_segment_path(), "xb", buffering=self.buffer_size)
+        self._size = self._file.write(
+            SEGMENT_HEADER.pack(
+                SEGMENT_MAGIC,
+                SEGMENT_VERSION,
+                self.codec_name.encode(),
+                time.time_ns(),
+                time.monotonic_ns(),
+            )
+        )
+
+    def record(self, direction: int, payload_type: int, frame):
+        if isinstance(frame, str):
+            frame = frame.encode()
+        if self._file is None or self._size >= self.segment_bytes:
+            self._open_segment()
+
+        file = self._file
+        file.write(
+            RECORD_HEADER.pack(
+                len(frame), time.monotonic_ns(), direction, payload_type or 0
+            )
+        )
+        file.write(frame)
+        self._size += RECORD_HEADER.size + len(frame)
+        self.records += 1
+
+    def flush(self):
+        if self._file is not None:
+            self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,241 @@
+"""
+Replays frames saved by FrameRecorder through MessageReceiver's handlers.
+
+    python -m <package>.frame_replay <directory or segment>... [--realtime] [--speed 10]
+"""
+
+import argparse
+import asyncio
+import glob
+import mmap
+import os
+import time
+from collections import Counter
+
+from logging_config import configure_logging
+
+from .codec import JsonCodec
+from .frame_recorder import (
+    INBOUND,
+    RECORD_HEADER,
+    SEGMENT_HEADER,
+    SEGMENT_MAGIC,
+    SEGMENT_SUFFIX,
+)
+from .message_emitter import MessageEmitter
+from .message_receiver import MessageReceiver
+from .models import ClientAssignables, WebsocketClientEvents
+from .position_book import PositionBook
+from .protobuf_codec import ProtobufCodec
+from .spot_buffers import SpotBuffers
+from .trendbars import TrendbarAggregator
+
+
+class FrameRecord:
+    __slots__ = ("timestamp_ns", "direction", "payload_type", "frame")
+
+    def __init__(self, timestamp_ns: int, direction: int, payload_type: int, frame):
+        self.timestamp_ns = timestamp_ns
+        self.direction = direction
+        self.payload_type = payload_type
+        self.frame = frame
+
+
+class SegmentInfo:
+    __slots__ = ("path", "codec_name", "started_at_ns", "started_monotonic_ns")
+
+    def __init__(self, path, codec_name, started_at_ns, started_monotonic_ns):
+        self.path = path
+        self.codec_name = codec_name
+        self.started_at_ns = started_at_ns
+        self.started_monotonic_ns = started_monotonic_ns
+
+
+def segment_paths(paths) -> list:
+    """Expands directories into their segments, oldest first."""
+    segments = []
+    for path in paths:
+        if os.path.isdir(path):
+            segments.extend(sorted(glob.glob(os.path.join(path, f"*{SEGMENT_SUFFIX}"))))
+        else:
+            segments.append(path)
+    return segments
+
+
+class FrameReader:
+    """
+    Iterates the records of one or more segments, memory-mapping each one so
+    only the pages being read are loaded. A record cut short by a crash at the
+    end of a segment is ignored.
+    """
+
+    def __init__(self, paths, direction: int = INBOUND, payload_types=None):
+        if isinstance(paths, str):
+            paths = [paths]
+        self.segments = segment_paths(paths)
+        self.direction = direction
+        self.payload_types = set(payload_types) if payload_types else None
+        self.codec_name = None
+        # SegmentInfo of the segment being read
+        self.segment = None
+
+    def read_segment_info(self, path: str) -> SegmentInfo:
+        with open(path, "rb") as f:
+            header = f.read(SEGMENT_HEADER.size)
+        if len(header) < SEGMENT_HEADER.size:
+            raise ValueError(f"{path} is not a frame segment.")
+        magic, _, codec_name, started_at, started_monotonic = SEGMENT_HEADER.unpack(
+            header
+        )
+        if magic != SEGMENT_MAGIC:
+            raise ValueError(f"{path} is not a frame segment.")
+        return SegmentInfo(
+            path, codec_name.rstrip(b"\0").decode(), started_at, started_monotonic
+        )
+
+    def codec_names(self) -> set:
+        """The codecs the segments were recorded with."""
+        return {self.read_segment_info(path).codec_name for path in self.segments}
+
+    def __iter__(self):
+        for path in self.segments:
+            self.segment = self.read_segment_info(path)
+            self.codec_name = self.segment.codec_name
+            yield from self._read_segment(path)
+
+    def _read_segment(self, path: str):
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size <= SEGMENT_HEADER.size:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                end = len(mm)
+                pos = SEGMENT_HEADER.size
+                unpack = RECORD_HEADER.unpack_from
+                header_size = RECORD_HEADER.size
+                while pos + header_size <= end:
+                    length, timestamp, direction, payload_type = unpack(mm, pos)
+                    start = pos + header_size
+                    pos = start + length
+                    if pos > end:
+                        break
+                    if self.direction is not None and direction != self.direction:
+                        continue
+                    if (
+                        self.payload_types is not None
+                        and payload_type not in self.payload_types
+                    ):
+                        continue
+                    yield FrameRecord(timestamp, direction, payload_type, mm[start:pos])
+
+
+class _ReplaySocket:
+    """Where handlers that answer a message (heartbeats, re-auth...) write during a replay."""
+
+    closed = False
+
+    def __init__(self):
+        self.sent = 0
+
+    async def send(self, frame):
+        self.sent += 1
+
+
+def replay_receiver(
+    codec_name: str = "json",
+    spot_buffers: SpotBuffers = None,
+    trendbars: TrendbarAggregator = None,
+    position_book: PositionBook = None,
+) -> MessageReceiver:
+    """A MessageReceiver wired to nothing, for replaying recorded frames."""
+    codec = ProtobufCodec() if codec_name == "protobuf" else JsonCodec()
+    socket = _ReplaySocket()
+    assignables = ClientAssignables(access_token="")
+    events = WebsocketClientEvents()
+    emitter = MessageEmitter(socket, assignables, events, codec=codec)
+    return MessageReceiver(
+        events,
+        socket,
+        emitter,
+        assignables,
+        spot_buffers,
+        trendbars,
+        codec=codec,
+        position_book=position_book,
+    )
+
+
+async def replay(
+    reader: FrameReader,
+    receiver: MessageReceiver,
+    realtime: bool = False,
+    speed: float = 1.0,
+) -> Counter:
+    """
+    Feeds the reader's frames to `receiver` in order, calling each handler
+    inline so every run gives the same result. With `realtime` the original
+    gaps between frames are kept, divided by `speed`. Timestamps are
+    monotonic times of the recording process, so the gaps are only kept
+    within a segment, each one starts right after the previous.
+
+    Every segment must have been recorded with the receiver's codec.
+    """
+    counts = Counter()
+    segment = None
+    for record in reader:
+        if reader.segment is not segment:
+            segment = reader.segment
+            if segment.codec_name != receiver.codec.name:
+                raise ValueError(
+                    f"{segment.path} was recorded with {segment.codec_name}, "
+                    f"the receiver decodes {receiver.codec.name}."
+                )
+            first_timestamp = None
+            started = time.monotonic()
+
+        if realtime:
+            if first_timestamp is None:
+                first_timestamp = record.timestamp_ns
+            due = (record.timestamp_ns - first_timestamp) / 1e9 / speed
+            delay = due - (time.monotonic() - started)
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+        await receiver.process_frame(record.frame, inline=True)
+        counts[record.payload_type] += 1
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded Open API frames.")
+    parser.add_argument("paths", nargs="+", help="Segment files or directories.")
+    parser.add_argument("--realtime", action="store_true")
+    parser.add_argument("--speed", type=float, default=1.0)
+    args = parser.parse_args()
+    configure_logging()
+
+    reader = FrameReader(args.paths)
+    if not reader.segments:
+        parser.error("No segments found.")
+    codec_names = reader.codec_names()
+    if len(codec_names) > 1:
+        parser.error(
+            f"The segments were recorded with different codecs: {sorted(codec_names)}, "
+            "replay them separately."
+        )
+    receiver = replay_receiver(codec_names.pop())
+
+    start = time.perf_counter()
+    counts = asyncio.run(replay(reader, receiver, args.realtime, args.speed))
+    elapsed = time.perf_counter() - start
+
+    total = sum(counts.values())
+    print(
+        f"Replayed {total} frames in {elapsed:.3f}s ({total / elapsed:,.0f} frames/s)"
+    )
+    for payload_type, count in counts.most_common():
+        print(f"{payload_type:>6} {count:>10}")
+    print(f"Open positions: {len(receiver.position_book)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,464 @@
+import asyncio
+import os
+import struct
+import time
+from array import array
+from bisect import bisect_left
+
+from logging_config import logger
+
+from .models import ProtoOAQuoteType, TrendbarPeriod
+from .send_scheduler import TokenBucket
+from .trendbars import BAR_COLUMNS, PERIOD_MILLISECONDS, ClosedBars
+
+HISTORY_CACHE_PATH = os.path.join("cache", "history")
+
+WEEK_MILLISECONDS = 7 * 24 * 60 * 60 * 1000
+
+# Longest fromTimestamp..toTimestamp range the server accepts in one request
+MAX_TRENDBAR_RANGE_MILLISECONDS = {
+    TrendbarPeriod.M1: 5 * WEEK_MILLISECONDS,
+    TrendbarPeriod.M2: 5 * WEEK_MILLISECONDS,
+    TrendbarPeriod.M3: 5 * WEEK_MILLISECONDS,
+    TrendbarPeriod.M4: 5 * WEEK_MILLISECONDS,
+    TrendbarPeriod.M5: 5 * WEEK_MILLISECONDS,
+    TrendbarPeriod.M10: 35 * WEEK_MILLISECONDS,
+    TrendbarPeriod.M15: 35 * WEEK_MILLISECONDS,
+    TrendbarPeriod.M30: 35 * WEEK_MILLISECONDS,
+    TrendbarPeriod.H1: 35 * WEEK_MILLISECONDS,
+    TrendbarPeriod.H4: 366 * 24 * 60 * 60 * 1000,
+    TrendbarPeriod.H12: 366 * 24 * 60 * 60 * 1000,
+    TrendbarPeriod.D1: 366 * 24 * 60 * 60 * 1000,
+}
+MAX_TICK_RANGE_MILLISECONDS = WEEK_MILLISECONDS
+
+# The Open API allows 5 historical data requests per second per connection
+HISTORICAL_RATE_LIMIT = (4.5, 5)
+MAX_CONCURRENT_REQUESTS = 5
+
+TICK_COLUMNS = ("timestamp", "price")
+
+CACHE_MAGIC = b"OAHC"
+CACHE_VERSION = 1
+# magic, version, column count, covered ranges, rows
+CACHE_HEADER = struct.Struct("<4sBBII")
+
+
+def now_milliseconds() -> int:
+    return time.time_ns() // 1_000_000
+
+
+def split_range(from_timestamp: int, to_timestamp: int, max_range: int) -> list:
+    """Splits [from, to) into consecutive ranges no longer than `max_range`."""
+    return [
+        (start, min(start + max_range, to_timestamp))
+        for start in range(from_timestamp, to_timestamp, max_range)
+    ]
+
+
+def trendbar_columns(trendbars) -> tuple:
+    """
+    Decodes ProtoOATrendbar entries, where prices are deltas from the bar's
+    low, into start, open, high, low, close and ticks columns.
+    """
+    start, open_, high, low, close, ticks = (array("q") for _ in BAR_COLUMNS)
+    for bar in trendbars:
+        bar_low = bar.get("low", 0)
+        start.append(bar.get("utcTimestampInMinutes", 0) * 60_000)
+        open_.append(bar_low + bar.get("deltaOpen", 0))
+        high.append(bar_low + bar.get("deltaHigh", 0))
+        low.append(bar_low)
+        close.append(bar_low + bar.get("deltaClose", 0))
+        ticks.append(bar.get("volume", 0))
+    return start, open_, high, low, close, ticks
+
+
+def tick_columns(tick_data) -> tuple:
+    """
+    Decodes ProtoOATickData entries, newest first and each one relative to the
+    previous, into timestamp and price columns in chronological order.
+    """
+    timestamps = array("q", bytes(8 * len(tick_data)))
+    prices = array("q", bytes(8 * len(tick_data)))
+    timestamp = price = 0
+    last = len(tick_data) - 1
+    for i, tick in enumerate(tick_data):
+        timestamp += tick.get("timestamp", 0)
+        price += tick.get("tick", 0)
+        timestamps[last - i] = timestamp
+        prices[last - i] = price
+    return timestamps, prices
+
+
+class Ticks:
+    """Columns of historical ticks, timestamps in Unix ms and prices in 1/100000 of a unit."""
+
+    __slots__ = ("timestamp", "price")
+
+    def __init__(self, timestamp: array, price: array):
+        self.timestamp = timestamp
+        self.price = price
+
+    def __len__(self):
+        return len(self.timestamp)
+
+    def columns(self):
+        return self.timestamp, self.price
+
+
+class HistorySeries:
+    """
+    Sorted columns of one symbol's bars or ticks, plus the time ranges that
+    were downloaded. A covered range without rows (a weekend, a holiday) is
+    known to be empty and is not requested again.
+    """
+
+    def __init__(self, column_names):
+        self.column_names = column_names
+        self.columns = tuple(array("q") for _ in column_names)
+        self.ranges: list[list] = []
+
+    def __len__(self):
+        return len(self.columns[0])
+
+    def missing(self, from_timestamp: int, to_timestamp: int) -> list:
+        """The parts of [from, to) that are not covered yet."""
+        gaps = []
+        cursor = from_timestamp
+        for start, end in self.ranges:
+            if end <= cursor:
+                continue
+            if start >= to_timestamp:
+                break
+            if start > cursor:
+                gaps.append((cursor, start))
+            cursor = max(cursor, end)
+        if cursor < to_timestamp:
+            gaps.append((cursor, to_timestamp))
+        return gaps
+
+    def add_range(self, from_timestamp: int, to_timestamp: int):
+        if from_timestamp >= to_timestamp:
+            return
+        ranges = sorted(self.ranges + [[from_timestamp, to_timestamp]])
+        merged = [ranges[0]]
+        for start, end in ranges[1:]:
+            if start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+        self.ranges = merged
+
+    def merge(self, columns, from_timestamp: int, to_timestamp: int):
+        """Adds the rows downloaded for [from, to), keeping only those inside it."""
+        keys = columns[0]
+        first = bisect_left(keys, from_timestamp)
+        last = bisect_left(keys, to_timestamp)
+        if first < last:
+            existing = self.columns[0]
+            # Downloads usually extend the series forward, that's just an append
+            if not existing or keys[first] >= existing[-1]:
+                for column, new in zip(self.columns, columns):
+                    column.extend(new[first:last])
+            else:
+                self._insert(columns, first, last)
+        self.add_range(from_timestamp, to_timestamp)
+
+    def _insert(self, columns, first: int, last: int):
+        merged = [
+            column + new[first:last] for column, new in zip(self.columns, columns)
+        ]
+        # A stable sort keeps ticks sharing a timestamp in their original order
+        order = sorted(range(len(merged[0])), key=merged[0].__getitem__)
+        self.columns = tuple(
+            array("q", (column[i] for i in order)) for column in merged
+        )
+
+    def slice(self, from_timestamp: int, to_timestamp: int) -> tuple:
+        keys = self.columns[0]
+        first = bisect_left(keys, from_timestamp)
+        last = bisect_left(keys, to_timestamp)
+        return tuple(column[first:last] for column in self.columns)
+
+
+class HistoryCache:
+    """
+    Stores every HistorySeries in its own file under `directory`, one per
+    symbol and period (or quote type for ticks): a small header, the covered
+    ranges, then each column as a contiguous block of int64.
+    """
+
+    def __init__(self, directory: str = HISTORY_CACHE_PATH):
+        self.directory = directory
+
+    def path(self, symbol_id: int, name: str) -> str:
+        return os.path.join(self.directory, str(symbol_id), f"{name}.columns")
+
+    def load(self, symbol_id: int, name: str, column_names) -> HistorySeries:
+        series = HistorySeries(column_names)
+        try:
+            with open(self.path(symbol_id, name), "rb") as f:
+                data = f.read()
+            magic, version, column_count, range_count, rows = CACHE_HEADER.unpack_from(
+                data
+            )
+        except (OSError, struct.error):
+            return series
+        if (
+            magic != CACHE_MAGIC
+            or version != CACHE_VERSION
+            or column_count != len(column_names)
+            or len(data)
+            != CACHE_HEADER.size + 16 * range_count + 8 * rows * column_count
+        ):
+            logger.info("Ignoring unreadable history cache for %s %s.", symbol_id, name)
+            return series
+
+        offset = CACHE_HEADER.size
+        bounds = array("q")
+        bounds.frombytes(data[offset : offset + 16 * range_count])
+        series.ranges = [[bounds[i], bounds[i + 1]] for i in range(0, len(bounds), 2)]
+        offset += 16 * range_count
+        for column in series.columns:
+            column.frombytes(data[offset : offset + 8 * rows])
+            offset += 8 * rows
+        return series
+
+    def save(self, symbol_id: int, name: str, series: HistorySeries):
+        path = self.path(symbol_id, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(
+                CACHE_HEADER.pack(
+                    CACHE_MAGIC,
+                    CACHE_VERSION,
+                    len(series.columns),
+                    len(series.ranges),
+                    len(series),
+                )
+            )
+            f.write(
+                array("q", (t for bounds in series.ranges for t in bounds)).tobytes()
+            )
+            for column in series.columns:
+                f.write(column.tobytes())
+        # Atomic, so a crash mid-write never leaves a truncated file behind
+        os.replace(tmp_path, path)
+
+
+class HistoryDownloader:
+    """
+    Downloads historical trendbars and ticks for `client`, splitting long
+    ranges into requests the server accepts and sending them concurrently,
+    within the historical data rate limit.
+
+    Downloaded ranges are kept in memory and, with a `cache`, on disk, so
+    later calls only request what is missing. Bars still open and ticks from
+    the future aren't stored, the next call picks them up.
+    """
+
+    def __init__(
+        self,
+        client,
+        cache: HistoryCache = None,
+        max_concurrency: int = MAX_CONCURRENT_REQUESTS,
+        rate_limit: tuple = HISTORICAL_RATE_LIMIT,
+        timeout: float = 60.0,
+    ):
+        self.client = client
+        self.cache = cache
+        self.max_concurrency = max_concurrency
+        self.bucket = TokenBucket(*rate_limit)
+        self.timeout = timeout
+        self.requests = 0
+        self.series: dict[tuple, HistorySeries] = {}
+        self._semaphore = None
+        self._locks: dict[tuple, asyncio.Lock] = {}
+
+    async def trendbars(
+        self,
+        symbol_id: int,
+        period: TrendbarPeriod,
+        from_timestamp: int,
+        to_timestamp: int = None,
+        account_id: int = None,
+    ) -> ClosedBars:
+        """Closed bars starting in [from_timestamp, to_timestamp), times in Unix ms."""
+        if period not in MAX_TRENDBAR_RANGE_MILLISECONDS:
+            raise ValueError(f"Historical {period.name} bars are not supported.")
+
+        period_milliseconds = PERIOD_MILLISECONDS[period]
+        now = now_milliseconds()
+        # The bar in progress isn't final, it is left out and fetched again later
+        complete_before = now - now % period_milliseconds
+
+        async def fetch(chunk_from, chunk_to):
+            return await self._fetch_trendbars(
+                symbol_id, period, chunk_from, chunk_to, account_id
+            )
+
+        columns = await self._get(
+            (symbol_id, period.name),
+            BAR_COLUMNS,
+            from_timestamp,
+            to_timestamp or now,
+            complete_before,
+            MAX_TRENDBAR_RANGE_MILLISECONDS[period],
+            fetch,
+        )
+        bars = ClosedBars(0)
+        bars.start, bars.open, bars.high, bars.low, bars.close, bars.ticks = columns
+        return bars
+
+    async def ticks(
+        self,
+        symbol_id: int,
+        from_timestamp: int,
+        to_timestamp: int = None,
+        quote_type: ProtoOAQuoteType = ProtoOAQuoteType.BID,
+        account_id: int = None,
+    ) -> Ticks:
+        """Ticks in [from_timestamp, to_timestamp), times in Unix ms."""
+        now = now_milliseconds()
+
+        async def fetch(chunk_from, chunk_to):
+            return await self._fetch_ticks(
+                symbol_id, quote_type, chunk_from, chunk_to, account_id
+            )
+
+        columns = await self._get(
+            (symbol_id, f"ticks-{quote_type.name}"),
+            TICK_COLUMNS,
+            from_timestamp,
+            to_timestamp or now,
+            now,
+            MAX_TICK_RANGE_MILLISECONDS,
+            fetch,
+        )
+        return Ticks(*columns)
+
+    async def _get(
+        self,
+        key: tuple,
+        column_names,
+        from_timestamp: int,
+        to_timestamp: int,
+        complete_before: int,
+        max_range: int,
+        fetch,
+    ) -> tuple:
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = self._locks[key] = asyncio.Lock()
+
+        # One download per series at a time, the second caller finds it cached
+        async with lock:
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = (
+                    await asyncio.to_thread(self.cache.load, *key, column_names)
+                    if self.cache is not None
+                    else HistorySeries(column_names)
+                )
+
+            chunks = [
+                chunk
+                for gap in series.missing(from_timestamp, to_timestamp)
+                for chunk in split_range(*gap, max_range)
+            ]
+            if chunks:
+                logger.info(
+                    "Downloading %s %s in %s requests.", key[0], key[1], len(chunks)
+                )
+                results = await asyncio.gather(
+                    *(fetch(*chunk) for chunk in chunks), return_exceptions=True
+                )
+                error = None
+                for (chunk_from, chunk_to), result in zip(chunks, results):
+                    if isinstance(result, BaseException):
+                        error = error or result
+                        continue
+                    # Whatever finished downloading is kept even if a chunk failed
+                    series.merge(result, chunk_from, min(chunk_to, complete_before))
+                if self.cache is not None:
+                    await asyncio.to_thread(self.cache.save, *key, series)
+                if error is not None:
+                    raise error
+
+            return series.slice(from_timestamp, to_timestamp)
+
+    async def _request(self, send):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self._semaphore:
+            while wait := self.bucket.take():
+                await asyncio.sleep(wait)
+            self.requests += 1
+            request = await send(self.client.message_emitter)
+            msg = await request
+        return msg.get("payload", {})
+
+    async def _fetch_trendbars(
+        self, symbol_id, period, from_timestamp, to_timestamp, account_id
+    ) -> tuple:
+        payload = await self._request(
+            lambda emitter: emitter.get_trendbars(
+                symbol_id,
+                period,
+                from_timestamp,
+                to_timestamp,
+                account_id,
+                timeout=self.timeout,
+            )
+        )
+        if (
+            payload.get("hasMore")
+            and to_timestamp - from_timestamp > PERIOD_MILLISECONDS[period]
+        ):
+            # More bars than fit in a response, ask for each half separately
+            middle = from_timestamp + (to_timestamp - from_timestamp) // 2
+            middle -= middle % PERIOD_MILLISECONDS[period]
+            halves = await asyncio.gather(
+                self._fetch_trendbars(
+                    symbol_id, period, from_timestamp, middle, account_id
+                ),
+                self._fetch_trendbars(
+                    symbol_id, period, middle, to_timestamp, account_id
+                ),
+            )
+            return tuple(a + b for a, b in zip(*halves))
+        return trendbar_columns(payload.get("trendbar", []))
+
+    async def _fetch_ticks(
+        self, symbol_id, quote_type, from_timestamp, to_timestamp, account_id
+    ) -> tuple:
+        # Pages come newest first, each one ending where the previous one started
+        pages = []
+        page_to = to_timestamp
+        while True:
+            payload = await self._request(
+                lambda emitter: emitter.get_tick_data(
+                    symbol_id,
+                    quote_type,
+                    from_timestamp,
+                    page_to,
+                    account_id,
+                    timeout=self.timeout,
+                )
+            )
+            timestamps, prices = tick_columns(payload.get("tickData", []))
+            if pages:
+                # The page repeats the ticks at the boundary timestamp
+                end = bisect_left(timestamps, page_to)
+                timestamps, prices = timestamps[:end], prices[:end]
+            pages.append((timestamps, prices))
+            if not payload.get("hasMore") or not timestamps:
+                break
+            page_to = timestamps[0]
+
+        timestamps, prices = array("q"), array("q")
+        for page_timestamps, page_prices in reversed(pages):
+            timestamps.extend(page_timestamps)
+            prices.extend(page_prices)
+        return timestamps, prices
@@ -1,101 +1,502 @@
 import asyncio
+import time
 import traceback
+from typing import TYPE_CHECKING
 
-import websockets
-import websockets.client
-import websockets.exceptions
-
-from logging_config import logger
+from logging_config import configure_logging, logger
 
+from . import websocket_transport
+from .codec import DEFAULT_CODEC
+from .config import ClientConfig
+from .event_bus import EventBus, SpotSubscriptions
+from .execution_journal import ExecutionJournal
+from .frame_recorder import FrameRecorder
+from .history import HISTORY_CACHE_PATH, HistoryCache, HistoryDownloader
+from .liveness import (
+    HEARTBEAT_INTERVAL_SECONDS,
+    RTT_PROBE_INTERVAL_SECONDS,
+    SILENCE_DEADLINE_SECONDS,
+    LinkWatchdog,
+)
 from .message_emitter import MessageEmitter
 from .message_receiver import MessageReceiver
+from .metrics import Metrics
 from .models import ClientAssignables, WebsocketClientEvents
+from .pending_requests import PendingRequests, RequestError
+from .position_book import PositionBook
+from .protocol import AuthenticationError, HandshakeState
+from .send_scheduler import TRADING_PAYLOAD_TYPES, SendScheduler
+from .spot_buffers import SpotBuffers
+from .standby import STANDBY_RETRY_DELAY_SECONDS, StandbyConnection
+from .symbol_index import SymbolIndex
+from .symbols_snapshot import (
+    SYMBOLS_SNAPSHOT_PATH,
+    SYMBOLS_SNAPSHOT_TTL_SECONDS,
+    load_symbols_snapshot,
+    save_symbols_snapshot,
+)
+from .trendbars import TrendbarAggregator
+from .websocket_transport import websocket_errors
 
-CLIENT_ID = ""
-CLIENT_SECRET = ""
-REFRESH_TOKEN = ""
-ACCESS_TOKEN = ""
-API_HOST_DEMO = "demo.ctraderapi.com"
-API_PORT_DEMO = 5036
+if TYPE_CHECKING:
+    import websockets.client
 
 
 class WebSocketsJsonClient:
-    def __init__(self):
-        self.client_id = CLIENT_ID
-        self.client_secret = CLIENT_SECRET
-        self.assignables = ClientAssignables(access_token=ACCESS_TOKEN)
-        self.websocket: websockets.client.WebSocketClientProtocol = None
+    def __init__(
+        self,
+        account_ids=None,
+        symbols: SymbolIndex = None,
+        spot_buffers: SpotBuffers = None,
+        trendbars: TrendbarAggregator = None,
+        position_book: PositionBook = None,
+        symbols_snapshot_path: str = SYMBOLS_SNAPSHOT_PATH,
+        symbols_snapshot_ttl: float = SYMBOLS_SNAPSHOT_TTL_SECONDS,
+        transport: str = None,
+        host: str = None,
+        port: int = None,
+        ssl=None,
+        rate_limits: dict = None,
+        recorder: FrameRecorder = None,
+        metrics: Metrics = None,
+        history_cache_path: str = HISTORY_CACHE_PATH,
+        heartbeat_interval: float = HEARTBEAT_INTERVAL_SECONDS,
+        rtt_probe_interval: float = RTT_PROBE_INTERVAL_SECONDS,
+        silence_deadline: float = SILENCE_DEADLINE_SECONDS,
+        standby: bool = False,
+        journal: ExecutionJournal = None,
+        config: ClientConfig = None,
+    ):
+        # Arguments given explicitly win over the configuration
+        config = config if config is not None else ClientConfig()
+        endpoint = {
+            name: value
+            for name, value in (
+                ("transport", transport),
+                ("host", host),
+                ("port", port),
+                ("ssl", ssl),
+            )
+            if value is not None
+        }
+        if endpoint:
+            config = config.replace(**endpoint)
+        self.config = config
+        if config.log_directory is not None:
+            configure_logging(config.log_directory)
+
+        self.transport = config.transport
+        self.host = config.host
+        self.port = config.port
+        self.ssl = config.ssl
+        self.rate_limits = rate_limits
+        if self.transport == "protobuf":
+            # Deferred, JSON clients never need the Protobuf codec
+            from .protobuf_codec import ProtobufCodec
+
+            self.codec = ProtobufCodec()
+        else:
+            self.codec = DEFAULT_CODEC
+        # Opt-in record of every frame sent and received, see frame_replay
+        self.recorder = recorder
+        if recorder is not None:
+            recorder.codec_name = self.codec.name
+        # Round trips, handler timings and loop lag, see metrics.serve_metrics
+        self.metrics = metrics if metrics is not None else Metrics()
+        self.client_id = config.client_id
+        self.client_secret = config.client_secret
+        self.assignables = ClientAssignables(
+            access_token=config.access_token,
+            account_ids=account_ids,
+            symbols=symbols,
+        )
+        self.websocket: "websockets.client.WebSocketClientProtocol" = None
         self.events: WebsocketClientEvents = WebsocketClientEvents()
         self.message_emitter: MessageEmitter = None
         self.message_receiver: MessageReceiver = None
         self.client_ready_event = asyncio.Event()
-        self.fx_pairs_ids = {}
+        self.pending_requests = PendingRequests()
+        self.spot_buffers = spot_buffers if spot_buffers is not None else SpotBuffers()
+        self.trendbars = trendbars if trendbars is not None else TrendbarAggregator()
+        self.position_book = (
+            position_book if position_book is not None else PositionBook()
+        )
+        # Opt-in durable record of executions and trading requests, see execution_journal
+        self.journal = journal
+        if journal is not None and journal.position_book is None:
+            journal.position_book = self.position_book
+        # Consumers of received messages, sharing reference-counted spot subscriptions
+        self.spot_subscriptions = SpotSubscriptions(self)
+        self.event_bus = EventBus(self.spot_subscriptions)
+        self.symbols_snapshot_path = symbols_snapshot_path
+        self.symbols_snapshot_ttl = symbols_snapshot_ttl
+        # Historical trendbars and ticks, cached on disk unless the path is None
+        self.history = HistoryDownloader(
+            self, HistoryCache(history_cache_path) if history_cache_path else None
+        )
+        self.heartbeat_interval = heartbeat_interval
+        # Seconds between the round trip pings of the metrics, None to never
+        self.rtt_probe_interval = rtt_probe_interval
+        # Seconds without receiving anything before the connection is dropped, None to never
+        self.silence_deadline = silence_deadline
+        # Keep a second authenticated connection to switch to when this one dies
+        self.standby = standby
+        self.failovers = 0
+        self.last_failover_seconds = None
+        # Monotonic time at which the last session became ready, None if it never did
+        self.last_ready_at = None
+        self.send_scheduler: SendScheduler = None
         self._receiver_task = None
         self._heartbeat_task = None
+        self._watchdog_task = None
+        self._rtt_task = None
+        self._metrics_task = None
+        self._standby: StandbyConnection = None
+        self._standby_task = None
+        # The standby the session switched to, whose connection it now uses
+        self._promoted: StandbyConnection = None
+
+    def _reset_session_state(self):
+        self.client_ready_event.clear()
+        self.events.clear_all()
+        self.assignables.authorized_accounts.clear()
+
+    async def _load_symbols_snapshot(self):
+        if self.assignables.symbols or not self.symbols_snapshot_path:
+            return
 
-    async def _authenticate_and_initialize(self):
-        await self.message_emitter.request_application_auth(
-            self.client_id, self.client_secret
+        rows = await asyncio.to_thread(
+            load_symbols_snapshot, self.symbols_snapshot_path, self.symbols_snapshot_ttl
         )
+        if rows:
+            self.assignables.symbols.load_snapshot(rows)
+            logger.info("Loaded %s symbols from snapshot.", len(rows))
+
+    async def _authenticate_and_initialize(self, symbols_loading: asyncio.Task = None):
+        # Accounts known from configuration or a previous session are authorized
+        # right behind the application auth, without waiting for the account list
+        await self.message_emitter.start_session(self.client_id, self.client_secret)
+
         await self.events.app_auth.wait()
         logger.info("Application authentication confirmed.")
 
         await self.events.account_auth.wait()
+        protocol = self.message_emitter.protocol
+        if protocol.state == HandshakeState.FAILED:
+            raise AuthenticationError(f"Authentication failed: {protocol.error}")
+        if protocol.ungranted_accounts:
+            logger.warning(
+                "Accounts not granted to this access token, left out: %s",
+                sorted(protocol.ungranted_accounts),
+            )
         logger.info("Account authentication confirmed.")
 
-        await self.message_emitter.get_symbols_list(self.assignables.account_id)
+        await self.message_emitter.restore_spot_subscriptions()
+        await self._reconcile_positions()
+
+        if symbols_loading is not None:
+            await symbols_loading
+        # The symbols cache can be shared with other connections that already loaded it
+        if not self.assignables.symbols:
+            await self.message_emitter.get_symbols_list(self.assignables.account_id)
+            if self.symbols_snapshot_path and self.assignables.symbols:
+                await asyncio.to_thread(
+                    save_symbols_snapshot,
+                    self.assignables.symbols.to_snapshot(),
+                    self.symbols_snapshot_path,
+                )
+
+        self.last_ready_at = time.monotonic()
         self.client_ready_event.set()
 
+    async def _reconcile_positions(self):
+        # Catches the position book up with whatever happened while disconnected
+        requests = [
+            await self.message_emitter.reconcile(account_id)
+            for account_id in self.assignables.authorized_accounts
+        ]
+        for request in requests:
+            try:
+                await request
+            except RequestError as e:
+                logger.info("Reconciliation failed: %s", e)
+        logger.info(
+            "Position book reconciled: %s open positions.", len(self.position_book)
+        )
+
     async def _cleanup_tasks(self):
-        if self._receiver_task and not self._receiver_task.done():
-            self._receiver_task.cancel()
+        for task in (
+            self._receiver_task,
+            self._heartbeat_task,
+            self._watchdog_task,
+            self._rtt_task,
+            self._metrics_task,
+            self._standby_task,
+        ):
+            if task and not task.done():
+                task.cancel()
 
-        if self._heartbeat_task and not self._heartbeat_task.done():
-            self._heartbeat_task.cancel()
+        if self.send_scheduler is not None:
+            await self.send_scheduler.close()
 
         if self.websocket and not self.websocket.closed:
             await self.websocket.close()
 
+        for standby in (self._standby, self._promoted):
+            if standby is not None:
+                await standby.close()
+        self._standby = self._promoted = None
+
+        self._reset_session_state()
+        if self.recorder is not None:
+            self.recorder.flush()
+        if self.journal is not None:
+            try:
+                await self.journal.commit()
+            except OSError as e:
+                # Still fails the pending requests below, the journal retries on its own
+                logger.error("Execution journal commit failed on disconnect: %s", e)
+        self.pending_requests.fail_all(
+            ConnectionError("WebSocket client disconnected before a response arrived.")
+        )
+
     async def run_client_and_wait(self):
-        uri = f"wss://{API_HOST_DEMO}:{API_PORT_DEMO}"
-        logger.info(f"Connecting to {uri}...")
+        self._reset_session_state()
+        self.last_ready_at = None
 
+        # Local state loads while the connection and the handshake wait on the network
+        symbols_loading = asyncio.create_task(self._load_symbols_snapshot())
         try:
-            async with websockets.client.connect(uri, ssl=True) as ws:
+            async with self._connect() as ws:
                 self.websocket = ws
                 self.set_up_communication(ws)
-                await self._authenticate_and_initialize()
+                await self._authenticate_and_initialize(symbols_loading)
+                self._start_standby()
 
-                # Keep the connection alive indefinitely until it closes or an error occurs
-                await ws.wait_closed()
+                # Runs until the connection dies and there is no standby to take over
+                await self.websocket.wait_closed()
+                while await self._fail_over():
+                    await self.websocket.wait_closed()
 
-        except websockets.exceptions.ConnectionClosedOK:
+        except websocket_errors("ConnectionClosedOK"):
             logger.info("WebSocket connection closed normally in run_client_and_wait.")
             raise
         except asyncio.CancelledError:
             logger.info("run_client_and_wait task was cancelled.")
             raise
-        except websockets.exceptions.ConnectionClosedError as e:
+        except websocket_errors("ConnectionClosedError") as e:
             logger.error(
-                f"WebSocket connection closed with an error (server disconnected unexpectedly): {e}"
+                "WebSocket connection closed with an error (server disconnected unexpectedly): %s",
+                e,
             )
             raise
         except Exception as e:
-            logger.error(f"An unexpected error occurred in run_client_and_wait: {e}")
+            logger.error("An unexpected error occurred in run_client_and_wait: %s", e)
             traceback.print_exc()
             raise
         finally:
+            symbols_loading.cancel()
             await self._cleanup_tasks()
             logger.info("Disconnected from cTrader's websockets server.")
 
-    def set_up_communication(self, ws: websockets.client.WebSocketClientProtocol):
-        self.message_emitter = MessageEmitter(ws, self.assignables, self.events)
-        self.message_receiver = MessageReceiver(
-            self.events, ws, self.message_emitter, self.assignables
+    def _connect(self):
+        if self.transport == "protobuf":
+            from . import protobuf_transport
+
+            logger.info("Connecting to %s:%s (protobuf)...", self.host, self.port)
+            return protobuf_transport.connect(self.host, self.port, ssl=self.ssl)
+
+        uri = f"{'wss' if self.ssl else 'ws'}://{self.host}:{self.port}"
+        logger.info("Connecting to %s...", uri)
+        return websocket_transport.connect(uri, ssl=self.ssl or None)
+
+    def _create_session(
+        self,
+        ws: "websockets.client.WebSocketClientProtocol",
+        events: WebsocketClientEvents,
+        assignables: ClientAssignables,
+        position_book: PositionBook,
+        recorder: FrameRecorder = None,
+        event_bus: EventBus = None,
+        journal: ExecutionJournal = None,
+    ):
+        scheduler = SendScheduler(ws, self.rate_limits)
+        emitter = MessageEmitter(
+            ws,
+            assignables,
+            events,
+            self.pending_requests,
+            codec=self.codec,
+            scheduler=scheduler,
+            recorder=recorder,
+            metrics=self.metrics,
+            journal=journal,
         )
-        self._receiver_task = asyncio.create_task(
-            self.message_receiver.receive_messages()
+        receiver = MessageReceiver(
+            events,
+            ws,
+            emitter,
+            assignables,
+            self.spot_buffers,
+            self.trendbars,
+            position_book=position_book,
+            recorder=recorder,
+            metrics=self.metrics,
+            # Pending requests outlive a connection that fails over, see _fail_over
+            fail_pending_on_close=False,
+            event_bus=event_bus,
+            journal=journal,
         )
-        self._heartbeat_task = asyncio.create_task(
-            self.message_emitter.heartbeat_sender()
+        return scheduler, emitter, receiver
+
+    def _start_session_tasks(
+        self, emitter: MessageEmitter, receiver: MessageReceiver
+    ) -> tuple:
+        """The receive loop, heartbeats, watchdog and RTT prober of a connection."""
+        tasks = [
+            asyncio.create_task(receiver.receive_messages()),
+            asyncio.create_task(emitter.heartbeat_sender(self.heartbeat_interval)),
+        ]
+        if self.silence_deadline:
+            tasks.append(
+                asyncio.create_task(
+                    LinkWatchdog(receiver, emitter, self.silence_deadline).run()
+                )
+            )
+        else:
+            tasks.append(None)
+        if self.rtt_probe_interval:
+            tasks.append(
+                asyncio.create_task(emitter.rtt_prober(self.rtt_probe_interval))
+            )
+        else:
+            tasks.append(None)
+        return tuple(tasks)
+
+    def set_up_communication(self, ws: "websockets.client.WebSocketClientProtocol"):
+        (
+            self.send_scheduler,
+            self.message_emitter,
+            self.message_receiver,
+        ) = self._create_session(
+            ws,
+            self.events,
+            self.assignables,
+            self.position_book,
+            self.recorder,
+            self.event_bus,
+            self.journal,
         )
+        (
+            self._receiver_task,
+            self._heartbeat_task,
+            self._watchdog_task,
+            self._rtt_task,
+        ) = self._start_session_tasks(self.message_emitter, self.message_receiver)
+        self._metrics_task = asyncio.create_task(self.metrics.sample_loop())
+
+    def _start_standby(self):
+        if self.standby:
+            self._standby_task = asyncio.create_task(self._keep_standby())
+
+    async def _keep_standby(self):
+        """Keeps a standby connection open until the session switches to it."""
+        while True:
+            standby = StandbyConnection(self)
+            try:
+                await standby.open()
+                self._standby = standby
+                await standby.websocket.wait_closed()
+                logger.info("Standby connection lost, replacing it.")
+            except asyncio.CancelledError:
+                # Unless the session just switched to it
+                if standby.websocket is not self.websocket:
+                    await standby.close()
+                raise
+            except (
+                ConnectionError,
+                OSError,
+                asyncio.TimeoutError,
+                *websocket_errors(),
+            ) as e:
+                logger.info("Standby connection failed: %s", e)
+            self._standby = None
+            await standby.close()
+            await asyncio.sleep(STANDBY_RETRY_DELAY_SECONDS)
+
+    async def _fail_over(self) -> bool:
+        """
+        Moves the session to the standby connection, if one is ready. Frames
+        not written yet go out on it as they are and requests already sent
+        are sent again, except orders: whether they were executed is unknown
+        until the reconciliation that follows, they fail with ConnectionError.
+        """
+        standby = self._standby
+        if standby is None or not standby.alive:
+            return False
+        started = time.perf_counter()
+        self._standby = None
+        self._standby_task.cancel()
+
+        for task in (
+            self._receiver_task,
+            self._heartbeat_task,
+            self._watchdog_task,
+            self._rtt_task,
+        ):
+            if task and not task.done():
+                task.cancel()
+        old_websocket = self.websocket
+        unsent = self.send_scheduler.detach()
+        subscribed_spots = self.assignables.subscribed_spots
+
+        self.websocket = standby.websocket
+        self.send_scheduler = standby.send_scheduler
+        self.message_emitter = standby.message_emitter
+        self.message_receiver = standby.message_receiver
+        self.events = standby.events
+        self.assignables = standby.assignables
+        self.assignables.subscribed_spots = subscribed_spots
+        self.message_receiver.position_book = self.position_book
+        self.message_receiver.event_bus = self.event_bus
+        self.message_emitter.recorder = self.message_receiver.recorder = self.recorder
+        self.message_emitter.journal = self.message_receiver.journal = self.journal
+        (
+            self._receiver_task,
+            self._heartbeat_task,
+            self._watchdog_task,
+            self._rtt_task,
+        ) = standby.tasks
+
+        self.send_scheduler.adopt(unsent)
+        unsent_frames = {id(frame) for _, frame, _, _ in unsent}
+        for request in self.pending_requests:
+            if request.websocket is not old_websocket:
+                continue
+            if id(request.frame) in unsent_frames:
+                request.websocket = self.websocket
+            elif request.payload_type in TRADING_PAYLOAD_TYPES:
+                self.pending_requests.fail(
+                    request,
+                    ConnectionError(
+                        "Connection lost after sending the order, see the position book."
+                    ),
+                )
+            else:
+                self.message_emitter.resend(request)
+        await self.message_emitter.restore_spot_subscriptions()
+
+        self.failovers += 1
+        self.last_failover_seconds = time.perf_counter() - started
+        logger.warning(
+            "Connection lost, switched to the standby in %.1f ms.",
+            self.last_failover_seconds * 1000,
+        )
+
+        previous, self._promoted = self._promoted, standby
+        if previous is not None:
+            await previous.close()
+        self._start_standby()
+        await self._reconcile_positions()
+        self.last_ready_at = time.monotonic()
+        return True
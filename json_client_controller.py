@@ -1,39 +1,94 @@
 import asyncio
+import random
+import time
 
-import websockets
-import websockets.exceptions
-
+from client_pool import WebsocketsClientPool
 from json_client import WebSocketsJsonClient
 from logging_config import logger
+from protocol import AuthenticationError
+from websocket_transport import websocket_errors
+
+RECONNECT_INITIAL_DELAY_SECONDS = 0.1
+RECONNECT_MAX_DELAY_SECONDS = 5
+# A session that stayed ready this long resets the backoff
+RECONNECT_STABLE_SESSION_SECONDS = 30
+
+
+class ReconnectBackoff:
+    """Exponential backoff with full jitter, starting at sub-second delays."""
+
+    def __init__(
+        self,
+        initial: float = RECONNECT_INITIAL_DELAY_SECONDS,
+        maximum: float = RECONNECT_MAX_DELAY_SECONDS,
+    ):
+        self.initial = initial
+        self.maximum = maximum
+        self.attempt = 0
+
+    def reset(self):
+        self.attempt = 0
 
-RECONNECT_DELAY_SECONDS = 5
+    def next_delay(self) -> float:
+        ceiling = min(self.maximum, self.initial * 2**self.attempt)
+        self.attempt += 1
+        return random.uniform(0, ceiling)
 
 
 class WebsocketsClientController:
     client: WebSocketsJsonClient = None
+    pool: WebsocketsClientPool = None
 
     @classmethod
     async def start_websocket_client_connection_loop(cls):
         if cls.client is None:
             cls.client = WebSocketsJsonClient()
 
+        await cls.run_connection_loop(cls.client)
+
+    @classmethod
+    async def start_client_pool_connection_loop(
+        cls, account_ids, connections: int = None
+    ):
+        if cls.pool is None:
+            cls.pool = WebsocketsClientPool(account_ids, connections)
+            cls.client = cls.pool.clients[0]
+
+        await cls.pool.run(cls.run_connection_loop)
+
+    @staticmethod
+    async def run_connection_loop(client: WebSocketsJsonClient):
+        backoff = ReconnectBackoff()
         while True:
             try:
                 logger.info("Starting WebSocket client.")
-                await cls.client.run_client_and_wait()
+                await client.run_client_and_wait()
+            except AuthenticationError as e:
+                # Wrong credentials or a revoked token fail the same way every time
+                logger.error("%s. Exiting reconnection loop.", e)
+                break
             except (
                 ConnectionError,
                 TimeoutError,
-                websockets.exceptions.ConnectionClosed,
-                websockets.exceptions.ConnectionClosedOK,
+                *websocket_errors("ConnectionClosed"),
             ) as e:
+                if (
+                    client.last_ready_at is not None
+                    and time.monotonic() - client.last_ready_at
+                    > RECONNECT_STABLE_SESSION_SECONDS
+                ):
+                    backoff.reset()
+                delay = backoff.next_delay()
                 logger.warning(
-                    f"WebSocket client disconnected or failed: {e}. Attempting to reconnect in {RECONNECT_DELAY_SECONDS} seconds..."
+                    "WebSocket client disconnected or failed: %s. Attempting to reconnect in %.2f seconds...",
+                    e,
+                    delay,
                 )
-                await asyncio.sleep(RECONNECT_DELAY_SECONDS)
+                await asyncio.sleep(delay)
             except Exception as e:
                 logger.error(
-                    f"An unexpected error occurred in WebSocket client: {e}. Exiting reconnection loop."
+                    "An unexpected error occurred in WebSocket client: %s. Exiting reconnection loop.",
+                    e,
                 )
                 break
 
@@ -0,0 +1,83 @@
+import asyncio
+import time
+
+from logging_config import logger
+
+from .models import PAYLOAD_TYPES
+
+# The Open API drops connections that send nothing for 30 seconds. Heartbeats
+# only go out on a link that has been idle this long, so stay well below it.
+HEARTBEAT_INTERVAL_SECONDS = 10.0
+
+# Interval of the VERSION_REQ pings that measure the round trip for the metrics
+RTT_PROBE_INTERVAL_SECONDS = 60.0
+
+# A connection that received nothing for this long is considered dead. Halfway
+# there it's probed with a request the server always answers.
+SILENCE_DEADLINE_SECONDS = 10.0
+
+
+def abort_connection(websocket):
+    """Drops a connection without a closing handshake, which a dead peer would never answer."""
+    abort = getattr(websocket, "abort", None)
+    if abort is not None:
+        abort()
+    else:
+        websocket.transport.abort()
+
+
+class LinkWatchdog:
+    """
+    Detects a connection that stopped delivering data, e.g. a half-open TCP
+    connection that would otherwise only be noticed when the OS gives up on
+    it, minutes later.
+
+    Every received frame counts as a sign of life. After `deadline / 2`
+    seconds of silence a VERSION_REQ is sent, and if nothing at all arrives
+    within `deadline` seconds the connection is aborted, which ends the
+    receive loop like any other disconnection would.
+    """
+
+    def __init__(self, receiver, emitter, deadline: float = SILENCE_DEADLINE_SECONDS):
+        self.receiver = receiver
+        self.emitter = emitter
+        self.deadline = deadline
+        self.expired = False
+
+    def _probe(self):
+        try:
+            self.emitter.submit_request(
+                PAYLOAD_TYPES.PROTO_OA_VERSION_REQ, {}, timeout=self.deadline
+            )
+        except RuntimeError as e:
+            logger.info("Liveness probe not sent: %s", e)
+
+    async def run(self):
+        deadline = self.deadline
+        probe_after = deadline / 2
+        probed_at = None
+        try:
+            while True:
+                now = time.monotonic()
+                last_received_at = self.receiver.last_received_at
+                silent = now - last_received_at
+                if silent >= deadline:
+                    logger.warning(
+                        "Nothing received for %.1f seconds, dropping the connection.",
+                        silent,
+                    )
+                    self.expired = True
+                    abort_connection(self.emitter.websocket)
+                    return
+
+                if silent < probe_after:
+                    wake_at = last_received_at + probe_after
+                else:
+                    # Once per silence, the answer ends it
+                    if probed_at is None or probed_at < last_received_at:
+                        probed_at = now
+                        self._probe()
+                    wake_at = last_received_at + deadline
+                await asyncio.sleep(wake_at - now)
+        except asyncio.CancelledError:
+            logger.info("Link watchdog stopped.")
@@ -1,38 +1,125 @@
+import atexit
 import logging
 import os
-from logging.config import dictConfig
-
-os.makedirs("logs", exist_ok=True)
-file_path = os.path.join(os.getcwd(), "logs/app.log")
-
-LOGGING_CONFIG = {
-    "version": 1,
-    "disable_existing_loggers": False,
-    "formatters": {
-        "minimal": {"format": "%(asctime)s - %(levelname)s - %(message)s"},
-    },
-    "handlers": {
-        "file_handler": {
-            "class": "logging.handlers.TimedRotatingFileHandler",
-            "formatter": "minimal",
-            "filename": file_path,
-            "when": "midnight",
-            "interval": 1,
-            "backupCount": 7,
-            "encoding": "utf8",
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+# Directory of app.log, relative to the working directory
+LOG_DIRECTORY = os.environ.get("OPEN_API_LOG_DIRECTORY", "logs")
+
+
+def build_logging_config(log_directory: str = LOG_DIRECTORY) -> dict:
+    return {
+        "version": 1,
+        "disable_existing_loggers": False,
+        "formatters": {
+            "minimal": {"format": "%(asctime)s - %(levelname)s - %(message)s"},
         },
-        "console_handler": {
+        "handlers": {
+            "file_handler": {
+                "class": "logging.handlers.TimedRotatingFileHandler",
+                "formatter": "minimal",
+                "filename": os.path.join(os.getcwd(), log_directory, "app.log"),
+                "when": "midnight",
+                "interval": 1,
+                "backupCount": 7,
+                "encoding": "utf8",
+            },
+            "console_handler": {
+                "level": "INFO",
+                "formatter": "minimal",
+                "class": "logging.StreamHandler",
+                "stream": "ext://sys.stdout",
+            },
+        },
+        "root": {
             "level": "INFO",
-            "formatter": "minimal",
-            "class": "logging.StreamHandler",
-            "stream": "ext://sys.stdout",
+            "handlers": ["file_handler", "console_handler"],
         },
-    },
-    "root": {
-        "level": "INFO",
-        "handlers": ["file_handler", "console_handler"],
-    },
-}
-
-dictConfig(LOGGING_CONFIG)
+    }
+
+
+# "queue" moves file and console I/O to a listener thread, "sync" writes from the caller
+LOGGING_MODE = os.environ.get("OPEN_API_LOGGING_MODE", "queue")
+
+# Raw frames are only traced when enabled, one out of every N frames
+WIRE_TRACE_ENABLED = os.environ.get("OPEN_API_WIRE_TRACE", "") not in ("", "0")
+WIRE_TRACE_SAMPLE_EVERY = int(os.environ.get("OPEN_API_WIRE_TRACE_SAMPLE_EVERY", "1"))
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    QueueHandler that enqueues records untouched, so %-style messages are only
+    formatted by the listener thread instead of on the event loop.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+def enable_queue_logging() -> QueueListener:
+    root = logging.getLogger()
+    handlers = [
+        handler for handler in root.handlers if not isinstance(handler, QueueHandler)
+    ]
+    if not handlers:
+        return None
+
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    root.handlers = [DeferredQueueHandler(log_queue)]
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
+
+
+class WireTrace:
+    """
+    Sampled trace of raw frames on the "logger.wire" channel, logged at DEBUG so
+    it reaches the log file but not the console. Callers check `enabled` before
+    calling `trace`, so a disabled trace costs one attribute lookup per frame.
+    """
+
+    __slots__ = ("enabled", "sample_every", "_count")
+
+    def __init__(self, enabled: bool = False, sample_every: int = 1):
+        self._count = 0
+        self.configure(enabled, sample_every)
+
+    def configure(self, enabled: bool, sample_every: int = 1):
+        self.enabled = enabled
+        self.sample_every = max(1, sample_every)
+        wire_logger.setLevel(logging.DEBUG if enabled else logging.WARNING)
+
+    def trace(self, direction: str, frame):
+        self._count += 1
+        if self._count % self.sample_every == 0:
+            wire_logger.debug("%s %s", direction, frame)
+
+
+def configure_logging(
+    log_directory: str = LOG_DIRECTORY, mode: str = LOGGING_MODE
+) -> QueueListener:
+    """
+    Sets up the log file and the console once per process, later calls do
+    nothing. Importing this module configures nothing, so applications with
+    their own logging setup simply never call it.
+    """
+    global log_listener, logging_configured
+    if logging_configured:
+        return log_listener
+    # Deferred, it's only needed here and slower to import than this module
+    from logging.config import dictConfig
+
+    os.makedirs(log_directory, exist_ok=True)
+    dictConfig(build_logging_config(log_directory))
+    logging_configured = True
+    log_listener = enable_queue_logging() if mode == "queue" else None
+    return log_listener
+
+
 logger = logging.getLogger("logger")
+wire_logger = logging.getLogger("logger.wire")
+wire_trace = WireTrace(WIRE_TRACE_ENABLED, WIRE_TRACE_SAMPLE_EVERY)
+log_listener = None
+logging_configured = False
@@ -1,94 +1,408 @@
 import asyncio
-import datetime
-import json
-import re
+import time
+from typing import TYPE_CHECKING
 
-import pytz
-import websockets.client
-
-from logging_config import logger
+from logging_config import logger, wire_trace
 
+from .codec import DEFAULT_CODEC, JsonCodec
+from .execution_journal import ExecutionJournal
+from .frame_recorder import OUTBOUND, FrameRecorder
+from .liveness import HEARTBEAT_INTERVAL_SECONDS, RTT_PROBE_INTERVAL_SECONDS
+from .metrics import Metrics
 from .models import (
     PAYLOAD_TYPES,
     ClientAssignables,
     LotSize,
+    ProtoOAExecutionType,
+    ProtoOAQuoteType,
     TradeSide,
+    TrendbarPeriod,
     WebsocketClientEvents,
 )
+from .pending_requests import PendingRequest, PendingRequests, RequestError
+from .protocol import OpenApiProtocol, Outbound, next_client_msg_id
+from .send_scheduler import TRADING_PAYLOAD_TYPES, SendScheduler
+from .symbol_index import Symbol
+
+if TYPE_CHECKING:
+    import websockets.client
+
+
+# Execution types ending an order that was never filled
+ORDER_ENDED_TYPES = frozenset(
+    (
+        ProtoOAExecutionType.ORDER_REJECTED.value,
+        ProtoOAExecutionType.ORDER_CANCELLED.value,
+        ProtoOAExecutionType.ORDER_EXPIRED.value,
+    )
+)
+
+
+def is_order_filled(msg: dict) -> bool:
+    """
+    `until` predicate of orders: true once filled, raises RequestError if
+    the order was rejected, cancelled or expired instead.
+    """
+    execution_type = msg.get("payload", {}).get("executionType")
+    if execution_type == ProtoOAExecutionType.ORDER_FILLED.value:
+        return True
+    if execution_type in ORDER_ENDED_TYPES:
+        raise RequestError(msg)
+    return False
 
 
 class MessageEmitter:
+    """
+    Asyncio side of the OpenApiProtocol for outgoing messages: encodes them
+    with it and writes them through the send scheduler, or straight to the
+    connection without one.
+    """
+
     def __init__(
         self,
-        websocket: websockets.client.WebSocketClientProtocol,
+        websocket: "websockets.client.WebSocketClientProtocol",
         client_assignables: ClientAssignables,
         events: WebsocketClientEvents,
+        pending_requests: PendingRequests = None,
+        codec: JsonCodec = DEFAULT_CODEC,
+        scheduler: SendScheduler = None,
+        recorder: FrameRecorder = None,
+        metrics: Metrics = None,
+        protocol: OpenApiProtocol = None,
+        journal: ExecutionJournal = None,
     ):
         self.websocket = websocket
+        self.codec = codec
+        self.protocol = (
+            protocol
+            if protocol is not None
+            else OpenApiProtocol(client_assignables, codec)
+        )
+        # Without a scheduler frames are written straight to the websocket
+        self.scheduler = scheduler
+        self.recorder = recorder
+        self.journal = journal
+        self.metrics = metrics
         self.client_assignables = client_assignables
         self.events = events
+        # Heartbeats are only sent when nothing else was for a while
+        self.last_sent_at = time.monotonic()
+        self.pending_requests = (
+            pending_requests if pending_requests is not None else PendingRequests()
+        )
 
     def generate_client_msg_id(self, payload_type: int) -> str:
-        now = datetime.datetime.now(pytz.utc)
-        timestamp_str = now.isoformat()
-        return f"{payload_type}-{timestamp_str}"
+        return next_client_msg_id(payload_type)
 
-    async def send_message(self, payload_type: int, payload: dict) -> str:
-        client_msg_id = self.generate_client_msg_id(payload_type)
-        message = {
-            "clientMsgId": client_msg_id,
-            "payloadType": payload_type,
-            "payload": payload,
-        }
-        json_message = json.dumps(message, indent=4)
+    def _encode(self, client_msg_id: str, payload_type: int, payload) -> str:
+        outbound = self.protocol.encode(payload_type, payload, client_msg_id)
+        self._record(outbound)
+        return outbound.frame
+
+    def _record(self, outbound: Outbound):
+        self.last_sent_at = time.monotonic()
+        payload_type = outbound.payload_type
         if payload_type != PAYLOAD_TYPES.PROTO_HEARTBEAT_EVENT:
-            logger.info(f"SENDING: {json_message}")
-        await self.websocket.send(json_message)
+            logger.info("SENDING %s: %s", outbound.client_msg_id, outbound.payload)
+            if self.metrics is not None:
+                self.metrics.request_sent(outbound.client_msg_id, payload_type)
+        if wire_trace.enabled:
+            wire_trace.trace("OUT", outbound.frame)
+        if self.recorder is not None:
+            self.recorder.record(OUTBOUND, payload_type, outbound.frame)
+        if self.journal is not None and payload_type in TRADING_PAYLOAD_TYPES:
+            self.journal.append(OUTBOUND, payload_type, outbound.payload)
+
+    async def send_protocol_frames(self):
+        """Writes what the protocol queued, e.g. the next step of the handshake."""
+        for outbound in self.protocol.data_to_send():
+            self._record(outbound)
+            await self._send_frame(outbound.frame, outbound.payload_type)
+
+    async def send_message(
+        self, payload_type: int, payload: dict, client_msg_id: str = None
+    ) -> str:
+        if client_msg_id is None:
+            client_msg_id = self.generate_client_msg_id(payload_type)
+        await self._send_frame(
+            self._encode(client_msg_id, payload_type, payload), payload_type
+        )
         return client_msg_id
 
-    async def heartbeat_sender(self):
+    async def _send_frame(self, frame, payload_type: int):
+        if self.scheduler is None:
+            await self.websocket.send(frame)
+        else:
+            await self.scheduler.send(frame, payload_type)
+
+    async def send_request(
+        self,
+        payload_type: int,
+        payload: dict,
+        timeout: float = None,
+        until=None,
+    ) -> PendingRequest:
+        """
+        Sends a message and returns a PendingRequest that the receiver resolves
+        with the message carrying the same clientMsgId.
+        """
+        client_msg_id = self.generate_client_msg_id(payload_type)
+        request = self.pending_requests.register(
+            client_msg_id, payload_type, payload, timeout, until
+        )
+        try:
+            request.frame = self._encode(client_msg_id, payload_type, payload)
+            request.websocket = self.websocket
+            await self._send_frame(request.frame, payload_type)
+        except BaseException:
+            request.cancel()
+            raise
+        return request
+
+    def submit_request(
+        self,
+        payload_type: int,
+        payload: dict,
+        timeout: float = None,
+        until=None,
+    ) -> PendingRequest:
+        """
+        Queues a request on the scheduler without waiting for it to be written,
+        so many requests can be pipelined through the writer task at once.
+        """
+        if self.scheduler is None:
+            raise RuntimeError("Pipelined requests need a send scheduler.")
+
+        client_msg_id = self.generate_client_msg_id(payload_type)
+        request = self.pending_requests.register(
+            client_msg_id, payload_type, payload, timeout, until
+        )
+        request.frame = self._encode(client_msg_id, payload_type, payload)
+        request.websocket = self.websocket
+        self._submit_frame(request)
+        return request
+
+    def resend(self, request: PendingRequest):
+        """
+        Queues a request that was sent on another connection again, under the
+        same clientMsgId, so whoever awaits it gets the answer from this one.
+        """
+        request.frame = self._encode(
+            request.client_msg_id, request.payload_type, request.payload
+        )
+        request.websocket = self.websocket
+        self._submit_frame(request)
+
+    def _submit_frame(self, request: PendingRequest):
+        written = self.scheduler.submit(request.frame, request.payload_type)
+        written.add_done_callback(
+            lambda future: _fail_unsent_request(self.pending_requests, request, future)
+        )
+
+    async def heartbeat_sender(self, interval: float = HEARTBEAT_INTERVAL_SECONDS):
+        """Sends a heartbeat whenever nothing else was sent for `interval` seconds."""
         try:
             while True:
-                await asyncio.sleep(30)
-                if self.websocket and not self.websocket.closed:
-                    await self.send_heartbeat_message()
+                idle = time.monotonic() - self.last_sent_at
+                if idle < interval:
+                    await asyncio.sleep(interval - idle)
+                    continue
+                if not self.websocket or self.websocket.closed:
+                    return
+                await self.send_heartbeat_message()
         except asyncio.CancelledError:
             logger.info("Heartbeat sender stopped.")
         except Exception as e:
-            logger.info(f"Heartbeat sender error: {e}")
+            logger.info("Heartbeat sender error: %s", e)
+
+    async def rtt_prober(self, interval: float = RTT_PROBE_INTERVAL_SECONDS):
+        """Measures the round trip every `interval` seconds, apart from the heartbeats."""
+        try:
+            while True:
+                await asyncio.sleep(interval)
+                if not self.websocket or self.websocket.closed:
+                    return
+                await self.measure_heartbeat_rtt(timeout=min(interval, 10.0))
+        except asyncio.CancelledError:
+            logger.info("RTT prober stopped.")
+        except Exception as e:
+            logger.info("RTT prober error: %s", e)
+
+    async def start_session(self, client_id: str, client_secret: str):
+        """Starts the handshake, the receiver sends its next steps as responses arrive."""
+        self.protocol.start(client_id, client_secret)
+        await self.send_protocol_frames()
 
     async def request_application_auth(self, client_id: str, client_secret: str):
-        await self.send_message(
-            PAYLOAD_TYPES.PROTO_OA_APPLICATION_AUTH_REQ,
-            {"clientId": client_id, "clientSecret": client_secret},
-        )
+        self.protocol.application_auth(client_id, client_secret)
+        await self.send_protocol_frames()
 
     async def send_heartbeat_message(self, msg=None):
-        await self.send_message(PAYLOAD_TYPES.PROTO_HEARTBEAT_EVENT, {})
+        self.protocol.heartbeat()
+        await self.send_protocol_frames()
 
-    async def request_account_auth(self):
-        await self.send_message(
-            PAYLOAD_TYPES.PROTO_OA_ACCOUNT_AUTH_REQ,
-            {
-                "accessToken": self.client_assignables.access_token,
-                "ctidTraderAccountId": self.client_assignables.account_id,
-            },
-        )
+    async def measure_heartbeat_rtt(self, timeout: float = 10.0):
+        """
+        Heartbeats aren't answered, so the round trip is measured with a
+        VERSION_REQ, the cheapest request the server replies to.
+        """
+        try:
+            request = await self.send_request(
+                PAYLOAD_TYPES.PROTO_OA_VERSION_REQ, {}, timeout=timeout
+            )
+            await request
+        except (asyncio.TimeoutError, RequestError) as e:
+            logger.info("Heartbeat ping failed: %s", e)
+            return None
+        self.metrics.heartbeat_received(request.latency)
+        return request.latency
+
+    async def request_account_auth(self, account_id: int = None):
+        self.protocol.account_auth(account_id)
+        await self.send_protocol_frames()
 
     async def get_symbols_list(
         self,
         account_id: int,
     ):
-        logger.info(f"Requesting symbols list for account: {account_id}")
+        logger.info("Requesting symbols list for account: %s", account_id)
         await self.send_message(
             PAYLOAD_TYPES.PROTO_OA_SYMBOLS_LIST_REQ,
+            self.codec.encode_static(
+                {
+                    "ctidTraderAccountId": self.client_assignables.account_id,
+                    "includeArchivedSymbols": True,
+                }
+            ),
+        )
+        await self.events.symbols_list.wait()
+        logger.info("Symbols list requested and processed.")
+
+    async def get_symbol_details(self, symbol_ids) -> PendingRequest:
+        return await self.send_request(
+            PAYLOAD_TYPES.PROTO_OA_SYMBOL_BY_ID_REQ,
             {
                 "ctidTraderAccountId": self.client_assignables.account_id,
-                "includeArchivedSymbols": True,
+                "symbolId": list(symbol_ids),
             },
         )
-        await self.events.symbols_list.wait()
-        logger.info("Symbols list requested and processed.")
+
+    async def symbol_details(self, symbol_name_or_id) -> Symbol:
+        """Returns the symbol with its details, fetching them on first use."""
+        symbol = self.client_assignables.symbols.get(symbol_name_or_id)
+        if symbol is None:
+            raise KeyError(f"Unknown symbol: {symbol_name_or_id}")
+        if not symbol.has_details:
+            # The receiver merges the response into the symbol index
+            await (await self.get_symbol_details([symbol.symbol_id]))
+        return symbol
+
+    async def subscribe_spots(
+        self, symbol_ids, account_id: int = None
+    ) -> PendingRequest:
+        symbol_ids = [
+            symbol_id
+            for symbol_id in symbol_ids
+            if symbol_id not in self.client_assignables.subscribed_spots
+        ]
+        if not symbol_ids:
+            return None
+
+        self.client_assignables.subscribed_spots.update(symbol_ids)
+        return await self.send_request(
+            PAYLOAD_TYPES.PROTO_OA_SUBSCRIBE_SPOTS_REQ,
+            {
+                "ctidTraderAccountId": account_id or self.client_assignables.account_id,
+                "symbolId": symbol_ids,
+                "subscribeToSpotTimestamp": True,
+            },
+        )
+
+    async def restore_spot_subscriptions(self) -> PendingRequest:
+        """Subscribes again to every symbol that was subscribed before a reconnection."""
+        symbol_ids = list(self.client_assignables.subscribed_spots)
+        if not symbol_ids:
+            return None
+
+        logger.info("Restoring spot subscriptions for %s symbols.", len(symbol_ids))
+        return await self.send_request(
+            PAYLOAD_TYPES.PROTO_OA_SUBSCRIBE_SPOTS_REQ,
+            {
+                "ctidTraderAccountId": self.client_assignables.account_id,
+                "symbolId": symbol_ids,
+                "subscribeToSpotTimestamp": True,
+            },
+        )
+
+    async def unsubscribe_spots(
+        self, symbol_ids, account_id: int = None
+    ) -> PendingRequest:
+        symbol_ids = [
+            symbol_id
+            for symbol_id in symbol_ids
+            if symbol_id in self.client_assignables.subscribed_spots
+        ]
+        if not symbol_ids:
+            return None
+
+        self.client_assignables.subscribed_spots.difference_update(symbol_ids)
+        return await self.send_request(
+            PAYLOAD_TYPES.PROTO_OA_UNSUBSCRIBE_SPOTS_REQ,
+            {
+                "ctidTraderAccountId": account_id or self.client_assignables.account_id,
+                "symbolId": symbol_ids,
+            },
+        )
+
+    async def get_trendbars(
+        self,
+        symbol_id: int,
+        period: TrendbarPeriod,
+        from_timestamp: int,
+        to_timestamp: int,
+        account_id: int = None,
+        timeout: float = None,
+    ) -> PendingRequest:
+        """One request's worth of bars, see history.HistoryDownloader for longer ranges."""
+        return await self.send_request(
+            PAYLOAD_TYPES.PROTO_OA_GET_TRENDBARS_REQ,
+            {
+                "ctidTraderAccountId": account_id or self.client_assignables.account_id,
+                "symbolId": symbol_id,
+                "period": period.name,
+                "fromTimestamp": from_timestamp,
+                "toTimestamp": to_timestamp,
+            },
+            timeout,
+        )
+
+    async def get_tick_data(
+        self,
+        symbol_id: int,
+        quote_type: ProtoOAQuoteType,
+        from_timestamp: int,
+        to_timestamp: int,
+        account_id: int = None,
+        timeout: float = None,
+    ) -> PendingRequest:
+        return await self.send_request(
+            PAYLOAD_TYPES.PROTO_OA_GET_TICKDATA_REQ,
+            {
+                "ctidTraderAccountId": account_id or self.client_assignables.account_id,
+                "symbolId": symbol_id,
+                "type": quote_type.name,
+                "fromTimestamp": from_timestamp,
+                "toTimestamp": to_timestamp,
+            },
+            timeout,
+        )
+
+    async def reconcile(self, account_id: int = None) -> PendingRequest:
+        """Requests the open positions and orders, the receiver loads them into the position book."""
+        return await self.send_request(
+            PAYLOAD_TYPES.PROTO_OA_RECONCILE_REQ,
+            {"ctidTraderAccountId": account_id or self.client_assignables.account_id},
+        )
 
     async def open_trade(
         self,
@@ -96,11 +410,32 @@ class MessageEmitter:
         symbol_name: str,
         stop_loss: float,
         take_profit: float,
-    ) -> str:
-        normalized_symbol = re.sub(r"[/-]", "", symbol_name)
-        symbol_id = self.client_assignables.fx_pairs_ids[normalized_symbol]
-        payload = {
-            "ctidTraderAccountId": self.client_assignables.account_id,
+        timeout: float = None,
+        account_id: int = None,
+    ) -> PendingRequest:
+        payload = self._new_order_payload(
+            trade_side, symbol_name, stop_loss, take_profit, account_id
+        )
+
+        # Resolves on ORDER_FILLED, so `request.latency` is the fill latency
+        return await self.send_request(
+            PAYLOAD_TYPES.PROTO_OA_NEW_ORDER_REQ,
+            payload,
+            timeout=timeout,
+            until=is_order_filled,
+        )
+
+    def _new_order_payload(
+        self,
+        trade_side: TradeSide,
+        symbol_name: str,
+        stop_loss: float,
+        take_profit: float,
+        account_id: int = None,
+    ) -> dict:
+        symbol_id = self.client_assignables.symbols.id_for(symbol_name)
+        return {
+            "ctidTraderAccountId": account_id or self.client_assignables.account_id,
             "symbolId": symbol_id,
             "tradeSide": trade_side.value,
             "volume": LotSize.MICRO_LOT.value,
@@ -109,31 +444,110 @@ class MessageEmitter:
             "relativeTakeProfit": take_profit,
         }
 
-        return await self.send_message(PAYLOAD_TYPES.PROTO_OA_NEW_ORDER_REQ, payload)
+    async def close_position(
+        self, position_id: int, timeout: float = None, account_id: int = None
+    ) -> PendingRequest:
+        return await self.send_request(
+            PAYLOAD_TYPES.PROTO_OA_CLOSE_POSITION_REQ,
+            self._close_position_payload(position_id, account_id),
+            timeout=timeout,
+            until=is_order_filled,
+        )
 
-    async def close_position(self, position_id: int) -> str:
-        payload = {
-            "ctidTraderAccountId": self.client_assignables.account_id,
+    def _close_position_payload(self, position_id: int, account_id: int = None):
+        return {
+            "ctidTraderAccountId": account_id or self.client_assignables.account_id,
             "positionId": position_id,
             "volume": LotSize.MICRO_LOT.value,
         }
 
-        return await self.send_message(
-            PAYLOAD_TYPES.PROTO_OA_CLOSE_POSITION_REQ, payload
+    async def amend_position_sl(
+        self,
+        new_stop_loss: float,
+        position_id: int,
+        same_take_profit: float,
+        timeout: float = None,
+        account_id: int = None,
+    ) -> PendingRequest:
+        return await self.send_request(
+            PAYLOAD_TYPES.PROTO_OA_AMEND_POSITION_SLTP_REQ,
+            self._amend_position_sl_payload(
+                new_stop_loss, position_id, same_take_profit, account_id
+            ),
+            timeout=timeout,
         )
 
-    async def amend_position_sl(
+    def _amend_position_sl_payload(
         self,
         new_stop_loss: float,
         position_id: int,
         same_take_profit: float,
-    ) -> str:
-        payload = {
-            "ctidTraderAccountId": self.client_assignables.account_id,
+        account_id: int = None,
+    ) -> dict:
+        return {
+            "ctidTraderAccountId": account_id or self.client_assignables.account_id,
             "positionId": position_id,
             "stopLoss": new_stop_loss,
             "takeProfit": same_take_profit,
         }
-        return await self.send_message(
-            PAYLOAD_TYPES.PROTO_OA_AMEND_POSITION_SLTP_REQ, payload
-        )
+
+    # Batch versions of the trading requests. Every request is queued on the
+    # scheduler at once and goes out as fast as the rate limit allows, each
+    # with its own PendingRequest.
+
+    def open_trades(
+        self, orders, timeout: float = None, account_id: int = None
+    ) -> list[PendingRequest]:
+        """`orders` are (trade_side, symbol_name, stop_loss, take_profit) tuples."""
+        payloads = [
+            self._new_order_payload(*order, account_id=account_id) for order in orders
+        ]
+        return [
+            self.submit_request(
+                PAYLOAD_TYPES.PROTO_OA_NEW_ORDER_REQ,
+                payload,
+                timeout=timeout,
+                until=is_order_filled,
+            )
+            for payload in payloads
+        ]
+
+    def close_positions(
+        self, position_ids, timeout: float = None, account_id: int = None
+    ) -> list[PendingRequest]:
+        return [
+            self.submit_request(
+                PAYLOAD_TYPES.PROTO_OA_CLOSE_POSITION_REQ,
+                self._close_position_payload(position_id, account_id),
+                timeout=timeout,
+                until=is_order_filled,
+            )
+            for position_id in position_ids
+        ]
+
+    def amend_positions_sl(
+        self, amendments, timeout: float = None, account_id: int = None
+    ) -> list[PendingRequest]:
+        """`amendments` are (new_stop_loss, position_id, same_take_profit) tuples."""
+        return [
+            self.submit_request(
+                PAYLOAD_TYPES.PROTO_OA_AMEND_POSITION_SLTP_REQ,
+                self._amend_position_sl_payload(*amendment, account_id=account_id),
+                timeout=timeout,
+            )
+            for amendment in amendments
+        ]
+
+
+def _fail_unsent_request(
+    pending_requests: PendingRequests, request: PendingRequest, written: asyncio.Future
+):
+    if written.cancelled():
+        exc = ConnectionError("Request was cancelled before being sent.")
+    else:
+        exc = written.exception()
+        if exc is None:
+            return
+    pending_requests.discard(request)
+    if not request.future.done():
+        request.future.set_exception(exc)
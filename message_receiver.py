@@ -1,63 +1,101 @@
-import json
+import time
+from typing import TYPE_CHECKING
 
-import websockets.client
-import websockets.exceptions
-
-from logging_config import logger
+from logging_config import logger, wire_trace
 
+from .codec import JsonCodec
+from .dispatch import MessageDispatcher
+from .event_bus import EventBus
+from .execution_journal import ExecutionJournal
+from .frame_recorder import INBOUND, FrameRecorder
 from .message_emitter import MessageEmitter
+from .metrics import Metrics
 from .models import (
     PAYLOAD_TYPES,
     ClientAssignables,
     ProtoOAExecutionType,
+    ProtoOAPositionStatus,
     WebsocketClientEvents,
 )
-
-FOREX_PAIRS = [
-    "CADJPY",
-    "GBPCAD",
-    "EURUSD",
-    "GBPUSD",
-    "GBPJPY",
-    "EURCAD",
-    "NZDJPY",
-    "EURJPY",
-    "AUDJPY",
-    "USDJPY",
-    "NZDCAD",
-    "NZDUSD",
-    "AUDUSD",
-    "GBPAUD",
-]
+from .position_book import PositionBook
+from .protocol import HandshakeState
+from .spot_buffers import SpotBuffers
+from .trendbars import TrendbarAggregator
+from .websocket_transport import websocket_errors
+
+if TYPE_CHECKING:
+    import websockets.client
+
+# Received without a handler on purpose, not worth logging
+SILENT_PAYLOAD_TYPES = (
+    PAYLOAD_TYPES.PROTO_HEARTBEAT_EVENT,
+    # Handled by the protocol's handshake
+    PAYLOAD_TYPES.PROTO_OA_APPLICATION_AUTH_RES,
+    PAYLOAD_TYPES.PROTO_OA_GET_ACCOUNTS_BY_ACCESS_TOKEN_RES,
+    PAYLOAD_TYPES.PROTO_OA_SPOT_EVENT,
+    PAYLOAD_TYPES.PROTO_OA_RECONCILE_RES,
+    # Applied to the symbols in process_frame
+    PAYLOAD_TYPES.PROTO_OA_SYMBOL_BY_ID_RES,
+    PAYLOAD_TYPES.PROTO_OA_VERSION_RES,
+    PAYLOAD_TYPES.PROTO_OA_GET_TRENDBARS_RES,
+    PAYLOAD_TYPES.PROTO_OA_GET_TICKDATA_RES,
+)
 
 
 class MessageReceiver:
+    """
+    Asyncio side of the emitter's OpenApiProtocol for incoming messages:
+    feeds it every frame read, sends what it queues in response and mirrors
+    its handshake state into the session events, then hands the messages
+    to the handlers and the event bus.
+    """
+
     def __init__(
         self,
         events: WebsocketClientEvents,
-        websocket: websockets.client.WebSocketClientProtocol,
+        websocket: "websockets.client.WebSocketClientProtocol",
         emitter: MessageEmitter,
         client_assignables: ClientAssignables,
+        spot_buffers: SpotBuffers = None,
+        trendbars: TrendbarAggregator = None,
+        codec: JsonCodec = None,
+        position_book: PositionBook = None,
+        recorder: FrameRecorder = None,
+        metrics: Metrics = None,
+        fail_pending_on_close: bool = True,
+        event_bus: EventBus = None,
+        journal: ExecutionJournal = None,
     ):
         self.websocket = websocket
         self.events = events
         self.handlers = {}
         self.emitter = emitter
         self.client_assignables = client_assignables
+        self.spot_buffers = spot_buffers if spot_buffers is not None else SpotBuffers()
+        self.trendbars = trendbars if trendbars is not None else TrendbarAggregator()
+        self.codec = codec if codec is not None else emitter.codec
+        self.protocol = emitter.protocol
+        self._handshake_state = self.protocol.state
+        self._handshake_error = None
+        self.recorder = recorder
+        self.journal = journal
+        self.metrics = metrics
+        self.position_book = (
+            position_book if position_book is not None else PositionBook()
+        )
+        # Further consumers of received messages, next to the handlers
+        self.event_bus = event_bus if event_bus is not None else EventBus()
+        # Off when the owner moves the pending requests to another connection
+        self.fail_pending_on_close = fail_pending_on_close
+        # When the last frame arrived, see liveness.LinkWatchdog
+        self.last_received_at = time.monotonic()
         self.register_all_handlers()
+        self.dispatcher = MessageDispatcher(self.handle_message, metrics=metrics)
 
     def register_all_handlers(self):
-        self.register_handler(
-            PAYLOAD_TYPES.PROTO_OA_APPLICATION_AUTH_RES,
-            self.handle_application_auth_res,
-        )
         self.register_handler(
             PAYLOAD_TYPES.PROTO_OA_ACCOUNT_AUTH_RES, self.handle_account_auth_res
         )
-        self.register_handler(
-            PAYLOAD_TYPES.PROTO_OA_GET_ACCOUNTS_BY_ACCESS_TOKEN_RES,
-            self.handle_get_accounts_by_access_token_res,
-        )
         self.register_handler(PAYLOAD_TYPES.PROTO_OA_ERROR_RES, self.handle_error_res)
         self.register_handler(
             PAYLOAD_TYPES.PROTO_OA_EXECUTION_EVENT, self.handle_execution_event
@@ -73,146 +111,221 @@ class MessageReceiver:
             self.handle_account_disconnection,
         )
         self.register_handler(
-            PAYLOAD_TYPES.PROTO_HEARTBEAT_EVENT, self.emitter.send_heartbeat_message
+            PAYLOAD_TYPES.PROTO_OA_SUBSCRIBE_SPOTS_RES, self.handle_subscribe_spots_res
+        )
+        self.register_handler(
+            PAYLOAD_TYPES.PROTO_OA_UNSUBSCRIBE_SPOTS_RES,
+            self.handle_unsubscribe_spots_res,
         )
 
     async def receive_messages(self):
         try:
             async for message in self.websocket:
+                self.last_received_at = time.monotonic()
+                if wire_trace.enabled:
+                    wire_trace.trace("IN", message)
                 try:
-                    msg = json.loads(message)
-                    payload_type = msg.get("payloadType")
-                    handler = self.handlers.get(payload_type)
-
-                    if payload_type != 51 and not handler:
-                        logger.info(
-                            f"RECEIVED message from Open API of unknown type: {json.dumps(msg, indent=2)}"
-                        )
-
-                    if handler:
-                        await handler(msg)
-
-                except json.JSONDecodeError as e:
-                    logger.info(f"Failed to parse message: {e}")
-        except websockets.exceptions.ConnectionClosedOK:
+                    await self.process_frame(message)
+                except self.codec.DecodeError as e:
+                    if self.recorder is not None:
+                        self.recorder.record(INBOUND, 0, message)
+                    logger.info("Failed to parse message: %s", e)
+        except websocket_errors("ConnectionClosedOK"):
             print("WebSocket connection closed normally.")
         except Exception as e:
             print(f"Receiving websockets messages error: {e}")
             self.events.clear_all()
+        finally:
+            if self.fail_pending_on_close:
+                self.emitter.pending_requests.fail_all(
+                    ConnectionError(
+                        "WebSocket connection lost before a response arrived."
+                    )
+                )
+            await self.dispatcher.close()
+
+    async def process_frame(self, message, inline: bool = False):
+        """
+        Decodes a frame and hands it to its handler. With `inline` the handler
+        is awaited right away instead of going through the dispatcher, as
+        replays do to be deterministic.
+        """
+        metrics = self.metrics
+        started = time.perf_counter() if metrics is not None else None
+        protocol = self.protocol
+        msg = protocol.receive_frame(message)
+        payload_type = msg.get("payloadType")
+        if metrics is not None and "clientMsgId" in msg:
+            metrics.response_received(msg["clientMsgId"])
+        if self.recorder is not None:
+            self.recorder.record(INBOUND, payload_type, message)
+
+        # The book and the symbols are updated before the request waiting on
+        # the message resolves
+        if payload_type == PAYLOAD_TYPES.PROTO_OA_EXECUTION_EVENT:
+            self.position_book.apply_execution(msg.get("payload", {}))
+        elif payload_type == PAYLOAD_TYPES.PROTO_OA_RECONCILE_RES:
+            self.position_book.reconcile(msg.get("payload", {}))
+        elif payload_type == PAYLOAD_TYPES.PROTO_OA_SYMBOL_BY_ID_RES:
+            self.client_assignables.symbols.load_symbol_details(
+                msg.get("payload", {}).get("symbol", [])
+            )
+        if self.journal is not None:
+            self.journal.record_inbound(payload_type, msg.get("payload", {}))
+
+        if (
+            protocol.state != self._handshake_state
+            or protocol.error is not self._handshake_error
+        ):
+            self._handshake_changed()
+        if protocol.has_data_to_send:
+            await self.emitter.send_protocol_frames()
+
+        self.emitter.pending_requests.resolve(msg)
+
+        # Ticks are recorded inline so buffers and bars see every one of them,
+        # a registered spot handler only gets the latest price per symbol
+        if payload_type == PAYLOAD_TYPES.PROTO_OA_SPOT_EVENT:
+            self.record_spot_event(msg)
+
+        if payload_type in self.handlers or payload_type in self.event_bus:
+            if inline:
+                handler_started = time.perf_counter()
+                await self.handle_message(msg)
+                if metrics is not None:
+                    metrics.handler_histogram(payload_type).record(
+                        time.perf_counter() - handler_started
+                    )
+            else:
+                await self.dispatcher.dispatch(msg)
+        elif payload_type not in SILENT_PAYLOAD_TYPES:
+            logger.info("RECEIVED message from Open API of unknown type: %s", message)
+
+        if metrics is not None:
+            metrics.frame_received(payload_type, time.perf_counter() - started)
+
+    async def handle_message(self, msg: dict):
+        """Runs the handler of the message's payloadType, then its event bus subscribers."""
+        handler = self.handlers.get(msg.get("payloadType"))
+        try:
+            if handler is not None:
+                await handler(msg)
+        finally:
+            await self.event_bus.publish(msg)
 
     def register_handler(self, payload_type, handler_func):
+        """Sets the one handler of a payloadType, see `event_bus` for more consumers."""
         self.handlers[payload_type] = handler_func
 
-    async def handle_application_auth_res(self, msg):
-        self.events.app_auth.set()
-        await self.emitter.send_message(
-            PAYLOAD_TYPES.PROTO_OA_GET_ACCOUNTS_BY_ACCESS_TOKEN_REQ,
-            {
-                "accessToken": self.client_assignables.access_token,
-            },
-        )
+    def _handshake_changed(self):
+        protocol = self.protocol
+        if protocol.error is not self._handshake_error:
+            self._handshake_error = protocol.error
+            if protocol.error is not None:
+                logger.info("Authentication: %s", protocol.error)
+
+        state = self._handshake_state = protocol.state
+        events = self.events
+        if protocol.app_authorized:
+            events.app_auth.set()
+        if state == HandshakeState.READY:
+            events.account_auth.set()
+        elif state == HandshakeState.ACCOUNT_AUTH:
+            events.account_auth.clear()
+        elif state == HandshakeState.FAILED:
+            # Unblocks whoever waits on the handshake
+            events.app_auth.set()
+            events.account_auth.set()
 
     async def handle_account_auth_res(self, msg: dict):
-        account_id_res = msg.get("payload", {}).get("ctidTraderAccountId")
-        if account_id_res:
-            logger.info(f"Account {account_id_res} authenticated!")
-            self.events.account_auth.set()
-        else:
-            logger.info("Account authentication response missing ctidTraderAccountId.")
-            self.events.account_auth.set()
-
-    async def handle_get_accounts_by_access_token_res(self, msg: dict):
-        accounts = msg.get("payload", {}).get("ctidTraderAccount", [])
-
-        for account in accounts:
-            is_live = account.get("isLive", False)
-            account_id = account.get("ctidTraderAccountId")
-
-            if not is_live:
-                self.client_assignables.account_id = account_id
-                await self.emitter.request_account_auth()
-                break
+        account_id = msg.get("payload", {}).get("ctidTraderAccountId")
+        if account_id:
+            logger.info("Account %s authenticated!", account_id)
 
     async def handle_account_disconnection(self, msg: dict):
-        self.events.account_auth.clear()
-        await self.emitter.request_account_auth()
+        account_id = msg.get("payload", {}).get("ctidTraderAccountId")
+        logger.info("Account %s disconnected, authorizing it again.", account_id)
 
     async def handle_symbols_list_res(self, msg: dict):
         symbols = msg.get("payload", {}).get("symbol", [])
+        self.client_assignables.symbols.load_symbols_list(symbols)
+        logger.info("Indexed %s symbols.", len(self.client_assignables.symbols))
+        self.events.symbols_list.set()
 
-        # Look for active symbols
-        for symbol in symbols:
-            symbol_id = symbol.get("symbolId")
-            symbol_name: str = symbol.get("symbolName")
+    def record_spot_event(self, msg: dict):
+        payload = msg["payload"]
+        buffer = self.spot_buffers.on_spot(payload)
 
-            if symbol_name in FOREX_PAIRS:
-                self.client_assignables.fx_pairs_ids[symbol_name] = symbol_id
+        # Bars are built from bids, like the server's own trendbars
+        if "bid" in payload:
+            bid, _, timestamp = buffer.latest()
+            self.trendbars.on_tick(buffer.symbol_id, bid, timestamp)
 
-        self.events.symbols_list.set()
+    async def handle_subscribe_spots_res(self, msg: dict):
+        logger.info("Spot subscription confirmed.")
+
+    async def handle_unsubscribe_spots_res(self, msg: dict):
+        logger.info("Spot unsubscription confirmed.")
 
     async def handle_error_res(self, msg: dict):
-        error_code = msg.get("payload", {}).get("errorCode", "UNKNOWN_ERROR")
-        description = msg.get("payload", {}).get(
-            "description", "No description available."
+        payload = msg.get("payload", {})
+        account_id = payload.get("ctidTraderAccountId")
+        account_info = f" for account {account_id}" if account_id else ""
+
+        logger.info(
+            "ERROR%s: %s - %s",
+            account_info,
+            payload.get("errorCode", "UNKNOWN_ERROR"),
+            payload.get("description", "No description available."),
         )
-        account_id_err = msg.get("payload", {}).get("ctidTraderAccountId")
-        account_info = f" for account {account_id_err}" if account_id_err else ""
 
-        logger.info(f"ERROR{account_info}: {error_code} - {description}")
-
-        # Crucially, unblock any waiting events in case an error prevents them from being set by their specific handlers
-        self.events.app_auth.set()
-        self.events.account_auth.set()
+        # The handshake events are set by the protocol, which fails the
+        # handshake on errors it can't recover from
         self.events.symbols_list.set()
 
     async def handle_execution_event(self, msg: dict):
         payload = msg.get("payload", {})
-
-        execution_type = payload.get("executionType", {})
+        execution_type = payload.get("executionType")
 
         if (
-            execution_type != ProtoOAExecutionType.ACCEPTED.value
-            and execution_type != ProtoOAExecutionType.FILLED.value
+            execution_type != ProtoOAExecutionType.ORDER_ACCEPTED.value
+            and execution_type != ProtoOAExecutionType.ORDER_FILLED.value
         ):
             logger.info(
-                f"Received message of not accepted or filled execution type: \n{json.dumps(payload, indent=2)}"
+                "Received message of not accepted or filled execution type: %s",
+                payload,
             )
             return
 
-        position = payload.get("position")
-
+        position = payload.get("position", {})
         position_status = position.get("positionStatus")
 
-        is_closed = position_status == 2
-        is_open = position_status == 1
-
-        profit_usd = 0
+        profit = 0
 
-        if is_open:
-            # Store the position id somewhere for later use
-            logger.info("Position opened.")
+        if position_status == ProtoOAPositionStatus.POSITION_STATUS_OPEN.value:
+            logger.info("Position %s opened.", position.get("positionId"))
 
-        elif is_closed:
-            deal = payload.get("deal")
+        elif position_status == ProtoOAPositionStatus.POSITION_STATUS_CLOSED.value:
+            close_position = payload.get("deal", {}).get("closePositionDetail")
+            if close_position is not None:
+                # Monetary values are integers in 10^-moneyDigits of the deposit currency
+                profit = (
+                    close_position.get("grossProfit", 0)
+                    + close_position.get("commission", 0)
+                ) / 10 ** close_position.get("moneyDigits", 2)
 
-            close_position = deal.get("closePositionDetail", {})
-            gross_profit = close_position.get("grossProfit", 0)
-            commission = close_position.get("commission", 0)
-
-            # The profit and commission come in cents
-            profit_usd = (gross_profit + commission) / 100
-
-            logger.info(f"Position closed.\nProfit/Loss: {profit_usd} USD")
+            logger.info("Position closed.\nProfit/Loss: %s", profit)
 
     async def handle_order_error_event(self, msg: dict):
         payload = msg.get("payload", {})
 
-        error_code = payload.get("errorCode", "UNKNOWN_ERROR")
-        order_id = payload.get("orderId", "N/A")
-        description = payload.get("description", "No description provided.")
-
-        logger.info("\n--- Order Error Event ---")
-        logger.info(f"  Order ID: {order_id}")
-        logger.info(f"  Error Code: {error_code}")
-        logger.info(f"  Description: {description}")
-        logger.info("-------------------------\n")
+        logger.info(
+            "\n--- Order Error Event ---\n"
+            "  Order ID: %s\n"
+            "  Error Code: %s\n"
+            "  Description: %s\n"
+            "-------------------------\n",
+            payload.get("orderId", "N/A"),
+            payload.get("errorCode", "UNKNOWN_ERROR"),
+            payload.get("description", "No description provided."),
+        )
@@ -0,0 +1,2917 @@
+"""
+Enums and message classes of messages.proto.
+
+Generated by proto_codegen.py, do not edit.
+"""
+
+from enum import IntEnum
+
+
+def _lookup(enum) -> dict:
+    """Members by name and by number, enums arrive as either depending on the codec."""
+    table = dict(enum.__members__)
+    table.update((member.value, member) for member in enum)
+    return table
+
+
+class Message:
+    """
+    Base of the generated message classes.
+
+    `from_dict` takes a decoded payload, as either codec produces it, turning
+    nested messages into their classes and enum values into IntEnum members
+    (unknown values are kept as they are). `to_dict` returns the payload to
+    send, with only the fields that are set and enums by name.
+    """
+
+    __slots__ = ()
+    PAYLOAD_TYPE = None
+
+    def __eq__(self, other):
+        return type(other) is type(self) and self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        fields = ", ".join(f"{key}={value!r}" for key, value in self.to_dict().items())
+        return f"{type(self).__name__}({fields})"
+
+
+class ProtoOAExecutionType(IntEnum):
+    ORDER_ACCEPTED = 2
+    ORDER_FILLED = 3
+    ORDER_REPLACED = 4
+    ORDER_CANCELLED = 5
+    ORDER_EXPIRED = 6
+    ORDER_REJECTED = 7
+    ORDER_CANCEL_REJECTED = 8
+    SWAP = 9
+    DEPOSIT_WITHDRAW = 10
+    ORDER_PARTIAL_FILL = 11
+    BONUS_DEPOSIT_WITHDRAW = 12
+
+
+_ProtoOAExecutionType = _lookup(ProtoOAExecutionType)
+
+
+class ProtoOAPositionStatus(IntEnum):
+    POSITION_STATUS_OPEN = 1
+    POSITION_STATUS_CLOSED = 2
+    POSITION_STATUS_CREATED = 3
+    POSITION_STATUS_ERROR = 4
+
+
+_ProtoOAPositionStatus = _lookup(ProtoOAPositionStatus)
+
+
+class ProtoPayloadType(IntEnum):
+    PROTO_MESSAGE = 5
+    ERROR_RES = 50
+    HEARTBEAT_EVENT = 51
+
+
+_ProtoPayloadType = _lookup(ProtoPayloadType)
+
+
+class ProtoOAPayloadType(IntEnum):
+    PROTO_OA_APPLICATION_AUTH_REQ = 2100
+    PROTO_OA_APPLICATION_AUTH_RES = 2101
+    PROTO_OA_ACCOUNT_AUTH_REQ = 2102
+    PROTO_OA_ACCOUNT_AUTH_RES = 2103
+    PROTO_OA_VERSION_REQ = 2104
+    PROTO_OA_VERSION_RES = 2105
+    PROTO_OA_NEW_ORDER_REQ = 2106
+    PROTO_OA_TRAILING_SL_CHANGED_EVENT = 2107
+    PROTO_OA_CANCEL_ORDER_REQ = 2108
+    PROTO_OA_AMEND_ORDER_REQ = 2109
+    PROTO_OA_AMEND_POSITION_SLTP_REQ = 2110
+    PROTO_OA_CLOSE_POSITION_REQ = 2111
+    PROTO_OA_ASSET_LIST_REQ = 2112
+    PROTO_OA_ASSET_LIST_RES = 2113
+    PROTO_OA_SYMBOLS_LIST_REQ = 2114
+    PROTO_OA_SYMBOLS_LIST_RES = 2115
+    PROTO_OA_SYMBOL_BY_ID_REQ = 2116
+    PROTO_OA_SYMBOL_BY_ID_RES = 2117
+    PROTO_OA_SYMBOLS_FOR_CONVERSION_REQ = 2118
+    PROTO_OA_SYMBOLS_FOR_CONVERSION_RES = 2119
+    PROTO_OA_SYMBOL_CHANGED_EVENT = 2120
+    PROTO_OA_TRADER_REQ = 2121
+    PROTO_OA_TRADER_RES = 2122
+    PROTO_OA_TRADER_UPDATE_EVENT = 2123
+    PROTO_OA_RECONCILE_REQ = 2124
+    PROTO_OA_RECONCILE_RES = 2125
+    PROTO_OA_EXECUTION_EVENT = 2126
+    PROTO_OA_SUBSCRIBE_SPOTS_REQ = 2127
+    PROTO_OA_SUBSCRIBE_SPOTS_RES = 2128
+    PROTO_OA_UNSUBSCRIBE_SPOTS_REQ = 2129
+    PROTO_OA_UNSUBSCRIBE_SPOTS_RES = 2130
+    PROTO_OA_SPOT_EVENT = 2131
+    PROTO_OA_ORDER_ERROR_EVENT = 2132
+    PROTO_OA_DEAL_LIST_REQ = 2133
+    PROTO_OA_DEAL_LIST_RES = 2134
+    PROTO_OA_SUBSCRIBE_LIVE_TRENDBAR_REQ = 2135
+    PROTO_OA_UNSUBSCRIBE_LIVE_TRENDBAR_REQ = 2136
+    PROTO_OA_GET_TRENDBARS_REQ = 2137
+    PROTO_OA_GET_TRENDBARS_RES = 2138
+    PROTO_OA_EXPECTED_MARGIN_REQ = 2139
+    PROTO_OA_EXPECTED_MARGIN_RES = 2140
+    PROTO_OA_MARGIN_CHANGED_EVENT = 2141
+    PROTO_OA_ERROR_RES = 2142
+    PROTO_OA_CASH_FLOW_HISTORY_LIST_REQ = 2143
+    PROTO_OA_CASH_FLOW_HISTORY_LIST_RES = 2144
+    PROTO_OA_GET_TICKDATA_REQ = 2145
+    PROTO_OA_GET_TICKDATA_RES = 2146
+    PROTO_OA_ACCOUNTS_TOKEN_INVALIDATED_EVENT = 2147
+    PROTO_OA_CLIENT_DISCONNECT_EVENT = 2148
+    PROTO_OA_GET_ACCOUNTS_BY_ACCESS_TOKEN_REQ = 2149
+    PROTO_OA_GET_ACCOUNTS_BY_ACCESS_TOKEN_RES = 2150
+    PROTO_OA_GET_CTID_PROFILE_BY_TOKEN_REQ = 2151
+    PROTO_OA_GET_CTID_PROFILE_BY_TOKEN_RES = 2152
+    PROTO_OA_ASSET_CLASS_LIST_REQ = 2153
+    PROTO_OA_ASSET_CLASS_LIST_RES = 2154
+    PROTO_OA_DEPTH_EVENT = 2155
+    PROTO_OA_SUBSCRIBE_DEPTH_QUOTES_REQ = 2156
+    PROTO_OA_SUBSCRIBE_DEPTH_QUOTES_RES = 2157
+    PROTO_OA_UNSUBSCRIBE_DEPTH_QUOTES_REQ = 2158
+    PROTO_OA_UNSUBSCRIBE_DEPTH_QUOTES_RES = 2159
+    PROTO_OA_SYMBOL_CATEGORY_REQ = 2160
+    PROTO_OA_SYMBOL_CATEGORY_RES = 2161
+    PROTO_OA_ACCOUNT_LOGOUT_REQ = 2162
+    PROTO_OA_ACCOUNT_LOGOUT_RES = 2163
+    PROTO_OA_ACCOUNT_DISCONNECT_EVENT = 2164
+    PROTO_OA_SUBSCRIBE_LIVE_TRENDBAR_RES = 2165
+    PROTO_OA_UNSUBSCRIBE_LIVE_TRENDBAR_RES = 2166
+
+
+_ProtoOAPayloadType = _lookup(ProtoOAPayloadType)
+
+
+class ProtoOAClientPermissionScope(IntEnum):
+    SCOPE_VIEW = 0
+    SCOPE_TRADE = 1
+
+
+_ProtoOAClientPermissionScope = _lookup(ProtoOAClientPermissionScope)
+
+
+class ProtoOATradeSide(IntEnum):
+    BUY = 1
+    SELL = 2
+
+
+_ProtoOATradeSide = _lookup(ProtoOATradeSide)
+
+
+class ProtoOAOrderType(IntEnum):
+    MARKET = 1
+    LIMIT = 2
+    STOP = 3
+    STOP_LOSS_TAKE_PROFIT = 4
+    MARKET_RANGE = 5
+    STOP_LIMIT = 6
+
+
+_ProtoOAOrderType = _lookup(ProtoOAOrderType)
+
+
+class ProtoOATimeInForce(IntEnum):
+    GOOD_TILL_DATE = 1
+    GOOD_TILL_CANCEL = 2
+    IMMEDIATE_OR_CANCEL = 3
+    FILL_OR_KILL = 4
+    MARKET_ON_OPEN = 5
+
+
+_ProtoOATimeInForce = _lookup(ProtoOATimeInForce)
+
+
+class ProtoOAOrderTriggerMethod(IntEnum):
+    TRADE = 1
+    OPPOSITE = 2
+    DOUBLE_TRADE = 3
+    DOUBLE_OPPOSITE = 4
+
+
+_ProtoOAOrderTriggerMethod = _lookup(ProtoOAOrderTriggerMethod)
+
+
+class ProtoOAOrderStatus(IntEnum):
+    ORDER_STATUS_ACCEPTED = 1
+    ORDER_STATUS_FILLED = 2
+    ORDER_STATUS_REJECTED = 3
+    ORDER_STATUS_EXPIRED = 4
+    ORDER_STATUS_CANCELLED = 5
+
+
+_ProtoOAOrderStatus = _lookup(ProtoOAOrderStatus)
+
+
+class ProtoOADealStatus(IntEnum):
+    FILLED = 2
+    PARTIALLY_FILLED = 3
+    REJECTED = 4
+    INTERNALLY_REJECTED = 5
+    ERROR = 6
+    MISSED = 7
+
+
+_ProtoOADealStatus = _lookup(ProtoOADealStatus)
+
+
+class ProtoOAQuoteType(IntEnum):
+    BID = 1
+    ASK = 2
+
+
+_ProtoOAQuoteType = _lookup(ProtoOAQuoteType)
+
+
+class ProtoOATrendbarPeriod(IntEnum):
+    M1 = 1
+    M2 = 2
+    M3 = 3
+    M4 = 4
+    M5 = 5
+    M10 = 6
+    M15 = 7
+    M30 = 8
+    H1 = 9
+    H4 = 10
+    H12 = 11
+    D1 = 12
+    W1 = 13
+    MN1 = 14
+
+
+_ProtoOATrendbarPeriod = _lookup(ProtoOATrendbarPeriod)
+
+
+class ProtoOAApplicationAuthReq(Message):
+    __slots__ = (
+        "clientId",
+        "clientSecret",
+    )
+    PAYLOAD_TYPE = ProtoOAPayloadType.PROTO_OA_APPLICATION_AUTH_REQ
+
+    def __init__(
+        self,
+        clientId=None,
+        clientSecret=None,
+    ):
+        self.clientId = clientId
+        self.clientSecret = clientSecret
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "ProtoOAApplicationAuthReq":
+        self = cls.__new__(cls)
+        get = d.get
+        self.clientId = get("clientId")
+        self.clientSecret = get("clientSecret")
+        return self
+
+    def to_dict(self) -> dict:
+        d = {}
+        v = self.clientId
+        if v is not None:
+            d["clientId"] = v
+        v = self.clientSecret
+        if v is not None:
+            d["clientSecret"] = v
+        return d
+
+
+class ProtoOAApplicationAuthRes(Message):
+    __slots__ = ()
+    PAYLOAD_TYPE = ProtoOAPayloadType.PROTO_OA_APPLICATION_AUTH_RES
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "ProtoOAApplicationAuthRes":
+        self = cls.__new__(cls)
+        return self
+
+    def to_dict(self) -> dict:
+        d = {}
+        return d
+
+
+class ProtoOAVersionReq(Message):
+    __slots__ = ()
+    PAYLOAD_TYPE = ProtoOAPayloadType.PROTO_OA_VERSION_REQ
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "ProtoOAVersionReq":
+        self = cls.__new__(cls)
+        return self
+
+    def to_dict(self) -> dict:
+        d = {}
+        return d
+
+
+class ProtoOAVersionRes(Message):
+    __slots__ = ("version",)
+    PAYLOAD_TYPE = ProtoOAPayloadType.PROTO_OA_VERSION_RES
+
+    def __init__(
+        self,
+        version=None,
+    ):
+        self.version = version
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "ProtoOAVersionRes":
+        self = cls.__new__(cls)
+        get = d.get
+        self.version = get("version")
+        return self
+
+    def to_dict(self) -> dict:
+        d = {}
+        v = self.version
+        if v is not None:
+            d["version"] = v
+        return d
+
+
+class ProtoOAAccountAuthReq(Message):
+    __slots__ = (
+        "ctidTraderAccountId",
+        "accessToken",
+    )
+    PAYLOAD_TYPE = ProtoOAPayloadType.PROTO_OA_ACCOUNT_AUTH_REQ
+
+    def __init__(
+        self,
+        ctidTraderAccountId=None,
+        accessToken=None,
+    ):
+        self.ctidTraderAccountId = ctidTraderAccountId
+        self.accessToken = accessToken
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "ProtoOAAccountAuthReq":
+        self = cls.__new__(cls)
+        get = d.get
+        self.ctidTraderAccountId = get("ctidTraderAccountId")
+        self.accessToken = get("accessToken")
+        return self
+
+    def to_dict(self) -> dict:
+        d = {}
+        v = self.ctidTraderAccountId
+        if v is not None:
+            d["ctidTraderAccountId"] = v
+        v = self.accessToken
+        if v is not None:
+            d["accessToken"] = v
+        return d
+
+
+class ProtoOAAccountAuthRes(Message):
+    __slots__ = ("ctidTraderAccountId",)
+    PAYLOAD_TYPE = ProtoOAPayloadType.PROTO_OA_ACCOUNT_AUTH_RES
+
+    def __init__(
+        self,
+        ctidTraderAccountId=None,
+    ):
+        self.ctidTraderAccountId = ctidTraderAccountId
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "ProtoOAAccountAuthRes":
+        self = cls.__new__(cls)
+        get = d.get
+        self.ctidTraderAccountId = get("ctidTraderAccountId")
+        return self
+
+    def to_dict(self) -> dict:
+        d = {}
+        v = self.ctidTraderAccountId
+        if v is not None:
+            d["ctidTraderAccountId"] = v
+        return d
+
+
+class ProtoOAErrorRes(Message):
+    __slots__ = (
+        "ctidTraderAccountId",
+        "errorCode",
+        "description",
+        "maintenanceEndTimestamp",
+        "retryAfter",
+    )
+    PAYLOAD_TYPE = ProtoOAPayloadType.PROTO_OA_ERROR_RES
+
+    def __init__(
+        self,
+        ctidTraderAccountId=None,
+        errorCode=None,
+        description=None,
+        maintenanceEndTimestamp=None,
+        retryAfter=None,
+    ):
+        self.ctidTraderAccountId = ctidTraderAccountId
+        self.errorCode = errorCode
+        self.description = description
+        self.maintenanceEndTimestamp = maintenanceEndTimestamp
+        self.retryAfter = retryAfter
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "ProtoOAErrorRes":
+        self = cls.__new__(cls)
+        get = d.get
+        self.ctidTraderAccountId = get("ctidTraderAccountId")
+        self.errorCode = get("errorCode")
+        self.description = get("description")
+        self.maintenanceEndTimestamp = get("maintenanceEndTimestamp")
+        self.retryAfter = get("retryAfter")
+        return self
+
+    def to_dict(self) -> dict:
+        d = {}
+        v = self.ctidTraderAccountId
+        if v is not None:
+            d["ctidTraderAccountId"] = v
+        v = self.errorCode
+        if v is not None:
+            d["errorCode"] = v
+        v = self.description
+        if v is not None:
+            d["description"] = v
+        v = self.maintenanceEndTimestamp
+        if v is not None:
+            d["maintenanceEndTimestamp"] = v
+        v = self.retryAfter
+        if v is not None:
+            d["retryAfter"] = v
+        return d
+
+
+class ProtoOANewOrderReq(Message):
+    __slots__ = (
+        "ctidTraderAccountId",
+        "symbolId",
+        "orderType",
+        "tradeSide",
+        "volume",
+        "limitPrice",
+        "stopPrice",
+        "timeInForce",
+        "expirationTimestamp",
+        "stopLoss",
+        "takeProfit",
+        "comment",
+        "baseSlippagePrice",
+        "slippageInPoints",
+        "label",
+        "positionId",
+        "clientOrderId",
+        "relativeStopLoss",
+        "relativeTakeProfit",
+        "guaranteedStopLoss",
+        "trailingStopLoss",
+        "stopTriggerMethod",
+    )
+    PAYLOAD_TYPE = ProtoOAPayloadType.PROTO_OA_NEW_ORDER_REQ
+
+    def __init__(
+        self,
+        ctidTraderAccountId=None,
+        symbolId=None,
+        orderType=None,
+        tradeSide=None,
+        volume=None,
+        limitPrice=None,
+        stopPrice=None,
+        timeInForce=None,
+        expirationTimestamp=None,
+        stopLoss=None,
+        takeProfit=None,
+        comment=None,
+        baseSlippagePrice=None,
+        slippageInPoints=None,
+        label=None,
+        positionId=None,
+        clientOrderId=None,
+        relativeStopLoss=None,
+        relativeTakeProfit=None,
+        guaranteedStopLoss=None,
+        trailingStopLoss=None,
+        stopTriggerMethod=None,
+    ):
+        self.ctidTraderAccountId = ctidTraderAccountId
+        self.symbolId = symbolId
+        self.orderType = orderType
+        self.tradeSide = tradeSide
+        self.volume = volume
+        self.limitPrice = limitPrice
+        self.stopPrice = stopPrice
+        self.timeInForce = timeInForce
+        self.expirationTimestamp = expirationTimestamp
+        self.stopLoss = stopLoss
+        self.takeProfit = takeProfit
+        self.comment = comment
+        self.baseSlippagePrice = baseSlippagePrice
+        self.slippageInPoints = slippageInPoints
+        self.label = label
+        self.positionId = positionId
+        self.clientOrderId = clientOrderId
+        self.relativeStopLoss = relativeStopLoss
+        self.relativeTakeProfit = relativeTakeProfit
+        self.guaranteedStopLoss = guaranteedStopLoss
+        self.trailingStopLoss = trailingStopLoss
+        self.stopTriggerMethod = stopTriggerMethod
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "ProtoOANewOrderReq":
+        self = cls.__new__(cls)
+        get = d.get
+        self.ctidTraderAccountId = get("ctidTraderAccountId")
+        self.symbolId = get("symbolId")
+        v = get("orderType")
+        self.orderType = _ProtoOAOrderType.get(v, v)
+        v = get("tradeSide")
+        self.tradeSide = _ProtoOATradeSide.get(v, v)
+        self.volume = get("volume")
+        self.limitPrice = get("limitPrice")
+        self.stopPrice = get("stopPrice")
+        v = get("timeInForce")
+        self.timeInForce = _ProtoOATimeInForce.get(v, v)
+        self.expirationTimestamp = get("expirationTimestamp")
+        self.stopLoss = get("stopLoss")
+        self.takeProfit = get("takeProfit")
+        self.comment = get("comment")
+        self.baseSlippagePrice = get("baseSlippagePrice")
+        self.slippageInPoints = get("slippageInPoints")
+        self.label = get("label")
+        self.positionId = get("positionId")
+        self.clientOrderId = get("clientOrderId")
+        self.relativeStopLoss = get("relativeStopLoss")
+        self.relativeTakeProfit = get("relativeTakeProfit")
+        self.guaranteedStopLoss = get("guaranteedStopLoss")
+        self.trailingStopLoss = get("trailingStopLoss")
+        v = get("stopTriggerMethod")
+        self.stopTriggerMethod = _ProtoOAOrderTriggerMethod.get(v, v)
+        return self
+
+    def to_dict(self) -> dict:
+        d = {}
+        v = self.ctidTraderAccountId
+        if v is not None:
+            d["ctidTraderAccountId"] = v
+        v = self.symbolId
+        if v is not None:
+            d["symbolId"] = v
+        v = self.orderType
+        if v is not None:
+            d["orderType"] = v.name if isinstance(v, IntEnum) else v
+        v = self.tradeSide
+        if v is not None:
+            d["tradeSide"] = v.name if isinstance(v, IntEnum) else v
+        v = self.volume
+        if v is not None:
+            d["volume"] = v
+        v = self.limitPrice
+        if v is not None:
+            d["limitPrice"] = v
+        v = self.stopPrice
+        if v is not None:
+            d["stopPrice"] = v
+        v = self.timeInForce
+        if v is not None:
+            d["timeInForce"] = v.name if isinstance(v, IntEnum) else v
+        v = self.expirationTimestamp
+        if v is not None:
+            d["expirationTimestamp"] = v
+        v = self.stopLoss
+        if v is not None:
+            d["stopLoss"] = v
+        v = self.takeProfit
+        if v is not None:
+            d["takeProfit"] = v
+        v = self.comment
+        if v is not None:
+            d["comment"] = v
+        v = self.baseSlippagePrice
+        if v is not None:
+            d["baseSlippagePrice"] = v
+        v = self.slippageInPoints
+        if v is not None:
+            d["slippageInPoints"] = v
+        v = self.label
+        if v is not None:
+            d["label"] = v
+        v = self.positionId
+        if v is not None:
+            d["positionId"] = v
+        v = self.clientOrderId
+        if v is not None:
+            d["clientOrderId"] = v
+        v = self.relativeStopLoss
+        if v is not None:
+            d["relativeStopLoss"] = v
+        v = self.relativeTakeProfit
+        if v is not None:
+            d["relativeTakeProfit"] = v
+        v = self.guaranteedStopLoss
+        if v is not None:
+            d["guaranteedStopLoss"] = v
+        v = self.trailingStopLoss
+        if v is not None:
+            d["trailingStopLoss"] = v
+        v = self.stopTriggerMethod
+        if v is not None:
+            d["stopTriggerMethod"] = v.name if isinstance(v, IntEnum) else v
+        return d
+
+
+class ProtoOAExecutionEvent(Message):
+    __slots__ = (
+        "ctidTraderAccountId",
+        "executionType",
+        "position",
+        "order",
+        "deal",
+        "bonusDepositWithdraw",
+        "depositWithdraw",
+        "errorCode",
+        "isServerEvent",
+    )
+    PAYLOAD_TYPE = ProtoOAPayloadType.PROTO_OA_EXECUTION_EVENT
+
+    def __init__(
+        self,
+        ctidTraderAccountId=None,
+        executionType=None,
+        position=None,
+        order=None,
+        deal=None,
+        bonusDepositWithdraw=None,
+        depositWithdraw=None,
+        errorCode=None,
+        isServerEvent=None,
+    ):
+        self.ctidTraderAccountId = ctidTraderAccountId
+        self.executionType = executionType
+        self.position = position
+        self.order = order
+        self.deal = deal
+        self.bonusDepositWithdraw = bonusDepositWithdraw
+        self.depositWithdraw = depositWithdraw
+        self.errorCode = errorCode
+        self.isServerEvent = isServerEvent
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "ProtoOAExecutionEvent":
+        self = cls.__new__(cls)
+        get = d.get
+        self.ctidTraderAccountId = get("ctidTraderAccountId")
+        v = get("executionType")
+        self.executionType = _ProtoOAExecutionType.get(v, v)
+        v = get("position")
+        if v is not None:
+            v = ProtoOAPosition.from_dict(v)
+        self.position = v
+        v = get("order")
+        if v is not None:
+            v = ProtoOAOrder.from_dict(v)
+        self.order = v
+        v = get("deal")
+        if v is not None:
+            v = ProtoOADeal.from_dict(v)
+        self.deal = v
+        v = get("bonusDepositWithdraw")
+        if v is not None:
+            v = ProtoOABonusDepositWithdraw.from_dict(v)
+        self.bonusDepositWithdraw = v
+        v = get("depositWithdraw")
+        if v is not None:
+            v = ProtoOADepositWithdraw.from_dict(v)
+        self.depositWithdraw = v
+        self.errorCode = get("errorCode")
+        self.isServerEvent = get("isServerEvent")
+        return self
+
+    def to_dict(self) -> dict:
+        d = {}
+        v = self.ctidTraderAccountId
+        if v is not None:
+            d["ctidTraderAccountId"] = v
+        v = self.executionType
+        if v is not None:
+            d["executionType"] = v.name if isinstance(v, IntEnum) else v
+        v = self.position
+        if v is not None:
+            d["position"] = v.to_dict()
+        v = self.order
+        if v is not None:
+            d["order"] = v.to_dict()
+        v = self.deal
+        if v is not None:
+            d["deal"] = v.to_dict()
+        v = self.bonusDepositWithdraw
+        if v is not None:
+            d["bonusDepositWithdraw"] = v.to_dict()
+        v = self.depositWithdraw
+        if v is not None:
+            d["depositWithdraw"] = v.to_dict()
+        v = self.errorCode
+        if v is not None:
+            d["errorCode"] = v
+        v = self.isServerEvent
+        if v is not None:
+            d["isServerEvent"] = v
+        return d
+
+
+class ProtoOAAmendPositionSLTPReq(Message):
+    __slots__ = (
+        "ctidTraderAccountId",
+        "positionId",
+        "stopLoss",
+        "takeProfit",
+        "guaranteedStopLoss",
+        "trailingStopLoss",
+        "stopLossTriggerMethod",
+    )
+    PAYLOAD_TYPE = ProtoOAPayloadType.PROTO_OA_AMEND_POSITION_SLTP_REQ
+
+    def __init__(
+        self,
+        ctidTraderAccountId=None,
+        positionId=None,
+        stopLoss=None,
+        takeProfit=None,
+        guaranteedStopLoss=None,
+        trailingStopLoss=None,
+        stopLossTriggerMethod=None,
+    ):
+        self.ctidTraderAccountId = ctidTraderAccountId
+        self.positionId = positionId
+        self.stopLoss = stopLoss
+        self.takeProfit = takeProfit
+        self.guaranteedStopLoss = guaranteedStopLoss
+        self.trailingStopLoss = trailingStopLoss
+        self.stopLossTriggerMethod = stopLossTriggerMethod
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "ProtoOAAmendPositionSLTPReq":
+        self = cls.__new__(cls)
+        get = d.get
+        self.ctidTraderAccountId = get("ctidTraderAccountId")
+        self.positionId = get("positionId")
+        self.stopLoss = get("stopLoss")
+        self.takeProfit = get("takeProfit")
+        self.guaranteedStopLoss = get("guaranteedStopLoss")
+        self.trailingStopLoss = get("trailingStopLoss")
+        v = get("stopLossTriggerMethod")
+        self.stopLossTriggerMethod = _ProtoOAOrderTriggerMethod.get(v, v)
+        return self
+
+    def to_dict(self) -> dict:
+        d = {}
+        v = self.ctidTraderAccountId
+        if v is not None:
+            d["ctidTraderAccountId"] = v
+        v = self.positionId
+        if v is not None:
+            d["positionId"] = v
+        v = self.stopLoss
+        if v is not None:
+            d["stopLoss"] = v
+        v = self.takeProfit
+        if v is not None:
+            d["takeProfit"] = v
+        v = self.guaranteedStopLoss
+        if v is not None:
+            d["guaranteedStopLoss"] = v
+        v = self.trailingStopLoss
+        if v is not None:
+            d["trailingStopLoss"] = v
+        v = self.stopLossTriggerMethod
+        if v is not None:
+            d["stopLossTriggerMethod"] = v.name if isinstance(v, IntEnum) else v
+        return d
+
+
+class ProtoOAOrderErrorEvent(Message):
+    __slots__ = (
+        "ctidTraderAccountId",
+        "errorCode",
+        "orderId",
+        "positionId",
+        "description",
+    )
+    PAYLOAD_TYPE = ProtoOAPayloadType.PROTO_OA_ORDER_ERROR_EVENT
+
+    def __init__(
+        self,
+        ctidTraderAccountId=None,
+        errorCode=None,
+        orderId=None,
+        positionId=None,
+        description=None,
+    ):
+        self.ctidTraderAccountId = ctidTraderAccountId
+        self.errorCode = errorCode
+        self.orderId = orderId
+        self.positionId = positionId
+        self.description = description
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "ProtoOAOrderErrorEvent":
+        self = cls.__new__(cls)
+        get = d.get
+        self.ctidTraderAccountId = get("ctidTraderAccountId")
+        self.errorCode = get("errorCode")
+        self.orderId = get("orderId")
+        self.positionId = get("positionId")
+        self.description = get("description")
+        return self
+
+    def to_dict(self) -> dict:
+        d = {}
+        v = self.ctidTraderAccountId
+        if v is not None:
+            d["ctidTraderAccountId"] = v
+        v = self.errorCode
+        if v is not None:
+            d["errorCode"] = v
+        v = self.orderId
+        if v is not None:
+            d["orderId"] = v
+        v = self.positionId
+        if v is not None:
+            d["positionId"] = v
+        v = self.description
+        if v is not None:
+            d["description"] = v
+        return d
+
+
+class ProtoOAClosePositionReq(Message):
+    __slots__ = (
+        "ctidTraderAccountId",
+        "positionId",
+        "volume",
+    )
+    PAYLOAD_TYPE = ProtoOAPayloadType.PROTO_OA_CLOSE_POSITION_REQ
+
+    def __init__(
+        self,
+        ctidTraderAccountId=None,
+        positionId=None,
+        volume=None,
+    ):
+        self.ctidTraderAccountId = ctidTraderAccountId
+        self.positionId = positionId
+        self.volume = volume
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "ProtoOAClosePositionReq":
+        self = cls.__new__(cls)
+        get = d.get
+        self.ctidTraderAccountId = get("ctidTraderAccountId")
+        self.positionId = get("positionId")
+        self.volume = get("volume")
+        return self
+
+    def to_dict(self) -> dict:
+        d = {}
+        v = self.ctidTraderAccountId
+        if v is not None:
+            d["ctidTraderAccountId"] = v
+        v = self.positionId
+        if v is not None:
+            d["positionId"] = v
+        v = self.volume
+        if v is not None:
+            d["volume"] = v
+        return d
+
+
+class ProtoOAGetAccountListByAccessTokenRes(Message):
+    __slots__ = (
+        "accessToken",
+        "permissionScope",
+        "ctidTraderAccount",
+    )
+    PAYLOAD_TYPE = ProtoOAPayloadType.PROTO_OA_GET_ACCOUNTS_BY_ACCESS_TOKEN_RES
+
+    def __init__(
+        self,
+        accessToken=None,
+        permissionScope=None,
+        ctidTraderAccount=None,
+    ):
+        self.accessToken = accessToken
+        self.permissionScope = permissionScope
+        self.ctidTraderAccount = [] if ctidTraderAccount is None else ctidTraderAccount
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "ProtoOAGetAccountListByAccessTokenRes":
+        self = cls.__new__(cls)
+        get = d.get
+        self.accessToken = get("accessToken")
+        v = get("permissionScope")
+        self.permissionScope = _ProtoOAClientPermissionScope.get(v, v)
+        v = get("ctidTraderAccount")
+        self.ctidTraderAccount = (
+            [ProtoOACtidTraderAccount.from_dict(i) for i in v] if v else []
+        )
+        return self
+
+    def to_dict(self) -> dict:
+        d = {}
+        v = self.accessToken
+        if v is not None:
+            d["accessToken"] = v
+        v = self.permissionScope
+        if v is not None:
+            d["permissionScope"] = v.name if isinstance(v, IntEnum) else v
+        if self.ctidTraderAccount:
+            d["ctidTraderAccount"] = [i.to_dict() for i in self.ctidTraderAccount]
+        return d
+
+
+class ProtoOAGetAccountListByAccessTokenReq(Message):
+    __slots__ = ("accessToken",)
+    PAYLOAD_TYPE = ProtoOAPayloadType.PROTO_OA_GET_ACCOUNTS_BY_ACCESS_TOKEN_REQ
+
+    def __init__(
+        self,
+        accessToken=None,
+    ):
+        self.accessToken = accessToken
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "ProtoOAGetAccountListByAccessTokenReq":
+        self = cls.__new__(cls)
+        get = d.get
+        self.accessToken = get("accessToken")
+        return self
+
+    def to_dict(self) -> dict:
+        d = {}
+        v = self.accessToken
+        if v is not None:
+            d["accessToken"] = v
+        return d
+
+
+class ProtoOASymbolsListReq(Message):
+    __slots__ = (
+        "ctidTraderAccountId",
+        "includeArchivedSymbols",
+    )
+    PAYLOAD_TYPE = ProtoOAPayloadType.PROTO_OA_SYMBOLS_LIST_REQ
+
+    def __init__(
+        self,
+        ctidTraderAccountId=None,
+        includeArchivedSymbols=None,
+    ):
+        self.ctidTraderAccountId = ctidTraderAccountId
+        self.includeArchivedSymbols = includeArchivedSymbols
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "ProtoOASymbolsListReq":
+        self = cls.__new__(cls)
+        get = d.get
+        self.ctidTraderAccountId = get("ctidTraderAccountId")
+        self.includeArchivedSymbols = get("includeArchivedSymbols")
+        return self
+
+    def to_dict(self) -> dict:
+        d = {}
+        v = self.ctidTraderAccountId
+        if v is not None:
+            d["ctidTraderAccountId"] = v
+        v = self.includeArchivedSymbols
+        if v is not None:
+            d["includeArchivedSymbols"] = v
+        return d
+
+
+class ProtoOASymbolsListRes(Message):
+    __slots__ = (
+        "ctidTraderAccountId",
+        "symbol",
+        "archivedSymbol",
+    )
+    PAYLOAD_TYPE = ProtoOAPayloadType.PROTO_OA_SYMBOLS_LIST_RES
+
+    def __init__(
+        self,
+        ctidTraderAccountId=None,
+        symbol=None,
+        archivedSymbol=None,
+    ):
+        self.ctidTraderAccountId = ctidTraderAccountId
+        self.symbol = [] if symbol is None else symbol
+        self.archivedSymbol = [] if archivedSymbol is None else archivedSymbol
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "ProtoOASymbolsListRes":
+        self = cls.__new__(cls)
+        get = d.get
+        self.ctidTraderAccountId = get("ctidTraderAccountId")
+        v = get("symbol")
+        self.symbol = [ProtoOALightSymbol.from_dict(i) for i in v] if v else []
+        v = get("archivedSymbol")
+        self.archivedSymbol = (
+            [ProtoOAArchivedSymbol.from_dict(i) for i in v] if v else []
+        )
+        return self
+
+    def to_dict(self) -> dict:
+        d = {}
+        v = self.ctidTraderAccountId
+        if v is not None:
+            d["ctidTraderAccountId"] = v
+        if self.symbol:
+            d["symbol"] = [i.to_dict() for i in self.symbol]
+        if self.archivedSymbol:
+            d["archivedSymbol"] = [i.to_dict() for i in self.archivedSymbol]
+        return d
+
+
+class ProtoOADeal(Message):
+    __slots__ = (
+        "dealId",
+        "orderId",
+        "positionId",
+        "volume",
+        "filledVolume",
+        "symbolId",
+        "createTimestamp",
+        "executionTimestamp",
+        "utcLastUpdateTimestamp",
+        "executionPrice",
+        "tradeSide",
+        "dealStatus",
+        "marginRate",
+        "commission",
+        "baseToUsdConversionRate",
+        "closePositionDetail",
+        "moneyDigits",
+    )
+
+    def __init__(
+        self,
+        dealId=None,
+        orderId=None,
+        positionId=None,
+        volume=None,
+        filledVolume=None,
+        symbolId=None,
+        createTimestamp=None,
+        executionTimestamp=None,
+        utcLastUpdateTimestamp=None,
+        executionPrice=None,
+        tradeSide=None,
+        dealStatus=None,
+        marginRate=None,
+        commission=None,
+        baseToUsdConversionRate=None,
+        closePositionDetail=None,
+        moneyDigits=None,
+    ):
+        self.dealId = dealId
+        self.orderId = orderId
+        self.positionId = positionId
+        self.volume = volume
+        self.filledVolume = filledVolume
+        self.symbolId = symbolId
+        self.createTimestamp = createTimestamp
+        self.executionTimestamp = executionTimestamp
+        self.utcLastUpdateTimestamp = utcLastUpdateTimestamp
+        self.executionPrice = executionPrice
+        self.tradeSide = tradeSide
+        self.dealStatus = dealStatus
+        self.marginRate = marginRate
+        self.commission = commission
+        self.baseToUsdConversionRate = baseToUsdConversionRate
+        self.closePositionDetail = closePositionDetail
+        self.moneyDigits = moneyDigits
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "ProtoOADeal":
+        self = cls.__new__(cls)
+        get = d.get
+        self.dealId = get("dealId")
+        self.orderId = get("orderId")
+        self.positionId = get("positionId")
+        self.volume = get("volume")
+        self.filledVolume = get("filledVolume")
+        self.symbolId = get("symbolId")
+        self.createTimestamp = get("createTimestamp")
+        self.executionTimestamp = get("executionTimestamp")
+        self.utcLastUpdateTimestamp = get("utcLastUpdateTimestamp")
+        self.executionPrice = get("executionPrice")
+        v = get("tradeSide")
+        self.tradeSide = _ProtoOATradeSide.get(v, v)
+        v = get("dealStatus")
+        self.dealStatus = _ProtoOADealStatus.get(v, v)
+        self.marginRate = get("marginRate")
+        self.commission = get("commission")
+        self.baseToUsdConversionRate = get("baseToUsdConversionRate")
+        v = get("closePositionDetail")
+        if v is not None:
+            v = ProtoOAClosePositionDetail.from_dict(v)
+        self.closePositionDetail = v
+        self.moneyDigits = get("moneyDigits")
+        return self
+
+    def to_dict(self) -> dict:
+        d = {}
+        v = self.dealId
+        if v is not None:
+            d["dealId"] = v
+        v = self.orderId
+        if v is not None:
+            d["orderId"] = v
+        v = self.positionId
+        if v is not None:
+            d["positionId"] = v
+        v = self.volume
+        if v is not None:
+            d["volume"] = v
+        v = self.filledVolume
+        if v is not None:
+            d["filledVolume"] = v
+        v = self.symbolId
+        if v is not None:
+            d["symbolId"] = v
+        v = self.createTimestamp
+        if v is not None:
+            d["createTimestamp"] = v
+        v = self.executionTimestamp
+        if v is not None:
+            d["executionTimestamp"] = v
+        v = self.utcLastUpdateTimestamp
+        if v is not None:
+            d["utcLastUpdateTimestamp"] = v
+        v = self.executionPrice
+        if v is not None:
+            d["executionPrice"] = v
+        v = self.tradeSide
+        if v is not None:
+            d["tradeSide"] = v.name if isinstance(v, IntEnum) else v
+        v = self.dealStatus
+        if v is not None:
+            d["dealStatus"] = v.name if isinstance(v, IntEnum) else v
+        v = self.marginRate
+        if v is not None:
+            d["marginRate"] = v
+        v = self.commission
+        if v is not None:
+            d["commission"] = v
+        v = self.baseToUsdConversionRate
+        if v is not None:
+            d["baseToUsdConversionRate"] = v
+        v = self.closePositionDetail
+        if v is not None:
+            d["closePositionDetail"] = v.to_dict()
+        v = self.moneyDigits
+        if v is not None:
+            d["moneyDigits"] = v
+        return d
+
+
+class ProtoOAPosition(Message):
+    __slots__ = (
+        "positionId",
+        "tradeData",
+        "positionStatus",
+        "swap",
+        "price",
+        "stopLoss",
+        "takeProfit",
+        "utcLastUpdateTimestamp",
+        "commission",
+        "marginRate",
+        "mirroringCommission",
+        "guaranteedStopLoss",
+        "usedMargin",
+        "stopLossTriggerMethod",
+        "moneyDigits",
+        "trailingStopLoss",
+    )
+
+    def __init__(
+        self,
+        positionId=None,
+        tradeData=None,
+        positionStatus=None,
+        swap=None,
+        price=None,
+        stopLoss=None,
+        takeProfit=None,
+        utcLastUpdateTimestamp=None,
+        commission=None,
+        marginRate=None,
+        mirroringCommission=None,
+        guaranteedStopLoss=None,
+        usedMargin=None,
+        stopLossTriggerMethod=None,
+        moneyDigits=None,
+        trailingStopLoss=None,
+    ):
+        self.positionId = positionId
+        self.tradeData = tradeData
+        self.positionStatus = positionStatus
+        self.swap = swap
+        self.price = price
+        self.stopLoss = stopLoss
+        self.takeProfit = takeProfit
+        self.utcLastUpdateTimestamp = utcLastUpdateTimestamp
+        self.commission = commission
+        self.marginRate = marginRate
+        self.mirroringCommission = mirroringCommission
+        self.guaranteedStopLoss = guaranteedStopLoss
+        self.usedMargin = usedMargin
+        self.stopLossTriggerMethod = stopLossTriggerMethod
+        self.moneyDigits = moneyDigits
+        self.trailingStopLoss = trailingStopLoss
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "ProtoOAPosition":
+        self = cls.__new__(cls)
+        get = d.get
+        self.positionId = get("positionId")
+        v = get("tradeData")
+        if v is not None:
+            v = ProtoOATradeData.from_dict(v)
+        self.tradeData = v
+        v = get("positionStatus")
+        self.positionStatus = _ProtoOAPositionStatus.get(v, v)
+        self.swap = get("swap")
+        self.price = get("price")
+        self.stopLoss = get("stopLoss")
+        self.takeProfit = get("takeProfit")
+        self.utcLastUpdateTimestamp = get("utcLastUpdateTimestamp")
+        self.commission = get("commission")
+        self.marginRate = get("marginRate")
+        self.mirroringCommission = get("mirroringCommission")
+        self.guaranteedStopLoss = get("guaranteedStopLoss")
+        self.usedMargin = get("usedMargin")
+        v = get("stopLossTriggerMethod")
+        self.stopLossTriggerMethod = _ProtoOAOrderTriggerMethod.get(v, v)
+        self.moneyDigits = get("moneyDigits")
+        self.trailingStopLoss = get("trailingStopLoss")
+        return self
+
+    def to_dict(self) -> dict:
+        d = {}
+        v = self.positionId
+        if v is not None:
+            d["positionId"] = v
+        v = self.tradeData
+        if v is not None:
+            d["tradeData"] = v.to_dict()
+        v = self.positionStatus
+        if v is not None:
+            d["positionStatus"] = v.name if isinstance(v, IntEnum) else v
+        v = self.swap
+        if v is not None:
+            d["swap"] = v
+        v = self.price
+        if v is not None:
+            d["price"] = v
+        v = self.stopLoss
+        if v is not None:
+            d["stopLoss"] = v
+        v = self.takeProfit
+        if v is not None:
+            d["takeProfit"] = v
+        v = self.utcLastUpdateTimestamp
+        if v is not None:
+            d["utcLastUpdateTimestamp"] = v
+        v = self.commission
+        if v is not None:
+            d["commission"] = v
+        v = self.marginRate
+        if v is not None:
+            d["marginRate"] = v
+        v = self.mirroringCommission
+        if v is not None:
+            d["mirroringCommission"] = v
+        v = self.guaranteedStopLoss
+        if v is not None:
+            d["guaranteedStopLoss"] = v
+        v = self.usedMargin
+        if v is not None:
+            d["usedMargin"] = v
+        v = self.stopLossTriggerMethod
+        if v is not None:
+            d["stopLossTriggerMethod"] = v.name if isinstance(v, IntEnum) else v
+        v = self.moneyDigits
+        if v is not None:
+            d["moneyDigits"] = v
+        v = self.trailingStopLoss
+        if v is not None:
+            d["trailingStopLoss"] = v
+        return d
+
+
+class ProtoOASpotEvent(Message):
+    __slots__ = (
+        "ctidTraderAccountId",
+        "symbolId",
+        "bid",
+        "ask",
+        "trendbar",
+        "sessionClose",
+        "timestamp",
+    )
+    PAYLOAD_TYPE = ProtoOAPayloadType.PROTO_OA_SPOT_EVENT
+
+    def __init__(
+        self,
+        ctidTraderAccountId=None,
+        symbolId=None,
+        bid=None,
+        ask=None,
+        trendbar=None,
+        sessionClose=None,
+        timestamp=None,
+    ):
+        self.ctidTraderAccountId = ctidTraderAccountId
+        self.symbolId = symbolId
+        self.bid = bid
+        self.ask = ask
+        self.trendbar = [] if trendbar is None else trendbar
+        self.sessionClose = sessionClose
+        self.timestamp = timestamp
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "ProtoOASpotEvent":
+        self = cls.__new__(cls)
+        get = d.get
+        self.ctidTraderAccountId = get("ctidTraderAccountId")
+        self.symbolId = get("symbolId")
+        self.bid = get("bid")
+        self.ask = get("ask")
+        v = get("trendbar")
+        self.trendbar = [ProtoOATrendbar.from_dict(i) for i in v] if v else []
+        self.sessionClose = get("sessionClose")
+        self.timestamp = get("timestamp")
+        return self
+
+    def to_dict(self) -> dict:
+        d = {}
+        v = self.ctidTraderAccountId
+        if v is not None:
+            d["ctidTraderAccountId"] = v
+        v = self.symbolId
+        if v is not None:
+            d["symbolId"] = v
+        v = self.bid
+        if v is not None:
+            d["bid"] = v
+        v = self.ask
+        if v is not None:
+            d["ask"] = v
+        if self.trendbar:
+            d["trendbar"] = [i.to_dict() for i in self.trendbar]
+        v = self.sessionClose
+        if v is not None:
+            d["sessionClose"] = v
+        v = self.timestamp
+        if v is not None:
+            d["timestamp"] = v
+        return d
+
+
+class ProtoOASubscribeSpotsReq(Message):
+    __slots__ = (
+        "ctidTraderAccountId",
+        "symbolId",
+        "subscribeToSpotTimestamp",
+    )
+    PAYLOAD_TYPE = ProtoOAPayloadType.PROTO_OA_SUBSCRIBE_SPOTS_REQ
+
+    def __init__(
+        self,
+        ctidTraderAccountId=None,
+        symbolId=None,
+        subscribeToSpotTimestamp=None,
+    ):
+        self.ctidTraderAccountId = ctidTraderAccountId
+        self.symbolId = [] if symbolId is None else symbolId
+        self.subscribeToSpotTimestamp = subscribeToSpotTimestamp
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "ProtoOASubscribeSpotsReq":
+        self = cls.__new__(cls)
+        get = d.get
+        self.ctidTraderAccountId = get("ctidTraderAccountId")
+        self.symbolId = get("symbolId") or []
+        self.subscribeToSpotTimestamp = get("subscribeToSpotTimestamp")
+        return self
+
+    def to_dict(self) -> dict:
+        d = {}
+        v = self.ctidTraderAccountId
+        if v is not None:
+            d["ctidTraderAccountId"] = v
+        if self.symbolId:
+            d["symbolId"] = list(self.symbolId)
+        v = self.subscribeToSpotTimestamp
+        if v is not None:
+            d["subscribeToSpotTimestamp"] = v
+        return d
+
+
+class ProtoOASubscribeSpotsRes(Message):
+    __slots__ = ("ctidTraderAccountId",)
+    PAYLOAD_TYPE = ProtoOAPayloadType.PROTO_OA_SUBSCRIBE_SPOTS_RES
+
+    def __init__(
+        self,
+        ctidTraderAccountId=None,
+    ):
+        self.ctidTraderAccountId = ctidTraderAccountId
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "ProtoOASubscribeSpotsRes":
+        self = cls.__new__(cls)
+        get = d.get
+        self.ctidTraderAccountId = get("ctidTraderAccountId")
+        return self
+
+    def to_dict(self) -> dict:
+        d = {}
+        v = self.ctidTraderAccountId
+        if v is not None:
+            d["ctidTraderAccountId"] = v
+        return d
+
+
+class ProtoOAUnsubscribeSpotsReq(Message):
+    __slots__ = (
+        "ctidTraderAccountId",
+        "symbolId",
+    )
+    PAYLOAD_TYPE = ProtoOAPayloadType.PROTO_OA_UNSUBSCRIBE_SPOTS_REQ
+
+    def __init__(
+        self,
+        ctidTraderAccountId=None,
+        symbolId=None,
+    ):
+        self.ctidTraderAccountId = ctidTraderAccountId
+        self.symbolId = [] if symbolId is None else symbolId
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "ProtoOAUnsubscribeSpotsReq":
+        self = cls.__new__(cls)
+        get = d.get
+        self.ctidTraderAccountId = get("ctidTraderAccountId")
+        self.symbolId = get("symbolId") or []
+        return self
+
+    def to_dict(self) -> dict:
+        d = {}
+        v = self.ctidTraderAccountId
+        if v is not None:
+            d["ctidTraderAccountId"] = v
+        if self.symbolId:
+            d["symbolId"] = list(self.symbolId)
+        return d
+
+
+class ProtoOAUnsubscribeSpotsRes(Message):
+    __slots__ = ("ctidTraderAccountId",)
+    PAYLOAD_TYPE = ProtoOAPayloadType.PROTO_OA_UNSUBSCRIBE_SPOTS_RES
+
+    def __init__(
+        self,
+        ctidTraderAccountId=None,
+    ):
+        self.ctidTraderAccountId = ctidTraderAccountId
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "ProtoOAUnsubscribeSpotsRes":
+        self = cls.__new__(cls)
+        get = d.get
+        self.ctidTraderAccountId = get("ctidTraderAccountId")
+        return self
+
+    def to_dict(self) -> dict:
+        d = {}
+        v = self.ctidTraderAccountId
+        if v is not None:
+            d["ctidTraderAccountId"] = v
+        return d
+
+
+class ProtoOASymbolByIdReq(Message):
+    __slots__ = (
+        "ctidTraderAccountId",
+        "symbolId",
+    )
+    PAYLOAD_TYPE = ProtoOAPayloadType.PROTO_OA_SYMBOL_BY_ID_REQ
+
+    def __init__(
+        self,
+        ctidTraderAccountId=None,
+        symbolId=None,
+    ):
+        self.ctidTraderAccountId = ctidTraderAccountId
+        self.symbolId = [] if symbolId is None else symbolId
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "ProtoOASymbolByIdReq":
+        self = cls.__new__(cls)
+        get = d.get
+        self.ctidTraderAccountId = get("ctidTraderAccountId")
+        self.symbolId = get("symbolId") or []
+        return self
+
+    def to_dict(self) -> dict:
+        d = {}
+        v = self.ctidTraderAccountId
+        if v is not None:
+            d["ctidTraderAccountId"] = v
+        if self.symbolId:
+            d["symbolId"] = list(self.symbolId)
+        return d
+
+
+class ProtoOASymbolByIdRes(Message):
+    __slots__ = (
+        "ctidTraderAccountId",
+        "symbol",
+        "archivedSymbol",
+    )
+    PAYLOAD_TYPE = ProtoOAPayloadType.PROTO_OA_SYMBOL_BY_ID_RES
+
+    def __init__(
+        self,
+        ctidTraderAccountId=None,
+        symbol=None,
+        archivedSymbol=None,
+    ):
+        self.ctidTraderAccountId = ctidTraderAccountId
+        self.symbol = [] if symbol is None else symbol
+        self.archivedSymbol = [] if archivedSymbol is None else archivedSymbol
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "ProtoOASymbolByIdRes":
+        self = cls.__new__(cls)
+        get = d.get
+        self.ctidTraderAccountId = get("ctidTraderAccountId")
+        v = get("symbol")
+        self.symbol = [ProtoOASymbol.from_dict(i) for i in v] if v else []
+        v = get("archivedSymbol")
+        self.archivedSymbol = (
+            [ProtoOAArchivedSymbol.from_dict(i) for i in v] if v else []
+        )
+        return self
+
+    def to_dict(self) -> dict:
+        d = {}
+        v = self.ctidTraderAccountId
+        if v is not None:
+            d["ctidTraderAccountId"] = v
+        if self.symbol:
+            d["symbol"] = [i.to_dict() for i in self.symbol]
+        if self.archivedSymbol:
+            d["archivedSymbol"] = [i.to_dict() for i in self.archivedSymbol]
+        return d
+
+
+class ProtoOAGetTrendbarsReq(Message):
+    __slots__ = (
+        "ctidTraderAccountId",
+        "fromTimestamp",
+        "toTimestamp",
+        "period",
+        "symbolId",
+        "count",
+    )
+    PAYLOAD_TYPE = ProtoOAPayloadType.PROTO_OA_GET_TRENDBARS_REQ
+
+    def __init__(
+        self,
+        ctidTraderAccountId=None,
+        fromTimestamp=None,
+        toTimestamp=None,
+        period=None,
+        symbolId=None,
+        count=None,
+    ):
+        self.ctidTraderAccountId = ctidTraderAccountId
+        self.fromTimestamp = fromTimestamp
+        self.toTimestamp = toTimestamp
+        self.period = period
+        self.symbolId = symbolId
+        self.count = count
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "ProtoOAGetTrendbarsReq":
+        self = cls.__new__(cls)
+        get = d.get
+        self.ctidTraderAccountId = get("ctidTraderAccountId")
+        self.fromTimestamp = get("fromTimestamp")
+        self.toTimestamp = get("toTimestamp")
+        v = get("period")
+        self.period = _ProtoOATrendbarPeriod.get(v, v)
+        self.symbolId = get("symbolId")
+        self.count = get("count")
+        return self
+
+    def to_dict(self) -> dict:
+        d = {}
+        v = self.ctidTraderAccountId
+        if v is not None:
+            d["ctidTraderAccountId"] = v
+        v = self.fromTimestamp
+        if v is not None:
+            d["fromTimestamp"] = v
+        v = self.toTimestamp
+        if v is not None:
+            d["toTimestamp"] = v
+        v = self.period
+        if v is not None:
+            d["period"] = v.name if isinstance(v, IntEnum) else v
+        v = self.symbolId
+        if v is not None:
+            d["symbolId"] = v
+        v = self.count
+        if v is not None:
+            d["count"] = v
+        return d
+
+
+class ProtoOAGetTrendbarsRes(Message):
+    __slots__ = (
+        "ctidTraderAccountId",
+        "period",
+        "timestamp",
+        "trendbar",
+        "symbolId",
+        "hasMore",
+    )
+    PAYLOAD_TYPE = ProtoOAPayloadType.PROTO_OA_GET_TRENDBARS_RES
+
+    def __init__(
+        self,
+        ctidTraderAccountId=None,
+        period=None,
+        timestamp=None,
+        trendbar=None,
+        symbolId=None,
+        hasMore=None,
+    ):
+        self.ctidTraderAccountId = ctidTraderAccountId
+        self.period = period
+        self.timestamp = timestamp
+        self.trendbar = [] if trendbar is None else trendbar
+        self.symbolId = symbolId
+        self.hasMore = hasMore
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "ProtoOAGetTrendbarsRes":
+        self = cls.__new__(cls)
+        get = d.get
+        self.ctidTraderAccountId = get("ctidTraderAccountId")
+        v = get("period")
+        self.period = _ProtoOATrendbarPeriod.get(v, v)
+        self.timestamp = get("timestamp")
+        v = get("trendbar")
+        self.trendbar = [ProtoOATrendbar.from_dict(i) for i in v] if v else []
+        self.symbolId = get("symbolId")
+        self.hasMore = get("hasMore")
+        return self
+
+    def to_dict(self) -> dict:
+        d = {}
+        v = self.ctidTraderAccountId
+        if v is not None:
+            d["ctidTraderAccountId"] = v
+        v = self.period
+        if v is not None:
+            d["period"] = v.name if isinstance(v, IntEnum) else v
+        v = self.timestamp
+        if v is not None:
+            d["timestamp"] = v
+        if self.trendbar:
+            d["trendbar"] = [i.to_dict() for i in self.trendbar]
+        v = self.symbolId
+        if v is not None:
+            d["symbolId"] = v
+        v = self.hasMore
+        if v is not None:
+            d["hasMore"] = v
+        return d
+
+
+class ProtoOAGetTickDataReq(Message):
+    __slots__ = (
+        "ctidTraderAccountId",
+        "symbolId",
+        "type",
+        "fromTimestamp",
+        "toTimestamp",
+    )
+    PAYLOAD_TYPE = ProtoOAPayloadType.PROTO_OA_GET_TICKDATA_REQ
+
+    def __init__(
+        self,
+        ctidTraderAccountId=None,
+        symbolId=None,
+        type=None,
+        fromTimestamp=None,
+        toTimestamp=None,
+    ):
+        self.ctidTraderAccountId = ctidTraderAccountId
+        self.symbolId = symbolId
+        self.type = type
+        self.fromTimestamp = fromTimestamp
+        self.toTimestamp = toTimestamp
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "ProtoOAGetTickDataReq":
+        self = cls.__new__(cls)
+        get = d.get
+        self.ctidTraderAccountId = get("ctidTraderAccountId")
+        self.symbolId = get("symbolId")
+        v = get("type")
+        self.type = _ProtoOAQuoteType.get(v, v)
+        self.fromTimestamp = get("fromTimestamp")
+        self.toTimestamp = get("toTimestamp")
+        return self
+
+    def to_dict(self) -> dict:
+        d = {}
+        v = self.ctidTraderAccountId
+        if v is not None:
+            d["ctidTraderAccountId"] = v
+        v = self.symbolId
+        if v is not None:
+            d["symbolId"] = v
+        v = self.type
+        if v is not None:
+            d["type"] = v.name if isinstance(v, IntEnum) else v
+        v = self.fromTimestamp
+        if v is not None:
+            d["fromTimestamp"] = v
+        v = self.toTimestamp
+        if v is not None:
+            d["toTimestamp"] = v
+        return d
+
+
+class ProtoOAGetTickDataRes(Message):
+    __slots__ = (
+        "ctidTraderAccountId",
+        "tickData",
+        "hasMore",
+    )
+    PAYLOAD_TYPE = ProtoOAPayloadType.PROTO_OA_GET_TICKDATA_RES
+
+    def __init__(
+        self,
+        ctidTraderAccountId=None,
+        tickData=None,
+        hasMore=None,
+    ):
+        self.ctidTraderAccountId = ctidTraderAccountId
+        self.tickData = [] if tickData is None else tickData
+        self.hasMore = hasMore
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "ProtoOAGetTickDataRes":
+        self = cls.__new__(cls)
+        get = d.get
+        self.ctidTraderAccountId = get("ctidTraderAccountId")
+        v = get("tickData")
+        self.tickData = [ProtoOATickData.from_dict(i) for i in v] if v else []
+        self.hasMore = get("hasMore")
+        return self
+
+    def to_dict(self) -> dict:
+        d = {}
+        v = self.ctidTraderAccountId
+        if v is not None:
+            d["ctidTraderAccountId"] = v
+        if self.tickData:
+            d["tickData"] = [i.to_dict() for i in self.tickData]
+        v = self.hasMore
+        if v is not None:
+            d["hasMore"] = v
+        return d
+
+
+class ProtoOAReconcileReq(Message):
+    __slots__ = (
+        "ctidTraderAccountId",
+        "returnProtectionOrders",
+    )
+    PAYLOAD_TYPE = ProtoOAPayloadType.PROTO_OA_RECONCILE_REQ
+
+    def __init__(
+        self,
+        ctidTraderAccountId=None,
+        returnProtectionOrders=None,
+    ):
+        self.ctidTraderAccountId = ctidTraderAccountId
+        self.returnProtectionOrders = returnProtectionOrders
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "ProtoOAReconcileReq":
+        self = cls.__new__(cls)
+        get = d.get
+        self.ctidTraderAccountId = get("ctidTraderAccountId")
+        self.returnProtectionOrders = get("returnProtectionOrders")
+        return self
+
+    def to_dict(self) -> dict:
+        d = {}
+        v = self.ctidTraderAccountId
+        if v is not None:
+            d["ctidTraderAccountId"] = v
+        v = self.returnProtectionOrders
+        if v is not None:
+            d["returnProtectionOrders"] = v
+        return d
+
+
+class ProtoOAReconcileRes(Message):
+    __slots__ = (
+        "ctidTraderAccountId",
+        "position",
+        "order",
+    )
+    PAYLOAD_TYPE = ProtoOAPayloadType.PROTO_OA_RECONCILE_RES
+
+    def __init__(
+        self,
+        ctidTraderAccountId=None,
+        position=None,
+        order=None,
+    ):
+        self.ctidTraderAccountId = ctidTraderAccountId
+        self.position = [] if position is None else position
+        self.order = [] if order is None else order
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "ProtoOAReconcileRes":
+        self = cls.__new__(cls)
+        get = d.get
+        self.ctidTraderAccountId = get("ctidTraderAccountId")
+        v = get("position")
+        self.position = [ProtoOAPosition.from_dict(i) for i in v] if v else []
+        v = get("order")
+        self.order = [ProtoOAOrder.from_dict(i) for i in v] if v else []
+        return self
+
+    def to_dict(self) -> dict:
+        d = {}
+        v = self.ctidTraderAccountId
+        if v is not None:
+            d["ctidTraderAccountId"] = v
+        if self.position:
+            d["position"] = [i.to_dict() for i in self.position]
+        if self.order:
+            d["order"] = [i.to_dict() for i in self.order]
+        return d
+
+
+class ProtoOAAccountDisconnectEvent(Message):
+    __slots__ = ("ctidTraderAccountId",)
+    PAYLOAD_TYPE = ProtoOAPayloadType.PROTO_OA_ACCOUNT_DISCONNECT_EVENT
+
+    def __init__(
+        self,
+        ctidTraderAccountId=None,
+    ):
+        self.ctidTraderAccountId = ctidTraderAccountId
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "ProtoOAAccountDisconnectEvent":
+        self = cls.__new__(cls)
+        get = d.get
+        self.ctidTraderAccountId = get("ctidTraderAccountId")
+        return self
+
+    def to_dict(self) -> dict:
+        d = {}
+        v = self.ctidTraderAccountId
+        if v is not None:
+            d["ctidTraderAccountId"] = v
+        return d
+
+
+class ProtoHeartbeatEvent(Message):
+    __slots__ = ()
+    PAYLOAD_TYPE = ProtoPayloadType.HEARTBEAT_EVENT
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "ProtoHeartbeatEvent":
+        self = cls.__new__(cls)
+        return self
+
+    def to_dict(self) -> dict:
+        d = {}
+        return d
+
+
+class ProtoMessage(Message):
+    __slots__ = (
+        "payload",
+        "clientMsgId",
+    )
+
+    def __init__(
+        self,
+        payload=None,
+        clientMsgId=None,
+    ):
+        self.payload = payload
+        self.clientMsgId = clientMsgId
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "ProtoMessage":
+        self = cls.__new__(cls)
+        get = d.get
+        self.payload = get("payload")
+        self.clientMsgId = get("clientMsgId")
+        return self
+
+    def to_dict(self) -> dict:
+        d = {}
+        v = self.payload
+        if v is not None:
+            d["payload"] = v
+        v = self.clientMsgId
+        if v is not None:
+            d["clientMsgId"] = v
+        return d
+
+
+class ProtoOACtidTraderAccount(Message):
+    __slots__ = (
+        "ctidTraderAccountId",
+        "isLive",
+        "traderLogin",
+        "lastClosingDealTimestamp",
+        "lastBalanceUpdateTimestamp",
+        "brokerTitleShort",
+    )
+
+    def __init__(
+        self,
+        ctidTraderAccountId=None,
+        isLive=None,
+        traderLogin=None,
+        lastClosingDealTimestamp=None,
+        lastBalanceUpdateTimestamp=None,
+        brokerTitleShort=None,
+    ):
+        self.ctidTraderAccountId = ctidTraderAccountId
+        self.isLive = isLive
+        self.traderLogin = traderLogin
+        self.lastClosingDealTimestamp = lastClosingDealTimestamp
+        self.lastBalanceUpdateTimestamp = lastBalanceUpdateTimestamp
+        self.brokerTitleShort = brokerTitleShort
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "ProtoOACtidTraderAccount":
+        self = cls.__new__(cls)
+        get = d.get
+        self.ctidTraderAccountId = get("ctidTraderAccountId")
+        self.isLive = get("isLive")
+        self.traderLogin = get("traderLogin")
+        self.lastClosingDealTimestamp = get("lastClosingDealTimestamp")
+        self.lastBalanceUpdateTimestamp = get("lastBalanceUpdateTimestamp")
+        self.brokerTitleShort = get("brokerTitleShort")
+        return self
+
+    def to_dict(self) -> dict:
+        d = {}
+        v = self.ctidTraderAccountId
+        if v is not None:
+            d["ctidTraderAccountId"] = v
+        v = self.isLive
+        if v is not None:
+            d["isLive"] = v
+        v = self.traderLogin
+        if v is not None:
+            d["traderLogin"] = v
+        v = self.lastClosingDealTimestamp
+        if v is not None:
+            d["lastClosingDealTimestamp"] = v
+        v = self.lastBalanceUpdateTimestamp
+        if v is not None:
+            d["lastBalanceUpdateTimestamp"] = v
+        v = self.brokerTitleShort
+        if v is not None:
+            d["brokerTitleShort"] = v
+        return d
+
+
+class ProtoOALightSymbol(Message):
+    __slots__ = (
+        "symbolId",
+        "symbolName",
+        "enabled",
+        "baseAssetId",
+        "quoteAssetId",
+        "symbolCategoryId",
+        "description",
+        "sortingNumber",
+    )
+
+    def __init__(
+        self,
+        symbolId=None,
+        symbolName=None,
+        enabled=None,
+        baseAssetId=None,
+        quoteAssetId=None,
+        symbolCategoryId=None,
+        description=None,
+        sortingNumber=None,
+    ):
+        self.symbolId = symbolId
+        self.symbolName = symbolName
+        self.enabled = enabled
+        self.baseAssetId = baseAssetId
+        self.quoteAssetId = quoteAssetId
+        self.symbolCategoryId = symbolCategoryId
+        self.description = description
+        self.sortingNumber = sortingNumber
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "ProtoOALightSymbol":
+        self = cls.__new__(cls)
+        get = d.get
+        self.symbolId = get("symbolId")
+        self.symbolName = get("symbolName")
+        self.enabled = get("enabled")
+        self.baseAssetId = get("baseAssetId")
+        self.quoteAssetId = get("quoteAssetId")
+        self.symbolCategoryId = get("symbolCategoryId")
+        self.description = get("description")
+        self.sortingNumber = get("sortingNumber")
+        return self
+
+    def to_dict(self) -> dict:
+        d = {}
+        v = self.symbolId
+        if v is not None:
+            d["symbolId"] = v
+        v = self.symbolName
+        if v is not None:
+            d["symbolName"] = v
+        v = self.enabled
+        if v is not None:
+            d["enabled"] = v
+        v = self.baseAssetId
+        if v is not None:
+            d["baseAssetId"] = v
+        v = self.quoteAssetId
+        if v is not None:
+            d["quoteAssetId"] = v
+        v = self.symbolCategoryId
+        if v is not None:
+            d["symbolCategoryId"] = v
+        v = self.description
+        if v is not None:
+            d["description"] = v
+        v = self.sortingNumber
+        if v is not None:
+            d["sortingNumber"] = v
+        return d
+
+
+class ProtoOAArchivedSymbol(Message):
+    __slots__ = (
+        "symbolId",
+        "name",
+        "utcLastUpdateTimestamp",
+        "description",
+    )
+
+    def __init__(
+        self,
+        symbolId=None,
+        name=None,
+        utcLastUpdateTimestamp=None,
+        description=None,
+    ):
+        self.symbolId = symbolId
+        self.name = name
+        self.utcLastUpdateTimestamp = utcLastUpdateTimestamp
+        self.description = description
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "ProtoOAArchivedSymbol":
+        self = cls.__new__(cls)
+        get = d.get
+        self.symbolId = get("symbolId")
+        self.name = get("name")
+        self.utcLastUpdateTimestamp = get("utcLastUpdateTimestamp")
+        self.description = get("description")
+        return self
+
+    def to_dict(self) -> dict:
+        d = {}
+        v = self.symbolId
+        if v is not None:
+            d["symbolId"] = v
+        v = self.name
+        if v is not None:
+            d["name"] = v
+        v = self.utcLastUpdateTimestamp
+        if v is not None:
+            d["utcLastUpdateTimestamp"] = v
+        v = self.description
+        if v is not None:
+            d["description"] = v
+        return d
+
+
+class ProtoOASymbol(Message):
+    __slots__ = (
+        "symbolId",
+        "digits",
+        "pipPosition",
+        "enableShortSelling",
+        "guaranteedStopLoss",
+        "swapLong",
+        "swapShort",
+        "maxVolume",
+        "minVolume",
+        "stepVolume",
+        "maxExposure",
+        "scheduleTimeZone",
+        "lotSize",
+        "measurementUnits",
+    )
+
+    def __init__(
+        self,
+        symbolId=None,
+        digits=None,
+        pipPosition=None,
+        enableShortSelling=None,
+        guaranteedStopLoss=None,
+        swapLong=None,
+        swapShort=None,
+        maxVolume=None,
+        minVolume=None,
+        stepVolume=None,
+        maxExposure=None,
+        scheduleTimeZone=None,
+        lotSize=None,
+        measurementUnits=None,
+    ):
+        self.symbolId = symbolId
+        self.digits = digits
+        self.pipPosition = pipPosition
+        self.enableShortSelling = enableShortSelling
+        self.guaranteedStopLoss = guaranteedStopLoss
+        self.swapLong = swapLong
+        self.swapShort = swapShort
+        self.maxVolume = maxVolume
+        self.minVolume = minVolume
+        self.stepVolume = stepVolume
+        self.maxExposure = maxExposure
+        self.scheduleTimeZone = scheduleTimeZone
+        self.lotSize = lotSize
+        self.measurementUnits = measurementUnits
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "ProtoOASymbol":
+        self = cls.__new__(cls)
+        get = d.get
+        self.symbolId = get("symbolId")
+        self.digits = get("digits")
+        self.pipPosition = get("pipPosition")
+        self.enableShortSelling = get("enableShortSelling")
+        self.guaranteedStopLoss = get("guaranteedStopLoss")
+        self.swapLong = get("swapLong")
+        self.swapShort = get("swapShort")
+        self.maxVolume = get("maxVolume")
+        self.minVolume = get("minVolume")
+        self.stepVolume = get("stepVolume")
+        self.maxExposure = get("maxExposure")
+        self.scheduleTimeZone = get("scheduleTimeZone")
+        self.lotSize = get("lotSize")
+        self.measurementUnits = get("measurementUnits")
+        return self
+
+    def to_dict(self) -> dict:
+        d = {}
+        v = self.symbolId
+        if v is not None:
+            d["symbolId"] = v
+        v = self.digits
+        if v is not None:
+            d["digits"] = v
+        v = self.pipPosition
+        if v is not None:
+            d["pipPosition"] = v
+        v = self.enableShortSelling
+        if v is not None:
+            d["enableShortSelling"] = v
+        v = self.guaranteedStopLoss
+        if v is not None:
+            d["guaranteedStopLoss"] = v
+        v = self.swapLong
+        if v is not None:
+            d["swapLong"] = v
+        v = self.swapShort
+        if v is not None:
+            d["swapShort"] = v
+        v = self.maxVolume
+        if v is not None:
+            d["maxVolume"] = v
+        v = self.minVolume
+        if v is not None:
+            d["minVolume"] = v
+        v = self.stepVolume
+        if v is not None:
+            d["stepVolume"] = v
+        v = self.maxExposure
+        if v is not None:
+            d["maxExposure"] = v
+        v = self.scheduleTimeZone
+        if v is not None:
+            d["scheduleTimeZone"] = v
+        v = self.lotSize
+        if v is not None:
+            d["lotSize"] = v
+        v = self.measurementUnits
+        if v is not None:
+            d["measurementUnits"] = v
+        return d
+
+
+class ProtoOATradeData(Message):
+    __slots__ = (
+        "symbolId",
+        "volume",
+        "tradeSide",
+        "openTimestamp",
+        "label",
+        "guaranteedStopLoss",
+        "comment",
+        "measurementUnits",
+        "closeTimestamp",
+    )
+
+    def __init__(
+        self,
+        symbolId=None,
+        volume=None,
+        tradeSide=None,
+        openTimestamp=None,
+        label=None,
+        guaranteedStopLoss=None,
+        comment=None,
+        measurementUnits=None,
+        closeTimestamp=None,
+    ):
+        self.symbolId = symbolId
+        self.volume = volume
+        self.tradeSide = tradeSide
+        self.openTimestamp = openTimestamp
+        self.label = label
+        self.guaranteedStopLoss = guaranteedStopLoss
+        self.comment = comment
+        self.measurementUnits = measurementUnits
+        self.closeTimestamp = closeTimestamp
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "ProtoOATradeData":
+        self = cls.__new__(cls)
+        get = d.get
+        self.symbolId = get("symbolId")
+        self.volume = get("volume")
+        v = get("tradeSide")
+        self.tradeSide = _ProtoOATradeSide.get(v, v)
+        self.openTimestamp = get("openTimestamp")
+        self.label = get("label")
+        self.guaranteedStopLoss = get("guaranteedStopLoss")
+        self.comment = get("comment")
+        self.measurementUnits = get("measurementUnits")
+        self.closeTimestamp = get("closeTimestamp")
+        return self
+
+    def to_dict(self) -> dict:
+        d = {}
+        v = self.symbolId
+        if v is not None:
+            d["symbolId"] = v
+        v = self.volume
+        if v is not None:
+            d["volume"] = v
+        v = self.tradeSide
+        if v is not None:
+            d["tradeSide"] = v.name if isinstance(v, IntEnum) else v
+        v = self.openTimestamp
+        if v is not None:
+            d["openTimestamp"] = v
+        v = self.label
+        if v is not None:
+            d["label"] = v
+        v = self.guaranteedStopLoss
+        if v is not None:
+            d["guaranteedStopLoss"] = v
+        v = self.comment
+        if v is not None:
+            d["comment"] = v
+        v = self.measurementUnits
+        if v is not None:
+            d["measurementUnits"] = v
+        v = self.closeTimestamp
+        if v is not None:
+            d["closeTimestamp"] = v
+        return d
+
+
+class ProtoOAOrder(Message):
+    __slots__ = (
+        "orderId",
+        "tradeData",
+        "orderType",
+        "orderStatus",
+        "expirationTimestamp",
+        "executionPrice",
+        "executedVolume",
+        "utcLastUpdateTimestamp",
+        "baseSlippagePrice",
+        "slippageInPoints",
+        "closingOrder",
+        "limitPrice",
+        "stopPrice",
+        "stopLoss",
+        "takeProfit",
+        "clientOrderId",
+        "timeInForce",
+        "positionId",
+        "relativeStopLoss",
+        "relativeTakeProfit",
+        "isStopOut",
+        "trailingStopLoss",
+        "stopTriggerMethod",
+    )
+
+    def __init__(
+        self,
+        orderId=None,
+        tradeData=None,
+        orderType=None,
+        orderStatus=None,
+        expirationTimestamp=None,
+        executionPrice=None,
+        executedVolume=None,
+        utcLastUpdateTimestamp=None,
+        baseSlippagePrice=None,
+        slippageInPoints=None,
+        closingOrder=None,
+        limitPrice=None,
+        stopPrice=None,
+        stopLoss=None,
+        takeProfit=None,
+        clientOrderId=None,
+        timeInForce=None,
+        positionId=None,
+        relativeStopLoss=None,
+        relativeTakeProfit=None,
+        isStopOut=None,
+        trailingStopLoss=None,
+        stopTriggerMethod=None,
+    ):
+        self.orderId = orderId
+        self.tradeData = tradeData
+        self.orderType = orderType
+        self.orderStatus = orderStatus
+        self.expirationTimestamp = expirationTimestamp
+        self.executionPrice = executionPrice
+        self.executedVolume = executedVolume
+        self.utcLastUpdateTimestamp = utcLastUpdateTimestamp
+        self.baseSlippagePrice = baseSlippagePrice
+        self.slippageInPoints = slippageInPoints
+        self.closingOrder = closingOrder
+        self.limitPrice = limitPrice
+        self.stopPrice = stopPrice
+        self.stopLoss = stopLoss
+        self.takeProfit = takeProfit
+        self.clientOrderId = clientOrderId
+        self.timeInForce = timeInForce
+        self.positionId = positionId
+        self.relativeStopLoss = relativeStopLoss
+        self.relativeTakeProfit = relativeTakeProfit
+        self.isStopOut = isStopOut
+        self.trailingStopLoss = trailingStopLoss
+        self.stopTriggerMethod = stopTriggerMethod
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "ProtoOAOrder":
+        self = cls.__new__(cls)
+        get = d.get
+        self.orderId = get("orderId")
+        v = get("tradeData")
+        if v is not None:
+            v = ProtoOATradeData.from_dict(v)
+        self.tradeData = v
+        v = get("orderType")
+        self.orderType = _ProtoOAOrderType.get(v, v)
+        v = get("orderStatus")
+        self.orderStatus = _ProtoOAOrderStatus.get(v, v)
+        self.expirationTimestamp = get("expirationTimestamp")
+        self.executionPrice = get("executionPrice")
+        self.executedVolume = get("executedVolume")
+        self.utcLastUpdateTimestamp = get("utcLastUpdateTimestamp")
+        self.baseSlippagePrice = get("baseSlippagePrice")
+        self.slippageInPoints = get("slippageInPoints")
+        self.closingOrder = get("closingOrder")
+        self.limitPrice = get("limitPrice")
+        self.stopPrice = get("stopPrice")
+        self.stopLoss = get("stopLoss")
+        self.takeProfit = get("takeProfit")
+        self.clientOrderId = get("clientOrderId")
+        v = get("timeInForce")
+        self.timeInForce = _ProtoOATimeInForce.get(v, v)
+        self.positionId = get("positionId")
+        self.relativeStopLoss = get("relativeStopLoss")
+        self.relativeTakeProfit = get("relativeTakeProfit")
+        self.isStopOut = get("isStopOut")
+        self.trailingStopLoss = get("trailingStopLoss")
+        v = get("stopTriggerMethod")
+        self.stopTriggerMethod = _ProtoOAOrderTriggerMethod.get(v, v)
+        return self
+
+    def to_dict(self) -> dict:
+        d = {}
+        v = self.orderId
+        if v is not None:
+            d["orderId"] = v
+        v = self.tradeData
+        if v is not None:
+            d["tradeData"] = v.to_dict()
+        v = self.orderType
+        if v is not None:
+            d["orderType"] = v.name if isinstance(v, IntEnum) else v
+        v = self.orderStatus
+        if v is not None:
+            d["orderStatus"] = v.name if isinstance(v, IntEnum) else v
+        v = self.expirationTimestamp
+        if v is not None:
+            d["expirationTimestamp"] = v
+        v = self.executionPrice
+        if v is not None:
+            d["executionPrice"] = v
+        v = self.executedVolume
+        if v is not None:
+            d["executedVolume"] = v
+        v = self.utcLastUpdateTimestamp
+        if v is not None:
+            d["utcLastUpdateTimestamp"] = v
+        v = self.baseSlippagePrice
+        if v is not None:
+            d["baseSlippagePrice"] = v
+        v = self.slippageInPoints
+        if v is not None:
+            d["slippageInPoints"] = v
+        v = self.closingOrder
+        if v is not None:
+            d["closingOrder"] = v
+        v = self.limitPrice
+        if v is not None:
+            d["limitPrice"] = v
+        v = self.stopPrice
+        if v is not None:
+            d["stopPrice"] = v
+        v = self.stopLoss
+        if v is not None:
+            d["stopLoss"] = v
+        v = self.takeProfit
+        if v is not None:
+            d["takeProfit"] = v
+        v = self.clientOrderId
+        if v is not None:
+            d["clientOrderId"] = v
+        v = self.timeInForce
+        if v is not None:
+            d["timeInForce"] = v.name if isinstance(v, IntEnum) else v
+        v = self.positionId
+        if v is not None:
+            d["positionId"] = v
+        v = self.relativeStopLoss
+        if v is not None:
+            d["relativeStopLoss"] = v
+        v = self.relativeTakeProfit
+        if v is not None:
+            d["relativeTakeProfit"] = v
+        v = self.isStopOut
+        if v is not None:
+            d["isStopOut"] = v
+        v = self.trailingStopLoss
+        if v is not None:
+            d["trailingStopLoss"] = v
+        v = self.stopTriggerMethod
+        if v is not None:
+            d["stopTriggerMethod"] = v.name if isinstance(v, IntEnum) else v
+        return d
+
+
+class ProtoOAClosePositionDetail(Message):
+    __slots__ = (
+        "entryPrice",
+        "grossProfit",
+        "swap",
+        "commission",
+        "balance",
+        "quoteToDepositConversionRate",
+        "closedVolume",
+        "balanceVersion",
+        "moneyDigits",
+    )
+
+    def __init__(
+        self,
+        entryPrice=None,
+        grossProfit=None,
+        swap=None,
+        commission=None,
+        balance=None,
+        quoteToDepositConversionRate=None,
+        closedVolume=None,
+        balanceVersion=None,
+        moneyDigits=None,
+    ):
+        self.entryPrice = entryPrice
+        self.grossProfit = grossProfit
+        self.swap = swap
+        self.commission = commission
+        self.balance = balance
+        self.quoteToDepositConversionRate = quoteToDepositConversionRate
+        self.closedVolume = closedVolume
+        self.balanceVersion = balanceVersion
+        self.moneyDigits = moneyDigits
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "ProtoOAClosePositionDetail":
+        self = cls.__new__(cls)
+        get = d.get
+        self.entryPrice = get("entryPrice")
+        self.grossProfit = get("grossProfit")
+        self.swap = get("swap")
+        self.commission = get("commission")
+        self.balance = get("balance")
+        self.quoteToDepositConversionRate = get("quoteToDepositConversionRate")
+        self.closedVolume = get("closedVolume")
+        self.balanceVersion = get("balanceVersion")
+        self.moneyDigits = get("moneyDigits")
+        return self
+
+    def to_dict(self) -> dict:
+        d = {}
+        v = self.entryPrice
+        if v is not None:
+            d["entryPrice"] = v
+        v = self.grossProfit
+        if v is not None:
+            d["grossProfit"] = v
+        v = self.swap
+        if v is not None:
+            d["swap"] = v
+        v = self.commission
+        if v is not None:
+            d["commission"] = v
+        v = self.balance
+        if v is not None:
+            d["balance"] = v
+        v = self.quoteToDepositConversionRate
+        if v is not None:
+            d["quoteToDepositConversionRate"] = v
+        v = self.closedVolume
+        if v is not None:
+            d["closedVolume"] = v
+        v = self.balanceVersion
+        if v is not None:
+            d["balanceVersion"] = v
+        v = self.moneyDigits
+        if v is not None:
+            d["moneyDigits"] = v
+        return d
+
+
+class ProtoOADepositWithdraw(Message):
+    __slots__ = (
+        "operationType",
+        "balanceHistoryId",
+        "balance",
+        "delta",
+        "changeBalanceTimestamp",
+        "externalNote",
+        "balanceVersion",
+        "equity",
+        "moneyDigits",
+    )
+
+    def __init__(
+        self,
+        operationType=None,
+        balanceHistoryId=None,
+        balance=None,
+        delta=None,
+        changeBalanceTimestamp=None,
+        externalNote=None,
+        balanceVersion=None,
+        equity=None,
+        moneyDigits=None,
+    ):
+        self.operationType = operationType
+        self.balanceHistoryId = balanceHistoryId
+        self.balance = balance
+        self.delta = delta
+        self.changeBalanceTimestamp = changeBalanceTimestamp
+        self.externalNote = externalNote
+        self.balanceVersion = balanceVersion
+        self.equity = equity
+        self.moneyDigits = moneyDigits
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "ProtoOADepositWithdraw":
+        self = cls.__new__(cls)
+        get = d.get
+        self.operationType = get("operationType")
+        self.balanceHistoryId = get("balanceHistoryId")
+        self.balance = get("balance")
+        self.delta = get("delta")
+        self.changeBalanceTimestamp = get("changeBalanceTimestamp")
+        self.externalNote = get("externalNote")
+        self.balanceVersion = get("balanceVersion")
+        self.equity = get("equity")
+        self.moneyDigits = get("moneyDigits")
+        return self
+
+    def to_dict(self) -> dict:
+        d = {}
+        v = self.operationType
+        if v is not None:
+            d["operationType"] = v
+        v = self.balanceHistoryId
+        if v is not None:
+            d["balanceHistoryId"] = v
+        v = self.balance
+        if v is not None:
+            d["balance"] = v
+        v = self.delta
+        if v is not None:
+            d["delta"] = v
+        v = self.changeBalanceTimestamp
+        if v is not None:
+            d["changeBalanceTimestamp"] = v
+        v = self.externalNote
+        if v is not None:
+            d["externalNote"] = v
+        v = self.balanceVersion
+        if v is not None:
+            d["balanceVersion"] = v
+        v = self.equity
+        if v is not None:
+            d["equity"] = v
+        v = self.moneyDigits
+        if v is not None:
+            d["moneyDigits"] = v
+        return d
+
+
+class ProtoOABonusDepositWithdraw(Message):
+    __slots__ = (
+        "operationType",
+        "bonusHistoryId",
+        "managerBonus",
+        "managerDelta",
+        "ibBonus",
+        "ibDelta",
+        "changeBonusTimestamp",
+        "externalNote",
+        "introducingBrokerId",
+        "moneyDigits",
+    )
+
+    def __init__(
+        self,
+        operationType=None,
+        bonusHistoryId=None,
+        managerBonus=None,
+        managerDelta=None,
+        ibBonus=None,
+        ibDelta=None,
+        changeBonusTimestamp=None,
+        externalNote=None,
+        introducingBrokerId=None,
+        moneyDigits=None,
+    ):
+        self.operationType = operationType
+        self.bonusHistoryId = bonusHistoryId
+        self.managerBonus = managerBonus
+        self.managerDelta = managerDelta
+        self.ibBonus = ibBonus
+        self.ibDelta = ibDelta
+        self.changeBonusTimestamp = changeBonusTimestamp
+        self.externalNote = externalNote
+        self.introducingBrokerId = introducingBrokerId
+        self.moneyDigits = moneyDigits
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "ProtoOABonusDepositWithdraw":
+        self = cls.__new__(cls)
+        get = d.get
+        self.operationType = get("operationType")
+        self.bonusHistoryId = get("bonusHistoryId")
+        self.managerBonus = get("managerBonus")
+        self.managerDelta = get("managerDelta")
+        self.ibBonus = get("ibBonus")
+        self.ibDelta = get("ibDelta")
+        self.changeBonusTimestamp = get("changeBonusTimestamp")
+        self.externalNote = get("externalNote")
+        self.introducingBrokerId = get("introducingBrokerId")
+        self.moneyDigits = get("moneyDigits")
+        return self
+
+    def to_dict(self) -> dict:
+        d = {}
+        v = self.operationType
+        if v is not None:
+            d["operationType"] = v
+        v = self.bonusHistoryId
+        if v is not None:
+            d["bonusHistoryId"] = v
+        v = self.managerBonus
+        if v is not None:
+            d["managerBonus"] = v
+        v = self.managerDelta
+        if v is not None:
+            d["managerDelta"] = v
+        v = self.ibBonus
+        if v is not None:
+            d["ibBonus"] = v
+        v = self.ibDelta
+        if v is not None:
+            d["ibDelta"] = v
+        v = self.changeBonusTimestamp
+        if v is not None:
+            d["changeBonusTimestamp"] = v
+        v = self.externalNote
+        if v is not None:
+            d["externalNote"] = v
+        v = self.introducingBrokerId
+        if v is not None:
+            d["introducingBrokerId"] = v
+        v = self.moneyDigits
+        if v is not None:
+            d["moneyDigits"] = v
+        return d
+
+
+class ProtoOATrendbar(Message):
+    __slots__ = (
+        "volume",
+        "period",
+        "low",
+        "deltaOpen",
+        "deltaClose",
+        "deltaHigh",
+        "utcTimestampInMinutes",
+    )
+
+    def __init__(
+        self,
+        volume=None,
+        period=None,
+        low=None,
+        deltaOpen=None,
+        deltaClose=None,
+        deltaHigh=None,
+        utcTimestampInMinutes=None,
+    ):
+        self.volume = volume
+        self.period = period
+        self.low = low
+        self.deltaOpen = deltaOpen
+        self.deltaClose = deltaClose
+        self.deltaHigh = deltaHigh
+        self.utcTimestampInMinutes = utcTimestampInMinutes
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "ProtoOATrendbar":
+        self = cls.__new__(cls)
+        get = d.get
+        self.volume = get("volume")
+        v = get("period")
+        self.period = _ProtoOATrendbarPeriod.get(v, v)
+        self.low = get("low")
+        self.deltaOpen = get("deltaOpen")
+        self.deltaClose = get("deltaClose")
+        self.deltaHigh = get("deltaHigh")
+        self.utcTimestampInMinutes = get("utcTimestampInMinutes")
+        return self
+
+    def to_dict(self) -> dict:
+        d = {}
+        v = self.volume
+        if v is not None:
+            d["volume"] = v
+        v = self.period
+        if v is not None:
+            d["period"] = v.name if isinstance(v, IntEnum) else v
+        v = self.low
+        if v is not None:
+            d["low"] = v
+        v = self.deltaOpen
+        if v is not None:
+            d["deltaOpen"] = v
+        v = self.deltaClose
+        if v is not None:
+            d["deltaClose"] = v
+        v = self.deltaHigh
+        if v is not None:
+            d["deltaHigh"] = v
+        v = self.utcTimestampInMinutes
+        if v is not None:
+            d["utcTimestampInMinutes"] = v
+        return d
+
+
+class ProtoOATickData(Message):
+    __slots__ = (
+        "timestamp",
+        "tick",
+    )
+
+    def __init__(
+        self,
+        timestamp=None,
+        tick=None,
+    ):
+        self.timestamp = timestamp
+        self.tick = tick
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "ProtoOATickData":
+        self = cls.__new__(cls)
+        get = d.get
+        self.timestamp = get("timestamp")
+        self.tick = get("tick")
+        return self
+
+    def to_dict(self) -> dict:
+        d = {}
+        v = self.timestamp
+        if v is not None:
+            d["timestamp"] = v
+        v = self.tick
+        if v is not None:
+            d["tick"] = v
+        return d
+
+
+MESSAGES_BY_PAYLOAD_TYPE = {
+    ProtoOAPayloadType.PROTO_OA_APPLICATION_AUTH_REQ.value: ProtoOAApplicationAuthReq,
+    ProtoOAPayloadType.PROTO_OA_APPLICATION_AUTH_RES.value: ProtoOAApplicationAuthRes,
+    ProtoOAPayloadType.PROTO_OA_VERSION_REQ.value: ProtoOAVersionReq,
+    ProtoOAPayloadType.PROTO_OA_VERSION_RES.value: ProtoOAVersionRes,
+    ProtoOAPayloadType.PROTO_OA_ACCOUNT_AUTH_REQ.value: ProtoOAAccountAuthReq,
+    ProtoOAPayloadType.PROTO_OA_ACCOUNT_AUTH_RES.value: ProtoOAAccountAuthRes,
+    ProtoOAPayloadType.PROTO_OA_ERROR_RES.value: ProtoOAErrorRes,
+    ProtoOAPayloadType.PROTO_OA_NEW_ORDER_REQ.value: ProtoOANewOrderReq,
+    ProtoOAPayloadType.PROTO_OA_EXECUTION_EVENT.value: ProtoOAExecutionEvent,
+    ProtoOAPayloadType.PROTO_OA_AMEND_POSITION_SLTP_REQ.value: ProtoOAAmendPositionSLTPReq,
+    ProtoOAPayloadType.PROTO_OA_ORDER_ERROR_EVENT.value: ProtoOAOrderErrorEvent,
+    ProtoOAPayloadType.PROTO_OA_CLOSE_POSITION_REQ.value: ProtoOAClosePositionReq,
+    ProtoOAPayloadType.PROTO_OA_GET_ACCOUNTS_BY_ACCESS_TOKEN_RES.value: ProtoOAGetAccountListByAccessTokenRes,
+    ProtoOAPayloadType.PROTO_OA_GET_ACCOUNTS_BY_ACCESS_TOKEN_REQ.value: ProtoOAGetAccountListByAccessTokenReq,
+    ProtoOAPayloadType.PROTO_OA_SYMBOLS_LIST_REQ.value: ProtoOASymbolsListReq,
+    ProtoOAPayloadType.PROTO_OA_SYMBOLS_LIST_RES.value: ProtoOASymbolsListRes,
+    ProtoOAPayloadType.PROTO_OA_SPOT_EVENT.value: ProtoOASpotEvent,
+    ProtoOAPayloadType.PROTO_OA_SUBSCRIBE_SPOTS_REQ.value: ProtoOASubscribeSpotsReq,
+    ProtoOAPayloadType.PROTO_OA_SUBSCRIBE_SPOTS_RES.value: ProtoOASubscribeSpotsRes,
+    ProtoOAPayloadType.PROTO_OA_UNSUBSCRIBE_SPOTS_REQ.value: ProtoOAUnsubscribeSpotsReq,
+    ProtoOAPayloadType.PROTO_OA_UNSUBSCRIBE_SPOTS_RES.value: ProtoOAUnsubscribeSpotsRes,
+    ProtoOAPayloadType.PROTO_OA_SYMBOL_BY_ID_REQ.value: ProtoOASymbolByIdReq,
+    ProtoOAPayloadType.PROTO_OA_SYMBOL_BY_ID_RES.value: ProtoOASymbolByIdRes,
+    ProtoOAPayloadType.PROTO_OA_GET_TRENDBARS_REQ.value: ProtoOAGetTrendbarsReq,
+    ProtoOAPayloadType.PROTO_OA_GET_TRENDBARS_RES.value: ProtoOAGetTrendbarsRes,
+    ProtoOAPayloadType.PROTO_OA_GET_TICKDATA_REQ.value: ProtoOAGetTickDataReq,
+    ProtoOAPayloadType.PROTO_OA_GET_TICKDATA_RES.value: ProtoOAGetTickDataRes,
+    ProtoOAPayloadType.PROTO_OA_RECONCILE_REQ.value: ProtoOAReconcileReq,
+    ProtoOAPayloadType.PROTO_OA_RECONCILE_RES.value: ProtoOAReconcileRes,
+    ProtoOAPayloadType.PROTO_OA_ACCOUNT_DISCONNECT_EVENT.value: ProtoOAAccountDisconnectEvent,
+    ProtoPayloadType.HEARTBEAT_EVENT.value: ProtoHeartbeatEvent,
+}
+
+
+def from_payload(payload_type: int, payload: dict) -> Message:
+    """The message class instance for a decoded payload, None for unknown types."""
+    cls = MESSAGES_BY_PAYLOAD_TYPE.get(payload_type)
+    return None if cls is None else cls.from_dict(payload)
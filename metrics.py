@@ -0,0 +1,356 @@
+import asyncio
+import time
+from collections import OrderedDict
+
+from logging_config import logger
+
+from .models import PAYLOAD_TYPES
+
+# 32 sub-buckets per power of two: every recorded value is within ~3% of its bucket
+SUB_BUCKET_BITS = 5
+SUB_BUCKET_COUNT = 1 << SUB_BUCKET_BITS
+# Values below this are counted one bucket per microsecond
+LINEAR_LIMIT = 2 * SUB_BUCKET_COUNT
+# Longest duration told apart from the others, anything longer lands in the last bucket
+MAX_TRACKABLE_US = 60 * 1_000_000
+
+QUANTILES = (0.5, 0.9, 0.99, 0.999)
+
+# clientMsgIds of sent requests remembered until their first response
+MAX_IN_FLIGHT = 10_000
+
+_PAYLOAD_TYPE_NAMES = {
+    value: name
+    for name, value in vars(PAYLOAD_TYPES).items()
+    if not name.startswith("_")
+}
+
+
+def payload_type_name(payload_type) -> str:
+    return _PAYLOAD_TYPE_NAMES.get(payload_type, str(payload_type))
+
+
+def _bucket_index(value_us: int) -> int:
+    if value_us < LINEAR_LIMIT:
+        return value_us
+    shift = value_us.bit_length() - SUB_BUCKET_BITS - 1
+    return (shift << SUB_BUCKET_BITS) + (value_us >> shift)
+
+
+def _bucket_value(index: int) -> int:
+    """Middle of the range of microseconds counted in bucket `index`."""
+    if index < LINEAR_LIMIT:
+        return index
+    shift = (index >> SUB_BUCKET_BITS) - 1
+    lowest = (index - (shift << SUB_BUCKET_BITS)) << shift
+    return lowest + (1 << (shift - 1))
+
+
+BUCKETS = _bucket_index(MAX_TRACKABLE_US) + 1
+
+
+class LatencyHistogram:
+    """
+    Log-linear histogram of durations, in the spirit of HdrHistogram.
+
+    Recording is a bit_length, a shift and a list increment, with a fixed
+    amount of memory however many values are recorded. Durations are given
+    and returned in seconds and kept with microsecond resolution.
+    """
+
+    __slots__ = ("counts", "count", "total", "min", "max")
+
+    def __init__(self):
+        self.counts = [0] * BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def record(self, seconds: float):
+        if seconds < 0:
+            seconds = 0.0
+        index = _bucket_index(int(seconds * 1_000_000))
+        self.counts[index if index < BUCKETS else BUCKETS - 1] += 1
+        self.count += 1
+        self.total += seconds
+        if self.max is None or seconds > self.max:
+            self.max = seconds
+        if self.min is None or seconds < self.min:
+            self.min = seconds
+
+    def percentile(self, fraction: float) -> float:
+        if not self.count:
+            return None
+        rank = max(1, round(fraction * self.count))
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                value = _bucket_value(index) / 1_000_000
+                # The bucket middle may be off the range actually recorded
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else None
+
+    def reset(self):
+        self.counts = [0] * BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def snapshot(self) -> dict:
+        """Count and durations in milliseconds."""
+        snapshot = {"count": self.count}
+        if not self.count:
+            return snapshot
+        snapshot["mean_ms"] = self.mean * 1000
+        snapshot["min_ms"] = self.min * 1000
+        for fraction in QUANTILES:
+            snapshot[f"p{fraction * 100:g}_ms"] = self.percentile(fraction) * 1000
+        snapshot["max_ms"] = self.max * 1000
+        return snapshot
+
+
+class Metrics:
+    """
+    Timings of one client, or of several sharing it:
+
+    - `rtt`: request sent to its first response, per request payloadType,
+      matched by clientMsgId.
+    - `receive`: time spent on each received frame inside the receive loop
+      (decoding, position book, pending requests, spot buffers), per payloadType.
+    - `handlers`: execution time of the handlers, per payloadType.
+    - `loop_lag`: how late the event loop runs a callback scheduled to the
+      sampling interval.
+    - `heartbeat_rtt`: round trip of the VERSION_REQ ping sent every
+      `rtt_probe_interval` seconds.
+    - `inbound_rates`: received messages per second per payloadType over the
+      last sampling interval.
+
+    When fills get slow, a high `rtt` with low `receive`/`handlers` and
+    `loop_lag` points at the network or server, a high `loop_lag` at
+    something blocking the loop, and a high `handlers` time at a handler.
+    """
+
+    def __init__(self, sample_interval: float = 1.0):
+        self.sample_interval = sample_interval
+        self.rtt: dict[int, LatencyHistogram] = {}
+        self.receive: dict[int, LatencyHistogram] = {}
+        self.handlers: dict[int, LatencyHistogram] = {}
+        self.loop_lag = LatencyHistogram()
+        self.heartbeat_rtt = LatencyHistogram()
+        self.last_loop_lag = None
+        self.last_heartbeat_rtt = None
+        self.inbound_rates: dict[int, float] = {}
+        self.started_at = time.monotonic()
+        self._in_flight: OrderedDict = OrderedDict()
+        self._rate_counts: dict[int, int] = {}
+        self._rate_sampled_at = time.monotonic()
+
+    def _histogram(self, histograms: dict, payload_type: int) -> LatencyHistogram:
+        histogram = histograms.get(payload_type)
+        if histogram is None:
+            histogram = histograms[payload_type] = LatencyHistogram()
+        return histogram
+
+    def handler_histogram(self, payload_type: int) -> LatencyHistogram:
+        return self._histogram(self.handlers, payload_type)
+
+    def request_sent(self, client_msg_id: str, payload_type: int):
+        in_flight = self._in_flight
+        in_flight[client_msg_id] = (payload_type, time.perf_counter())
+        # Requests the server never answers must not pile up
+        if len(in_flight) > MAX_IN_FLIGHT:
+            in_flight.popitem(last=False)
+
+    def response_received(self, client_msg_id: str):
+        sent = self._in_flight.pop(client_msg_id, None)
+        if sent is not None:
+            payload_type, sent_at = sent
+            self._histogram(self.rtt, payload_type).record(
+                time.perf_counter() - sent_at
+            )
+
+    def frame_received(self, payload_type: int, seconds: float):
+        self._histogram(self.receive, payload_type).record(seconds)
+
+    def heartbeat_received(self, seconds: float):
+        self.last_heartbeat_rtt = seconds
+        self.heartbeat_rtt.record(seconds)
+
+    def _sample_rates(self, now: float):
+        elapsed = now - self._rate_sampled_at
+        if elapsed <= 0:
+            return
+        counts = {
+            payload_type: histogram.count
+            for payload_type, histogram in self.receive.items()
+        }
+        self.inbound_rates = {
+            payload_type: (count - self._rate_counts.get(payload_type, 0)) / elapsed
+            for payload_type, count in counts.items()
+        }
+        self._rate_counts = counts
+        self._rate_sampled_at = now
+
+    async def sample_loop(self):
+        """Samples event loop lag and inbound rates every `sample_interval` seconds."""
+        interval = self.sample_interval
+        try:
+            while True:
+                expected = time.perf_counter() + interval
+                await asyncio.sleep(interval)
+                lag = time.perf_counter() - expected
+                self.last_loop_lag = lag
+                self.loop_lag.record(lag)
+                self._sample_rates(time.monotonic())
+        except asyncio.CancelledError:
+            logger.info("Metrics sampler stopped.")
+
+    def reset(self):
+        for histograms in (self.rtt, self.receive, self.handlers):
+            histograms.clear()
+        self.loop_lag.reset()
+        self.heartbeat_rtt.reset()
+        self._rate_counts = {}
+        self.inbound_rates = {}
+        self.started_at = time.monotonic()
+
+    def snapshot(self) -> dict:
+        def by_type(histograms: dict) -> dict:
+            return {
+                payload_type_name(payload_type): histogram.snapshot()
+                for payload_type, histogram in histograms.items()
+            }
+
+        return {
+            "uptime_seconds": time.monotonic() - self.started_at,
+            "rtt": by_type(self.rtt),
+            "receive": by_type(self.receive),
+            "handlers": by_type(self.handlers),
+            "loop_lag": self.loop_lag.snapshot(),
+            "heartbeat_rtt": self.heartbeat_rtt.snapshot(),
+            "inbound_messages": {
+                payload_type_name(payload_type): histogram.count
+                for payload_type, histogram in self.receive.items()
+            },
+            "inbound_rates": {
+                payload_type_name(payload_type): rate
+                for payload_type, rate in self.inbound_rates.items()
+            },
+            "requests_in_flight": len(self._in_flight),
+        }
+
+    def to_prometheus(self) -> str:
+        """The metrics in the Prometheus text exposition format."""
+        lines = []
+
+        def summary(name: str, help_text: str, histograms: dict):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} summary")
+            for labels, histogram in histograms:
+                if not histogram.count:
+                    continue
+                for fraction in QUANTILES:
+                    quantile_labels = ",".join(
+                        filter(None, (labels, f'quantile="{fraction:g}"'))
+                    )
+                    lines.append(
+                        f"{name}{{{quantile_labels}}} {histogram.percentile(fraction):.9g}"
+                    )
+                suffix = f"{{{labels}}}" if labels else ""
+                lines.append(f"{name}_sum{suffix} {histogram.total:.9g}")
+                lines.append(f"{name}_count{suffix} {histogram.count}")
+
+        def labelled(histograms: dict):
+            return [
+                (f'payload_type="{payload_type_name(payload_type)}"', histogram)
+                for payload_type, histogram in histograms.items()
+            ]
+
+        summary(
+            "open_api_request_rtt_seconds",
+            "Request sent to its first response.",
+            labelled(self.rtt),
+        )
+        summary(
+            "open_api_receive_seconds",
+            "Time spent on a received frame in the receive loop.",
+            labelled(self.receive),
+        )
+        summary(
+            "open_api_handler_seconds",
+            "Execution time of message handlers.",
+            labelled(self.handlers),
+        )
+        summary(
+            "open_api_loop_lag_seconds",
+            "Event loop lag.",
+            [("", self.loop_lag)],
+        )
+        summary(
+            "open_api_heartbeat_rtt_seconds",
+            "Round trip of the heartbeat ping.",
+            [("", self.heartbeat_rtt)],
+        )
+
+        lines.append("# HELP open_api_inbound_messages_total Received messages.")
+        lines.append("# TYPE open_api_inbound_messages_total counter")
+        for labels, histogram in labelled(self.receive):
+            lines.append(
+                f"open_api_inbound_messages_total{{{labels}}} {histogram.count}"
+            )
+        lines.append(
+            "# HELP open_api_inbound_messages_per_second Received messages per second."
+        )
+        lines.append("# TYPE open_api_inbound_messages_per_second gauge")
+        for payload_type, rate in self.inbound_rates.items():
+            lines.append(
+                f'open_api_inbound_messages_per_second{{payload_type="{payload_type_name(payload_type)}"}} {rate:.9g}'
+            )
+        lines.append(
+            "# HELP open_api_requests_in_flight Requests waiting for a response."
+        )
+        lines.append("# TYPE open_api_requests_in_flight gauge")
+        lines.append(f"open_api_requests_in_flight {len(self._in_flight)}")
+        return "\n".join(lines) + "\n"
+
+
+async def serve_metrics(
+    metrics: Metrics, host: str = "127.0.0.1", port: int = 9464
+) -> asyncio.AbstractServer:
+    """
+    Serves `metrics.to_prometheus()` over HTTP on every path, for a Prometheus
+    scrape or a curl. Close the returned server to stop it.
+    """
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            # Only the request line and headers matter, whatever they ask for
+            await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), 5)
+            body = metrics.to_prometheus().encode()
+            writer.write(
+                b"HTTP/1.1 200 OK\r\n"
+                b"Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                b"Content-Length: " + str(len(body)).encode() + b"\r\n"
+                b"Connection: close\r\n\r\n" + body
+            )
+            await writer.drain()
+        except (
+            asyncio.IncompleteReadError,
+            asyncio.LimitOverrunError,
+            asyncio.TimeoutError,
+            ConnectionError,
+        ):
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, host, port)
+    logger.info("Serving metrics on http://%s:%s/metrics", host, port)
+    return server
@@ -0,0 +1,778 @@
+"""
+Local stand-in for the Open API, to run the client without a live account.
+
+    python -m <package>.mock_server [--port 5036] [--transport json] [--spot-rate 1000]
+
+Implements the auth handshake, the account and symbols lists, symbol details,
+reconciliation, spot subscriptions, historical trendbars and ticks and a
+market order/close/amend flow, over
+JSON websockets or length-prefixed Protobuf. Latency can be added to every
+frame it sends and connections can be dropped on demand or on a timer.
+"""
+
+import argparse
+import asyncio
+import itertools
+import random
+import time
+
+import websockets.exceptions
+import websockets.server
+
+from .codec import JsonCodec
+from .history import MAX_TICK_RANGE_MILLISECONDS, MAX_TRENDBAR_RANGE_MILLISECONDS
+from .models import (
+    PAYLOAD_TYPES,
+    ProtoOAExecutionType,
+    ProtoOAPositionStatus,
+    TrendbarPeriod,
+)
+from .protobuf_codec import ProtobufCodec
+from .protobuf_transport import ProtobufStream
+from .trendbars import PERIOD_MILLISECONDS
+
+DEFAULT_ACCOUNT_IDS = (1000001,)
+FOREX_SYMBOL_NAMES = (
+    "EURUSD",
+    "GBPUSD",
+    "EURJPY",
+    "USDJPY",
+    "AUDUSD",
+    "USDCHF",
+    "GBPJPY",
+    "USDCAD",
+    "EURGBP",
+    "EURCHF",
+)
+
+# Historical data: bars and ticks per response, and the spacing of generated ticks
+TRENDBARS_PER_RESPONSE = 4000
+TICKS_PER_RESPONSE = 10_000
+TICK_INTERVAL_MILLISECONDS = 5_000
+DAY_MILLISECONDS = 24 * 60 * 60 * 1000
+
+
+def _market_closed(timestamp: int) -> bool:
+    # Saturdays, 1970-01-01 was a Thursday
+    return (timestamp // DAY_MILLISECONDS + 4) % 7 == 6
+
+
+def _historical_price(symbol_id: int, timestamp: int) -> int:
+    # Deterministic, so every download of the same range gets the same prices
+    return 100_000 + symbol_id * 10 + (timestamp // 1000 * 2_654_435_761) % 500
+
+
+class MockOpenApiServer:
+    """
+    One server, any number of connections. Each connection has its own
+    subscriptions and positions but shares the symbols and their prices.
+
+    `spot_rate` is the number of spot events per second each subscribed
+    connection receives, `latency` the seconds every outbound frame is held
+    back and `disconnect_after` the seconds after which connections are
+    dropped without a close handshake.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        transport: str = "json",
+        account_ids=DEFAULT_ACCOUNT_IDS,
+        symbols: int = 100,
+        spot_rate: float = 0.0,
+        latency: float = 0.0,
+        disconnect_after: float = None,
+        seed: int = 0,
+    ):
+        if transport not in ("json", "protobuf"):
+            raise ValueError(f"Unknown transport: {transport}")
+
+        self.host = host
+        self.port = port
+        self.transport = transport
+        self.codec = ProtobufCodec() if transport == "protobuf" else JsonCodec()
+        self.account_ids = list(account_ids)
+        self.spot_rate = spot_rate
+        self.latency = latency
+        self.disconnect_after = disconnect_after
+        self.random = random.Random(seed)
+        self.symbol_names = {
+            symbol_id: (
+                FOREX_SYMBOL_NAMES[symbol_id - 1]
+                if symbol_id <= len(FOREX_SYMBOL_NAMES)
+                else f"SYM{symbol_id:04d}"
+            )
+            for symbol_id in range(1, symbols + 1)
+        }
+        # Prices in 1/100000 of a unit, as on the wire
+        self.bids = {
+            symbol_id: 100_000 + symbol_id * 10 for symbol_id in self.symbol_names
+        }
+        self.connections: set[_MockConnection] = set()
+        self._server = None
+        self._ids = itertools.count(1)
+
+    async def start(self):
+        if self.transport == "json":
+            self._server = await websockets.server.serve(
+                self._serve_websocket, self.host, self.port, max_size=None
+            )
+        else:
+            self._server = await asyncio.start_server(
+                self._serve_stream, self.host, self.port
+            )
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        self.drop_connections()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+    async def serve_forever(self):
+        await self.start()
+        try:
+            await asyncio.Future()
+        finally:
+            await self.stop()
+
+    def next_id(self) -> int:
+        return next(self._ids)
+
+    def drop_connections(self):
+        """Drops every connection abruptly, like a network failure would."""
+        for connection in list(self.connections):
+            connection.abort()
+
+    def freeze_connections(self, count: int = None):
+        """
+        Stops the oldest `count` connections (all if None) from reading or
+        writing anything while leaving them open, like a half-open TCP
+        connection behind a dead route.
+        """
+        connections = sorted(self.connections, key=lambda c: c.opened_at)
+        for connection in connections[:count]:
+            connection.frozen = True
+
+    def encode(self, client_msg_id: str, payload_type: int, payload: dict):
+        if self.transport == "protobuf":
+            return self.codec.encode_message(client_msg_id, payload_type, payload)
+        msg = {"payloadType": payload_type, "payload": payload}
+        if client_msg_id:
+            msg["clientMsgId"] = client_msg_id
+        return self.codec.dumps(msg)
+
+    def next_spot(self, account_id: int, symbol_id: int) -> dict:
+        bid = self.bids[symbol_id] = max(
+            1, self.bids[symbol_id] + self.random.randint(-3, 3)
+        )
+        return {
+            "ctidTraderAccountId": account_id,
+            "symbolId": symbol_id,
+            "bid": bid,
+            "ask": bid + 2,
+            "timestamp": int(time.time() * 1000),
+        }
+
+    def encode_spots(self, count: int, symbol_ids=None) -> list:
+        """Pre-encodes `count` spot events, round-robin over `symbol_ids`."""
+        symbol_ids = list(symbol_ids or self.symbol_names)
+        account_id = self.account_ids[0]
+        return [
+            self.encode(
+                None,
+                PAYLOAD_TYPES.PROTO_OA_SPOT_EVENT,
+                self.next_spot(account_id, symbol_ids[i % len(symbol_ids)]),
+            )
+            for i in range(count)
+        ]
+
+    def broadcast(self, frames):
+        """Queues already encoded frames on every connection."""
+        for connection in self.connections:
+            for frame in frames:
+                connection.push(frame)
+
+    async def _serve_websocket(self, websocket):
+        await self._serve(websocket)
+
+    async def _serve_stream(self, reader, writer):
+        await self._serve(ProtobufStream(reader, writer))
+
+    async def _serve(self, stream):
+        connection = _MockConnection(self, stream)
+        self.connections.add(connection)
+        try:
+            await connection.run()
+        finally:
+            self.connections.discard(connection)
+
+
+class _MockConnection:
+    def __init__(self, server: MockOpenApiServer, stream):
+        self.server = server
+        self.stream = stream
+        self.opened_at = time.monotonic()
+        # Neither reads nor writes, see MockOpenApiServer.freeze_connections
+        self.frozen = False
+        self.outbound = asyncio.Queue()
+        self.app_authorized = False
+        self.authorized_accounts = set()
+        self.subscribed_spots = set()
+        self.positions: dict[int, dict] = {}
+        self._spot_task = None
+        self.handlers = {
+            PAYLOAD_TYPES.PROTO_HEARTBEAT_EVENT: self.handle_heartbeat,
+            PAYLOAD_TYPES.PROTO_OA_VERSION_REQ: self.handle_version,
+            PAYLOAD_TYPES.PROTO_OA_APPLICATION_AUTH_REQ: self.handle_application_auth,
+            PAYLOAD_TYPES.PROTO_OA_GET_ACCOUNTS_BY_ACCESS_TOKEN_REQ: self.handle_get_accounts,
+            PAYLOAD_TYPES.PROTO_OA_ACCOUNT_AUTH_REQ: self.handle_account_auth,
+            PAYLOAD_TYPES.PROTO_OA_SYMBOLS_LIST_REQ: self.handle_symbols_list,
+            PAYLOAD_TYPES.PROTO_OA_SYMBOL_BY_ID_REQ: self.handle_symbol_by_id,
+            PAYLOAD_TYPES.PROTO_OA_RECONCILE_REQ: self.handle_reconcile,
+            PAYLOAD_TYPES.PROTO_OA_SUBSCRIBE_SPOTS_REQ: self.handle_subscribe_spots,
+            PAYLOAD_TYPES.PROTO_OA_UNSUBSCRIBE_SPOTS_REQ: self.handle_unsubscribe_spots,
+            PAYLOAD_TYPES.PROTO_OA_GET_TRENDBARS_REQ: self.handle_get_trendbars,
+            PAYLOAD_TYPES.PROTO_OA_GET_TICKDATA_REQ: self.handle_get_tick_data,
+            PAYLOAD_TYPES.PROTO_OA_NEW_ORDER_REQ: self.handle_new_order,
+            PAYLOAD_TYPES.PROTO_OA_CLOSE_POSITION_REQ: self.handle_close_position,
+            PAYLOAD_TYPES.PROTO_OA_AMEND_POSITION_SLTP_REQ: self.handle_amend_position,
+        }
+
+    def push(self, frame):
+        self.outbound.put_nowait((time.monotonic() + self.server.latency, frame))
+
+    def reply(self, client_msg_id: str, payload_type: int, payload: dict):
+        self.push(self.server.encode(client_msg_id, payload_type, payload))
+
+    def error(
+        self, client_msg_id: str, error_code: str, description: str, account_id=None
+    ):
+        payload = {"errorCode": error_code, "description": description}
+        if account_id is not None:
+            payload["ctidTraderAccountId"] = account_id
+        self.reply(client_msg_id, PAYLOAD_TYPES.PROTO_OA_ERROR_RES, payload)
+
+    def abort(self):
+        transport = getattr(self.stream, "transport", None)
+        if transport is None:
+            transport = self.stream.writer.transport
+        transport.abort()
+
+    async def run(self):
+        # Tasks and timers that die with the connection
+        tasks = [asyncio.create_task(self.write_frames())]
+        if self.server.disconnect_after is not None:
+            tasks.append(
+                asyncio.get_running_loop().call_later(
+                    self.server.disconnect_after, self.abort
+                )
+            )
+        if self.server.spot_rate:
+            self.start_spot_stream()
+
+        try:
+            async for frame in self.stream:
+                if self.frozen:
+                    continue
+                msg = self.server.codec.decode(frame)
+                handler = self.handlers.get(msg.get("payloadType"))
+                if handler is None:
+                    self.error(
+                        msg.get("clientMsgId"),
+                        "UNSUPPORTED_MESSAGE",
+                        f"payloadType {msg.get('payloadType')} is not mocked.",
+                    )
+                    continue
+                handler(msg.get("clientMsgId"), msg.get("payload", {}))
+        except (ConnectionError, websockets.exceptions.ConnectionClosed):
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            if self._spot_task is not None:
+                self._spot_task.cancel()
+
+    async def write_frames(self):
+        try:
+            while True:
+                due, frame = await self.outbound.get()
+                if self.frozen:
+                    continue
+                delay = due - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                await self.stream.send(frame)
+        except (ConnectionError, websockets.exceptions.ConnectionClosed):
+            pass
+
+    def start_spot_stream(self):
+        """Streams spots to the subscribed symbols at the server's current `spot_rate`."""
+        if self._spot_task is None or self._spot_task.done():
+            self._spot_task = asyncio.create_task(self.stream_spots())
+
+    async def stream_spots(self):
+        # Sent in small batches, fractional spots carry over to the next one
+        pending = 0.0
+        symbols = itertools.count()
+        last = time.monotonic()
+        while True:
+            await asyncio.sleep(0.01)
+            now = time.monotonic()
+            pending += self.server.spot_rate * (now - last)
+            last = now
+            subscribed = sorted(self.subscribed_spots)
+            if not subscribed or not self.authorized_accounts:
+                pending = 0.0
+                continue
+            account_id = next(iter(self.authorized_accounts))
+            while pending >= 1:
+                pending -= 1
+                symbol_id = subscribed[next(symbols) % len(subscribed)]
+                self.reply(
+                    None,
+                    PAYLOAD_TYPES.PROTO_OA_SPOT_EVENT,
+                    self.server.next_spot(account_id, symbol_id),
+                )
+
+    def handle_heartbeat(self, client_msg_id, payload):
+        pass
+
+    def handle_version(self, client_msg_id, payload):
+        self.reply(
+            client_msg_id, PAYLOAD_TYPES.PROTO_OA_VERSION_RES, {"version": "mock"}
+        )
+
+    def handle_application_auth(self, client_msg_id, payload):
+        self.app_authorized = True
+        self.reply(client_msg_id, PAYLOAD_TYPES.PROTO_OA_APPLICATION_AUTH_RES, {})
+
+    def handle_get_accounts(self, client_msg_id, payload):
+        self.reply(
+            client_msg_id,
+            PAYLOAD_TYPES.PROTO_OA_GET_ACCOUNTS_BY_ACCESS_TOKEN_RES,
+            {
+                "accessToken": payload.get("accessToken", ""),
+                "ctidTraderAccount": [
+                    {"ctidTraderAccountId": account_id, "isLive": False}
+                    for account_id in self.server.account_ids
+                ],
+            },
+        )
+
+    def handle_account_auth(self, client_msg_id, payload):
+        account_id = payload.get("ctidTraderAccountId")
+        if not self.app_authorized:
+            self.error(
+                client_msg_id,
+                "CH_CLIENT_NOT_AUTHENTICATED",
+                "Application not authorized.",
+            )
+        elif account_id not in self.server.account_ids:
+            self.error(
+                client_msg_id,
+                "CH_CTID_TRADER_ACCOUNT_NOT_FOUND",
+                "Trading account is not found.",
+                account_id,
+            )
+        else:
+            self.authorized_accounts.add(account_id)
+            self.reply(
+                client_msg_id,
+                PAYLOAD_TYPES.PROTO_OA_ACCOUNT_AUTH_RES,
+                {"ctidTraderAccountId": account_id},
+            )
+
+    def handle_symbols_list(self, client_msg_id, payload):
+        self.reply(
+            client_msg_id,
+            PAYLOAD_TYPES.PROTO_OA_SYMBOLS_LIST_RES,
+            {
+                "ctidTraderAccountId": payload.get("ctidTraderAccountId"),
+                "symbol": [
+                    {
+                        "symbolId": symbol_id,
+                        "symbolName": name,
+                        "enabled": True,
+                        "baseAssetId": symbol_id,
+                        "quoteAssetId": 1,
+                        "symbolCategoryId": 1,
+                    }
+                    for symbol_id, name in self.server.symbol_names.items()
+                ],
+            },
+        )
+
+    def handle_symbol_by_id(self, client_msg_id, payload):
+        self.reply(
+            client_msg_id,
+            PAYLOAD_TYPES.PROTO_OA_SYMBOL_BY_ID_RES,
+            {
+                "ctidTraderAccountId": payload.get("ctidTraderAccountId"),
+                "symbol": [
+                    {
+                        "symbolId": symbol_id,
+                        "digits": 5,
+                        "pipPosition": 4,
+                        "lotSize": 10_000_000,
+                        "minVolume": 1_000,
+                        "maxVolume": 10_000_000_000,
+                        "stepVolume": 1_000,
+                    }
+                    for symbol_id in payload.get("symbolId", [])
+                    if symbol_id in self.server.symbol_names
+                ],
+            },
+        )
+
+    def handle_reconcile(self, client_msg_id, payload):
+        account_id = payload.get("ctidTraderAccountId")
+        self.reply(
+            client_msg_id,
+            PAYLOAD_TYPES.PROTO_OA_RECONCILE_RES,
+            {
+                "ctidTraderAccountId": account_id,
+                "position": list(self.positions.values()),
+                "order": [],
+            },
+        )
+
+    def handle_subscribe_spots(self, client_msg_id, payload):
+        symbol_ids = payload.get("symbolId", [])
+        self.subscribed_spots.update(symbol_ids)
+        account_id = payload.get("ctidTraderAccountId")
+        self.reply(
+            client_msg_id,
+            PAYLOAD_TYPES.PROTO_OA_SUBSCRIBE_SPOTS_RES,
+            {"ctidTraderAccountId": account_id},
+        )
+        # Like the real server, the latest price follows every subscription
+        for symbol_id in symbol_ids:
+            self.reply(
+                None,
+                PAYLOAD_TYPES.PROTO_OA_SPOT_EVENT,
+                self.server.next_spot(account_id, symbol_id),
+            )
+
+    def handle_unsubscribe_spots(self, client_msg_id, payload):
+        self.subscribed_spots.difference_update(payload.get("symbolId", []))
+        self.reply(
+            client_msg_id,
+            PAYLOAD_TYPES.PROTO_OA_UNSUBSCRIBE_SPOTS_RES,
+            {"ctidTraderAccountId": payload.get("ctidTraderAccountId")},
+        )
+
+    def _historical_range(self, client_msg_id, payload, max_range: int):
+        from_timestamp = payload.get("fromTimestamp", 0)
+        to_timestamp = payload.get("toTimestamp", 0)
+        if not 0 <= to_timestamp - from_timestamp <= max_range:
+            self.error(
+                client_msg_id,
+                "INCORRECT_BOUNDARIES",
+                "fromTimestamp and toTimestamp are out of bounds.",
+                payload.get("ctidTraderAccountId"),
+            )
+            return None
+        return from_timestamp, to_timestamp
+
+    def handle_get_trendbars(self, client_msg_id, payload):
+        period = payload.get("period")
+        period = (
+            TrendbarPeriod[period]
+            if isinstance(period, str)
+            else TrendbarPeriod(period)
+        )
+        bounds = self._historical_range(
+            client_msg_id, payload, MAX_TRENDBAR_RANGE_MILLISECONDS[period]
+        )
+        if bounds is None:
+            return
+        from_timestamp, to_timestamp = bounds
+        symbol_id = payload.get("symbolId")
+        period_milliseconds = PERIOD_MILLISECONDS[period]
+
+        starts = [
+            start
+            for start in range(
+                from_timestamp - from_timestamp % period_milliseconds,
+                to_timestamp,
+                period_milliseconds,
+            )
+            if start >= from_timestamp and not _market_closed(start)
+        ]
+        trendbars = []
+        for start in starts[:TRENDBARS_PER_RESPONSE]:
+            prices = [
+                _historical_price(symbol_id, start + offset)
+                for offset in range(0, period_milliseconds, period_milliseconds // 4)
+            ]
+            low = min(prices)
+            trendbars.append(
+                {
+                    "volume": 4,
+                    "period": period.name,
+                    "low": low,
+                    "deltaOpen": prices[0] - low,
+                    "deltaHigh": max(prices) - low,
+                    "deltaClose": prices[-1] - low,
+                    "utcTimestampInMinutes": start // 60_000,
+                }
+            )
+        self.reply(
+            client_msg_id,
+            PAYLOAD_TYPES.PROTO_OA_GET_TRENDBARS_RES,
+            {
+                "ctidTraderAccountId": payload.get("ctidTraderAccountId"),
+                "period": period.name,
+                "symbolId": symbol_id,
+                "trendbar": trendbars,
+                "hasMore": len(starts) > TRENDBARS_PER_RESPONSE,
+            },
+        )
+
+    def handle_get_tick_data(self, client_msg_id, payload):
+        bounds = self._historical_range(
+            client_msg_id, payload, MAX_TICK_RANGE_MILLISECONDS
+        )
+        if bounds is None:
+            return
+        from_timestamp, to_timestamp = bounds
+        symbol_id = payload.get("symbolId")
+
+        # Newest first, both ends included
+        newest = to_timestamp - to_timestamp % TICK_INTERVAL_MILLISECONDS
+        timestamps = [
+            timestamp
+            for timestamp in range(
+                newest, from_timestamp - 1, -TICK_INTERVAL_MILLISECONDS
+            )
+            if not _market_closed(timestamp)
+        ]
+        tick_data = []
+        previous_timestamp = previous_price = 0
+        for timestamp in timestamps[:TICKS_PER_RESPONSE]:
+            price = _historical_price(symbol_id, timestamp)
+            tick_data.append(
+                {
+                    "timestamp": timestamp - previous_timestamp,
+                    "tick": price - previous_price,
+                }
+            )
+            previous_timestamp, previous_price = timestamp, price
+        self.reply(
+            client_msg_id,
+            PAYLOAD_TYPES.PROTO_OA_GET_TICKDATA_RES,
+            {
+                "ctidTraderAccountId": payload.get("ctidTraderAccountId"),
+                "tickData": tick_data,
+                "hasMore": len(timestamps) > TICKS_PER_RESPONSE,
+            },
+        )
+
+    def _order(self, order_id, position, status, execution_price=None):
+        order = {
+            "orderId": order_id,
+            "tradeData": position["tradeData"],
+            "orderType": 1,
+            "orderStatus": status,
+            "positionId": position["positionId"],
+            "utcLastUpdateTimestamp": int(time.time() * 1000),
+        }
+        if execution_price is not None:
+            order["executionPrice"] = execution_price
+            order["executedVolume"] = position["tradeData"]["volume"]
+        return order
+
+    def _execution(
+        self, client_msg_id, account_id, execution_type, position, order, deal=None
+    ):
+        payload = {
+            "ctidTraderAccountId": account_id,
+            "executionType": execution_type,
+            "position": position,
+            "order": order,
+        }
+        if deal is not None:
+            payload["deal"] = deal
+        self.reply(client_msg_id, PAYLOAD_TYPES.PROTO_OA_EXECUTION_EVENT, payload)
+
+    def handle_new_order(self, client_msg_id, payload):
+        account_id = payload.get("ctidTraderAccountId")
+        symbol_id = payload.get("symbolId")
+        if account_id not in self.authorized_accounts:
+            self.error(
+                client_msg_id,
+                "CH_ACCOUNT_NOT_AUTHORIZED",
+                "Account is not authorized.",
+                account_id,
+            )
+            return
+        if symbol_id not in self.server.symbol_names:
+            self.reply(
+                client_msg_id,
+                PAYLOAD_TYPES.PROTO_OA_ORDER_ERROR_EVENT,
+                {
+                    "ctidTraderAccountId": account_id,
+                    "errorCode": "SYMBOL_NOT_FOUND",
+                    "description": f"Symbol {symbol_id} is not found.",
+                },
+            )
+            return
+
+        side = payload.get("tradeSide")
+        side = {"BUY": 1, "SELL": 2}.get(side, side)
+        bid = self.server.bids[symbol_id]
+        price = (bid + 2 if side == 1 else bid) / 100_000
+        position_id = self.server.next_id()
+        order_id = self.server.next_id()
+        now = int(time.time() * 1000)
+        position = {
+            "positionId": position_id,
+            "tradeData": {
+                "symbolId": symbol_id,
+                "volume": payload.get("volume", 0),
+                "tradeSide": side,
+                "openTimestamp": now,
+            },
+            "positionStatus": ProtoOAPositionStatus.POSITION_STATUS_CREATED.value,
+            "swap": 0,
+            "utcLastUpdateTimestamp": now,
+            "moneyDigits": 2,
+        }
+        self._execution(
+            client_msg_id,
+            account_id,
+            ProtoOAExecutionType.ORDER_ACCEPTED.value,
+            dict(position),
+            self._order(order_id, position, 1),
+        )
+
+        position["positionStatus"] = ProtoOAPositionStatus.POSITION_STATUS_OPEN.value
+        position["price"] = price
+        self.positions[position_id] = position
+        self._execution(
+            client_msg_id,
+            account_id,
+            ProtoOAExecutionType.ORDER_FILLED.value,
+            dict(position),
+            self._order(order_id, position, 2, price),
+        )
+
+    def handle_close_position(self, client_msg_id, payload):
+        account_id = payload.get("ctidTraderAccountId")
+        position = self.positions.pop(payload.get("positionId"), None)
+        if position is None:
+            self.reply(
+                client_msg_id,
+                PAYLOAD_TYPES.PROTO_OA_ORDER_ERROR_EVENT,
+                {
+                    "ctidTraderAccountId": account_id,
+                    "errorCode": "POSITION_NOT_FOUND",
+                    "positionId": payload.get("positionId", 0),
+                    "description": "Position is not found.",
+                },
+            )
+            return
+
+        symbol_id = position["tradeData"]["symbolId"]
+        close_price = self.server.bids[symbol_id] / 100_000
+        direction = 1 if position["tradeData"]["tradeSide"] == 1 else -1
+        gross_profit = round(
+            (close_price - position["price"])
+            * direction
+            * position["tradeData"]["volume"]
+        )
+        position["positionStatus"] = ProtoOAPositionStatus.POSITION_STATUS_CLOSED.value
+        order_id = self.server.next_id()
+        self._execution(
+            client_msg_id,
+            account_id,
+            ProtoOAExecutionType.ORDER_FILLED.value,
+            position,
+            self._order(order_id, position, 2, close_price),
+            {
+                "dealId": self.server.next_id(),
+                "orderId": order_id,
+                "positionId": position["positionId"],
+                "volume": position["tradeData"]["volume"],
+                "filledVolume": position["tradeData"]["volume"],
+                "symbolId": symbol_id,
+                "createTimestamp": int(time.time() * 1000),
+                "executionTimestamp": int(time.time() * 1000),
+                "executionPrice": close_price,
+                "tradeSide": 3 - position["tradeData"]["tradeSide"],
+                "dealStatus": 2,
+                "closePositionDetail": {
+                    "entryPrice": position["price"],
+                    "grossProfit": gross_profit,
+                    "swap": 0,
+                    "commission": 0,
+                    "balance": 0,
+                    "moneyDigits": 2,
+                },
+            },
+        )
+
+    def handle_amend_position(self, client_msg_id, payload):
+        account_id = payload.get("ctidTraderAccountId")
+        position = self.positions.get(payload.get("positionId"))
+        if position is None:
+            self.reply(
+                client_msg_id,
+                PAYLOAD_TYPES.PROTO_OA_ORDER_ERROR_EVENT,
+                {
+                    "ctidTraderAccountId": account_id,
+                    "errorCode": "POSITION_NOT_FOUND",
+                    "positionId": payload.get("positionId", 0),
+                    "description": "Position is not found.",
+                },
+            )
+            return
+
+        for field in ("stopLoss", "takeProfit"):
+            if field in payload:
+                position[field] = payload[field]
+        self._execution(
+            client_msg_id,
+            account_id,
+            ProtoOAExecutionType.ORDER_REPLACED.value,
+            dict(position),
+            self._order(self.server.next_id(), position, 1),
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local mock of the cTrader Open API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5036)
+    parser.add_argument("--transport", choices=("json", "protobuf"), default="json")
+    parser.add_argument("--symbols", type=int, default=100)
+    parser.add_argument("--spot-rate", type=float, default=0.0)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--disconnect-after", type=float, default=None)
+    args = parser.parse_args()
+
+    server = MockOpenApiServer(
+        args.host,
+        args.port,
+        args.transport,
+        symbols=args.symbols,
+        spot_rate=args.spot_rate,
+        latency=args.latency,
+        disconnect_after=args.disconnect_after,
+    )
+    print(f"Mock Open API ({args.transport}) listening on {args.host}:{args.port}")
+    asyncio.run(server.serve_forever())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,55 +1,112 @@
 import asyncio
 from enum import Enum
 
+# The proto enums are generated, see proto_codegen.py
+from .messages import (
+    ProtoOAExecutionType,
+    ProtoOAOrderStatus,
+    ProtoOAPayloadType,
+    ProtoOAPositionStatus,
+    ProtoOAQuoteType,
+    ProtoOATrendbarPeriod,
+    ProtoPayloadType,
+)
+from .symbol_index import SymbolIndex
+
 
 class WebsocketClientEvents:
     app_auth: asyncio.Event
     account_auth: asyncio.Event
-    symbols_list: asyncio.Event    
+    symbols_list: asyncio.Event
 
     def clear_all(self):
         self.app_auth.clear()
         self.account_auth.clear()
-        self.symbols_list.clear()      
+        self.symbols_list.clear()
 
     def __init__(self):
         self.app_auth = asyncio.Event()
         self.account_auth = asyncio.Event()
         self.symbols_list = asyncio.Event()
 
+
 class ClientAssignables:
-    def __init__(self, access_token):
+    def __init__(self, access_token, account_ids=None, symbols=None):
         self.access_token = access_token
-        self.account_id = None
-        self.fx_pairs_ids = {}
+        # Accounts to authorize on this connection, the first non-live one if empty
+        self.account_ids = list(account_ids or [])
+        self.account_id = self.account_ids[0] if self.account_ids else None
+        self.authorized_accounts = set()
+        # Account auth was sent right after the app auth, skip the account list
+        self.pipelined_account_auth = False
+        # May be shared between several connections
+        self.symbols: SymbolIndex = symbols if symbols is not None else SymbolIndex()
+        self.subscribed_spots = set()
 
 
 class PAYLOAD_TYPES:
+    # Plain ints rather than the enum members, compared against every frame
+
     # Core Communication
-    PROTO_HEARTBEAT_EVENT = 51
-    PROTO_OA_ERROR_RES = 2142
-    PROTO_OA_SYMBOLS_LIST_REQ = 2114
-    PROTO_OA_SYMBOLS_LIST_RES = 2115
+    PROTO_HEARTBEAT_EVENT = ProtoPayloadType.HEARTBEAT_EVENT.value
+    PROTO_OA_ERROR_RES = ProtoOAPayloadType.PROTO_OA_ERROR_RES.value
+    PROTO_OA_SYMBOLS_LIST_REQ = ProtoOAPayloadType.PROTO_OA_SYMBOLS_LIST_REQ.value
+    PROTO_OA_SYMBOLS_LIST_RES = ProtoOAPayloadType.PROTO_OA_SYMBOLS_LIST_RES.value
+    PROTO_OA_SYMBOL_BY_ID_REQ = ProtoOAPayloadType.PROTO_OA_SYMBOL_BY_ID_REQ.value
+    PROTO_OA_SYMBOL_BY_ID_RES = ProtoOAPayloadType.PROTO_OA_SYMBOL_BY_ID_RES.value
+    PROTO_OA_VERSION_REQ = ProtoOAPayloadType.PROTO_OA_VERSION_REQ.value
+    PROTO_OA_VERSION_RES = ProtoOAPayloadType.PROTO_OA_VERSION_RES.value
 
     # Application and Account Authentication
-    PROTO_OA_APPLICATION_AUTH_REQ = 2100
-    PROTO_OA_APPLICATION_AUTH_RES = 2101
-    PROTO_OA_ACCOUNT_AUTH_REQ = 2102
-    PROTO_OA_ACCOUNT_AUTH_RES = 2103
+    PROTO_OA_APPLICATION_AUTH_REQ = (
+        ProtoOAPayloadType.PROTO_OA_APPLICATION_AUTH_REQ.value
+    )
+    PROTO_OA_APPLICATION_AUTH_RES = (
+        ProtoOAPayloadType.PROTO_OA_APPLICATION_AUTH_RES.value
+    )
+    PROTO_OA_ACCOUNT_AUTH_REQ = ProtoOAPayloadType.PROTO_OA_ACCOUNT_AUTH_REQ.value
+    PROTO_OA_ACCOUNT_AUTH_RES = ProtoOAPayloadType.PROTO_OA_ACCOUNT_AUTH_RES.value
 
     # Account Listing
-    PROTO_OA_GET_ACCOUNTS_BY_ACCESS_TOKEN_REQ = 2149
-    PROTO_OA_GET_ACCOUNTS_BY_ACCESS_TOKEN_RES = 2150
+    PROTO_OA_GET_ACCOUNTS_BY_ACCESS_TOKEN_REQ = (
+        ProtoOAPayloadType.PROTO_OA_GET_ACCOUNTS_BY_ACCESS_TOKEN_REQ.value
+    )
+    PROTO_OA_GET_ACCOUNTS_BY_ACCESS_TOKEN_RES = (
+        ProtoOAPayloadType.PROTO_OA_GET_ACCOUNTS_BY_ACCESS_TOKEN_RES.value
+    )
 
     # Trading Operations
-    PROTO_OA_NEW_ORDER_REQ = 2106
-    PROTO_OA_AMEND_POSITION_SLTP_REQ = 2110
-    PROTO_OA_CLOSE_POSITION_REQ = 2111
-    PROTO_OA_ACCOUNT_DISCONNECT_EVENT = 2164
+    PROTO_OA_NEW_ORDER_REQ = ProtoOAPayloadType.PROTO_OA_NEW_ORDER_REQ.value
+    PROTO_OA_AMEND_POSITION_SLTP_REQ = (
+        ProtoOAPayloadType.PROTO_OA_AMEND_POSITION_SLTP_REQ.value
+    )
+    PROTO_OA_CLOSE_POSITION_REQ = ProtoOAPayloadType.PROTO_OA_CLOSE_POSITION_REQ.value
+    PROTO_OA_RECONCILE_REQ = ProtoOAPayloadType.PROTO_OA_RECONCILE_REQ.value
+    PROTO_OA_RECONCILE_RES = ProtoOAPayloadType.PROTO_OA_RECONCILE_RES.value
+    PROTO_OA_ACCOUNT_DISCONNECT_EVENT = (
+        ProtoOAPayloadType.PROTO_OA_ACCOUNT_DISCONNECT_EVENT.value
+    )
 
     # Trading Events
-    PROTO_OA_ORDER_ERROR_EVENT = 2132
-    PROTO_OA_EXECUTION_EVENT = 2126
+    PROTO_OA_ORDER_ERROR_EVENT = ProtoOAPayloadType.PROTO_OA_ORDER_ERROR_EVENT.value
+    PROTO_OA_EXECUTION_EVENT = ProtoOAPayloadType.PROTO_OA_EXECUTION_EVENT.value
+
+    # Market Data
+    PROTO_OA_SUBSCRIBE_SPOTS_REQ = ProtoOAPayloadType.PROTO_OA_SUBSCRIBE_SPOTS_REQ.value
+    PROTO_OA_SUBSCRIBE_SPOTS_RES = ProtoOAPayloadType.PROTO_OA_SUBSCRIBE_SPOTS_RES.value
+    PROTO_OA_UNSUBSCRIBE_SPOTS_REQ = (
+        ProtoOAPayloadType.PROTO_OA_UNSUBSCRIBE_SPOTS_REQ.value
+    )
+    PROTO_OA_UNSUBSCRIBE_SPOTS_RES = (
+        ProtoOAPayloadType.PROTO_OA_UNSUBSCRIBE_SPOTS_RES.value
+    )
+    PROTO_OA_SPOT_EVENT = ProtoOAPayloadType.PROTO_OA_SPOT_EVENT.value
+
+    # Historical Data
+    PROTO_OA_GET_TRENDBARS_REQ = ProtoOAPayloadType.PROTO_OA_GET_TRENDBARS_REQ.value
+    PROTO_OA_GET_TRENDBARS_RES = ProtoOAPayloadType.PROTO_OA_GET_TRENDBARS_RES.value
+    PROTO_OA_GET_TICKDATA_REQ = ProtoOAPayloadType.PROTO_OA_GET_TICKDATA_REQ.value
+    PROTO_OA_GET_TICKDATA_RES = ProtoOAPayloadType.PROTO_OA_GET_TICKDATA_RES.value
 
 
 class LotSize(Enum):
@@ -69,7 +126,5 @@ class TradeSide(Enum):
     SELL = "SELL"
 
 
-class ProtoOAExecutionType(Enum):
-    ACCEPTED = 2
-    FILLED = 3
-    CANCELLED = 5
+# The proto's own name for it
+TrendbarPeriod = ProtoOATrendbarPeriod
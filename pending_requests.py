@@ -0,0 +1,204 @@
+import asyncio
+import time
+
+from .models import PAYLOAD_TYPES, ProtoOAExecutionType
+
+ERROR_PAYLOAD_TYPES = (
+    PAYLOAD_TYPES.PROTO_OA_ERROR_RES,
+    PAYLOAD_TYPES.PROTO_OA_ORDER_ERROR_EVENT,
+)
+
+
+def _execution_type_name(execution_type) -> str:
+    # An order rejected, cancelled or expired comes without an error code
+    try:
+        return ProtoOAExecutionType(execution_type).name
+    except ValueError:
+        return "UNKNOWN_ERROR"
+
+
+class RequestError(Exception):
+    """Raised on a request's future when the server answers it with an error."""
+
+    def __init__(self, msg: dict):
+        payload = msg.get("payload", {})
+        self.msg = msg
+        self.error_code = payload.get("errorCode") or _execution_type_name(
+            payload.get("executionType")
+        )
+        self.description = payload.get("description", "No description available.")
+        super().__init__(f"{self.error_code} - {self.description}")
+
+
+class PendingRequest:
+    """
+    A request sent through the emitter that is waiting for its response.
+
+    Awaiting it returns the message that resolved it (a response or an
+    execution event) or raises RequestError / asyncio.TimeoutError.
+    """
+
+    __slots__ = (
+        "client_msg_id",
+        "payload_type",
+        "payload",
+        "frame",
+        "websocket",
+        "future",
+        "sent_at",
+        "received_at",
+        "until",
+        "_timeout_handle",
+        "_table",
+    )
+
+    def __init__(self, table, client_msg_id, payload_type, payload, future, until):
+        self._table = table
+        self.client_msg_id = client_msg_id
+        self.payload_type = payload_type
+        self.payload = payload
+        # The encoded request and the connection it was queued on, for failovers
+        self.frame = None
+        self.websocket = None
+        self.future = future
+        self.until = until
+        self.sent_at = time.perf_counter()
+        self.received_at = None
+        self._timeout_handle = None
+
+    def __await__(self):
+        return self.future.__await__()
+
+    @property
+    def latency(self):
+        """Seconds between sending the request and receiving its resolving message."""
+        if self.received_at is None:
+            return None
+        return self.received_at - self.sent_at
+
+    def done(self) -> bool:
+        return self.future.done()
+
+    def cancel(self) -> bool:
+        self._table.discard(self)
+        return self.future.cancel()
+
+
+class PendingRequests:
+    """
+    Table of in-flight requests keyed by clientMsgId.
+
+    The emitter registers a request right before sending it and the receiver
+    resolves it with whatever message comes back carrying the same clientMsgId.
+    """
+
+    def __init__(self, default_timeout: float = 30.0):
+        self.default_timeout = default_timeout
+        self._requests: dict[str, PendingRequest] = {}
+
+    def __len__(self):
+        return len(self._requests)
+
+    def __contains__(self, client_msg_id):
+        return client_msg_id in self._requests
+
+    def __iter__(self):
+        return iter(list(self._requests.values()))
+
+    def get(self, client_msg_id: str):
+        return self._requests.get(client_msg_id)
+
+    def register(
+        self,
+        client_msg_id: str,
+        payload_type: int,
+        payload: dict = None,
+        timeout: float = None,
+        until=None,
+    ) -> PendingRequest:
+        """
+        `until` is an optional predicate on the incoming message. Messages that
+        don't satisfy it (e.g. ORDER_ACCEPTED when waiting for ORDER_FILLED) are
+        skipped and the request stays pending. Errors always resolve it, as
+        does a predicate raising RequestError, e.g. on ORDER_REJECTED.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        # Fire-and-forget callers never await the future, don't let asyncio
+        # complain about unretrieved timeouts or errors on them.
+        future.add_done_callback(_retrieve_exception)
+        request = PendingRequest(
+            self, client_msg_id, payload_type, payload, future, until
+        )
+        timeout = self.default_timeout if timeout is None else timeout
+        if timeout:
+            request._timeout_handle = loop.call_later(
+                timeout, self._expire, client_msg_id
+            )
+        self._requests[client_msg_id] = request
+        return request
+
+    def resolve(self, msg: dict) -> bool:
+        client_msg_id = msg.get("clientMsgId")
+        if client_msg_id is None:
+            return False
+
+        request = self._requests.get(client_msg_id)
+        if request is None:
+            return False
+
+        is_error = msg.get("payloadType") in ERROR_PAYLOAD_TYPES
+        if not is_error and request.until is not None:
+            try:
+                if not request.until(msg):
+                    return True
+            except RequestError as e:
+                request.received_at = time.perf_counter()
+                self.fail(request, e)
+                return True
+
+        self.discard(request)
+        request.received_at = time.perf_counter()
+        if not request.future.done():
+            if is_error:
+                request.future.set_exception(RequestError(msg))
+            else:
+                request.future.set_result(msg)
+        return True
+
+    def discard(self, request: PendingRequest):
+        if self._requests.get(request.client_msg_id) is request:
+            del self._requests[request.client_msg_id]
+        if request._timeout_handle is not None:
+            request._timeout_handle.cancel()
+            request._timeout_handle = None
+
+    def fail(self, request: PendingRequest, exc: BaseException):
+        self.discard(request)
+        if not request.future.done():
+            request.future.set_exception(exc)
+
+    def fail_all(self, exc: BaseException):
+        requests = list(self._requests.values())
+        self._requests.clear()
+        for request in requests:
+            if request._timeout_handle is not None:
+                request._timeout_handle.cancel()
+                request._timeout_handle = None
+            if not request.future.done():
+                request.future.set_exception(exc)
+
+    def _expire(self, client_msg_id: str):
+        request = self._requests.pop(client_msg_id, None)
+        if request is None:
+            return
+        request._timeout_handle = None
+        if not request.future.done():
+            request.future.set_exception(
+                asyncio.TimeoutError(f"No response to {client_msg_id}")
+            )
+
+
+def _retrieve_exception(future: asyncio.Future):
+    if not future.cancelled():
+        future.exception()
@@ -0,0 +1,309 @@
+import numpy as np
+
+from .position_book import PositionBook, PositionRecord
+from .symbol_index import SymbolIndex
+
+# Prices are integers in 1/100000 of a unit and volumes in 1/100 of a unit, so
+# a price times a volume is exact in 1/10^7 of a currency unit. P&L and
+# exposure are computed at that scale and only rounded to moneyDigits.
+PRICE_SCALE = 100_000
+VOLUME_SCALE = 100
+FIXED_POINT_SCALE = PRICE_SCALE * VOLUME_SCALE
+FIXED_POINT_DIGITS = 7
+
+DEFAULT_CAPACITY = 256
+
+# One int64 array per position field, a row per open position
+_POSITION_COLUMNS = (
+    "position_ids",
+    "symbol_rows",
+    "account_rows",
+    "base_assets",
+    "quote_assets",
+    "signs",
+    "volumes",
+    "entries",
+    "used_margins",
+    "money_multipliers",
+    "money_divisors",
+    "fixed_pnl",
+    "pnl",
+)
+
+
+def _grown(column, capacity: int):
+    grown = np.zeros(capacity, np.int64)
+    grown[: len(column)] = column
+    return grown
+
+
+def to_money(fixed: int, money_digits: int) -> int:
+    """A 1/10^7 fixed point amount in 10^-money_digits units, rounded half up."""
+    if money_digits >= FIXED_POINT_DIGITS:
+        return fixed * 10 ** (money_digits - FIXED_POINT_DIGITS)
+    divisor = 10 ** (FIXED_POINT_DIGITS - money_digits)
+    return (fixed + divisor // 2) // divisor
+
+
+class PnlEngine:
+    """
+    Unrealized P&L, net exposure per currency and used margin of every open
+    position, recomputed in a few NumPy operations on each tick of a symbol
+    that has positions instead of looping over them in Python.
+
+    Positions are mirrored from a PositionBook into parallel int64 arrays.
+    P&L is in the symbol's quote currency, long positions being marked at the
+    bid and short ones at the ask: `(mark - entry) * volume` is exact in
+    1/10^7 of the currency, then rounded to the position's moneyDigits.
+    Converting it to the deposit currency needs rates the client doesn't
+    track, so it's left to the caller.
+
+    Exposure is the net amount of each asset the positions hold, e.g. a long
+    EURUSD position holds EUR and owes USD at the entry price.
+    """
+
+    def __init__(self, symbols: SymbolIndex = None, capacity: int = DEFAULT_CAPACITY):
+        self.symbols = symbols if symbols is not None else SymbolIndex()
+        self.count = 0
+        self._rows: dict[int, int] = {}
+        for name in _POSITION_COLUMNS:
+            setattr(self, name, np.zeros(capacity, np.int64))
+
+        # Latest prices, a row per symbol that ever had a position
+        self._symbol_rows: dict[int, int] = {}
+        self._positions_per_symbol: list[int] = []
+        self.bids = np.zeros(16, np.int64)
+        self.asks = np.zeros(16, np.int64)
+
+        # Row numbers of assets and accounts in the aggregates
+        self._asset_rows: dict = {}
+        self._asset_ids: list = []
+        self._account_rows: dict = {}
+        self._account_ids: list = []
+        self._account_money_digits: dict = {}
+
+        self.unrealized_fixed = np.zeros(0, np.int64)
+        self.exposure_fixed = np.zeros(0, np.int64)
+        self.used_margin_by_account = np.zeros(0, np.int64)
+        self._positions_changed = True
+        self.updates = 0
+        self._callbacks = []
+        self._client = None
+
+    def __len__(self):
+        return self.count
+
+    def on_update(self, callback):
+        """Calls `callback(engine)` after every recomputation."""
+        self._callbacks.append(callback)
+        return callback
+
+    def remove_update_callback(self, callback):
+        if callback in self._callbacks:
+            self._callbacks.remove(callback)
+
+    def attach(self, client):
+        """Follows a client's position book and spot ticks until `detach`."""
+        self._client = client
+        self.symbols = client.assignables.symbols
+        client.position_book.on_execution(self._on_execution)
+        client.position_book.on_reconcile(self._on_reconcile)
+        client.spot_buffers.on_tick(self.on_tick)
+        for symbol_id, row in self._symbol_rows.items():
+            self._seed_prices(symbol_id, row)
+        self.load(client.position_book)
+        return self
+
+    def detach(self):
+        client, self._client = self._client, None
+        if client is not None:
+            client.position_book.remove_execution_callback(self._on_execution)
+            client.position_book.remove_reconcile_callback(self._on_reconcile)
+            client.spot_buffers.remove_tick_callback(self.on_tick)
+
+    def load(self, position_book: PositionBook):
+        """Replaces the rows with the open positions of a book."""
+        self._rows.clear()
+        self.count = 0
+        self._positions_per_symbol = [0] * len(self._positions_per_symbol)
+        for record in position_book.positions.values():
+            self.upsert(record)
+        self.recompute()
+
+    def _on_execution(self, payload: dict):
+        position = payload.get("position")
+        if position is None:
+            return
+        position_id = position["positionId"]
+        record = self._client.position_book.position(position_id)
+        if record is None:
+            self.remove(position_id)
+        else:
+            self.upsert(record)
+        self.recompute()
+
+    def _on_reconcile(self, account_id: int):
+        self.load(self._client.position_book)
+
+    def _seed_prices(self, symbol_id: int, row: int):
+        if self._client is None:
+            return
+        latest = self._client.spot_buffers.latest(symbol_id)
+        if latest is not None:
+            self.bids[row], self.asks[row] = latest[0], latest[1]
+
+    def _symbol_row(self, symbol_id: int) -> int:
+        row = self._symbol_rows.get(symbol_id)
+        if row is None:
+            row = self._symbol_rows[symbol_id] = len(self._symbol_rows)
+            self._positions_per_symbol.append(0)
+            if row == len(self.bids):
+                self.bids = _grown(self.bids, 2 * row)
+                self.asks = _grown(self.asks, 2 * row)
+            self._seed_prices(symbol_id, row)
+        return row
+
+    def _asset_row(self, asset_id) -> int:
+        row = self._asset_rows.get(asset_id)
+        if row is None:
+            row = self._asset_rows[asset_id] = len(self._asset_ids)
+            self._asset_ids.append(asset_id)
+        return row
+
+    def _account_row(self, account_id) -> int:
+        row = self._account_rows.get(account_id)
+        if row is None:
+            row = self._account_rows[account_id] = len(self._account_ids)
+            self._account_ids.append(account_id)
+        return row
+
+    def upsert(self, record: PositionRecord):
+        """Adds or updates a position's row, removing it if it isn't open anymore."""
+        if not record.volume or record.price is None or record.side is None:
+            # Not filled yet
+            self.remove(record.position_id)
+            return
+
+        row = self._rows.get(record.position_id)
+        if row is None:
+            row = self.count
+            if row == len(self.position_ids):
+                for name in _POSITION_COLUMNS:
+                    setattr(self, name, _grown(getattr(self, name), 2 * row))
+            self._rows[record.position_id] = row
+            self.count += 1
+        else:
+            self._positions_per_symbol[self.symbol_rows[row]] -= 1
+
+        symbol_row = self._symbol_row(record.symbol_id)
+        self._positions_per_symbol[symbol_row] += 1
+        symbol = self.symbols.get(record.symbol_id)
+        money_digits = record.money_digits
+        self._account_money_digits[record.account_id] = money_digits
+
+        self.position_ids[row] = record.position_id
+        self.symbol_rows[row] = symbol_row
+        self.account_rows[row] = self._account_row(record.account_id)
+        self.base_assets[row] = self._asset_row(
+            symbol.base_asset_id if symbol is not None else None
+        )
+        self.quote_assets[row] = self._asset_row(
+            symbol.quote_asset_id if symbol is not None else None
+        )
+        self.signs[row] = 1 if record.side == 1 else -1
+        self.volumes[row] = record.volume
+        self.entries[row] = round(record.price * PRICE_SCALE)
+        self.used_margins[row] = record.used_margin or 0
+        self.money_multipliers[row] = 10 ** max(money_digits - FIXED_POINT_DIGITS, 0)
+        self.money_divisors[row] = 10 ** max(FIXED_POINT_DIGITS - money_digits, 0)
+        self._positions_changed = True
+
+    def remove(self, position_id: int):
+        row = self._rows.pop(position_id, None)
+        if row is None:
+            return
+        self._positions_per_symbol[self.symbol_rows[row]] -= 1
+        last = self.count - 1
+        if row != last:
+            # The last row fills the gap, so rows stay contiguous
+            for name in _POSITION_COLUMNS:
+                column = getattr(self, name)
+                column[row] = column[last]
+            self._rows[int(self.position_ids[row])] = row
+        self.count = last
+        self._positions_changed = True
+
+    def on_tick(self, symbol_id: int, bid: int, ask: int, timestamp: int = None):
+        row = self._symbol_rows.get(symbol_id)
+        if row is None:
+            return
+        self.bids[row] = bid
+        self.asks[row] = ask
+        if self._positions_per_symbol[row]:
+            self.recompute()
+
+    def recompute(self):
+        n = self.count
+        signs = self.signs[:n]
+        symbol_rows = self.symbol_rows[:n]
+        marks = np.where(signs > 0, self.bids[symbol_rows], self.asks[symbol_rows])
+        fixed_pnl = self.fixed_pnl[:n]
+        np.multiply(marks - self.entries[:n], signs * self.volumes[:n], out=fixed_pnl)
+        # No price yet
+        fixed_pnl[marks == 0] = 0
+
+        divisors = self.money_divisors[:n]
+        np.floor_divide(
+            fixed_pnl * self.money_multipliers[:n] + divisors // 2,
+            divisors,
+            out=self.pnl[:n],
+        )
+
+        quote_assets = self.quote_assets[:n]
+        assets = len(self._asset_ids)
+        self.unrealized_fixed = np.zeros(assets, np.int64)
+        np.add.at(self.unrealized_fixed, quote_assets, fixed_pnl)
+
+        # Exposure and margin only move with the positions
+        if self._positions_changed:
+            self._positions_changed = False
+            signed_volumes = signs * self.volumes[:n]
+            exposure = np.zeros(assets, np.int64)
+            np.add.at(exposure, self.base_assets[:n], signed_volumes * PRICE_SCALE)
+            np.add.at(exposure, quote_assets, -signed_volumes * self.entries[:n])
+            self.exposure_fixed = exposure
+            margins = np.zeros(len(self._account_ids), np.int64)
+            np.add.at(margins, self.account_rows[:n], self.used_margins[:n])
+            self.used_margin_by_account = margins
+
+        self.updates += 1
+        for callback in self._callbacks:
+            callback(self)
+
+    def position_pnl(self, position_id: int) -> int:
+        """Unrealized P&L of a position in its quote currency, in 10^-moneyDigits units."""
+        row = self._rows.get(position_id)
+        return int(self.pnl[row]) if row is not None else None
+
+    def unrealized(self, money_digits: int = 2) -> dict:
+        """Unrealized P&L per quote asset id, in 10^-money_digits units."""
+        return {
+            asset_id: to_money(int(fixed), money_digits)
+            for asset_id, fixed in zip(self._asset_ids, self.unrealized_fixed)
+            if fixed and asset_id is not None
+        }
+
+    def exposure(self, money_digits: int = 2) -> dict:
+        """Net amount held per asset id, in 10^-money_digits units."""
+        return {
+            asset_id: to_money(int(fixed), money_digits)
+            for asset_id, fixed in zip(self._asset_ids, self.exposure_fixed)
+            if fixed and asset_id is not None
+        }
+
+    def used_margin(self, account_id: int) -> int:
+        """Margin used by an account's positions, in 10^-moneyDigits of its deposit currency."""
+        row = self._account_rows.get(account_id)
+        if row is None or row >= len(self.used_margin_by_account):
+            return 0
+        return int(self.used_margin_by_account[row])
@@ -0,0 +1,339 @@
+from .models import ProtoOAOrderStatus, ProtoOAPositionStatus
+
+# Trade sides arrive as enum numbers, but accept names too
+TRADE_SIDES = {"BUY": 1, "SELL": 2, 1: 1, 2: 2}
+
+
+class PositionRecord:
+    __slots__ = (
+        "position_id",
+        "account_id",
+        "symbol_id",
+        "side",
+        "volume",
+        "status",
+        "price",
+        "stop_loss",
+        "take_profit",
+        "swap",
+        "commission",
+        "used_margin",
+        "money_digits",
+        "open_timestamp",
+        "updated_at",
+    )
+
+    def __init__(self, position_id: int, account_id: int = None):
+        self.position_id = position_id
+        self.account_id = account_id
+        self.symbol_id = None
+        self.side = None
+        self.volume = 0
+        self.status = None
+        self.price = None
+        self.stop_loss = None
+        self.take_profit = None
+        self.swap = 0
+        self.commission = 0
+        self.used_margin = 0
+        self.money_digits = 2
+        self.open_timestamp = None
+        self.updated_at = None
+
+    def update(self, position: dict):
+        trade_data = position.get("tradeData", {})
+        self.symbol_id = trade_data.get("symbolId", self.symbol_id)
+        self.side = TRADE_SIDES.get(trade_data.get("tradeSide"), self.side)
+        self.volume = trade_data.get("volume", self.volume)
+        self.open_timestamp = trade_data.get("openTimestamp", self.open_timestamp)
+        self.status = position.get("positionStatus", self.status)
+        self.price = position.get("price", self.price)
+        self.stop_loss = position.get("stopLoss")
+        self.take_profit = position.get("takeProfit")
+        self.swap = position.get("swap", self.swap)
+        self.commission = position.get("commission", self.commission)
+        self.used_margin = position.get("usedMargin", self.used_margin)
+        self.money_digits = position.get("moneyDigits", self.money_digits)
+        self.updated_at = position.get("utcLastUpdateTimestamp", self.updated_at)
+
+    def to_dict(self) -> dict:
+        """The record as a ProtoOAPosition payload, which `update` reads back."""
+        return {
+            "positionId": self.position_id,
+            "tradeData": {
+                "symbolId": self.symbol_id,
+                "volume": self.volume,
+                "tradeSide": self.side,
+                "openTimestamp": self.open_timestamp,
+            },
+            "positionStatus": self.status,
+            "price": self.price,
+            "stopLoss": self.stop_loss,
+            "takeProfit": self.take_profit,
+            "swap": self.swap,
+            "commission": self.commission,
+            "usedMargin": self.used_margin,
+            "moneyDigits": self.money_digits,
+            "utcLastUpdateTimestamp": self.updated_at,
+        }
+
+    def __repr__(self):
+        return (
+            f"PositionRecord({self.position_id}, symbol={self.symbol_id}, "
+            f"side={self.side}, volume={self.volume}, status={self.status})"
+        )
+
+
+class OrderRecord:
+    __slots__ = (
+        "order_id",
+        "account_id",
+        "position_id",
+        "symbol_id",
+        "side",
+        "volume",
+        "order_type",
+        "status",
+        "executed_volume",
+        "execution_price",
+        "limit_price",
+        "stop_price",
+        "client_order_id",
+        "updated_at",
+    )
+
+    def __init__(self, order_id: int, account_id: int = None):
+        self.order_id = order_id
+        self.account_id = account_id
+        self.position_id = None
+        self.symbol_id = None
+        self.side = None
+        self.volume = 0
+        self.order_type = None
+        self.status = None
+        self.executed_volume = 0
+        self.execution_price = None
+        self.limit_price = None
+        self.stop_price = None
+        self.client_order_id = None
+        self.updated_at = None
+
+    def update(self, order: dict):
+        trade_data = order.get("tradeData", {})
+        self.symbol_id = trade_data.get("symbolId", self.symbol_id)
+        self.side = TRADE_SIDES.get(trade_data.get("tradeSide"), self.side)
+        self.volume = trade_data.get("volume", self.volume)
+        self.position_id = order.get("positionId", self.position_id)
+        self.order_type = order.get("orderType", self.order_type)
+        self.status = order.get("orderStatus", self.status)
+        self.executed_volume = order.get("executedVolume", self.executed_volume)
+        self.execution_price = order.get("executionPrice", self.execution_price)
+        self.limit_price = order.get("limitPrice", self.limit_price)
+        self.stop_price = order.get("stopPrice", self.stop_price)
+        self.client_order_id = order.get("clientOrderId", self.client_order_id)
+        self.updated_at = order.get("utcLastUpdateTimestamp", self.updated_at)
+
+    def to_dict(self) -> dict:
+        """The record as a ProtoOAOrder payload, which `update` reads back."""
+        return {
+            "orderId": self.order_id,
+            "tradeData": {
+                "symbolId": self.symbol_id,
+                "volume": self.volume,
+                "tradeSide": self.side,
+            },
+            "positionId": self.position_id,
+            "orderType": self.order_type,
+            "orderStatus": self.status,
+            "executedVolume": self.executed_volume,
+            "executionPrice": self.execution_price,
+            "limitPrice": self.limit_price,
+            "stopPrice": self.stop_price,
+            "clientOrderId": self.client_order_id,
+            "utcLastUpdateTimestamp": self.updated_at,
+        }
+
+    def __repr__(self):
+        return (
+            f"OrderRecord({self.order_id}, position={self.position_id}, "
+            f"symbol={self.symbol_id}, status={self.status})"
+        )
+
+
+def _index_add(index: dict, key, item_id):
+    ids = index.get(key)
+    if ids is None:
+        ids = index[key] = set()
+    ids.add(item_id)
+
+
+def _index_discard(index: dict, key, item_id):
+    ids = index.get(key)
+    if ids is not None:
+        ids.discard(item_id)
+        if not ids:
+            del index[key]
+
+
+class PositionBook:
+    """
+    Open positions and working orders kept up to date from execution events.
+
+    Records are keyed by id and indexed by symbolId, side and status, so every
+    lookup is a dict hit. Closed positions and finished orders leave the book.
+    """
+
+    def __init__(self):
+        self.positions: dict[int, PositionRecord] = {}
+        self.orders: dict[int, OrderRecord] = {}
+        self.positions_by_symbol: dict = {}
+        self.positions_by_side: dict = {}
+        self.positions_by_status: dict = {}
+        self.orders_by_symbol: dict = {}
+        self.orders_by_position: dict = {}
+        self._callbacks = []
+        self._reconcile_callbacks = []
+
+    def __len__(self):
+        return len(self.positions)
+
+    def position(self, position_id: int) -> PositionRecord:
+        return self.positions.get(position_id)
+
+    def order(self, order_id: int) -> OrderRecord:
+        return self.orders.get(order_id)
+
+    def position_ids(self, symbol_id: int = None, side=None, status=None) -> set:
+        """Ids of the positions matching every given filter."""
+        filters = []
+        if symbol_id is not None:
+            filters.append(self.positions_by_symbol.get(symbol_id, ()))
+        if side is not None:
+            side = TRADE_SIDES.get(getattr(side, "value", side), side)
+            filters.append(self.positions_by_side.get(side, ()))
+        if status is not None:
+            filters.append(
+                self.positions_by_status.get(getattr(status, "value", status), ())
+            )
+        if not filters:
+            return set(self.positions)
+
+        filters.sort(key=len)
+        return set(filters[0]).intersection(*filters[1:])
+
+    def find_positions(self, symbol_id: int = None, side=None, status=None):
+        return [
+            self.positions[position_id]
+            for position_id in self.position_ids(symbol_id, side, status)
+        ]
+
+    def on_execution(self, callback):
+        """Calls `callback(payload)` with every execution event, once the book is updated."""
+        self._callbacks.append(callback)
+        return callback
+
+    def remove_execution_callback(self, callback):
+        if callback in self._callbacks:
+            self._callbacks.remove(callback)
+
+    def on_reconcile(self, callback):
+        """Calls `callback(account_id)` once an account's records were replaced."""
+        self._reconcile_callbacks.append(callback)
+        return callback
+
+    def remove_reconcile_callback(self, callback):
+        if callback in self._reconcile_callbacks:
+            self._reconcile_callbacks.remove(callback)
+
+    def apply_execution(self, payload: dict):
+        account_id = payload.get("ctidTraderAccountId")
+        position = payload.get("position")
+        if position is not None:
+            self._apply_position(position, account_id)
+        order = payload.get("order")
+        if order is not None:
+            self._apply_order(order, account_id)
+        for callback in self._callbacks:
+            callback(payload)
+
+    def reconcile(self, payload: dict):
+        """Replaces an account's records with those of a ProtoOAReconcileRes."""
+        account_id = payload.get("ctidTraderAccountId")
+        for record in list(self.positions.values()):
+            if record.account_id == account_id:
+                self._remove_position(record)
+        for record in list(self.orders.values()):
+            if record.account_id == account_id:
+                self._remove_order(record)
+
+        for position in payload.get("position", []):
+            self._apply_position(position, account_id)
+        for order in payload.get("order", []):
+            self._apply_order(order, account_id)
+        for callback in self._reconcile_callbacks:
+            callback(account_id)
+
+    def snapshot(self) -> list:
+        """The book as one ProtoOAReconcileRes payload per account, see `reconcile`."""
+        accounts = {}
+        for record in self.positions.values():
+            accounts.setdefault(record.account_id, ([], []))[0].append(record.to_dict())
+        for record in self.orders.values():
+            accounts.setdefault(record.account_id, ([], []))[1].append(record.to_dict())
+        return [
+            {"ctidTraderAccountId": account_id, "position": positions, "order": orders}
+            for account_id, (positions, orders) in accounts.items()
+        ]
+
+    def _apply_position(self, position: dict, account_id: int):
+        position_id = position["positionId"]
+        record = self.positions.get(position_id)
+        if record is not None:
+            self._unindex_position(record)
+        else:
+            record = PositionRecord(position_id, account_id)
+
+        record.update(position)
+        if record.status == ProtoOAPositionStatus.POSITION_STATUS_CLOSED.value:
+            self.positions.pop(position_id, None)
+            return
+
+        self.positions[position_id] = record
+        _index_add(self.positions_by_symbol, record.symbol_id, position_id)
+        _index_add(self.positions_by_side, record.side, position_id)
+        _index_add(self.positions_by_status, record.status, position_id)
+
+    def _apply_order(self, order: dict, account_id: int):
+        order_id = order["orderId"]
+        record = self.orders.get(order_id)
+        if record is not None:
+            self._unindex_order(record)
+        else:
+            record = OrderRecord(order_id, account_id)
+
+        record.update(order)
+        if record.status != ProtoOAOrderStatus.ORDER_STATUS_ACCEPTED.value:
+            self.orders.pop(order_id, None)
+            return
+
+        self.orders[order_id] = record
+        _index_add(self.orders_by_symbol, record.symbol_id, order_id)
+        _index_add(self.orders_by_position, record.position_id, order_id)
+
+    def _unindex_position(self, record: PositionRecord):
+        position_id = record.position_id
+        _index_discard(self.positions_by_symbol, record.symbol_id, position_id)
+        _index_discard(self.positions_by_side, record.side, position_id)
+        _index_discard(self.positions_by_status, record.status, position_id)
+
+    def _remove_position(self, record: PositionRecord):
+        self._unindex_position(record)
+        del self.positions[record.position_id]
+
+    def _unindex_order(self, record: OrderRecord):
+        _index_discard(self.orders_by_symbol, record.symbol_id, record.order_id)
+        _index_discard(self.orders_by_position, record.position_id, record.order_id)
+
+    def _remove_order(self, record: OrderRecord):
+        self._unindex_order(record)
+        del self.orders[record.order_id]
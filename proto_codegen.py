@@ -0,0 +1,244 @@
+"""
+Generates `messages.py` from `messages.proto`: an IntEnum per proto enum and a
+slotted class per message, with `from_dict`/`to_dict` written out field by
+field. Run it again after changing the proto:
+
+    python -m <package>.proto_codegen [--check]
+
+`--check` only reports whether `messages.py` is up to date.
+"""
+
+import os
+import sys
+
+from .proto_schema import PROTO_PATH, ProtoSchema, load_schema
+
+MESSAGES_PATH = os.path.join(os.path.dirname(PROTO_PATH), "messages.py")
+
+# The output is kept as black formats it, so regenerating it leaves no diff
+LINE_LENGTH = 88
+
+HEADER = '''"""
+Enums and message classes of messages.proto.
+
+Generated by proto_codegen.py, do not edit.
+"""
+
+from enum import IntEnum
+
+
+def _lookup(enum) -> dict:
+    """Members by name and by number, enums arrive as either depending on the codec."""
+    table = dict(enum.__members__)
+    table.update((member.value, member) for member in enum)
+    return table
+
+
+class Message:
+    """
+    Base of the generated message classes.
+
+    `from_dict` takes a decoded payload, as either codec produces it, turning
+    nested messages into their classes and enum values into IntEnum members
+    (unknown values are kept as they are). `to_dict` returns the payload to
+    send, with only the fields that are set and enums by name.
+    """
+
+    __slots__ = ()
+    PAYLOAD_TYPE = None
+
+    def __eq__(self, other):
+        return type(other) is type(self) and self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        fields = ", ".join(f"{key}={value!r}" for key, value in self.to_dict().items())
+        return f"{type(self).__name__}({fields})"
+'''
+
+
+def _assign(indent: str, target: str, value: str) -> list:
+    """An assignment, wrapped in parentheses the way black does when it's too long."""
+    line = f"{indent}{target} = {value}"
+    if len(line) <= LINE_LENGTH:
+        return [line]
+    return [f"{indent}{target} = (", f"{indent}    {value}", f"{indent})"]
+
+
+def _enum_source(enum) -> list:
+    lines = ["", "", f"class {enum.name}(IntEnum):"]
+    lines += [f"    {name} = {number}" for name, number in enum.values.items()]
+    lines += ["", "", f"_{enum.name} = _lookup({enum.name})"]
+    return lines
+
+
+def _from_dict_source(field, schema: ProtoSchema) -> list:
+    name = field.name
+    if field.type_name in schema.messages:
+        cls = field.type_name
+        if field.repeated:
+            return [f'        v = get("{name}")'] + _assign(
+                "        ",
+                f"self.{name}",
+                f"[{cls}.from_dict(i) for i in v] if v else []",
+            )
+        return [
+            f'        v = get("{name}")',
+            "        if v is not None:",
+            f"            v = {cls}.from_dict(v)",
+            f"        self.{name} = v",
+        ]
+    if field.type_name in schema.enums:
+        table = f"_{field.type_name}"
+        if field.repeated:
+            return [f'        v = get("{name}")'] + _assign(
+                "        ",
+                f"self.{name}",
+                f"[{table}.get(i, i) for i in v] if v else []",
+            )
+        return [
+            f'        v = get("{name}")',
+            f"        self.{name} = {table}.get(v, v)",
+        ]
+    if field.repeated:
+        return [f'        self.{name} = get("{name}") or []']
+    return [f'        self.{name} = get("{name}")']
+
+
+def _to_dict_source(field, schema: ProtoSchema) -> list:
+    name = field.name
+    if field.repeated:
+        if field.type_name in schema.messages:
+            value = f"[i.to_dict() for i in self.{name}]"
+        elif field.type_name in schema.enums:
+            value = f"[i.name if isinstance(i, IntEnum) else i for i in self.{name}]"
+        else:
+            value = f"list(self.{name})"
+        return [f"        if self.{name}:"] + _assign(
+            "            ", f'd["{name}"]', value
+        )
+
+    lines = [f"        v = self.{name}", "        if v is not None:"]
+    if field.type_name in schema.messages:
+        lines.append(f'            d["{name}"] = v.to_dict()')
+    elif field.type_name in schema.enums:
+        lines.append(
+            f'            d["{name}"] = v.name if isinstance(v, IntEnum) else v'
+        )
+    else:
+        lines.append(f'            d["{name}"] = v')
+    return lines
+
+
+def _payload_type(message, schema: ProtoSchema):
+    field = message.by_name.get("payloadType")
+    if field is None or field.default is None:
+        return None
+    enum = schema.enums.get(field.type_name)
+    if enum is None or field.default not in enum.values:
+        return None
+    return f"{enum.name}.{field.default}"
+
+
+def _message_source(message, schema: ProtoSchema) -> list:
+    # The payloadType is the envelope's, not part of the payload
+    fields = [field for field in message.fields if field.name != "payloadType"]
+    lines = ["", "", f"class {message.name}(Message):"]
+    if len(fields) == 1:
+        lines.append(f'    __slots__ = ("{fields[0].name}",)')
+    elif fields:
+        lines.append("    __slots__ = (")
+        lines += [f'        "{field.name}",' for field in fields]
+        lines.append("    )")
+    else:
+        lines.append("    __slots__ = ()")
+    payload_type = _payload_type(message, schema)
+    if payload_type is not None:
+        lines.append(f"    PAYLOAD_TYPE = {payload_type}")
+
+    if fields:
+        lines += ["", "    def __init__(", "        self,"]
+        lines += [f"        {field.name}=None," for field in fields]
+        lines.append("    ):")
+        for field in fields:
+            if field.repeated:
+                lines += _assign(
+                    "        ",
+                    f"self.{field.name}",
+                    f"[] if {field.name} is None else {field.name}",
+                )
+            else:
+                lines.append(f"        self.{field.name} = {field.name}")
+
+    lines += [
+        "",
+        "    @classmethod",
+        f'    def from_dict(cls, d: dict) -> "{message.name}":',
+        "        self = cls.__new__(cls)",
+    ]
+    if fields:
+        lines.append("        get = d.get")
+    for field in fields:
+        lines += _from_dict_source(field, schema)
+    lines.append("        return self")
+
+    lines += ["", "    def to_dict(self) -> dict:", "        d = {}"]
+    for field in fields:
+        lines += _to_dict_source(field, schema)
+    lines.append("        return d")
+    return lines
+
+
+def generate(schema: ProtoSchema) -> str:
+    undefined = schema.undefined_types()
+    if undefined:
+        raise ValueError(
+            f"Undefined types in the proto: {', '.join(sorted(undefined))}"
+        )
+
+    lines = HEADER.rstrip("\n").split("\n")
+    for enum in schema.enums.values():
+        lines += _enum_source(enum)
+    for message in schema.messages.values():
+        lines += _message_source(message, schema)
+
+    lines += ["", "", "MESSAGES_BY_PAYLOAD_TYPE = {"]
+    for message in schema.messages.values():
+        payload_type = _payload_type(message, schema)
+        if payload_type is not None:
+            lines.append(f"    {payload_type}.value: {message.name},")
+    lines.append("}")
+    lines += [
+        "",
+        "",
+        "def from_payload(payload_type: int, payload: dict) -> Message:",
+        '    """The message class instance for a decoded payload, None for unknown types."""',
+        "    cls = MESSAGES_BY_PAYLOAD_TYPE.get(payload_type)",
+        "    return None if cls is None else cls.from_dict(payload)",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    source = generate(load_schema(PROTO_PATH))
+    try:
+        with open(MESSAGES_PATH, encoding="utf8") as f:
+            current = f.read()
+    except FileNotFoundError:
+        current = None
+
+    if "--check" in argv:
+        if current != source:
+            print(f"{MESSAGES_PATH} is out of date, run proto_codegen.")
+            return 1
+        return 0
+
+    if current != source:
+        with open(MESSAGES_PATH, "w", encoding="utf8") as f:
+            f.write(source)
+        print(f"Wrote {MESSAGES_PATH}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+import os
+import re
+from functools import lru_cache
+
+PROTO_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "messages.proto")
+
+SCALAR_TYPES = frozenset(
+    (
+        "double",
+        "float",
+        "int32",
+        "int64",
+        "uint32",
+        "uint64",
+        "sint32",
+        "sint64",
+        "fixed32",
+        "fixed64",
+        "sfixed32",
+        "sfixed64",
+        "bool",
+        "string",
+        "bytes",
+    )
+)
+
+_COMMENTS = re.compile(r"//[^\n]*|/\*.*?\*/", re.S)
+_BLOCK = re.compile(r"\b(message|enum)\s+(\w+)\s*\{(.*?)\}", re.S)
+_FIELD = re.compile(
+    r"(optional|required|repeated)\s+([\w.]+)\s+(\w+)\s*=\s*(\d+)\s*(?:\[(.*?)\])?\s*;",
+    re.S,
+)
+_ENUM_VALUE = re.compile(r"(\w+)\s*=\s*(-?\d+)\s*;")
+_DEFAULT = re.compile(r"default\s*=\s*([\w.\-\"]+)")
+
+
+class ProtoField:
+    __slots__ = ("name", "number", "type_name", "label", "default")
+
+    def __init__(self, name, number, type_name, label, default=None):
+        self.name = name
+        self.number = number
+        self.type_name = type_name
+        self.label = label
+        self.default = default
+
+    @property
+    def repeated(self) -> bool:
+        return self.label == "repeated"
+
+    def __repr__(self):
+        return f"ProtoField({self.label} {self.type_name} {self.name} = {self.number})"
+
+
+class ProtoMessageType:
+    __slots__ = ("name", "fields", "by_name", "by_number")
+
+    def __init__(self, name: str, fields):
+        self.name = name
+        self.fields = fields
+        self.by_name = {field.name: field for field in fields}
+        self.by_number = {field.number: field for field in fields}
+
+
+class ProtoEnum:
+    __slots__ = ("name", "values", "names")
+
+    def __init__(self, name: str, values: dict):
+        self.name = name
+        self.values = values
+        self.names = {number: value_name for value_name, number in values.items()}
+
+
+class ProtoSchema:
+    """
+    The messages and enums of a proto2 file, and which message each payloadType
+    number stands for (taken from the default of its `payloadType` field).
+    """
+
+    def __init__(self, messages: dict, enums: dict):
+        self.messages = messages
+        self.enums = enums
+        self.message_for_payload_type: dict[int, ProtoMessageType] = {}
+        for message in messages.values():
+            field = message.by_name.get("payloadType")
+            if field is None or field.default is None or field.type_name not in enums:
+                continue
+            payload_type = enums[field.type_name].values.get(field.default)
+            if payload_type is not None:
+                self.message_for_payload_type[payload_type] = message
+
+    def undefined_types(self) -> set:
+        """Field types referenced somewhere but defined nowhere."""
+        return {
+            field.type_name
+            for message in self.messages.values()
+            for field in message.fields
+            if field.type_name not in SCALAR_TYPES
+            and field.type_name not in self.messages
+            and field.type_name not in self.enums
+        }
+
+
+def parse_proto(text: str) -> ProtoSchema:
+    """
+    Parses the flat proto2 files the Open API ships: top-level messages and
+    enums, no nesting, no imports, no oneofs.
+    """
+    messages = {}
+    enums = {}
+    for kind, name, body in _BLOCK.findall(_COMMENTS.sub("", text)):
+        if kind == "enum":
+            enums[name] = ProtoEnum(
+                name, {key: int(value) for key, value in _ENUM_VALUE.findall(body)}
+            )
+            continue
+
+        fields = []
+        for label, type_name, field_name, number, options in _FIELD.findall(body):
+            default = _DEFAULT.search(options) if options else None
+            fields.append(
+                ProtoField(
+                    field_name,
+                    int(number),
+                    type_name,
+                    label,
+                    default.group(1) if default else None,
+                )
+            )
+        messages[name] = ProtoMessageType(name, fields)
+    return ProtoSchema(messages, enums)
+
+
+@lru_cache(maxsize=None)
+def load_schema(path: str = PROTO_PATH) -> ProtoSchema:
+    with open(path, encoding="utf8") as f:
+        return parse_proto(f.read())
@@ -0,0 +1,551 @@
+import struct
+from enum import Enum
+
+from .proto_schema import SCALAR_TYPES, ProtoSchema, load_schema
+
+try:
+    from google.protobuf import descriptor_pb2, descriptor_pool, message_factory
+    from google.protobuf.internal import api_implementation
+    from google.protobuf.message import DecodeError as UpbDecodeError
+except ImportError:  # pragma: no cover - optional speedup
+    descriptor_pb2 = None
+
+# How each field type is read from and written to the wire
+_INT = 0  # int32, int64 and enums: varint, two's complement when negative
+_UINT = 1  # uint32, uint64: varint
+_BOOL = 2
+_SINT = 3  # sint32, sint64: zigzag varint
+_DOUBLE = 4
+_FLOAT = 5
+_FIXED32 = 6
+_FIXED64 = 7
+_SFIXED32 = 8
+_SFIXED64 = 9
+_STRING = 10
+_BYTES = 11
+_MESSAGE = 12
+_PACKED = 13  # repeated scalars sent as one length-delimited field
+
+_SCALAR_KINDS = {
+    "int32": _INT,
+    "int64": _INT,
+    "uint32": _UINT,
+    "uint64": _UINT,
+    "bool": _BOOL,
+    "sint32": _SINT,
+    "sint64": _SINT,
+    "double": _DOUBLE,
+    "float": _FLOAT,
+    "fixed32": _FIXED32,
+    "fixed64": _FIXED64,
+    "sfixed32": _SFIXED32,
+    "sfixed64": _SFIXED64,
+    "string": _STRING,
+    "bytes": _BYTES,
+}
+
+_WIRE_TYPES = {
+    _INT: 0,
+    _UINT: 0,
+    _BOOL: 0,
+    _SINT: 0,
+    _DOUBLE: 1,
+    _FIXED64: 1,
+    _SFIXED64: 1,
+    _FLOAT: 5,
+    _FIXED32: 5,
+    _SFIXED32: 5,
+    _STRING: 2,
+    _BYTES: 2,
+    _MESSAGE: 2,
+}
+
+_FIXED_FORMATS = {
+    _DOUBLE: struct.Struct("<d"),
+    _FLOAT: struct.Struct("<f"),
+    _FIXED32: struct.Struct("<I"),
+    _FIXED64: struct.Struct("<Q"),
+    _SFIXED32: struct.Struct("<i"),
+    _SFIXED64: struct.Struct("<q"),
+}
+
+_ENVELOPE_PAYLOAD_TYPE_TAG = 0x08
+_ENVELOPE_PAYLOAD_TAG = 0x12
+_ENVELOPE_CLIENT_MSG_ID_TAG = 0x1A
+
+
+class ProtobufDecodeError(ValueError):
+    pass
+
+
+class ProtobufEncodeError(ValueError):
+    pass
+
+
+class StaticPayload(dict):
+    """A payload whose encoding is cached, see `ProtobufCodec.encode_static`."""
+
+    __slots__ = ("key",)
+
+
+def _write_varint(out: bytearray, value: int):
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(buf, pos: int):
+    result = 0
+    shift = 0
+    while True:
+        byte = buf[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+        if shift > 63:
+            raise ProtobufDecodeError("Varint is too long.")
+
+
+def _skip_field(buf, pos: int, wire_type: int) -> int:
+    if wire_type == 0:
+        return _read_varint(buf, pos)[1]
+    if wire_type == 1:
+        return pos + 8
+    if wire_type == 2:
+        length, pos = _read_varint(buf, pos)
+        return pos + length
+    if wire_type == 5:
+        return pos + 4
+    raise ProtobufDecodeError(f"Unsupported wire type {wire_type}.")
+
+
+def _decode_message(buf, pos: int, end: int, table: dict) -> dict:
+    result = {}
+    while pos < end:
+        tag = buf[pos]
+        pos += 1
+        if tag > 0x7F:
+            tag, pos = _read_varint(buf, pos - 1)
+
+        field = table.get(tag)
+        if field is None:
+            pos = _skip_field(buf, pos, tag & 7)
+            continue
+
+        name, kind, repeated, sub_table = field
+        if kind <= _SINT:
+            value = buf[pos]
+            pos += 1
+            if value > 0x7F:
+                value, pos = _read_varint(buf, pos - 1)
+            if kind == _INT:
+                if value > 0x7FFFFFFFFFFFFFFF:
+                    value -= 1 << 64
+            elif kind == _BOOL:
+                value = value != 0
+            elif kind == _SINT:
+                value = (value >> 1) ^ -(value & 1)
+        elif _STRING <= kind <= _MESSAGE:
+            length = buf[pos]
+            pos += 1
+            if length > 0x7F:
+                length, pos = _read_varint(buf, pos - 1)
+            if kind == _MESSAGE:
+                value = _decode_message(buf, pos, pos + length, sub_table)
+            elif kind == _STRING:
+                value = buf[pos : pos + length].decode()
+            else:
+                value = bytes(buf[pos : pos + length])
+            pos += length
+        elif kind == _PACKED:
+            # `sub_table` holds the element kind
+            value, pos = _decode_packed(buf, pos, sub_table)
+            result.setdefault(name, []).extend(value)
+            continue
+        else:
+            fmt = _FIXED_FORMATS[kind]
+            value = fmt.unpack_from(buf, pos)[0]
+            pos += fmt.size
+
+        if repeated:
+            values = result.get(name)
+            if values is None:
+                result[name] = [value]
+            else:
+                values.append(value)
+        else:
+            result[name] = value
+
+    if pos != end:
+        raise ProtobufDecodeError("Truncated message.")
+    return result
+
+
+def _decode_packed(buf, pos: int, kind: int):
+    length, pos = _read_varint(buf, pos)
+    end = pos + length
+    values = []
+    if kind in _FIXED_FORMATS:
+        fmt = _FIXED_FORMATS[kind]
+        values.extend(value for (value,) in fmt.iter_unpack(buf[pos:end]))
+        return values, end
+
+    while pos < end:
+        value, pos = _read_varint(buf, pos)
+        if kind == _INT and value > 0x7FFFFFFFFFFFFFFF:
+            value -= 1 << 64
+        elif kind == _BOOL:
+            value = value != 0
+        elif kind == _SINT:
+            value = (value >> 1) ^ -(value & 1)
+        values.append(value)
+    return values, pos
+
+
+def _encode_message(payload: dict, table: dict, message_name: str) -> bytes:
+    out = bytearray()
+    for name, value in payload.items():
+        if value is None:
+            continue
+        field = table.get(name)
+        if field is None:
+            raise ProtobufEncodeError(f"{message_name} has no field {name!r}.")
+
+        tag, kind, repeated, sub, enum_values = field
+        for item in value if repeated else (value,):
+            out += tag
+            if kind <= _SINT:
+                if enum_values is not None:
+                    item = _enum_number(item, enum_values, name)
+                item = int(item)
+                if kind == _SINT:
+                    item = (item << 1) ^ (item >> 63)
+                elif item < 0:
+                    item += 1 << 64
+                _write_varint(out, item)
+            elif kind == _MESSAGE:
+                encoded = _encode_message(item, sub[0], sub[1])
+                _write_varint(out, len(encoded))
+                out += encoded
+            elif kind == _STRING:
+                encoded = item.encode()
+                _write_varint(out, len(encoded))
+                out += encoded
+            elif kind == _BYTES:
+                _write_varint(out, len(item))
+                out += item
+            else:
+                out += _FIXED_FORMATS[kind].pack(item)
+    return bytes(out)
+
+
+def _enum_number(value, enum_values: dict, field_name: str) -> int:
+    if isinstance(value, Enum):
+        value = value.value
+    if isinstance(value, str):
+        try:
+            return enum_values[value]
+        except KeyError:
+            raise ProtobufEncodeError(
+                f"{value!r} is not a valid value of {field_name}."
+            ) from None
+    return value
+
+
+def upb_available() -> bool:
+    """Whether google.protobuf is installed with its C (upb) implementation."""
+    return (
+        descriptor_pb2 is not None
+        and api_implementation.Type() == "upb"
+        and hasattr(message_factory, "GetMessageClass")
+    )
+
+
+def _file_descriptor(schema: ProtoSchema) -> "descriptor_pb2.FileDescriptorProto":
+    field_proto = descriptor_pb2.FieldDescriptorProto
+    file = descriptor_pb2.FileDescriptorProto(
+        name="open_api_messages.proto", syntax="proto2"
+    )
+    for enum in schema.enums.values():
+        enum_type = file.enum_type.add(name=enum.name)
+        for value_name, number in enum.values.items():
+            enum_type.value.add(name=value_name, number=number)
+
+    for message in schema.messages.values():
+        message_type = file.message_type.add(name=message.name)
+        for field in message.fields:
+            proto_field = message_type.field.add(
+                name=field.name,
+                number=field.number,
+                label=getattr(field_proto, "LABEL_" + field.label.upper()),
+            )
+            if field.type_name in SCALAR_TYPES:
+                proto_field.type = getattr(
+                    field_proto, "TYPE_" + field.type_name.upper()
+                )
+            else:
+                proto_field.type = (
+                    field_proto.TYPE_ENUM
+                    if field.type_name in schema.enums
+                    else field_proto.TYPE_MESSAGE
+                )
+                proto_field.type_name = "." + field.type_name
+            if field.default is not None:
+                proto_field.default_value = field.default.strip('"')
+    return file
+
+
+# How _upb_to_dict copies a field of a upb message
+_UPB_SCALAR = 0
+_UPB_REPEATED = 1
+_UPB_MESSAGE = 2
+_UPB_REPEATED_MESSAGE = 3
+
+
+def _upb_to_dict(message, fields: list) -> dict:
+    result = {}
+    has = message.HasField
+    for name, kind, sub_fields in fields:
+        if kind == _UPB_SCALAR:
+            if has(name):
+                result[name] = getattr(message, name)
+        elif kind == _UPB_MESSAGE:
+            if has(name):
+                result[name] = _upb_to_dict(getattr(message, name), sub_fields)
+        else:
+            values = getattr(message, name)
+            if values:
+                result[name] = (
+                    list(values)
+                    if kind == _UPB_REPEATED
+                    else [_upb_to_dict(value, sub_fields) for value in values]
+                )
+    return result
+
+
+class ProtobufCodec:
+    """
+    Binary encoding of Open API frames, as used on the length-prefixed TCP
+    transport.
+
+    Frames are ProtoMessage envelopes whose payload is the message named by
+    payloadType in messages.proto. Decoding gives the same dicts JsonCodec
+    does, with enums as numbers, so handlers work with either encoding.
+    Encoding accepts enum names ("BUY", "MARKET") as well as numbers.
+
+    Uses message classes google.protobuf's C implementation (upb) builds
+    from the schema when it is installed, and a pure Python encoder
+    otherwise. The pure one also encodes the payloads upb refuses, like
+    enum members or floats in integer fields.
+    """
+
+    name = "protobuf"
+    DecodeError = ProtobufDecodeError
+
+    def __init__(self, schema: ProtoSchema = None, use_upb: bool = True):
+        self.schema = schema if schema is not None else load_schema()
+        self.backend = "upb" if (use_upb and upb_available()) else "python"
+        self._pool = None
+        # payloadType -> message class, and the class with its dict conversion
+        self._upb_encoders: dict[int, type] = {}
+        self._upb_decoders: dict[int, tuple] = {}
+        self._upb_fields: dict[str, list] = {}
+        self._decode_tables: dict[str, dict] = {}
+        self._encode_tables: dict[str, dict] = {}
+        self._decoders: dict[int, dict] = {}
+        self._encoders: dict[int, tuple] = {}
+        self._static: dict[tuple, bytes] = {}
+
+    def _decode_table(self, message_name: str) -> dict:
+        table = self._decode_tables.get(message_name)
+        if table is not None:
+            return table
+
+        # Registered before it's filled in, so recursive messages resolve
+        table = self._decode_tables[message_name] = {}
+        for field in self.schema.messages[message_name].fields:
+            if field.name == "payloadType":
+                continue
+            if field.type_name in self.schema.messages:
+                kind = _MESSAGE
+                sub_table = self._decode_table(field.type_name)
+            else:
+                kind = _SCALAR_KINDS.get(field.type_name, _INT)
+                sub_table = None
+            table[(field.number << 3) | _WIRE_TYPES[kind]] = (
+                field.name,
+                kind,
+                field.repeated,
+                sub_table,
+            )
+            if field.repeated and _WIRE_TYPES[kind] != 2:
+                table[(field.number << 3) | 2] = (field.name, _PACKED, True, kind)
+        return table
+
+    def _encode_table(self, message_name: str) -> dict:
+        table = self._encode_tables.get(message_name)
+        if table is not None:
+            return table
+
+        table = self._encode_tables[message_name] = {}
+        for field in self.schema.messages[message_name].fields:
+            enum = self.schema.enums.get(field.type_name)
+            if field.type_name in self.schema.messages:
+                kind = _MESSAGE
+                sub = (self._encode_table(field.type_name), field.type_name)
+            else:
+                kind = _SCALAR_KINDS.get(field.type_name, _INT)
+                sub = None
+            tag = bytearray()
+            _write_varint(tag, (field.number << 3) | _WIRE_TYPES[kind])
+            table[field.name] = (
+                bytes(tag),
+                kind,
+                field.repeated,
+                sub,
+                enum.values if enum is not None else None,
+            )
+        return table
+
+    def _message_name(self, payload_type: int) -> str:
+        message = self.schema.message_for_payload_type.get(payload_type)
+        return message.name if message is not None else None
+
+    def _upb_class(self, payload_type: int) -> type:
+        message_name = self._message_name(payload_type)
+        if message_name is None:
+            return None
+        if self._pool is None:
+            self._pool = descriptor_pool.DescriptorPool()
+            self._pool.Add(_file_descriptor(self.schema))
+        return message_factory.GetMessageClass(
+            self._pool.FindMessageTypeByName(message_name)
+        )
+
+    def _upb_field_table(self, message_name: str) -> list:
+        fields = self._upb_fields.get(message_name)
+        if fields is not None:
+            return fields
+
+        # Registered before it's filled in, so recursive messages resolve
+        fields = self._upb_fields[message_name] = []
+        for field in self.schema.messages[message_name].fields:
+            if field.name == "payloadType":
+                continue
+            if field.type_name in self.schema.messages:
+                kind = _UPB_REPEATED_MESSAGE if field.repeated else _UPB_MESSAGE
+                sub_fields = self._upb_field_table(field.type_name)
+            else:
+                kind = _UPB_REPEATED if field.repeated else _UPB_SCALAR
+                sub_fields = None
+            fields.append((field.name, kind, sub_fields))
+        return fields
+
+    def encode_payload(self, payload_type: int, payload: dict) -> bytes:
+        if self.backend == "upb":
+            message_class = self._upb_encoders.get(payload_type)
+            if message_class is None:
+                message_class = self._upb_encoders[payload_type] = self._upb_class(
+                    payload_type
+                )
+            if message_class is not None:
+                try:
+                    return message_class(**payload).SerializePartialToString()
+                except (TypeError, ValueError):
+                    # The Python encoder converts what upb refuses, or raises
+                    # ProtobufEncodeError
+                    pass
+
+        encoder = self._encoders.get(payload_type)
+        if encoder is None:
+            message_name = self._message_name(payload_type)
+            if message_name is None:
+                raise ProtobufEncodeError(f"Unknown payloadType {payload_type}.")
+            encoder = self._encoders[payload_type] = (
+                self._encode_table(message_name),
+                message_name,
+            )
+        return _encode_message(payload, *encoder)
+
+    def decode_payload(self, payload_type: int, data) -> dict:
+        if self.backend == "upb":
+            decoder = self._upb_decoders.get(payload_type)
+            if decoder is None:
+                message_class = self._upb_class(payload_type)
+                if message_class is None:
+                    return {}
+                decoder = self._upb_decoders[payload_type] = (
+                    message_class,
+                    self._upb_field_table(self._message_name(payload_type)),
+                )
+            message_class, fields = decoder
+            try:
+                return _upb_to_dict(message_class.FromString(data), fields)
+            except UpbDecodeError as e:
+                raise ProtobufDecodeError(f"Malformed payload: {e}") from e
+
+        table = self._decoders.get(payload_type)
+        if table is None:
+            message_name = self._message_name(payload_type)
+            if message_name is None:
+                return {}
+            table = self._decoders[payload_type] = self._decode_table(message_name)
+        return _decode_message(data, 0, len(data), table)
+
+    def encode_static(self, payload: dict) -> StaticPayload:
+        static = StaticPayload(payload)
+        static.key = tuple(payload.items())
+        return static
+
+    def encode_message(self, client_msg_id: str, payload_type: int, payload) -> bytes:
+        if isinstance(payload, StaticPayload):
+            key = (payload_type, payload.key)
+            encoded = self._static.get(key)
+            if encoded is None:
+                encoded = self._static[key] = self.encode_payload(payload_type, payload)
+        else:
+            encoded = self.encode_payload(payload_type, payload)
+
+        out = bytearray((_ENVELOPE_PAYLOAD_TYPE_TAG,))
+        _write_varint(out, payload_type)
+        out.append(_ENVELOPE_PAYLOAD_TAG)
+        _write_varint(out, len(encoded))
+        out += encoded
+        if client_msg_id:
+            msg_id = client_msg_id.encode()
+            out.append(_ENVELOPE_CLIENT_MSG_ID_TAG)
+            _write_varint(out, len(msg_id))
+            out += msg_id
+        return bytes(out)
+
+    def decode(self, frame) -> dict:
+        try:
+            msg = {}
+            payload = b""
+            pos = 0
+            end = len(frame)
+            while pos < end:
+                tag = frame[pos]
+                pos += 1
+                if tag == _ENVELOPE_PAYLOAD_TYPE_TAG:
+                    msg["payloadType"], pos = _read_varint(frame, pos)
+                elif tag == _ENVELOPE_PAYLOAD_TAG:
+                    length, pos = _read_varint(frame, pos)
+                    payload = frame[pos : pos + length]
+                    pos += length
+                elif tag == _ENVELOPE_CLIENT_MSG_ID_TAG:
+                    length, pos = _read_varint(frame, pos)
+                    msg["clientMsgId"] = frame[pos : pos + length].decode()
+                    pos += length
+                else:
+                    pos = _skip_field(frame, pos, tag & 7)
+            if pos != end or "payloadType" not in msg:
+                raise ProtobufDecodeError("Truncated or invalid ProtoMessage.")
+
+            msg["payload"] = self.decode_payload(msg["payloadType"], payload)
+            return msg
+        except (IndexError, struct.error, UnicodeDecodeError) as e:
+            raise ProtobufDecodeError(f"Malformed frame: {e}") from e
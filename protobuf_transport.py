@@ -0,0 +1,92 @@
+import asyncio
+import ssl as ssl_module
+from collections import deque
+from contextlib import asynccontextmanager
+
+from .protocol import LengthPrefixedFramer, ProtocolError
+
+# Bytes asked for per read, every frame they complete is returned before the next
+READ_CHUNK_SIZE = 256 * 1024
+
+
+class ProtobufStream:
+    """
+    Length-prefixed frames over a TCP (usually TLS) connection: every frame is
+    a 4 bytes big-endian length followed by that many bytes.
+
+    Offers the part of the websockets connection API the client uses (`send`,
+    `async for`, `closed`, `close`, `wait_closed`), so the emitter, receiver
+    and send scheduler work on either transport.
+
+    The stream is read in large chunks split by a LengthPrefixedFramer, so a
+    burst of small frames costs one read instead of two per frame.
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.framer = LengthPrefixedFramer()
+        self._frames = deque()
+        self._closed = asyncio.Event()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed.is_set()
+
+    async def send(self, frame: bytes):
+        if self._closed.is_set():
+            raise ConnectionError("Protobuf stream is closed.")
+        self.writer.write(LengthPrefixedFramer.frame(frame))
+        await self.writer.drain()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> bytes:
+        frames = self._frames
+        while not frames:
+            try:
+                data = await self.reader.read(READ_CHUNK_SIZE)
+                if not data:
+                    self._closed.set()
+                    if self.framer.buffered:
+                        raise ProtocolError(
+                            "Connection closed in the middle of a frame."
+                        )
+                    raise StopAsyncIteration
+                frames.extend(self.framer.feed(data))
+            except (ConnectionError, OSError):
+                self._closed.set()
+                raise
+        return frames.popleft()
+
+    async def close(self):
+        if self._closed.is_set() and self.writer.is_closing():
+            return
+        self._closed.set()
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except (ConnectionError, OSError):
+            pass
+
+    def abort(self):
+        """Drops the connection at once, without waiting for the peer."""
+        self._closed.set()
+        self.writer.transport.abort()
+
+    async def wait_closed(self):
+        await self._closed.wait()
+
+
+@asynccontextmanager
+async def connect(host: str, port: int, ssl=True):
+    """Opens a ProtobufStream, `ssl` is True for a default TLS context or an SSLContext."""
+    if ssl is True:
+        ssl = ssl_module.create_default_context()
+    reader, writer = await asyncio.open_connection(host, port, ssl=ssl or None)
+    stream = ProtobufStream(reader, writer)
+    try:
+        yield stream
+    finally:
+        await stream.close()
@@ -0,0 +1,309 @@
+import itertools
+from enum import IntEnum
+
+from .codec import DEFAULT_CODEC, JsonCodec
+from .messages import (
+    ProtoOAAccountAuthRes,
+    ProtoOAAccountDisconnectEvent,
+    ProtoOAErrorRes,
+    ProtoOAGetAccountListByAccessTokenRes,
+)
+from .models import PAYLOAD_TYPES, ClientAssignables
+
+# Shared by every connection so ids stay unique across reconnections
+_client_msg_ids = itertools.count(1)
+
+# Length prefix of the Protobuf transport's frames
+FRAME_HEADER_SIZE = 4
+# Frames bigger than this are a corrupted stream rather than a real message
+MAX_FRAME_SIZE = 16 * 1024 * 1024
+
+
+def next_client_msg_id(payload_type: int) -> str:
+    return f"{payload_type}-{next(_client_msg_ids)}"
+
+
+class ProtocolError(ConnectionError):
+    """The peer broke the framing, the connection can't be used anymore."""
+
+
+class AuthenticationError(ConnectionError):
+    """The server refused the application or the accounts, retrying won't help."""
+
+
+class HandshakeState(IntEnum):
+    IDLE = 0
+    # Application auth sent
+    APPLICATION_AUTH = 1
+    # Account list requested, to pick the accounts to authorize
+    ACCOUNT_LIST = 2
+    # Account auth sent for every account of the connection
+    ACCOUNT_AUTH = 3
+    READY = 4
+    # The server refused a step, see OpenApiProtocol.error
+    FAILED = 5
+
+
+class Outbound:
+    """A frame to write, with what it was encoded from."""
+
+    __slots__ = ("client_msg_id", "payload_type", "payload", "frame")
+
+    def __init__(self, client_msg_id: str, payload_type: int, payload, frame):
+        self.client_msg_id = client_msg_id
+        self.payload_type = payload_type
+        self.payload = payload
+        self.frame = frame
+
+    def __repr__(self):
+        return f"Outbound({self.client_msg_id!r}, {self.payload_type})"
+
+
+class LengthPrefixedFramer:
+    """
+    Splits a byte stream into the Protobuf transport's frames, a 4 bytes
+    big-endian length followed by that many bytes, however the bytes were
+    chunked when read.
+    """
+
+    def __init__(self, max_frame_size: int = MAX_FRAME_SIZE):
+        self.max_frame_size = max_frame_size
+        self._buffer = bytearray()
+
+    @property
+    def buffered(self) -> int:
+        return len(self._buffer)
+
+    def feed(self, data) -> list:
+        """Returns every frame completed by `data`, in order."""
+        buffer = self._buffer
+        buffer += data
+        frames = []
+        pos = 0
+        end = len(buffer)
+        while end - pos >= FRAME_HEADER_SIZE:
+            length = int.from_bytes(buffer[pos : pos + FRAME_HEADER_SIZE], "big")
+            if length > self.max_frame_size:
+                raise ProtocolError(f"Frame of {length} bytes exceeds the limit.")
+            start = pos + FRAME_HEADER_SIZE
+            if end - start < length:
+                break
+            frames.append(bytes(buffer[start : start + length]))
+            pos = start + length
+        if pos:
+            del buffer[:pos]
+        return frames
+
+    @staticmethod
+    def frame(data: bytes) -> bytes:
+        return len(data).to_bytes(FRAME_HEADER_SIZE, "big") + data
+
+
+class OpenApiProtocol:
+    """
+    The Open API session without any I/O: frames go in, decoded messages and
+    frames to write come out, so it runs the same over websockets, a TLS
+    stream, a replay or a test feeding it canned frames.
+
+    It encodes outgoing messages and runs the authentication handshake:
+    `start` queues the application auth, and the account auth right behind
+    it when the accounts are known. Each response moves `state` on and
+    queues the next step, e.g. the account list request when the accounts
+    aren't known, or a new account auth when the server disconnects one.
+    Queued frames are taken with `data_to_send`.
+    """
+
+    def __init__(self, assignables: ClientAssignables, codec: JsonCodec = None):
+        self.assignables = assignables
+        self.codec = codec if codec is not None else DEFAULT_CODEC
+        self.state = HandshakeState.IDLE
+        self.app_authorized = False
+        self.error = None
+        # Configured accounts the access token doesn't grant, left out of READY
+        self.ungranted_accounts = set()
+        self._outbound = []
+
+    @property
+    def ready(self) -> bool:
+        return self.state == HandshakeState.READY
+
+    # Outbound
+
+    def encode(self, payload_type: int, payload, client_msg_id: str = None) -> Outbound:
+        if client_msg_id is None:
+            client_msg_id = next_client_msg_id(payload_type)
+        return Outbound(
+            client_msg_id,
+            payload_type,
+            payload,
+            self.codec.encode_message(client_msg_id, payload_type, payload),
+        )
+
+    def send(self, payload_type: int, payload, client_msg_id: str = None) -> Outbound:
+        """Encodes a message and queues it for `data_to_send`."""
+        outbound = self.encode(payload_type, payload, client_msg_id)
+        self._outbound.append(outbound)
+        return outbound
+
+    @property
+    def has_data_to_send(self) -> bool:
+        return bool(self._outbound)
+
+    def data_to_send(self) -> list:
+        outbound, self._outbound = self._outbound, []
+        return outbound
+
+    def start(self, client_id: str, client_secret: str):
+        """Queues the application auth, and the account auth too when the accounts are known."""
+        assignables = self.assignables
+        account_ids = assignables.account_ids or (
+            [assignables.account_id] if assignables.account_id else []
+        )
+        # Skips waiting for the account list
+        assignables.pipelined_account_auth = bool(account_ids)
+        self.app_authorized = False
+        self.error = None
+        self.ungranted_accounts = set()
+        self.state = HandshakeState.APPLICATION_AUTH
+        self.application_auth(client_id, client_secret)
+        for account_id in account_ids:
+            self.account_auth(account_id)
+
+    def application_auth(self, client_id: str, client_secret: str) -> Outbound:
+        return self.send(
+            PAYLOAD_TYPES.PROTO_OA_APPLICATION_AUTH_REQ,
+            self.codec.encode_static(
+                {"clientId": client_id, "clientSecret": client_secret}
+            ),
+        )
+
+    def account_auth(self, account_id: int = None) -> Outbound:
+        if self.state == HandshakeState.READY:
+            self.state = HandshakeState.ACCOUNT_AUTH
+        return self.send(
+            PAYLOAD_TYPES.PROTO_OA_ACCOUNT_AUTH_REQ,
+            self.codec.encode_static(
+                {
+                    "accessToken": self.assignables.access_token,
+                    "ctidTraderAccountId": account_id or self.assignables.account_id,
+                }
+            ),
+        )
+
+    def heartbeat(self) -> Outbound:
+        return self.send(
+            PAYLOAD_TYPES.PROTO_HEARTBEAT_EVENT, self.codec.encode_static({})
+        )
+
+    # Inbound
+
+    def receive_frame(self, frame) -> dict:
+        """Decodes a frame, advancing the handshake if it's one of its responses."""
+        msg = self.codec.decode(frame)
+        step = self._HANDSHAKE_STEPS.get(msg.get("payloadType"))
+        if step is not None:
+            step(self, msg.get("payload", {}))
+        return msg
+
+    def receive_frames(self, frames) -> list:
+        receive_frame = self.receive_frame
+        return [receive_frame(frame) for frame in frames]
+
+    def _fail(self, error: str):
+        self.error = error
+        self.state = HandshakeState.FAILED
+
+    def _on_application_auth_res(self, payload: dict):
+        self.app_authorized = True
+        if self.assignables.pipelined_account_auth:
+            self.state = HandshakeState.ACCOUNT_AUTH
+            return
+        self.state = HandshakeState.ACCOUNT_LIST
+        self.send(
+            PAYLOAD_TYPES.PROTO_OA_GET_ACCOUNTS_BY_ACCESS_TOKEN_REQ,
+            {"accessToken": self.assignables.access_token},
+        )
+
+    def _on_account_list_res(self, payload: dict):
+        accounts = ProtoOAGetAccountListByAccessTokenRes.from_dict(
+            payload
+        ).ctidTraderAccount
+        assignables = self.assignables
+        self.state = HandshakeState.ACCOUNT_AUTH
+
+        if assignables.account_ids:
+            granted = {account.ctidTraderAccountId for account in accounts}
+            missing = [
+                account_id
+                for account_id in assignables.account_ids
+                if account_id not in granted
+            ]
+            if missing:
+                self.error = f"Accounts not granted to this access token: {missing}"
+                self.ungranted_accounts.update(missing)
+            for account_id in assignables.account_ids:
+                if account_id in granted:
+                    self.account_auth(account_id)
+            if missing:
+                self._check_ready()
+            return
+
+        for account in accounts:
+            if not account.isLive:
+                assignables.account_id = account.ctidTraderAccountId
+                self.account_auth()
+                return
+        self._fail("No demo account granted to this access token.")
+
+    def _on_account_auth_res(self, payload: dict):
+        account_id = ProtoOAAccountAuthRes.from_dict(payload).ctidTraderAccountId
+        if not account_id:
+            self._fail("Account authentication response missing ctidTraderAccountId.")
+            return
+
+        self.assignables.authorized_accounts.add(account_id)
+        self._check_ready(account_id)
+
+    def _check_ready(self, account_id: int = None):
+        # Ready once every account of this connection the token grants is authorized
+        assignables = self.assignables
+        expected = set(assignables.account_ids or (account_id,))
+        expected -= self.ungranted_accounts
+        if not expected:
+            self._fail(self.error)
+        elif assignables.authorized_accounts.issuperset(expected):
+            self.state = HandshakeState.READY
+
+    def _on_account_disconnect_event(self, payload: dict):
+        account_id = ProtoOAAccountDisconnectEvent.from_dict(
+            payload
+        ).ctidTraderAccountId
+        self.assignables.authorized_accounts.discard(account_id)
+        self.state = HandshakeState.ACCOUNT_AUTH
+        self.account_auth(account_id)
+
+    def _on_error_res(self, payload: dict):
+        # Later errors answer requests, not the handshake
+        if self.state in (HandshakeState.READY, HandshakeState.IDLE):
+            return
+        error = ProtoOAErrorRes.from_dict(payload)
+        account_id = error.ctidTraderAccountId
+        if (
+            self.state == HandshakeState.ACCOUNT_AUTH
+            and account_id
+            and account_id in (self.assignables.account_ids or ())
+        ):
+            # One account refused, the others can still be used
+            self.ungranted_accounts.add(account_id)
+            self.error = f"Account {account_id} refused: {error.errorCode}"
+            self._check_ready()
+            return
+        self._fail(f"{error.errorCode}: {error.description}")
+
+    _HANDSHAKE_STEPS = {
+        PAYLOAD_TYPES.PROTO_OA_APPLICATION_AUTH_RES: _on_application_auth_res,
+        PAYLOAD_TYPES.PROTO_OA_GET_ACCOUNTS_BY_ACCESS_TOKEN_RES: _on_account_list_res,
+        PAYLOAD_TYPES.PROTO_OA_ACCOUNT_AUTH_RES: _on_account_auth_res,
+        PAYLOAD_TYPES.PROTO_OA_ACCOUNT_DISCONNECT_EVENT: _on_account_disconnect_event,
+        PAYLOAD_TYPES.PROTO_OA_ERROR_RES: _on_error_res,
+    }
@@ -0,0 +1,240 @@
+import asyncio
+import time
+from collections import deque
+
+from .models import PAYLOAD_TYPES
+
+# Every request of the connection, whatever its class
+CONNECTION = "connection"
+
+TRADING_PAYLOAD_TYPES = frozenset(
+    (
+        PAYLOAD_TYPES.PROTO_OA_NEW_ORDER_REQ,
+        PAYLOAD_TYPES.PROTO_OA_CLOSE_POSITION_REQ,
+        PAYLOAD_TYPES.PROTO_OA_AMEND_POSITION_SLTP_REQ,
+    )
+)
+
+CONTROL_PAYLOAD_TYPES = frozenset(
+    (
+        PAYLOAD_TYPES.PROTO_HEARTBEAT_EVENT,
+        PAYLOAD_TYPES.PROTO_OA_APPLICATION_AUTH_REQ,
+        PAYLOAD_TYPES.PROTO_OA_ACCOUNT_AUTH_REQ,
+        PAYLOAD_TYPES.PROTO_OA_GET_ACCOUNTS_BY_ACCESS_TOKEN_REQ,
+        PAYLOAD_TYPES.PROTO_OA_RECONCILE_REQ,
+        PAYLOAD_TYPES.PROTO_OA_VERSION_REQ,
+    )
+)
+
+# Lanes in priority order: the writer always empties a lane before looking at
+# the next one, so an order never waits behind a symbols or history download.
+TRADING_LANE = 0
+CONTROL_LANE = 1
+BULK_LANE = 2
+LANE_NAMES = ("trading", "control", "bulk")
+
+# (requests per second, burst) for the whole connection. The Open API allows
+# 50 requests per second per connection, so the bucket sits a bit below that
+# to absorb clock skew.
+DEFAULT_RATE_LIMITS = {
+    CONNECTION: (45.0, 10),
+}
+
+
+def lane_for(payload_type: int) -> int:
+    if payload_type in TRADING_PAYLOAD_TYPES:
+        return TRADING_LANE
+    if payload_type in CONTROL_PAYLOAD_TYPES:
+        return CONTROL_LANE
+    return BULK_LANE
+
+
+class TokenBucket:
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def take(self) -> float:
+        """Takes a token if there is one. Returns 0, or the seconds until there is."""
+        now = time.monotonic()
+        tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if tokens >= 1:
+            self.tokens = tokens - 1
+            return 0.0
+        self.tokens = tokens
+        return (1 - tokens) / self.rate
+
+
+class LaneStats:
+    __slots__ = ("sent", "total_wait", "max_wait", "last_wait")
+
+    def __init__(self):
+        self.sent = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.last_wait = 0.0
+
+    def record(self, wait: float):
+        self.sent += 1
+        self.total_wait += wait
+        self.last_wait = wait
+        if wait > self.max_wait:
+            self.max_wait = wait
+
+
+class SendScheduler:
+    """
+    Single writer task for a websocket with trading, control and bulk lanes.
+
+    Each wakeup of the writer takes every frame that is ready, highest
+    priority lane first and as long as the connection's token bucket
+    allows, and writes them back to back before yielding again. A burst of
+    requests therefore goes out as fast as the rate limit allows and no faster.
+
+    `rate_limits` maps CONNECTION to (rate, burst), without it frames go out
+    unthrottled.
+    """
+
+    def __init__(self, websocket, rate_limits: dict = None):
+        self.websocket = websocket
+        self.buckets = {
+            name: TokenBucket(rate, capacity)
+            for name, (rate, capacity) in (rate_limits or DEFAULT_RATE_LIMITS).items()
+        }
+        self.lanes = tuple(deque() for _ in LANE_NAMES)
+        # Deliberately one bucket for trading and non-trading requests rather
+        # than a limit per class: separate 45/s limits let a connection send
+        # about 90 requests per second, over the server's 50. The lanes only
+        # decide which class gets the tokens first.
+        self.connection_bucket = self.buckets.get(CONNECTION)
+        self.lane_stats = tuple(LaneStats() for _ in LANE_NAMES)
+        self.writes = 0
+        self._wakeup = asyncio.Event()
+        self._writer_task = None
+
+    def start(self):
+        if self._writer_task is None:
+            self._writer_task = asyncio.create_task(self._writer())
+
+    def submit(self, frame, payload_type: int) -> asyncio.Future:
+        """Queues a frame and returns a future that resolves once it is written."""
+        future = asyncio.get_running_loop().create_future()
+        self.lanes[lane_for(payload_type)].append((frame, future, time.monotonic()))
+        self._wakeup.set()
+        self.start()
+        return future
+
+    async def send(self, frame, payload_type: int):
+        await self.submit(frame, payload_type)
+
+    def stats(self) -> dict:
+        return {
+            name: {
+                "depth": len(lane),
+                "sent": stats.sent,
+                "avg_wait": stats.total_wait / stats.sent if stats.sent else 0.0,
+                "max_wait": stats.max_wait,
+                "last_wait": stats.last_wait,
+            }
+            for name, lane, stats in zip(LANE_NAMES, self.lanes, self.lane_stats)
+        }
+
+    def _take_ready(self):
+        """Returns the frames that can be written now, and how long until the next one can."""
+        batch = []
+        delay = None
+        connection_bucket = self.connection_bucket
+        for index, lane in enumerate(self.lanes):
+            while lane:
+                frame, future, queued_at = lane[0]
+                if future.cancelled():
+                    lane.popleft()
+                    continue
+                wait = (
+                    connection_bucket.take() if connection_bucket is not None else 0.0
+                )
+                if wait:
+                    delay = wait if delay is None else min(delay, wait)
+                    break
+                lane.popleft()
+                batch.append((index, frame, future, queued_at))
+        return batch, delay
+
+    async def _writer(self):
+        while True:
+            batch, delay = self._take_ready()
+            if batch:
+                await self._write(batch)
+                continue
+
+            self._wakeup.clear()
+            if delay is None:
+                await self._wakeup.wait()
+            else:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def _write(self, batch):
+        self.writes += 1
+        for position, (index, frame, future, queued_at) in enumerate(batch):
+            self.lane_stats[index].record(time.monotonic() - queued_at)
+            try:
+                await self.websocket.send(frame)
+            except asyncio.CancelledError:
+                self._fail(batch[position:], ConnectionError("Send scheduler closed."))
+                raise
+            except Exception as e:
+                # The connection is gone, nothing else in the batch can make it
+                self._fail(batch[position:], e)
+                return
+            if not future.done():
+                future.set_result(None)
+
+    @staticmethod
+    def _fail(batch, exc: BaseException):
+        for _, _, future, _ in batch:
+            if not future.done():
+                future.set_exception(exc)
+
+    def detach(self) -> list:
+        """
+        Stops the writer and takes out the frames not written yet, with their
+        futures still pending, for another scheduler to adopt.
+        """
+        if self._writer_task is not None:
+            self._writer_task.cancel()
+            self._writer_task = None
+        entries = []
+        for index, lane in enumerate(self.lanes):
+            while lane:
+                frame, future, queued_at = lane.popleft()
+                if not future.done():
+                    entries.append((index, frame, future, queued_at))
+        return entries
+
+    def adopt(self, entries):
+        """Queues frames detached from another scheduler, ahead of this one's as they're older."""
+        for index, frame, future, queued_at in reversed(entries):
+            self.lanes[index].appendleft((frame, future, queued_at))
+        if entries:
+            self._wakeup.set()
+            self.start()
+
+    async def close(self, exc: BaseException = None):
+        if self._writer_task is not None:
+            self._writer_task.cancel()
+            self._writer_task = None
+
+        exc = exc or ConnectionError("Send scheduler closed before the frame was sent.")
+        for lane in self.lanes:
+            while lane:
+                _, future, _ = lane.popleft()
+                if not future.done():
+                    future.set_exception(exc)
@@ -0,0 +1,265 @@
+import struct
+import sys
+import time
+from multiprocessing import shared_memory
+
+from .models import ProtoOAExecutionType, ProtoOAPositionStatus
+from .position_book import TRADE_SIDES
+
+SPOT = 1
+EXECUTION = 2
+COMMAND_RESULT = 3
+
+# Outcome of a worker command, in COMMAND_RESULT events
+COMMAND_OK = 1
+COMMAND_FAILED = 2
+COMMAND_TIMED_OUT = 3
+
+# write sequence, capacity, stop flag, record size; padded to a cache line
+HEADER = struct.Struct("<QQQQ")
+HEADER_SIZE = 64
+SEQUENCE = struct.Struct("<Q")
+STOP_OFFSET = 16
+# sequence followed by the RingEvent fields, every one an int64
+RECORD = struct.Struct("<Q15q")
+FIELDS = struct.Struct("<15q")
+
+DEFAULT_RING_CAPACITY = 65_536
+
+# Execution events carry prices as doubles, the ring keeps them like spot prices
+PRICE_SCALE = 100_000
+
+
+def _enum_value(enum, value) -> int:
+    if isinstance(value, str):
+        member = enum.__members__.get(value)
+        return member.value if member is not None else 0
+    return value or 0
+
+
+class RingEvent:
+    """
+    One decoded event read from the ring. Prices are in 1/100000 of a unit
+    and timestamps in Unix milliseconds, fields that don't apply are 0.
+    """
+
+    __slots__ = (
+        "sequence",
+        "kind",
+        "symbol_id",
+        "timestamp",
+        "bid",
+        "ask",
+        "account_id",
+        "position_id",
+        "order_id",
+        "execution_type",
+        "position_status",
+        "trade_side",
+        "volume",
+        "price",
+        "reference",
+        "status",
+    )
+
+    def __init__(self, sequence: int, fields: tuple):
+        self.sequence = sequence
+        (
+            self.kind,
+            self.symbol_id,
+            self.timestamp,
+            self.bid,
+            self.ask,
+            self.account_id,
+            self.position_id,
+            self.order_id,
+            self.execution_type,
+            self.position_status,
+            self.trade_side,
+            self.volume,
+            self.price,
+            self.reference,
+            self.status,
+        ) = fields
+
+    def __repr__(self):
+        return f"RingEvent(#{self.sequence} kind={self.kind} symbol={self.symbol_id})"
+
+
+class SharedEventRing:
+    """
+    Single-writer ring of fixed-size event records in shared memory.
+
+    Every slot starts with the sequence number of the event it holds. The
+    writer zeroes it, writes the fields, then stores the new sequence and
+    finally bumps the ring's write sequence, so a reader that sees the same
+    sequence before and after copying the fields knows they weren't being
+    overwritten. Readers in other processes attach by name and never block
+    the writer: one that falls more than `capacity` events behind skips
+    ahead and counts what it missed.
+
+    The ordering relies on stores becoming visible in program order, as they
+    do on x86-64.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_RING_CAPACITY, name: str = None):
+        self.capacity = capacity
+        self.shm = shared_memory.SharedMemory(
+            name=name, create=True, size=HEADER_SIZE + capacity * RECORD.size
+        )
+        self.name = self.shm.name
+        self.buf = self.shm.buf
+        self.sequence = 0
+        HEADER.pack_into(self.buf, 0, 0, capacity, 0, RECORD.size)
+
+    def _publish(self, *fields):
+        sequence = self.sequence + 1
+        offset = HEADER_SIZE + (sequence - 1) % self.capacity * RECORD.size
+        buf = self.buf
+        SEQUENCE.pack_into(buf, offset, 0)
+        FIELDS.pack_into(buf, offset + SEQUENCE.size, *fields)
+        SEQUENCE.pack_into(buf, offset, sequence)
+        SEQUENCE.pack_into(buf, 0, sequence)
+        self.sequence = sequence
+        return sequence
+
+    def publish_spot(self, symbol_id: int, bid: int, ask: int, timestamp: int):
+        return self._publish(
+            SPOT, symbol_id, timestamp, bid, ask, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0
+        )
+
+    def publish_execution(self, payload: dict):
+        position = payload.get("position") or {}
+        order = payload.get("order") or {}
+        trade_data = position.get("tradeData") or order.get("tradeData") or {}
+        price = order.get("executionPrice") or position.get("price") or 0
+        return self._publish(
+            EXECUTION,
+            trade_data.get("symbolId", 0),
+            position.get("utcLastUpdateTimestamp")
+            or order.get("utcLastUpdateTimestamp")
+            or 0,
+            0,
+            0,
+            payload.get("ctidTraderAccountId", 0),
+            position.get("positionId", 0),
+            order.get("orderId", 0),
+            _enum_value(ProtoOAExecutionType, payload.get("executionType")),
+            _enum_value(ProtoOAPositionStatus, position.get("positionStatus")),
+            TRADE_SIDES.get(trade_data.get("tradeSide"), 0),
+            trade_data.get("volume", 0),
+            round(price * PRICE_SCALE),
+            0,
+            0,
+        )
+
+    def publish_command_result(
+        self,
+        reference: int,
+        status: int,
+        position_id: int = 0,
+        order_id: int = 0,
+        account_id: int = 0,
+    ):
+        return self._publish(
+            COMMAND_RESULT,
+            0,
+            int(time.time() * 1000),
+            0,
+            0,
+            account_id,
+            position_id,
+            order_id,
+            0,
+            0,
+            0,
+            0,
+            0,
+            reference,
+            status,
+        )
+
+    def request_stop(self):
+        """Tells the readers to finish, see RingReader.stopping."""
+        SEQUENCE.pack_into(self.buf, STOP_OFFSET, 1)
+
+    def close(self):
+        self.buf = None
+        self.shm.close()
+        try:
+            self.shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class RingReader:
+    """Reads a SharedEventRing from another process, starting at its next event."""
+
+    def __init__(self, name: str):
+        # Only the creating process owns the segment. Before 3.13 attaching
+        # registers it again, harmless in child processes that share their
+        # parent's resource tracker, as the pool's workers do.
+        track = {"track": False} if sys.version_info >= (3, 13) else {}
+        self.shm = shared_memory.SharedMemory(name=name, **track)
+        self.buf = self.shm.buf
+        _, self.capacity, _, record_size = HEADER.unpack_from(self.buf, 0)
+        if record_size != RECORD.size:
+            raise ValueError(f"Ring {name} has records of {record_size} bytes.")
+        self.next_sequence = self.published + 1
+        self.dropped = 0
+
+    @property
+    def published(self) -> int:
+        return SEQUENCE.unpack_from(self.buf, 0)[0]
+
+    @property
+    def stopping(self) -> bool:
+        return bool(SEQUENCE.unpack_from(self.buf, STOP_OFFSET)[0])
+
+    def poll(self, max_events: int = 4096) -> list:
+        """Every event published since the last call, up to `max_events`."""
+        buf = self.buf
+        capacity = self.capacity
+        published = SEQUENCE.unpack_from(buf, 0)[0]
+        sequence = self.next_sequence
+        if published - sequence >= capacity:
+            # Lapped by the writer, the oldest events are gone
+            skipped = published - capacity + 1 - sequence
+            self.dropped += skipped
+            sequence += skipped
+
+        events = []
+        unpack = RECORD.unpack_from
+        end = min(published, sequence + max_events - 1)
+        while sequence <= end:
+            offset = HEADER_SIZE + (sequence - 1) % capacity * RECORD.size
+            record = unpack(buf, offset)
+            if (
+                record[0] != sequence
+                or SEQUENCE.unpack_from(buf, offset)[0] != sequence
+            ):
+                # Overwritten while copying it
+                self.dropped += 1
+            else:
+                events.append(RingEvent(sequence, record[1:]))
+            sequence += 1
+        self.next_sequence = sequence
+        return events
+
+    def wait(self, timeout: float = None, max_sleep: float = 0.001) -> list:
+        """Polls until there are events, spinning briefly then sleeping up to `max_sleep`."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        sleep = 0.0
+        while True:
+            events = self.poll()
+            if events or self.stopping:
+                return events
+            if deadline is not None and time.monotonic() >= deadline:
+                return events
+            if sleep:
+                time.sleep(sleep)
+            sleep = min(max_sleep, sleep * 2 or 0.00005)
+
+    def close(self):
+        self.buf = None
+        self.shm.close()
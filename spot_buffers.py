@@ -0,0 +1,119 @@
+import time
+from array import array
+
+DEFAULT_CAPACITY = 4096
+
+
+class TickRingBuffer:
+    """
+    Fixed-size ring of (bid, ask, timestamp) ticks for one symbol.
+
+    Prices are kept as integers in 1/100000 of a unit, as sent by the API, and
+    timestamps in Unix milliseconds. Every tick is written twice, at `pos` and
+    `pos + capacity`, so the last N ticks are always contiguous in memory and
+    `window` can hand out memoryviews without copying or wrapping.
+    """
+
+    __slots__ = ("symbol_id", "capacity", "bids", "asks", "timestamps", "count", "_pos")
+
+    def __init__(self, symbol_id: int, capacity: int = DEFAULT_CAPACITY):
+        self.symbol_id = symbol_id
+        self.capacity = capacity
+        self.bids = array("q", bytes(16 * capacity))
+        self.asks = array("q", bytes(16 * capacity))
+        self.timestamps = array("q", bytes(16 * capacity))
+        self.count = 0
+        self._pos = 0
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def append(self, bid: int, ask: int, timestamp: int):
+        pos = self._pos
+        mirror = pos + self.capacity
+        self.bids[pos] = self.bids[mirror] = bid
+        self.asks[pos] = self.asks[mirror] = ask
+        self.timestamps[pos] = self.timestamps[mirror] = timestamp
+        self.count += 1
+        pos += 1
+        self._pos = 0 if pos == self.capacity else pos
+
+    def latest(self):
+        """Returns (bid, ask, timestamp) of the newest tick, or None if empty."""
+        if not self.count:
+            return None
+        # The mirrored copy of the newest tick always sits right before pos + capacity
+        index = self._pos + self.capacity - 1
+        return self.bids[index], self.asks[index], self.timestamps[index]
+
+    def window(self, n: int = None):
+        """
+        Returns (bids, asks, timestamps) memoryviews over the last `n` ticks,
+        oldest first. The views alias the buffer, so they are only valid until
+        `capacity - n` more ticks have been appended.
+        """
+        available = len(self)
+        n = available if n is None else min(n, available)
+        end = self._pos + self.capacity
+        start = end - n
+        return (
+            memoryview(self.bids)[start:end],
+            memoryview(self.asks)[start:end],
+            memoryview(self.timestamps)[start:end],
+        )
+
+
+class SpotBuffers:
+    """Per-symbol tick ring buffers fed from ProtoOASpotEvent payloads."""
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.buffers: dict[int, TickRingBuffer] = {}
+        self._callbacks = []
+
+    def on_tick(self, callback):
+        """Calls `callback(symbol_id, bid, ask, timestamp)` for every tick recorded."""
+        self._callbacks.append(callback)
+        return callback
+
+    def remove_tick_callback(self, callback):
+        if callback in self._callbacks:
+            self._callbacks.remove(callback)
+
+    def __contains__(self, symbol_id: int):
+        return symbol_id in self.buffers
+
+    def buffer(self, symbol_id: int) -> TickRingBuffer:
+        buffer = self.buffers.get(symbol_id)
+        if buffer is None:
+            buffer = self.buffers[symbol_id] = TickRingBuffer(symbol_id, self.capacity)
+        return buffer
+
+    def latest(self, symbol_id: int):
+        buffer = self.buffers.get(symbol_id)
+        return buffer.latest() if buffer is not None else None
+
+    def window(self, symbol_id: int, n: int = None):
+        return self.buffer(symbol_id).window(n)
+
+    def on_spot(self, payload: dict) -> TickRingBuffer:
+        buffer = self.buffer(payload["symbolId"])
+
+        # Spot events only carry the side that changed, carry the other one over
+        last = buffer.latest()
+        bid = payload.get("bid")
+        ask = payload.get("ask")
+        if last is not None:
+            if bid is None:
+                bid = last[0]
+            if ask is None:
+                ask = last[1]
+
+        timestamp = payload.get("timestamp")
+        if timestamp is None:
+            timestamp = int(time.time() * 1000)
+
+        buffer.append(bid or 0, ask or 0, timestamp)
+        for callback in self._callbacks:
+            callback(buffer.symbol_id, bid or 0, ask or 0, timestamp)
+        return buffer
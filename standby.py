@@ -0,0 +1,87 @@
+import asyncio
+
+from logging_config import logger
+
+from .models import ClientAssignables, WebsocketClientEvents
+from .position_book import PositionBook
+
+# Time allowed for the standby's authentication
+STANDBY_AUTH_TIMEOUT_SECONDS = 10.0
+# Delay before replacing a standby connection that failed or died
+STANDBY_RETRY_DELAY_SECONDS = 1.0
+
+
+class StandbyConnection:
+    """
+    A second connection of a WebSocketsJsonClient, authenticated for the same
+    accounts and kept alive with heartbeats and the watchdog's probes, but
+    with no subscriptions. When the client's connection dies the client
+    switches to it instead of reconnecting from scratch.
+
+    Until then it uses a position book of its own, so execution events the
+    server may also deliver here aren't applied twice.
+    """
+
+    def __init__(self, client):
+        self.client = client
+        account_ids = list(client.assignables.authorized_accounts) or list(
+            client.assignables.account_ids
+        )
+        self.assignables = ClientAssignables(
+            client.assignables.access_token,
+            account_ids=account_ids,
+            symbols=client.assignables.symbols,
+        )
+        self.assignables.account_id = client.assignables.account_id
+        self.events = WebsocketClientEvents()
+        self.position_book = PositionBook()
+        self.websocket = None
+        self.send_scheduler = None
+        self.message_emitter = None
+        self.message_receiver = None
+        self.tasks = ()
+        self._context = None
+
+    @property
+    def alive(self) -> bool:
+        return self.websocket is not None and not self.websocket.closed
+
+    async def open(self, timeout: float = STANDBY_AUTH_TIMEOUT_SECONDS):
+        client = self.client
+        account_ids = self.assignables.account_ids
+        if not account_ids:
+            raise ConnectionError("No authorized account to keep a standby for.")
+
+        self._context = client._connect()
+        self.websocket = await self._context.__aenter__()
+        (
+            self.send_scheduler,
+            self.message_emitter,
+            self.message_receiver,
+        ) = client._create_session(
+            self.websocket, self.events, self.assignables, self.position_book
+        )
+        self.tasks = client._start_session_tasks(
+            self.message_emitter, self.message_receiver
+        )
+
+        await self.message_emitter.start_session(client.client_id, client.client_secret)
+        await asyncio.wait_for(self.events.account_auth.wait(), timeout)
+        # Errors also set the event, to unblock whoever waits on it
+        if not self.assignables.authorized_accounts.issuperset(account_ids):
+            raise ConnectionError("The standby connection wasn't authorized.")
+        logger.info("Standby connection ready.")
+
+    async def close(self):
+        for task in self.tasks:
+            # There is no watchdog task without a silence deadline
+            if task is not None:
+                task.cancel()
+        if self.send_scheduler is not None:
+            await self.send_scheduler.close()
+        if self._context is not None:
+            context, self._context = self._context, None
+            try:
+                await context.__aexit__(None, None, None)
+            except Exception as e:
+                logger.info("Error closing the standby connection: %s", e)
@@ -0,0 +1,207 @@
+import asyncio
+import itertools
+import multiprocessing
+
+from logging_config import logger
+
+from .pending_requests import RequestError
+from .shared_ring import (
+    COMMAND_FAILED,
+    COMMAND_OK,
+    COMMAND_RESULT,
+    COMMAND_TIMED_OUT,
+    DEFAULT_RING_CAPACITY,
+    RingReader,
+    SharedEventRing,
+)
+
+# Emitter methods a worker may call, with their arguments
+WORKER_COMMANDS = frozenset(("open_trade", "close_position", "amend_position_sl"))
+
+# Low bits of a command reference, the worker id goes above them
+REFERENCE_BITS = 40
+
+
+class StrategyWorker:
+    """
+    What a strategy function gets in its worker process: the events from the
+    connection process and a way to send orders back to it.
+
+    Orders return a reference, the outcome arrives later as a COMMAND_RESULT
+    event with the same `reference` and a COMMAND_* `status`.
+    """
+
+    def __init__(self, worker_id: int, ring_name: str, commands):
+        self.worker_id = worker_id
+        self.reader = RingReader(ring_name)
+        self.commands = commands
+        self._references = itertools.count(1)
+
+    def events(self, max_sleep: float = 0.001):
+        """Yields every event until the pool stops, skipping other workers' command results."""
+        reader = self.reader
+        worker_id = self.worker_id
+        while not reader.stopping:
+            for event in reader.wait(1.0, max_sleep):
+                if (
+                    event.kind == COMMAND_RESULT
+                    and event.reference >> REFERENCE_BITS != worker_id
+                ):
+                    continue
+                yield event
+
+    def send(self, method: str, *args, **kwargs) -> int:
+        if method not in WORKER_COMMANDS:
+            raise ValueError(f"Workers can't call {method}.")
+        reference = (self.worker_id << REFERENCE_BITS) | next(self._references)
+        self.commands.put((reference, method, args, kwargs))
+        return reference
+
+    def open_trade(self, trade_side, symbol_name: str, stop_loss, take_profit) -> int:
+        return self.send("open_trade", trade_side, symbol_name, stop_loss, take_profit)
+
+    def close_position(self, position_id: int) -> int:
+        return self.send("close_position", position_id)
+
+    def amend_position_sl(
+        self, new_stop_loss, position_id: int, same_take_profit
+    ) -> int:
+        return self.send(
+            "amend_position_sl", new_stop_loss, position_id, same_take_profit
+        )
+
+    def close(self):
+        self.reader.close()
+
+
+def _run_worker(target, worker_id: int, ring_name: str, commands):
+    worker = StrategyWorker(worker_id, ring_name, commands)
+    try:
+        target(worker)
+    finally:
+        worker.close()
+
+
+class StrategyWorkerPool:
+    """
+    Runs `target(worker)` in `workers` processes fed from one connection.
+
+    Spot quotes and execution events are published into a SharedEventRing
+    that every worker reads without copying the messages or pickling them,
+    and the orders the workers send come back over a queue to the client's
+    current MessageEmitter. CPU-heavy strategy code then runs on other cores
+    while the connection process only decodes and forwards. `target` must be
+    importable from the workers, i.e. defined at module level.
+    """
+
+    def __init__(
+        self,
+        client,
+        target,
+        workers: int = 2,
+        capacity: int = DEFAULT_RING_CAPACITY,
+        start_method: str = "spawn",
+        command_timeout: float = 30.0,
+    ):
+        self.client = client
+        self.target = target
+        self.workers = workers
+        self.capacity = capacity
+        self.command_timeout = command_timeout
+        self.context = multiprocessing.get_context(start_method)
+        self.ring: SharedEventRing = None
+        self.commands = None
+        self.processes: list = []
+        self._command_task = None
+        self._requests = set()
+
+    def _on_tick(self, symbol_id: int, bid: int, ask: int, timestamp: int):
+        self.ring.publish_spot(symbol_id, bid, ask, timestamp)
+
+    def _on_execution(self, payload: dict):
+        self.ring.publish_execution(payload)
+
+    async def start(self):
+        self.ring = SharedEventRing(self.capacity)
+        self.commands = self.context.Queue()
+        self.client.spot_buffers.on_tick(self._on_tick)
+        self.client.position_book.on_execution(self._on_execution)
+        for worker_id in range(1, self.workers + 1):
+            process = self.context.Process(
+                target=_run_worker,
+                args=(self.target, worker_id, self.ring.name, self.commands),
+                name=f"strategy-worker-{worker_id}",
+                daemon=True,
+            )
+            process.start()
+            self.processes.append(process)
+        self._command_task = asyncio.create_task(self._serve_commands())
+        logger.info("Started %s strategy workers.", self.workers)
+        return self
+
+    async def stop(self, timeout: float = 5.0):
+        self.client.spot_buffers.remove_tick_callback(self._on_tick)
+        self.client.position_book.remove_execution_callback(self._on_execution)
+        self.ring.request_stop()
+        # Wakes up the thread blocked on the queue
+        self.commands.put(None)
+        await self._command_task
+        for request in list(self._requests):
+            request.cancel()
+
+        for process in self.processes:
+            await asyncio.to_thread(process.join, timeout)
+            if process.is_alive():
+                logger.warning("Terminating unresponsive %s.", process.name)
+                process.terminate()
+        self.processes.clear()
+        self.commands.close()
+        self.ring.close()
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+    async def _serve_commands(self):
+        while True:
+            command = await asyncio.to_thread(self.commands.get)
+            if command is None:
+                return
+            reference, method, args, kwargs = command
+            emitter = self.client.message_emitter
+            if method not in WORKER_COMMANDS or emitter is None:
+                self.ring.publish_command_result(reference, COMMAND_FAILED)
+                continue
+            try:
+                request = await getattr(emitter, method)(
+                    *args, timeout=self.command_timeout, **kwargs
+                )
+            except Exception as e:
+                logger.info("Worker command %s failed: %s", method, e)
+                self.ring.publish_command_result(reference, COMMAND_FAILED)
+                continue
+            # The outcome is published when it arrives, the next command doesn't wait
+            task = asyncio.create_task(self._publish_outcome(reference, request))
+            self._requests.add(task)
+            task.add_done_callback(self._requests.discard)
+
+    async def _publish_outcome(self, reference: int, request):
+        try:
+            msg = await request
+        except asyncio.TimeoutError:
+            self.ring.publish_command_result(reference, COMMAND_TIMED_OUT)
+            return
+        except (RequestError, ConnectionError) as e:
+            logger.info("Worker command %s failed: %s", reference, e)
+            self.ring.publish_command_result(reference, COMMAND_FAILED)
+            return
+        payload = msg.get("payload", {})
+        self.ring.publish_command_result(
+            reference,
+            COMMAND_OK,
+            (payload.get("position") or {}).get("positionId", 0),
+            (payload.get("order") or {}).get("orderId", 0),
+            payload.get("ctidTraderAccountId", 0),
+        )
@@ -0,0 +1,180 @@
+import re
+
+_SEPARATORS = re.compile(r"[/\-_. ]")
+
+
+def normalize_symbol_name(name: str) -> str:
+    return _SEPARATORS.sub("", name).upper()
+
+
+def symbol_aliases(name: str):
+    """The spellings of a symbol name that resolve to it, e.g. EURUSD, EUR/USD, eur-usd."""
+    normalized = normalize_symbol_name(name)
+    aliases = {name, name.upper(), name.lower(), normalized, normalized.lower()}
+    # Currency pairs are also commonly written with a separator
+    if len(normalized) == 6 and normalized.isalpha():
+        base, quote = normalized[:3], normalized[3:]
+        for separator in ("/", "-", "_", " "):
+            alias = f"{base}{separator}{quote}"
+            aliases.add(alias)
+            aliases.add(alias.lower())
+    return aliases
+
+
+class Symbol:
+    __slots__ = (
+        "symbol_id",
+        "name",
+        "enabled",
+        "base_asset_id",
+        "quote_asset_id",
+        "category_id",
+        "digits",
+        "pip_position",
+        "lot_size",
+        "min_volume",
+        "max_volume",
+        "step_volume",
+    )
+
+    def __init__(
+        self,
+        symbol_id: int,
+        name: str,
+        enabled: bool = True,
+        base_asset_id: int = None,
+        quote_asset_id: int = None,
+        category_id: int = None,
+    ):
+        self.symbol_id = symbol_id
+        self.name = name
+        self.enabled = enabled
+        self.base_asset_id = base_asset_id
+        self.quote_asset_id = quote_asset_id
+        self.category_id = category_id
+        # Filled in lazily from ProtoOASymbolByIdRes
+        self.digits = None
+        self.pip_position = None
+        self.lot_size = None
+        self.min_volume = None
+        self.max_volume = None
+        self.step_volume = None
+
+    @property
+    def has_details(self) -> bool:
+        return self.digits is not None
+
+    def __repr__(self):
+        return f"Symbol({self.symbol_id}, {self.name!r})"
+
+
+# Order of the fields of a symbol row in snapshots
+_SNAPSHOT_FIELDS = Symbol.__slots__
+
+
+class SymbolIndex:
+    """
+    Every symbol of the account, by id and by any usual spelling of its name.
+
+    Built once from ProtoOASymbolsListRes, so resolving a name at order entry
+    is a single dict lookup. Per-symbol details (digits, pip position, lot
+    size...) are merged in when a ProtoOASymbolByIdRes arrives.
+    """
+
+    def __init__(self):
+        self.by_id: dict[int, Symbol] = {}
+        self._by_alias: dict[str, Symbol] = {}
+
+    def __len__(self):
+        return len(self.by_id)
+
+    def __bool__(self):
+        return bool(self.by_id)
+
+    def __contains__(self, key):
+        return key in self.by_id or key in self._by_alias
+
+    def get(self, key) -> Symbol:
+        """Looks a symbol up by id or by name alias, None if unknown."""
+        symbol = self.by_id.get(key)
+        if symbol is None:
+            symbol = self._by_alias.get(key)
+            if symbol is None and isinstance(key, str):
+                symbol = self._by_alias.get(normalize_symbol_name(key))
+        return symbol
+
+    def id_for(self, name: str) -> int:
+        symbol = self._by_alias.get(name)
+        if symbol is None:
+            symbol = self._by_alias.get(normalize_symbol_name(name))
+            if symbol is None:
+                raise KeyError(f"Unknown symbol: {name}")
+        return symbol.symbol_id
+
+    def name_for(self, symbol_id: int) -> str:
+        return self.by_id[symbol_id].name
+
+    def add(self, symbol: Symbol):
+        previous = self.by_id.get(symbol.symbol_id)
+        if previous is not None:
+            for alias in symbol_aliases(previous.name):
+                if self._by_alias.get(alias) is previous:
+                    del self._by_alias[alias]
+
+        self.by_id[symbol.symbol_id] = symbol
+        for alias in symbol_aliases(symbol.name):
+            self._by_alias[alias] = symbol
+
+    def clear(self):
+        self.by_id.clear()
+        self._by_alias.clear()
+
+    def load_symbols_list(self, light_symbols):
+        """Replaces the index with the `symbol` entries of a ProtoOASymbolsListRes."""
+        self.clear()
+        for light_symbol in light_symbols:
+            self.add(
+                Symbol(
+                    light_symbol["symbolId"],
+                    light_symbol.get("symbolName", str(light_symbol["symbolId"])),
+                    light_symbol.get("enabled", True),
+                    light_symbol.get("baseAssetId"),
+                    light_symbol.get("quoteAssetId"),
+                    light_symbol.get("symbolCategoryId"),
+                )
+            )
+
+    def load_symbol_details(self, symbols):
+        """Merges the `symbol` entries of a ProtoOASymbolByIdRes into the index."""
+        for details in symbols:
+            symbol = self.by_id.get(details["symbolId"])
+            if symbol is None:
+                continue
+            symbol.digits = details.get("digits")
+            symbol.pip_position = details.get("pipPosition")
+            symbol.lot_size = details.get("lotSize")
+            symbol.min_volume = details.get("minVolume")
+            symbol.max_volume = details.get("maxVolume")
+            symbol.step_volume = details.get("stepVolume")
+
+    def missing_details(self, symbol_ids):
+        return [
+            symbol_id
+            for symbol_id in symbol_ids
+            if symbol_id in self.by_id and not self.by_id[symbol_id].has_details
+        ]
+
+    def to_snapshot(self) -> list:
+        """Compact, JSON friendly rows of field values in `Symbol.__slots__` order."""
+        return [
+            [getattr(symbol, field) for field in _SNAPSHOT_FIELDS]
+            for symbol in self.by_id.values()
+        ]
+
+    def load_snapshot(self, rows):
+        self.clear()
+        for row in rows:
+            symbol = Symbol(row[0], row[1])
+            for field, value in zip(_SNAPSHOT_FIELDS[2:], row[2:]):
+                setattr(symbol, field, value)
+            self.add(symbol)
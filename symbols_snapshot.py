@@ -0,0 +1,50 @@
+import json
+import os
+import time
+
+SYMBOLS_SNAPSHOT_PATH = os.path.join("cache", "symbols.json")
+SYMBOLS_SNAPSHOT_TTL_SECONDS = 24 * 60 * 60
+# Format of the saved symbols, to bump whenever the rows change, e.g. when a
+# field is added to Symbol. Snapshots of another version are ignored.
+SYMBOLS_SNAPSHOT_VERSION = 2
+
+
+def load_symbols_snapshot(
+    path: str = SYMBOLS_SNAPSHOT_PATH, ttl: float = SYMBOLS_SNAPSHOT_TTL_SECONDS
+):
+    """
+    Returns the symbol rows (see SymbolIndex.to_snapshot) saved at `path`, or
+    None if the snapshot is missing, unreadable, expired or in another format,
+    such as the name to id mapping saved before the rows.
+    """
+    try:
+        with open(path, encoding="utf8") as f:
+            snapshot = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if not isinstance(snapshot, dict):
+        return None
+    if snapshot.get("version") != SYMBOLS_SNAPSHOT_VERSION:
+        return None
+    if time.time() - snapshot.get("savedAt", 0) > ttl:
+        return None
+    symbols = snapshot.get("symbols")
+    return symbols if isinstance(symbols, list) else None
+
+
+def save_symbols_snapshot(symbols, path: str = SYMBOLS_SNAPSHOT_PATH):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf8") as f:
+        json.dump(
+            {
+                "version": SYMBOLS_SNAPSHOT_VERSION,
+                "savedAt": time.time(),
+                "symbols": symbols,
+            },
+            f,
+            separators=(",", ":"),
+        )
+    # Atomic, so a crash mid-write never leaves a truncated snapshot behind
+    os.replace(tmp_path, path)
@@ -0,0 +1,64 @@
+import asyncio
+import importlib
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# The modules import each other relatively and logging_config absolutely, so
+# the package is imported from its parent directory, under a fixed name.
+sys.path[:0] = [os.path.dirname(ROOT), ROOT]
+sys.modules.setdefault("ctrader", importlib.import_module(os.path.basename(ROOT)))
+
+from ctrader.config import ClientConfig  # noqa: E402
+from ctrader.json_client import WebSocketsJsonClient  # noqa: E402
+from ctrader.send_scheduler import CONNECTION  # noqa: E402
+
+UNLIMITED_RATE = {CONNECTION: (1e9, 1_000_000)}
+
+
+@pytest.fixture(params=["json", "protobuf"])
+def transport(request):
+    return request.param
+
+
+def make_client(server, account_ids=None, **kwargs) -> WebSocketsJsonClient:
+    """A client of the mock server that caches nothing and logs nowhere."""
+    kwargs.setdefault("rate_limits", UNLIMITED_RATE)
+    config = ClientConfig(
+        transport=server.transport,
+        host=server.host,
+        port=server.port,
+        ssl=False,
+        log_directory=None,
+    )
+    return WebSocketsJsonClient(
+        account_ids=server.account_ids if account_ids is None else account_ids,
+        symbols_snapshot_path=None,
+        history_cache_path=None,
+        config=config,
+        **kwargs,
+    )
+
+
+async def start(client, timeout: float = 5.0) -> asyncio.Task:
+    """Runs the client until it's ready, raising the error of a session that ends first."""
+    task = asyncio.create_task(client.run_client_and_wait())
+    ready = asyncio.create_task(client.client_ready_event.wait())
+    await asyncio.wait(
+        (task, ready), timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+    )
+    ready.cancel()
+    if task.done():
+        task.result()
+        raise AssertionError("The session ended before the client was ready.")
+    if not client.client_ready_event.is_set():
+        await stop(task)
+        raise AssertionError("The client wasn't ready in time.")
+    return task
+
+
+async def stop(task: asyncio.Task):
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
@@ -0,0 +1,102 @@
+import asyncio
+import errno
+import os
+
+import pytest
+
+from conftest import make_client, start, stop
+from ctrader import execution_journal
+from ctrader.execution_journal import ExecutionJournal, JournalReader
+from ctrader.mock_server import MockOpenApiServer
+from ctrader.models import PAYLOAD_TYPES, TradeSide
+
+EXECUTION_EVENT = PAYLOAD_TYPES.PROTO_OA_EXECUTION_EVENT
+
+
+@pytest.fixture
+def failing_syncs(monkeypatch):
+    """The number of next fdatasync calls of the journal that fail as if the disk was full."""
+    failures = {"remaining": 0}
+    fdatasync = os.fdatasync
+
+    def flaky_fdatasync(fd):
+        if failures["remaining"]:
+            failures["remaining"] -= 1
+            raise OSError(errno.ENOSPC, "No space left on device")
+        fdatasync(fd)
+
+    monkeypatch.setattr(execution_journal.os, "fdatasync", flaky_fdatasync)
+    monkeypatch.setattr(execution_journal, "WRITE_RETRY_SECONDS", 0.05)
+    return failures
+
+
+def test_failed_write_is_retried_without_losing_records(tmp_path, failing_syncs):
+    directory = str(tmp_path / "journal")
+
+    async def main():
+        journal = ExecutionJournal(directory, commit_interval=0.001)
+        for i in range(3):
+            journal.append(1, EXECUTION_EVENT, {"i": i})
+        await asyncio.wait_for(journal.commit(), 5)
+
+        failing_syncs["remaining"] = 2
+        for i in range(3, 6):
+            journal.append(1, EXECUTION_EVENT, {"i": i})
+        with pytest.raises(OSError) as error:
+            await asyncio.wait_for(journal.commit(), 5)
+        assert error.value.errno == errno.ENOSPC
+
+        for _ in range(10):
+            try:
+                await asyncio.wait_for(journal.commit(), 5)
+                break
+            except OSError:
+                pass
+        journal.append(1, EXECUTION_EVENT, {"i": 6})
+        await asyncio.wait_for(journal.commit(), 5)
+        journal.close()
+
+    asyncio.run(main())
+    records = list(JournalReader(directory).records(0))
+    assert [record.sequence for record in records] == list(range(1, 8))
+    assert [record.payload["i"] for record in records] == list(range(7))
+
+
+def test_close_ends_while_writes_keep_failing(tmp_path, failing_syncs):
+    directory = str(tmp_path / "journal")
+    journal = ExecutionJournal(directory, commit_interval=0.001)
+    failing_syncs["remaining"] = 10**9
+    journal.append(1, EXECUTION_EVENT, {"i": 0})
+    journal.close()
+    with pytest.raises(RuntimeError):
+        journal.append(1, EXECUTION_EVENT, {"i": 1})
+
+
+def test_journal_rebuilds_the_position_book(tmp_path, transport):
+    directory = str(tmp_path / "journal")
+
+    async def main():
+        journal = ExecutionJournal(directory, snapshot_interval=5)
+        async with MockOpenApiServer(transport=transport, symbols=5) as server:
+            client = make_client(server, journal=journal)
+            task = await start(client)
+            emitter = client.message_emitter
+            symbol_name = client.assignables.symbols.name_for(1)
+            position_ids = []
+            for _ in range(4):
+                order = await emitter.open_trade(TradeSide.BUY, symbol_name, 10, 10)
+                execution = await asyncio.wait_for(order, 5)
+                position_ids.append(execution["payload"]["position"]["positionId"])
+            await asyncio.wait_for(await emitter.close_position(position_ids[0]), 5)
+            await asyncio.wait_for(await emitter.reconcile(), 5)
+            await asyncio.wait_for(journal.commit(), 5)
+            live = sorted(client.position_book.positions)
+            await stop(task)
+        journal.close()
+        return live
+
+    live = asyncio.run(main())
+    reader = JournalReader(directory)
+    assert reader.latest_snapshot() is not None
+    assert sorted(reader.rebuild().positions) == live
+    assert len(live) == 3
@@ -0,0 +1,142 @@
+import asyncio
+
+import pytest
+
+from conftest import make_client, start, stop
+from ctrader.mock_server import MockOpenApiServer
+from ctrader.models import PAYLOAD_TYPES, ClientAssignables
+from ctrader.protocol import AuthenticationError, HandshakeState, OpenApiProtocol
+
+
+def started(account_ids, pipelined=True) -> OpenApiProtocol:
+    protocol = OpenApiProtocol(ClientAssignables("token", account_ids=account_ids))
+    protocol.start("client id", "client secret")
+    # Without pipelining the accounts are picked from the account list
+    protocol.assignables.pipelined_account_auth = pipelined
+    receive(protocol, PAYLOAD_TYPES.PROTO_OA_APPLICATION_AUTH_RES, {})
+    return protocol
+
+
+def receive(protocol: OpenApiProtocol, payload_type: int, payload: dict):
+    protocol.receive_frame(protocol.codec.encode_message("x", payload_type, payload))
+
+
+def account_list(*accounts) -> dict:
+    return {
+        "ctidTraderAccount": [
+            {"ctidTraderAccountId": account_id, "isLive": is_live}
+            for account_id, is_live in accounts
+        ]
+    }
+
+
+def test_pipelined_handshake_is_ready_once_every_account_is_authorized():
+    protocol = started([1, 2])
+    assert protocol.state == HandshakeState.ACCOUNT_AUTH
+    receive(
+        protocol, PAYLOAD_TYPES.PROTO_OA_ACCOUNT_AUTH_RES, {"ctidTraderAccountId": 1}
+    )
+    assert protocol.state == HandshakeState.ACCOUNT_AUTH
+    receive(
+        protocol, PAYLOAD_TYPES.PROTO_OA_ACCOUNT_AUTH_RES, {"ctidTraderAccountId": 2}
+    )
+    assert protocol.state == HandshakeState.READY
+    assert protocol.assignables.authorized_accounts == {1, 2}
+
+
+def test_refused_account_is_left_out_of_ready():
+    protocol = started([1, 2])
+    receive(
+        protocol, PAYLOAD_TYPES.PROTO_OA_ACCOUNT_AUTH_RES, {"ctidTraderAccountId": 1}
+    )
+    receive(
+        protocol,
+        PAYLOAD_TYPES.PROTO_OA_ERROR_RES,
+        {"ctidTraderAccountId": 2, "errorCode": "CH_CTID_TRADER_ACCOUNT_NOT_FOUND"},
+    )
+    assert protocol.state == HandshakeState.READY
+    assert protocol.ungranted_accounts == {2}
+
+
+def test_handshake_fails_when_every_account_is_refused():
+    protocol = started([1])
+    receive(
+        protocol,
+        PAYLOAD_TYPES.PROTO_OA_ERROR_RES,
+        {"ctidTraderAccountId": 1, "errorCode": "CH_CTID_TRADER_ACCOUNT_NOT_FOUND"},
+    )
+    assert protocol.state == HandshakeState.FAILED
+    assert "CH_CTID_TRADER_ACCOUNT_NOT_FOUND" in protocol.error
+
+
+def test_account_list_authorizes_the_granted_accounts_only():
+    protocol = started([1, 2, 3], pipelined=False)
+    assert protocol.state == HandshakeState.ACCOUNT_LIST
+    receive(
+        protocol,
+        PAYLOAD_TYPES.PROTO_OA_GET_ACCOUNTS_BY_ACCESS_TOKEN_RES,
+        account_list((1, False), (2, False)),
+    )
+    assert protocol.ungranted_accounts == {3}
+    for account_id in (1, 2):
+        receive(
+            protocol,
+            PAYLOAD_TYPES.PROTO_OA_ACCOUNT_AUTH_RES,
+            {"ctidTraderAccountId": account_id},
+        )
+    assert protocol.state == HandshakeState.READY
+
+
+def test_account_list_granting_none_fails():
+    protocol = started([1], pipelined=False)
+    receive(
+        protocol,
+        PAYLOAD_TYPES.PROTO_OA_GET_ACCOUNTS_BY_ACCESS_TOKEN_RES,
+        account_list((2, False)),
+    )
+    assert protocol.state == HandshakeState.FAILED
+
+
+def test_account_list_picks_a_demo_account():
+    protocol = started([], pipelined=False)
+    receive(
+        protocol,
+        PAYLOAD_TYPES.PROTO_OA_GET_ACCOUNTS_BY_ACCESS_TOKEN_RES,
+        account_list((1, True), (2, False)),
+    )
+    assert protocol.assignables.account_id == 2
+    receive(
+        protocol, PAYLOAD_TYPES.PROTO_OA_ACCOUNT_AUTH_RES, {"ctidTraderAccountId": 2}
+    )
+    assert protocol.state == HandshakeState.READY
+
+
+def test_account_list_without_a_demo_account_fails():
+    protocol = started([], pipelined=False)
+    receive(
+        protocol,
+        PAYLOAD_TYPES.PROTO_OA_GET_ACCOUNTS_BY_ACCESS_TOKEN_RES,
+        account_list((1, True)),
+    )
+    assert protocol.state == HandshakeState.FAILED
+
+
+def test_client_is_ready_without_the_refused_accounts(transport):
+    async def main():
+        async with MockOpenApiServer(transport=transport, symbols=5) as server:
+            client = make_client(server, account_ids=server.account_ids + [999])
+            task = await start(client)
+            assert client.assignables.authorized_accounts == set(server.account_ids)
+            await stop(task)
+
+    asyncio.run(main())
+
+
+def test_client_raises_when_no_account_is_granted(transport):
+    async def main():
+        async with MockOpenApiServer(transport=transport, symbols=5) as server:
+            client = make_client(server, account_ids=[998, 999])
+            with pytest.raises(AuthenticationError):
+                await start(client)
+
+    asyncio.run(main())
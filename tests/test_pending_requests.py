@@ -0,0 +1,160 @@
+import asyncio
+
+import pytest
+
+from conftest import make_client, start, stop
+from ctrader.message_emitter import is_order_filled
+from ctrader.mock_server import MockOpenApiServer, _MockConnection
+from ctrader.models import PAYLOAD_TYPES, ProtoOAExecutionType, TradeSide
+from ctrader.pending_requests import PendingRequests, RequestError
+
+
+def execution_event(client_msg_id, execution_type: ProtoOAExecutionType) -> dict:
+    return {
+        "clientMsgId": client_msg_id,
+        "payloadType": PAYLOAD_TYPES.PROTO_OA_EXECUTION_EVENT,
+        "payload": {"ctidTraderAccountId": 1, "executionType": execution_type.value},
+    }
+
+
+def test_responses_resolve_the_request_with_their_client_msg_id():
+    async def main():
+        requests = PendingRequests()
+        first = requests.register("a", PAYLOAD_TYPES.PROTO_OA_VERSION_REQ)
+        second = requests.register("b", PAYLOAD_TYPES.PROTO_OA_VERSION_REQ)
+        response = {
+            "clientMsgId": "b",
+            "payloadType": PAYLOAD_TYPES.PROTO_OA_VERSION_RES,
+            "payload": {},
+        }
+        assert requests.resolve(response)
+        assert await second is response
+        assert not first.done()
+        assert "a" in requests and "b" not in requests
+        assert not requests.resolve({**response, "clientMsgId": "unknown"})
+        first.cancel()
+
+    asyncio.run(main())
+
+
+def test_order_stays_pending_until_filled():
+    async def main():
+        requests = PendingRequests()
+        order = requests.register(
+            "order", PAYLOAD_TYPES.PROTO_OA_NEW_ORDER_REQ, until=is_order_filled
+        )
+        requests.resolve(execution_event("order", ProtoOAExecutionType.ORDER_ACCEPTED))
+        assert not order.done()
+        filled = execution_event("order", ProtoOAExecutionType.ORDER_FILLED)
+        requests.resolve(filled)
+        assert await order is filled
+        assert order.latency is not None
+        assert len(requests) == 0
+
+    asyncio.run(main())
+
+
+@pytest.mark.parametrize(
+    "execution_type",
+    [
+        ProtoOAExecutionType.ORDER_REJECTED,
+        ProtoOAExecutionType.ORDER_CANCELLED,
+        ProtoOAExecutionType.ORDER_EXPIRED,
+    ],
+)
+def test_order_fails_when_it_ends_without_a_fill(execution_type):
+    async def main():
+        requests = PendingRequests()
+        order = requests.register(
+            "order", PAYLOAD_TYPES.PROTO_OA_NEW_ORDER_REQ, until=is_order_filled
+        )
+        requests.resolve(execution_event("order", execution_type))
+        with pytest.raises(RequestError) as error:
+            await order
+        assert error.value.error_code == execution_type.name
+        assert len(requests) == 0
+
+    asyncio.run(main())
+
+
+def test_error_responses_fail_the_request():
+    async def main():
+        requests = PendingRequests()
+        order = requests.register(
+            "order", PAYLOAD_TYPES.PROTO_OA_NEW_ORDER_REQ, until=is_order_filled
+        )
+        requests.resolve(
+            {
+                "clientMsgId": "order",
+                "payloadType": PAYLOAD_TYPES.PROTO_OA_ORDER_ERROR_EVENT,
+                "payload": {"errorCode": "NOT_ENOUGH_MONEY"},
+            }
+        )
+        with pytest.raises(RequestError) as error:
+            await order
+        assert error.value.error_code == "NOT_ENOUGH_MONEY"
+
+    asyncio.run(main())
+
+
+def test_unanswered_requests_time_out():
+    async def main():
+        requests = PendingRequests()
+        request = requests.register(
+            "a", PAYLOAD_TYPES.PROTO_OA_VERSION_REQ, timeout=0.01
+        )
+        with pytest.raises(asyncio.TimeoutError):
+            await request
+        assert len(requests) == 0
+
+    asyncio.run(main())
+
+
+def test_open_trade_resolves_on_the_fill(transport):
+    async def main():
+        async with MockOpenApiServer(transport=transport, symbols=5) as server:
+            client = make_client(server)
+            task = await start(client)
+            symbol_name = client.assignables.symbols.name_for(1)
+            order = await client.message_emitter.open_trade(
+                TradeSide.BUY, symbol_name, 10, 10
+            )
+            execution = await asyncio.wait_for(order, 5)
+            assert (
+                execution["payload"]["executionType"]
+                == ProtoOAExecutionType.ORDER_FILLED.value
+            )
+            assert len(client.position_book) == 1
+            await stop(task)
+
+    asyncio.run(main())
+
+
+def test_open_trade_fails_on_a_rejection(transport, monkeypatch):
+    def reject(self, client_msg_id, payload):
+        self.reply(
+            client_msg_id,
+            PAYLOAD_TYPES.PROTO_OA_EXECUTION_EVENT,
+            {
+                "ctidTraderAccountId": payload.get("ctidTraderAccountId"),
+                "executionType": ProtoOAExecutionType.ORDER_REJECTED.value,
+            },
+        )
+
+    monkeypatch.setattr(_MockConnection, "handle_new_order", reject)
+
+    async def main():
+        async with MockOpenApiServer(transport=transport, symbols=5) as server:
+            client = make_client(server)
+            task = await start(client)
+            symbol_name = client.assignables.symbols.name_for(1)
+            order = await client.message_emitter.open_trade(
+                TradeSide.BUY, symbol_name, 10, 10
+            )
+            with pytest.raises(RequestError) as error:
+                await asyncio.wait_for(order, 5)
+            assert error.value.error_code == "ORDER_REJECTED"
+            assert len(client.message_emitter.pending_requests) == 0
+            await stop(task)
+
+    asyncio.run(main())
@@ -0,0 +1,55 @@
+import asyncio
+import time
+
+from ctrader.models import PAYLOAD_TYPES
+from ctrader.send_scheduler import CONNECTION, SendScheduler
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, frame):
+        self.sent.append((time.monotonic(), frame))
+
+
+def test_trading_and_other_requests_share_the_connection_limit():
+    rate, burst = 100.0, 5
+
+    async def main():
+        websocket = FakeWebSocket()
+        scheduler = SendScheduler(websocket, {CONNECTION: (rate, burst)})
+        started = time.monotonic()
+        futures = []
+        for i in range(10):
+            futures.append(
+                scheduler.submit(f"order {i}", PAYLOAD_TYPES.PROTO_OA_NEW_ORDER_REQ)
+            )
+            futures.append(
+                scheduler.submit(
+                    f"details {i}", PAYLOAD_TYPES.PROTO_OA_SYMBOL_BY_ID_REQ
+                )
+            )
+        await asyncio.wait_for(asyncio.gather(*futures), 5)
+        await scheduler.close()
+        return started, websocket.sent
+
+    started, sent = asyncio.run(main())
+    assert len(sent) == 20
+    # One bucket for both classes: after the burst, `rate` frames per second in all
+    assert sent[-1][0] - started >= (len(sent) - burst) / rate * 0.9
+    # The orders go first
+    assert [frame for _, frame in sent[:10]] == [f"order {i}" for i in range(10)]
+
+
+def test_close_fails_the_frames_not_written():
+    async def main():
+        scheduler = SendScheduler(FakeWebSocket(), {CONNECTION: (1.0, 1)})
+        first = scheduler.submit("first", PAYLOAD_TYPES.PROTO_OA_VERSION_REQ)
+        second = scheduler.submit("second", PAYLOAD_TYPES.PROTO_OA_VERSION_REQ)
+        await asyncio.wait_for(first, 1)
+        await scheduler.close()
+        return second
+
+    second = asyncio.run(main())
+    assert isinstance(second.exception(), ConnectionError)
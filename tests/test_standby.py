@@ -0,0 +1,61 @@
+import asyncio
+
+from conftest import make_client, start, stop
+from ctrader.mock_server import MockOpenApiServer
+
+
+async def standby_ready(client, timeout: float = 5.0):
+    async def wait():
+        while client._standby is None:
+            await asyncio.sleep(0.01)
+
+    await asyncio.wait_for(wait(), timeout)
+
+
+def live_connections(server) -> list:
+    return sorted(
+        (connection for connection in server.connections if not connection.frozen),
+        key=lambda connection: connection.opened_at,
+    )
+
+
+def test_silent_primary_fails_over_to_the_standby(transport):
+    async def main():
+        async with MockOpenApiServer(transport=transport, symbols=5) as server:
+            client = make_client(server, standby=True, silence_deadline=0.5)
+            task = await start(client)
+            await standby_ready(client)
+            await asyncio.wait_for(await client.message_emitter.reconcile(), 5)
+
+            live_connections(server)[0].frozen = True
+            # Sent to the silent primary, answered once it's replayed on the standby
+            details = await client.message_emitter.get_symbol_details([1])
+            await asyncio.wait_for(details, 5)
+            assert client.failovers == 1
+            assert not task.done()
+
+            await standby_ready(client)
+            live_connections(server)[0].abort()
+            while client.failovers < 2:
+                await asyncio.sleep(0.01)
+            await asyncio.wait_for(await client.message_emitter.reconcile(), 5)
+            await stop(task)
+
+    asyncio.run(main())
+
+
+def test_stopping_closes_the_standby_without_a_watchdog(transport):
+    async def main():
+        async with MockOpenApiServer(transport=transport, symbols=5) as server:
+            client = make_client(server, standby=True, silence_deadline=None)
+            task = await start(client)
+            await standby_ready(client)
+            assert len(server.connections) == 2
+            await stop(task)
+            for _ in range(100):
+                if not server.connections:
+                    break
+                await asyncio.sleep(0.01)
+            assert not server.connections
+
+    asyncio.run(main())
@@ -0,0 +1,54 @@
+import json
+import time
+
+from ctrader.symbols_snapshot import (
+    SYMBOLS_SNAPSHOT_VERSION,
+    load_symbols_snapshot,
+    save_symbols_snapshot,
+)
+
+ROWS = [[1, "EURUSD", 5], [2, "GBPUSD", 5]]
+
+
+def write(path, snapshot):
+    path.write_text(json.dumps(snapshot), encoding="utf8")
+
+
+def test_saved_snapshot_loads_back(tmp_path):
+    path = str(tmp_path / "cache" / "symbols.json")
+    save_symbols_snapshot(ROWS, path)
+    assert load_symbols_snapshot(path) == ROWS
+
+
+def test_snapshot_of_another_version_is_ignored(tmp_path):
+    path = tmp_path / "symbols.json"
+    write(
+        path,
+        {
+            "version": SYMBOLS_SNAPSHOT_VERSION - 1,
+            "savedAt": time.time(),
+            "symbols": ROWS,
+        },
+    )
+    assert load_symbols_snapshot(str(path)) is None
+
+
+def test_name_to_id_mapping_of_older_versions_is_ignored(tmp_path):
+    path = tmp_path / "symbols.json"
+    write(path, {"EURUSD": 1, "GBPUSD": 2})
+    assert load_symbols_snapshot(str(path)) is None
+    write(path, [["EURUSD", 1]])
+    assert load_symbols_snapshot(str(path)) is None
+
+
+def test_expired_snapshot_is_ignored(tmp_path):
+    path = str(tmp_path / "symbols.json")
+    save_symbols_snapshot(ROWS, path)
+    assert load_symbols_snapshot(path, ttl=-1) is None
+
+
+def test_missing_or_corrupt_snapshot_is_ignored(tmp_path):
+    path = tmp_path / "symbols.json"
+    assert load_symbols_snapshot(str(path)) is None
+    path.write_text("{", encoding="utf8")
+    assert load_symbols_snapshot(str(path)) is None
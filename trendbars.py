@@ -0,0 +1,192 @@
+import asyncio
+from array import array
+from bisect import bisect_left
+
+from .models import TrendbarPeriod
+
+PERIOD_MILLISECONDS = {
+    TrendbarPeriod.M1: 60_000,
+    TrendbarPeriod.M2: 120_000,
+    TrendbarPeriod.M3: 180_000,
+    TrendbarPeriod.M4: 240_000,
+    TrendbarPeriod.M5: 300_000,
+    TrendbarPeriod.M10: 600_000,
+    TrendbarPeriod.M15: 900_000,
+    TrendbarPeriod.M30: 1_800_000,
+    TrendbarPeriod.H1: 3_600_000,
+    TrendbarPeriod.H4: 14_400_000,
+    TrendbarPeriod.H12: 43_200_000,
+    TrendbarPeriod.D1: 86_400_000,
+}
+
+DEFAULT_PERIODS = (TrendbarPeriod.M1, TrendbarPeriod.M5, TrendbarPeriod.H1)
+
+BAR_COLUMNS = ("start", "open", "high", "low", "close", "ticks")
+
+
+class Trendbar:
+    """OHLC bar built from bid ticks. Prices in 1/100000 of a unit, times in Unix ms."""
+
+    __slots__ = (
+        "symbol_id",
+        "period",
+        "start",
+        "open",
+        "high",
+        "low",
+        "close",
+        "ticks",
+    )
+
+    def __init__(self, symbol_id: int, period: TrendbarPeriod, start: int, price: int):
+        self.symbol_id = symbol_id
+        self.period = period
+        self.start = start
+        self.open = self.high = self.low = self.close = price
+        self.ticks = 1
+
+    def __repr__(self):
+        return (
+            f"Trendbar({self.period.name} {self.symbol_id} @ {self.start}: "
+            f"O={self.open} H={self.high} L={self.low} C={self.close} T={self.ticks})"
+        )
+
+
+class ClosedBars:
+    """Columnar store of closed bars for one symbol and period."""
+
+    __slots__ = ("max_bars", "start", "open", "high", "low", "close", "ticks")
+
+    def __init__(self, max_bars: int):
+        self.max_bars = max_bars
+        self.start = array("q")
+        self.open = array("q")
+        self.high = array("q")
+        self.low = array("q")
+        self.close = array("q")
+        self.ticks = array("q")
+
+    def __len__(self):
+        return len(self.start)
+
+    def columns(self):
+        return self.start, self.open, self.high, self.low, self.close, self.ticks
+
+    def append(self, bar: Trendbar):
+        self.start.append(bar.start)
+        self.open.append(bar.open)
+        self.high.append(bar.high)
+        self.low.append(bar.low)
+        self.close.append(bar.close)
+        self.ticks.append(bar.ticks)
+
+        # Trim in chunks so the amortized cost per bar stays O(1)
+        if self.max_bars and len(self.start) >= 2 * self.max_bars:
+            excess = len(self.start) - self.max_bars
+            for column in self.columns():
+                del column[:excess]
+
+
+class TrendbarAggregator:
+    """
+    Keeps running OHLC bars per symbol and period, updated in O(1) per tick.
+
+    A bar is closed by the first tick that falls into a later period bucket.
+    Closed bars are appended to `ClosedBars` columns and handed to every
+    `on_bar_close` callback and `bars()` iterator.
+    """
+
+    def __init__(self, periods=DEFAULT_PERIODS, max_bars: int = 10_000):
+        self.periods = tuple(
+            (period, PERIOD_MILLISECONDS[period]) for period in periods
+        )
+        self.max_bars = max_bars
+        self.running: dict[int, list] = {}
+        self.closed: dict[tuple, ClosedBars] = {}
+        self._callbacks = []
+        self._queues: list[asyncio.Queue] = []
+
+    def on_bar_close(self, callback):
+        self._callbacks.append(callback)
+        return callback
+
+    async def bars(self, maxsize: int = 0):
+        """Async iterator over closed bars from the moment it starts being iterated."""
+        queue = asyncio.Queue(maxsize)
+        self._queues.append(queue)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self._queues.remove(queue)
+
+    def current(self, symbol_id: int, period: TrendbarPeriod):
+        bars = self.running.get(symbol_id)
+        if bars is None:
+            return None
+        for (bar_period, _), bar in zip(self.periods, bars):
+            if bar_period is period:
+                return bar
+        return None
+
+    def history(self, symbol_id: int, period: TrendbarPeriod) -> ClosedBars:
+        key = (symbol_id, period)
+        closed = self.closed.get(key)
+        if closed is None:
+            closed = self.closed[key] = ClosedBars(self.max_bars)
+        return closed
+
+    def seed(self, symbol_id: int, period: TrendbarPeriod, bars: ClosedBars):
+        """
+        Puts downloaded bars (see history.HistoryDownloader) before the ones
+        built from live ticks, so a strategy can warm up without waiting.
+        """
+        closed = self.history(symbol_id, period)
+        running = self.current(symbol_id, period)
+        if len(closed):
+            first_live = closed.start[0]
+        elif running is not None:
+            first_live = running.start
+        else:
+            first_live = None
+        end = len(bars) if first_live is None else bisect_left(bars.start, first_live)
+
+        for name, column, seeded in zip(BAR_COLUMNS, closed.columns(), bars.columns()):
+            column = seeded[:end] + column
+            if self.max_bars and len(column) > self.max_bars:
+                del column[: len(column) - self.max_bars]
+            setattr(closed, name, column)
+
+    def on_tick(self, symbol_id: int, price: int, timestamp: int):
+        bars = self.running.get(symbol_id)
+        if bars is None:
+            bars = self.running[symbol_id] = [None] * len(self.periods)
+
+        for i, (period, milliseconds) in enumerate(self.periods):
+            start = timestamp - timestamp % milliseconds
+            bar = bars[i]
+
+            if bar is not None and bar.start == start:
+                if price > bar.high:
+                    bar.high = price
+                elif price < bar.low:
+                    bar.low = price
+                bar.close = price
+                bar.ticks += 1
+                continue
+
+            # Late ticks for an already closed bucket are dropped
+            if bar is not None and start < bar.start:
+                continue
+
+            bars[i] = Trendbar(symbol_id, period, start, price)
+            if bar is not None:
+                self._close(bar)
+
+    def _close(self, bar: Trendbar):
+        self.history(bar.symbol_id, bar.period).append(bar)
+        for callback in self._callbacks:
+            callback(bar)
+        for queue in self._queues:
+            if not queue.full():
+                queue.put_nowait(bar)
@@ -0,0 +1,24 @@
+"""
+The websockets library, imported on first use: it takes longer to import
+than the rest of the client, and a client on the Protobuf transport never
+needs it.
+"""
+
+import sys
+
+
+def connect(uri: str, ssl=None):
+    """websockets.client.connect, an awaitable and async context manager."""
+    import websockets.client
+
+    return websockets.client.connect(uri, ssl=ssl)
+
+
+def websocket_errors(name: str = "WebSocketException") -> tuple:
+    """
+    The websockets exception `name` as a tuple to use in `except`, evaluated
+    when an exception is raised. It's empty while websockets isn't imported,
+    since no websocket could have raised it then.
+    """
+    exceptions = sys.modules.get("websockets.exceptions")
+    return (getattr(exceptions, name),) if exceptions is not None else ()